@@ -22,6 +22,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 
+from .responses import FastJSONResponse
 from .routers import auth_router, crawler_router, data_router, websocket_router, publisher_router
 from .services.auth_service import init_user_db
 
@@ -31,7 +32,8 @@ API_ONLY = os.environ.get("API_ONLY", "").lower() in ("1", "true", "yes")
 app = FastAPI(
     title="LittleCrawler API",
     description="多平台社交媒体爬虫控制API - 支持小红书、知乎",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse,
 )
 
 # Get webui static files directory
@@ -168,11 +170,13 @@ async def get_config_options():
         ],
         "save_options": [
             {"value": "json", "label": "JSON File"},
+            {"value": "jsonl", "label": "JSON Lines File"},
             {"value": "csv", "label": "CSV File"},
             {"value": "excel", "label": "Excel File"},
             {"value": "sqlite", "label": "SQLite Database"},
             {"value": "db", "label": "MySQL Database"},
             {"value": "mongodb", "label": "MongoDB Database"},
+            {"value": "parquet", "label": "Parquet Dataset"},
         ],
     }
 
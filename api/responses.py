@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+"""
+API 响应类
+
+FastJSONResponse 使用 src.utils.codec 序列化，安装 orjson/msgspec 时由其完成，输出格式与 JSONResponse 相同（紧凑、不转义非 ASCII 字符）
+"""
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from src.utils import codec
+
+
+class FastJSONResponse(JSONResponse):
+    """作为 FastAPI 的 default_response_class，数据预览等大响应的序列化不再占用事件循环过久"""
+
+    def render(self, content: Any) -> bytes:
+        return codec.dumps_bytes(content)
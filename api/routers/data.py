@@ -7,18 +7,21 @@
 - GET /data/files/{path} - 预览文件内容
 - GET /data/download/{path} - 下载文件
 - GET /data/stats - 获取数据统计
+- GET /data/sqlite/{table} - 只读预览SQLite表数据
 
 所有接口需要Bearer Token认证
 """
 
+import asyncio
 import os
-import json
 from pathlib import Path
 from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import FileResponse
 
+from src.storage.base.sqlite_writer import open_readonly_connection
+from src.utils import codec
 from .auth import get_current_user
 
 router = APIRouter(prefix="/data", tags=["数据管理"])
@@ -39,13 +42,20 @@ def get_file_info(file_path: Path) -> dict:
     # 尝试获取记录数
     try:
         if file_path.suffix == ".json":
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            with open(file_path, "rb") as f:
+                data = codec.loads(f.read())
                 if isinstance(data, list):
                     record_count = len(data)
+        elif file_path.suffix == ".jsonl":
+            with open(file_path, "r", encoding="utf-8") as f:
+                record_count = sum(1 for line in f if line.strip())
         elif file_path.suffix == ".csv":
             with open(file_path, "r", encoding="utf-8") as f:
                 record_count = sum(1 for _ in f) - 1  # 减去表头行
+        elif file_path.suffix == ".parquet":
+            import pyarrow.parquet as pq
+            # 记录数直接读取文件元数据，无需扫描数据
+            record_count = pq.ParquetFile(file_path).metadata.num_rows
     except Exception:
         pass
 
@@ -69,13 +79,13 @@ async def list_data_files(
     获取数据文件列表
     
     - **platform**: 平台过滤 (xhs/zhihu/xhy)
-    - **file_type**: 文件类型过滤 (json/csv/xlsx)
+    - **file_type**: 文件类型过滤 (json/jsonl/csv/xlsx/parquet)
     """
     if not DATA_DIR.exists():
         return {"files": []}
 
     files = []
-    supported_extensions = {".json", ".csv", ".xlsx", ".xls"}
+    supported_extensions = {".json", ".jsonl", ".csv", ".xlsx", ".xls", ".parquet"}
 
     for root, dirs, filenames in os.walk(DATA_DIR):
         root_path = Path(root)
@@ -137,14 +147,25 @@ async def get_file_content(
         # 返回预览数据
         try:
             if full_path.suffix == ".json":
-                with open(full_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
+                with open(full_path, "rb") as f:
+                    data = codec.loads(f.read())
                     if isinstance(data, list):
                         # 取最后 limit 条并倒序返回（最新的在前）
                         latest_data = data[-limit:] if len(data) > limit else data
                         latest_data = list(reversed(latest_data))
                         return {"data": latest_data, "total": len(data)}
                     return {"data": data, "total": 1}
+            elif full_path.suffix == ".jsonl":
+                # 只保留最后 limit 行并倒序返回（最新的在前）
+                from collections import deque
+                total = 0
+                latest_lines = deque(maxlen=limit)
+                with open(full_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            total += 1
+                            latest_lines.append(line)
+                return {"data": [codec.loads(line) for line in reversed(latest_lines)], "total": total}
             elif full_path.suffix == ".csv":
                 import csv
                 with open(full_path, "r", encoding="utf-8") as f:
@@ -172,9 +193,23 @@ async def get_file_content(
                     "total": total,
                     "columns": list(df.columns)
                 }
+            elif full_path.suffix == ".parquet":
+                import pyarrow.parquet as pq
+                parquet_file = pq.ParquetFile(full_path)
+                # 按批读取前limit行，不加载整个文件
+                rows = []
+                for batch in parquet_file.iter_batches(batch_size=limit):
+                    rows.extend(batch.to_pylist())
+                    if len(rows) >= limit:
+                        break
+                return {
+                    "data": rows[:limit],
+                    "total": parquet_file.metadata.num_rows,
+                    "columns": parquet_file.schema_arrow.names
+                }
             else:
                 raise HTTPException(status_code=400, detail="不支持预览该文件类型")
-        except json.JSONDecodeError:
+        except codec.JSONDecodeError:
             raise HTTPException(status_code=400, detail="无效的JSON文件")
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
@@ -235,7 +270,7 @@ async def get_data_stats(current_user: dict = Depends(get_current_user)):
         "by_type": {}
     }
 
-    supported_extensions = {".json", ".csv", ".xlsx", ".xls"}
+    supported_extensions = {".json", ".jsonl", ".csv", ".xlsx", ".xls", ".parquet"}
 
     for root, dirs, filenames in os.walk(DATA_DIR):
         root_path = Path(root)
@@ -263,3 +298,39 @@ async def get_data_stats(current_user: dict = Depends(get_current_user)):
                 continue
 
     return stats
+
+
+def _query_sqlite_table(table: str, limit: int) -> dict:
+    """
+    通过只读连接查询SQLite表，不会与写线程争用写锁
+    """
+    conn = open_readonly_connection()
+    try:
+        tables = {row["name"] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if table not in tables:
+            raise HTTPException(status_code=404, detail="表不存在")
+        total = conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+        rows = conn.execute(f'SELECT * FROM "{table}" ORDER BY id DESC LIMIT ?', (limit,)).fetchall()
+        return {"data": [dict(row) for row in rows], "total": total}
+    finally:
+        conn.close()
+
+
+@router.get("/sqlite/{table}", summary="预览SQLite表数据")
+async def get_sqlite_table(
+    table: str,
+    limit: int = 100,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    只读预览SQLite表数据（最新的在前）
+
+    - **table**: 表名，如 xhs_note / zhihu_content
+    - **limit**: 预览记录数，默认100
+    """
+    try:
+        return await asyncio.to_thread(_query_sqlite_table, table, limit)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -11,6 +11,7 @@
 所有接口需要Bearer Token认证
 """
 
+import asyncio
 import base64
 import os
 import tempfile
@@ -20,11 +21,15 @@ from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
 from pydantic import BaseModel
 
 from .auth import get_current_user
+from src.services.media import make_thumbnail_bytes
 from src.utils import utils
 
 
 router = APIRouter(prefix="/publisher", tags=["笔记发布"])
 
+# 上传预览缩略图最长边像素
+PREVIEW_MAX_SIZE = 480
+
 
 # ========== 数据模型 ==========
 
@@ -186,11 +191,18 @@ async def upload_image(
             detail=f"不支持的图片格式: {file.content_type}"
         )
     
+    content = await file.read()
+    # 上传前先生成预览缩略图（Base64 data URL，原图仍用于发布），无法解码的图片直接拒绝，不会在远端留下无用文件
+    try:
+        thumbnail = await asyncio.to_thread(make_thumbnail_bytes, content, PREVIEW_MAX_SIZE, "WEBP")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"图片无法解码: {str(e)}")
+    preview_url = f"data:image/webp;base64,{base64.b64encode(thumbnail).decode()}"
+    
     try:
         # 保存临时文件
         suffix = os.path.splitext(file.filename or "image.jpg")[1] or ".jpg"
         with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            content = await file.read()
             tmp.write(content)
             tmp_path = tmp.name
         
@@ -210,9 +222,6 @@ async def upload_image(
                 "local_path": tmp_path,
             }
             
-            # 生成预览URL（Base64 data URL）
-            preview_url = f"data:{file.content_type};base64,{base64.b64encode(content).decode()}"
-            
             return ImageUploadResponse(
                 file_id=file_id,
                 width=image_info.width,
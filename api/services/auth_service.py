@@ -130,7 +130,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     使用简单的base64编码 + 签名方式生成Token
     """
     import base64
-    import json
+    from src.utils import codec
     import hmac
     
     to_encode = data.copy()
@@ -138,7 +138,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     to_encode.update({"exp": expire.isoformat()})
     
     # 编码payload
-    payload = base64.urlsafe_b64encode(json.dumps(to_encode).encode()).decode()
+    payload = base64.urlsafe_b64encode(codec.dumps_bytes(to_encode)).decode()
     
     # 生成签名
     signature = hmac.new(
@@ -157,7 +157,7 @@ def verify_token(token: str) -> Optional[dict]:
     解析并验证Token，返回payload或None
     """
     import base64
-    import json
+    from src.utils import codec
     import hmac
     
     try:
@@ -178,7 +178,7 @@ def verify_token(token: str) -> Optional[dict]:
             return None
         
         # 解码payload
-        payload = json.loads(base64.urlsafe_b64decode(payload_b64.encode()))
+        payload = codec.loads(base64.urlsafe_b64decode(payload_b64.encode()))
         
         # 验证过期时间
         exp = datetime.fromisoformat(payload["exp"])
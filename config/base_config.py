@@ -15,6 +15,27 @@ IP_PROXY_POOL_COUNT = 2
 # 代理IP提供商名称
 IP_PROXY_PROVIDER_NAME = "kuaidaili"  # kuaidaili | wandouhttp
 
+# 代理有效性验证地址，从服务商拉取的一批代理并发验证，只有验证通过的代理进入代理池
+PROXY_VALIDATE_URL = "https://echo.apifox.cn/"
+# 单个代理的验证超时（秒）
+PROXY_VALIDATE_TIMEOUT = 5
+# 代理池中可用代理少于该数量时，在后台从服务商补充
+PROXY_POOL_LOW_WATER = 1
+# 当前代理剩余有效期少于该秒数时，提前切换到池中已验证的代理
+PROXY_ROTATE_AHEAD_SEC = 60
+
+# 多代理并发模式：同时绑定 IP_PROXY_POOL_COUNT 个代理，每个代理一个长连接 HTTP 客户端，
+# API 请求按健康分和 EWMA 延迟分配到各代理，吞吐随代理数量增长（需开启 ENABLE_IP_PROXY，浏览器仍使用第一个代理）
+ENABLE_MULTI_PROXY = False
+# EWMA 延迟和健康分的平滑系数（0 ~ 1），越大越看重最近的请求
+PROXY_EWMA_ALPHA = 0.3
+# 代理连续失败（连接错误 / 代理网关错误）达到该次数后被隔离，并从代理池换入新代理
+PROXY_MAX_FAILURES = 3
+# 代理隔离时长（秒），代理池取不到新代理时，隔离到期后重新试用
+PROXY_QUARANTINE_SEC = 120
+# 代理健康分和延迟的保存文件，下次运行沿用，为空时不保存
+PROXY_SCORE_FILE = "browser_data/proxy_scores.json"
+
 # 设置为True不会打开浏览器（无头浏览器）
 # 设置False会打开一个浏览器
 # 小红书如果一直扫码登录不通过，打开浏览器手动过一下滑动验证码
@@ -24,6 +45,22 @@ HEADLESS = False
 # 是否保存登录状态
 SAVE_LOGIN_STATE = True
 
+# ==================== 多账号会话池 ====================
+# 配置多个账号后，每个账号拥有独立的浏览器上下文、签名页面、API 客户端和请求速率预算，
+# 请求调度到健康账号，吞吐随账号数量增长；单个账号触发验证码/封禁后进入冷却，其余账号继续爬取
+# 每项: {"name": 账号名, "cookies": Cookie 字符串, "user_data_dir": 登录态目录（可选）}
+# cookies 为空时使用该账号登录态目录中保存的登录状态（需开启 SAVE_LOGIN_STATE），
+# 未指定 user_data_dir 时使用 browser_data/USER_DATA_DIR（平台名_账号名）
+# 启动流程中登录的主账号（LOGIN_TYPE / COOKIES）始终作为第一个账号；CDP 模式只用于主账号
+# 并发请求数仍受 MAX_CONCURRENCY_NUM 限制，多账号时建议不小于账号数
+ACCOUNTS = []
+# 单个账号每秒最多发起的 API 调用数，<= 0 表示不限速（仅在配置了 ACCOUNTS 时生效）
+ACCOUNT_RATE_LIMIT = 1.0
+# 账号健康检查（pong）失败或触发验证码后的冷却时间（秒），冷却结束后重新检查
+ACCOUNT_COOLDOWN_SEC = 300
+# 账号连续失败次数上限，所有账号都达到上限时停止爬取
+ACCOUNT_MAX_FAILURES = 3
+
 # ==================== CDP (Chrome DevTools Protocol) 配置 ====================
 # 是否启用CDP模式 - 使用用户现有的Chrome/Edge浏览器进行爬取，提供更好的反检测能力
 # 启用后将自动检测并启动用户的Chrome/Edge浏览器，通过CDP协议进行控制
@@ -51,8 +88,27 @@ BROWSER_LAUNCH_TIMEOUT = 60
 # 设置为False可以保持浏览器运行，便于调试
 AUTO_CLOSE_BROWSER = True
 
-# 数据保存类型选项配置,支持五种类型：csv、db、json、sqlite、excel, 最好保存到DB，有排重的功能。
-SAVE_DATA_OPTION = "json"  # csv or db or json or sqlite or excel
+# 数据保存类型选项配置,支持以下类型：csv、db、json、jsonl、sqlite、mongodb、excel、parquet, 最好保存到DB，有排重的功能。
+# 支持同时写入多个存储，用逗号分隔，例如 "sqlite,jsonl"，一次爬取同时写入所有存储
+SAVE_DATA_OPTION = "json"  # csv or db or json or jsonl or sqlite or mongodb or excel or parquet
+
+# 多存储同时写入时，每个存储独立的待写入队列长度，慢的存储只会堆积自己的队列
+SAVE_DATA_QUEUE_SIZE = 1000
+# 队列满后记录暂存到该存储自己的积压列表中，不阻塞爬取和其他存储；积压超过此长度后该存储丢弃新记录并记录错误日志
+SAVE_DATA_BACKLOG_SIZE = 100000
+
+# Excel 流式写入模式（openpyxl write-only），数据逐行写入临时文件而不是常驻内存，适合大数据量导出
+EXCEL_STREAMING_MODE = False
+# 流式模式下单个文件每个工作表的最大行数，超过后滚动写入新文件（Excel 上限为 1048576 行）
+EXCEL_STREAMING_MAX_ROWS = 1000000
+# 流式模式下用于估算列宽的样本行数
+EXCEL_STREAMING_SAMPLE_ROWS = 100
+
+# Parquet 输出配置（需要安装 pyarrow），按 平台/日期/实体 分区写入 data/parquet 目录
+# 每个行组（row group）包含的记录数，越大压缩率和读取性能越好，但占用内存越多
+PARQUET_ROW_GROUP_SIZE = 10000
+# 压缩算法
+PARQUET_COMPRESSION = "zstd"
 
 # 用户浏览器缓存的浏览器文件配置
 USER_DATA_DIR = "%s_user_data_dir"  # %s will be replaced by platform name
@@ -66,9 +122,75 @@ CRAWLER_MAX_NOTES_COUNT = 15
 # 并发爬虫数量控制
 MAX_CONCURRENCY_NUM = 1
 
+# 创作者模式：多个创作者并发抓取，列表分页、详情和评论请求共享 MAX_CONCURRENCY_NUM 并发预算
+# 待处理内容队列长度，队列满时列表分页会等待详情/评论 worker
+CREATOR_PIPELINE_QUEUE_SIZE = 100
+
 # 是否开启爬媒体模式（包含图片或视频资源），默认不开启爬媒体
 ENABLE_GET_MEIDAS = False
 
+# 媒体下载配置：媒体文件由独立的下载池流式写入磁盘，不阻塞帖子爬取
+# 并发下载数
+MEDIA_DOWNLOAD_CONCURRENCY = 4
+# 待下载队列长度，队列满时爬取会等待下载池
+MEDIA_DOWNLOAD_QUEUE_SIZE = 200
+# 单个文件失败重试次数，重试时通过 HTTP Range 断点续传
+MEDIA_DOWNLOAD_RETRIES = 3
+# 每个 CDN 域名每秒最多发起的请求数（按域名后缀匹配），未匹配的域名使用默认值
+MEDIA_DOWNLOAD_RATE_LIMITS = {
+    "xhscdn.com": 5,
+}
+MEDIA_DOWNLOAD_DEFAULT_RATE = 5
+# 下载速度（bytes/s）日志输出间隔（秒）
+MEDIA_DOWNLOAD_REPORT_INTERVAL = 10
+# 是否启用内容寻址存储：媒体按 SHA-256 存放在 data/media/objects，帖子目录下为硬链接，相同内容只保存一份
+# 已下载过的 URL 在后续运行中直接复用，不再重复下载
+MEDIA_STORE_CONTENT_ADDRESSED = True
+# 未下载过的 URL 是否先发 HEAD 请求，大小和 ETag 与已有对象一致时跳过下载
+MEDIA_STORE_HEAD_CHECK = True
+# 是否在图片下载完成后生成缩略图（进程池中执行，输出到原图旁的 <文件名>.thumb.<格式>）
+MEDIA_THUMBNAIL_ENABLED = False
+# 缩略图最长边像素
+MEDIA_THUMBNAIL_MAX_SIZE = 480
+# 缩略图格式：WEBP / AVIF（需安装 pillow-avif-plugin，未安装时回退为 WEBP）/ JPEG
+MEDIA_THUMBNAIL_FORMAT = "WEBP"
+# 缩略图编码质量
+MEDIA_THUMBNAIL_QUALITY = 80
+# 缩略图工作进程数
+MEDIA_THUMBNAIL_WORKERS = 2
+
+# 是否归档原始响应（JSON/HTML），用于提取逻辑变更后离线重新提取：
+# python -m src.services.archive.reextract --platform xhs
+ENABLE_RAW_ARCHIVE = False
+# 归档响应体的 gzip 压缩级别
+RAW_ARCHIVE_COMPRESS_LEVEL = 6
+# 离线重新提取的工作进程数
+RAW_ARCHIVE_REEXTRACT_WORKERS = 4
+
+# 平台客户端 HTTP 传输模式：passthrough 直接访问网络 / record 访问网络并录制到 cassette /
+# replay 只从 cassette 回放，不访问网络，签名替换为本地桩（用于离线基准测试）
+HTTP_TRANSPORT_MODE = "passthrough"
+# cassette 文件路径（JSONL）
+HTTP_CASSETTE_PATH = "data/cassettes/default.jsonl"
+# 回放模式下每次响应的模拟延迟和随机抖动（毫秒）
+HTTP_REPLAY_LATENCY_MS = 0
+HTTP_REPLAY_JITTER_MS = 0
+# 请求匹配时忽略的易变参数（query 参数或 JSON 请求体字段）
+HTTP_CASSETTE_IGNORE_PARAMS = ["search_id", "x-t", "t"]
+
+# 提取进程池的工作进程数，大页面 HTML 和大搜索响应的解析/提取在进程池中执行，0 表示全部在事件循环上执行
+EXTRACTION_POOL_WORKERS = 2
+# 负载（HTML/JSON 文本）达到该字符数时才提交到进程池，更小的负载直接执行以避免进程间传输开销
+EXTRACTION_OFFLOAD_MIN_BYTES = 128 * 1024
+# 是否统计事件循环延迟（运行结束时输出平均/p99/最大延迟）
+ENABLE_LOOP_LAG_MONITOR = False
+# 事件循环延迟采样间隔（毫秒）
+LOOP_LAG_MONITOR_INTERVAL_MS = 50
+
+# 是否在写入存储前校验提取记录（知乎内容/评论/创作者、小红书笔记/评论）的字段类型，并按声明类型转换
+# 提取器的输出可信，默认关闭以节省大批量评论时的开销
+ENABLE_RECORD_VALIDATION = False
+
 # 是否开启爬评论模式, 默认开启爬评论
 ENABLE_GET_COMMENTS = True
 
@@ -24,6 +24,7 @@ REDIS_DB_NUM = os.getenv("REDIS_DB_NUM", 0)  # your redis db num
 
 # cache type
 CACHE_TYPE_REDIS = "redis"
+CACHE_TYPE_REDIS_ASYNC = "redis_async"
 CACHE_TYPE_MEMORY = "memory"
 
 # sqlite config
@@ -33,12 +34,22 @@ sqlite_db_config = {
     "db_path": SQLITE_DB_PATH
 }
 
+# sqlite single writer config
+# When enabled, one dedicated thread owns the write connection and commits records in groups
+SQLITE_SINGLE_WRITER = False
+SQLITE_WRITER_BATCH_SIZE = 500  # commit every N rows
+SQLITE_WRITER_FLUSH_INTERVAL_MS = 200  # or every T milliseconds
+SQLITE_WRITER_QUEUE_SIZE = 10000  # max rows waiting to be written
+
 # mongodb config
 MONGODB_HOST = os.getenv("MONGODB_HOST", "localhost")
 MONGODB_PORT = os.getenv("MONGODB_PORT", 27017)
 MONGODB_USER = os.getenv("MONGODB_USER", "")
 MONGODB_PWD = os.getenv("MONGODB_PWD", "")
 MONGODB_DB_NAME = os.getenv("MONGODB_DB_NAME", "media_crawler")
+MONGODB_MAX_POOL_SIZE = os.getenv("MONGODB_MAX_POOL_SIZE", 20)
+MONGODB_MIN_POOL_SIZE = os.getenv("MONGODB_MIN_POOL_SIZE", 0)
+MONGODB_MAX_IDLE_TIME_MS = os.getenv("MONGODB_MAX_IDLE_TIME_MS", 60000)
 
 mongodb_config = {
     "host": MONGODB_HOST,
@@ -46,4 +57,13 @@ mongodb_config = {
     "user": MONGODB_USER,
     "password": MONGODB_PWD,
     "db_name": MONGODB_DB_NAME,
+    "max_pool_size": int(MONGODB_MAX_POOL_SIZE),
+    "min_pool_size": int(MONGODB_MIN_POOL_SIZE),
+    "max_idle_time_ms": int(MONGODB_MAX_IDLE_TIME_MS),
 }
+
+# mongodb bulk write config
+# Upserts are buffered per collection and sent as unordered bulk_write calls
+MONGODB_BULK_SIZE = 200  # send a batch every N operations per collection
+MONGODB_BULK_FLUSH_INTERVAL_MS = 2000  # or when the oldest buffered operation is older than T milliseconds (timer)
+MONGODB_BULK_MAX_RETRIES = 3  # failed (retryable / unacknowledged) operations are re-buffered up to N times
@@ -8,6 +8,10 @@ ZHIHU_CREATOR_URL_LIST = [
     # 示例: "https://www.zhihu.com/people/xxx"
 ]
 
+# creator 模式抓取的内容类型，多个类型按创作者并行分页
+# 可选: answer(回答) | article(文章) | zvideo(视频)
+ZHIHU_CREATOR_CONTENT_TYPES = ["answer", "article", "zvideo"]
+
 # 指定知乎内容 ID 列表（detail 模式使用）
 ZHIHU_SPECIFIED_ID_LIST = [
     # 示例: "https://www.zhihu.com/question/xxx/answer/xxx"
@@ -16,11 +16,11 @@ from typing import Optional, Type
 from src.core import arg as cmd
 import config
 from src.storage.base import db
+from src.storage.base.fanout_store import get_save_data_options
 from src.core.base_crawler import AbstractCrawler
+from src.services.extraction import close_extraction_executor, start_loop_lag_monitor, stop_loop_lag_monitor
 from src.platforms.xhs import XiaoHongShuCrawler
 from src.platforms.zhihu import ZhihuCrawler
-from src.utils.async_file_writer import AsyncFileWriter
-from src.core.var import crawler_type_var
 
 
 class CrawlerFactory:
@@ -41,31 +41,29 @@ class CrawlerFactory:
 crawler: Optional[AbstractCrawler] = None
 
 
-def _flush_excel_if_needed() -> None:
-    if config.SAVE_DATA_OPTION != "excel":
+async def _close_sqlite_writer_if_needed() -> None:
+    if "sqlite" not in get_save_data_options() or not config.SQLITE_SINGLE_WRITER:
         return
 
     try:
-        from src.storage.base.excel_store_base import ExcelStoreBase
+        from src.storage.base.sqlite_writer import SqliteWriter
 
-        ExcelStoreBase.flush_all()
-        print("[Main] Excel files saved successfully")
+        await asyncio.to_thread(SqliteWriter.close_all)
     except Exception as e:
-        print(f"[Main] Error flushing Excel data: {e}")
+        print(f"[Main] Error closing SQLite writer: {e}")
 
 
-async def _generate_wordcloud_if_needed() -> None:
-    if config.SAVE_DATA_OPTION != "json" or not config.ENABLE_GET_WORDCLOUD:
+async def _flush_mongodb_if_needed() -> None:
+    if "mongodb" not in get_save_data_options():
         return
 
     try:
-        file_writer = AsyncFileWriter(
-            platform=config.PLATFORM,
-            crawler_type=crawler_type_var.get(),
-        )
-        await file_writer.generate_wordcloud_from_comments()
+        from src.storage.base.mongodb_store_base import MongoDBConnection, MongoDBStoreBase
+
+        await MongoDBStoreBase.flush_all()
+        await MongoDBConnection().close()
     except Exception as e:
-        print(f"[Main] Error generating wordcloud: {e}")
+        print(f"[Main] Error flushing MongoDB data: {e}")
 
 
 async def main() -> None:
@@ -77,15 +75,11 @@ async def main() -> None:
         print(f"Database {args.init_db} initialized successfully.")
         return
 
+    start_loop_lag_monitor()
     crawler = CrawlerFactory.create_crawler(platform=config.PLATFORM)
+    # Stores are flushed and closed by the crawler itself (excel file, wordcloud, buffered writes)
     await crawler.start()
 
-    _flush_excel_if_needed()
-
-    # Generate wordcloud after crawling is complete
-    # Only for JSON save mode
-    await _generate_wordcloud_if_needed()
-
 
 async def async_cleanup() -> None:
     global crawler
@@ -106,7 +100,13 @@ async def async_cleanup() -> None:
                 if "closed" not in error_msg and "disconnected" not in error_msg:
                     print(f"[Main] Error closing browser context: {e}")
 
-    if config.SAVE_DATA_OPTION in ("db", "sqlite"):
+    await stop_loop_lag_monitor()
+    await asyncio.to_thread(close_extraction_executor)
+
+    # Fallback for interrupted runs, both are no-ops once the store has been closed
+    await _close_sqlite_writer_if_needed()
+    await _flush_mongodb_if_needed()
+    if {"db", "sqlite"} & set(get_save_data_options()):
         await db.close()
 
 if __name__ == "__main__":
@@ -49,7 +49,9 @@ class SaveDataOptionEnum(str, Enum):
     JSON = "json"
     SQLITE = "sqlite"
     MONGODB = "mongodb"
+    JSONL = "jsonl"
     EXCEL = "excel"
+    PARQUET = "parquet"
 
 
 class InitDbOptionEnum(str, Enum):
@@ -85,6 +87,45 @@ def _coerce_enum(
         return default
 
 
+def _default_save_data_option() -> str:
+    """Current SAVE_DATA_OPTION as CLI default, unsupported values fall back to json."""
+
+    options = [option.value for option in _save_data_option_enums(config.SAVE_DATA_OPTION, strict=False)]
+    return ",".join(options) or SaveDataOptionEnum.JSON.value
+
+
+def _save_data_option_enums(value: str | Sequence[str], strict: bool = True) -> list[SaveDataOptionEnum]:
+    raw_options = value.split(",") if isinstance(value, str) else list(value)
+    options: list[SaveDataOptionEnum] = []
+    for raw in raw_options:
+        raw = str(getattr(raw, "value", raw)).strip().lower()
+        if not raw:
+            continue
+        try:
+            option = SaveDataOptionEnum(raw)
+        except ValueError:
+            if strict:
+                supported = " | ".join(option.value for option in SaveDataOptionEnum)
+                raise typer.BadParameter(f"Unsupported save option '{raw}', supported: {supported}")
+            typer.secho(
+                f"⚠️ Config value '{raw}' is not within the supported range of SaveDataOptionEnum, ignored.",
+                fg=typer.colors.YELLOW,
+            )
+            continue
+        if option not in options:
+            options.append(option)
+    return options
+
+
+def _parse_save_data_option(value: str) -> str:
+    """Validate a single or comma separated save option, e.g. "sqlite,jsonl"."""
+
+    options = _save_data_option_enums(value)
+    if not options:
+        raise typer.BadParameter("At least one save option is required")
+    return ",".join(option.value for option in options)
+
+
 def _normalize_argv(argv: Optional[Sequence[str]]) -> Iterable[str]:
     if argv is None:
         return list(sys.argv[1:])
@@ -184,15 +225,13 @@ async def parse_cmd(argv: Optional[Sequence[str]] = None):
             ),
         ] = str(config.HEADLESS),
         save_data_option: Annotated[
-            SaveDataOptionEnum,
+            str,
             typer.Option(
                 "--save_data_option",
-                help="Data save option (csv=CSV file | db=MySQL database | json=JSON file | sqlite=SQLite database | mongodb=MongoDB database | excel=Excel file)",
+                help="Data save option, multiple options separated by commas are written in one pass, e.g. sqlite,jsonl (csv=CSV file | db=MySQL database | json=JSON file | jsonl=JSON Lines file | sqlite=SQLite database | mongodb=MongoDB database | excel=Excel file | parquet=Parquet dataset)",
                 rich_help_panel="Storage Configuration",
             ),
-        ] = _coerce_enum(
-            SaveDataOptionEnum, config.SAVE_DATA_OPTION, SaveDataOptionEnum.JSON
-        ),
+        ] = _default_save_data_option(),
         init_db: Annotated[
             Optional[InitDbOptionEnum],
             typer.Option(
@@ -247,7 +286,7 @@ async def parse_cmd(argv: Optional[Sequence[str]] = None):
         config.ENABLE_GET_SUB_COMMENTS = enable_sub_comment
         config.HEADLESS = enable_headless
         config.CDP_HEADLESS = enable_headless
-        config.SAVE_DATA_OPTION = save_data_option.value
+        config.SAVE_DATA_OPTION = _parse_save_data_option(save_data_option)
         config.COOKIES = cookies
 
         # Set platform-specific ID lists for detail/creator mode
@@ -102,7 +102,26 @@ class AbstractLogin(ABC):
 
 
 class AbstractStore(ABC):
-    """存储抽象基类，定义数据持久化接口"""
+    """
+    存储抽象基类，定义数据持久化接口
+
+    存储实例在一次运行中只创建一次并被复用，爬虫在开始时调用 open，结束时调用 close
+    """
+
+    # store_* 是否会修改传入的记录，多存储同时写入时只给这类存储传入副本
+    mutates_records = False
+
+    async def open(self):
+        """运行开始时调用，用于打开文件、连接等资源"""
+        pass
+
+    async def flush(self):
+        """将缓冲中的数据写出"""
+        pass
+
+    async def close(self):
+        """运行结束时调用，写出剩余数据并释放资源"""
+        await self.flush()
 
     @abstractmethod
     async def store_content(self, content_item: Dict):
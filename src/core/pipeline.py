@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+创作者模式流水线模块
+
+多个创作者并发抓取，列表分页与详情/评论处理解耦：
+- 每个创作者一个协程，抓取创作者信息并把内容列表的每一页放入有界队列
+- 固定数量的 worker 从队列取出单条内容，抓取详情、评论并入库
+- 所有请求共享同一个并发预算（MAX_CONCURRENCY_NUM），创作者数量再多也不会超出预算
+- 队列满时列表分页等待 worker，已抓到的内容不会整体驻留内存
+"""
+import asyncio
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, List, Optional
+
+import config
+from src.models.page import CursorPage
+from src.utils import utils
+
+
+class CreatorPipeline:
+    """创作者 -> 列表分页 -> 有界队列 -> 详情/评论 worker"""
+
+    def __init__(self, concurrency: Optional[int] = None, queue_size: Optional[int] = None, name: str = "creator"):
+        """
+        Args:
+            concurrency: 并发预算，同时也是 worker 数量，默认 MAX_CONCURRENCY_NUM
+            queue_size: 待处理内容队列长度，默认 CREATOR_PIPELINE_QUEUE_SIZE
+            name: 日志中的流水线名称
+        """
+        self.concurrency = max(concurrency or config.MAX_CONCURRENCY_NUM, 1)
+        # 列表分页、创作者信息、详情和评论请求都在这个预算内进行
+        self.budget = asyncio.Semaphore(self.concurrency)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size or config.CREATOR_PIPELINE_QUEUE_SIZE)
+        self.name = name
+
+        # 统计信息
+        self.items_submitted = 0
+        self.items_processed = 0
+        self.items_failed = 0
+
+    async def run(
+        self,
+        creators: Iterable[Any],
+        crawl_creator: Callable[[Any, "CreatorPipeline"], Awaitable[None]],
+        handle_item: Callable[[Any, "CreatorPipeline"], Awaitable[None]],
+    ):
+        """
+        并发抓取所有创作者，等待队列中的内容全部处理完成后返回
+
+        Args:
+            creators: 创作者列表（URL / ID）
+            crawl_creator: 抓取单个创作者的协程函数，通过 feed / submit 把内容交给 worker
+            handle_item: 处理单条内容（详情、评论、入库）的协程函数
+        """
+        workers: List[asyncio.Task] = [
+            asyncio.create_task(self._worker(handle_item), name=f"{self.name}-pipeline-{i}")
+            for i in range(self.concurrency)
+        ]
+        try:
+            creators = list(creators)
+            results = await asyncio.gather(
+                *(crawl_creator(creator, self) for creator in creators), return_exceptions=True
+            )
+            for creator, result in zip(creators, results):
+                if isinstance(result, Exception):
+                    utils.logger.error(f"[CreatorPipeline.run] 创作者 {creator} 抓取失败: {result!r}")
+            await self.queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        utils.logger.info(
+            f"[CreatorPipeline.run] {self.name} 流水线完成，创作者 {len(creators)} 个，"
+            f"内容 {self.items_processed}/{self.items_submitted} 条，失败 {self.items_failed} 条"
+        )
+
+    async def submit(self, item: Any):
+        """提交单条内容，仅在队列满时等待"""
+        self.items_submitted += 1
+        await self.queue.put(item)
+
+    async def feed(self, pages: AsyncIterator[CursorPage], crawl_interval: float = 0) -> int:
+        """
+        逐页消费 iter_* 分页生成器并提交每条内容
+
+        每页请求占用一个并发预算，翻页间隔在预算之外等待；生成器应以 crawl_interval=0 创建，由这里控制间隔
+
+        Args:
+            pages: 客户端 iter_* 分页生成器
+            crawl_interval: 翻页间隔（秒）
+
+        Returns:
+            int: 提交的内容数量
+        """
+        submitted = 0
+        async with aclosing(pages):
+            while True:
+                async with self.budget:
+                    page = await anext(pages, None)
+                if page is None:
+                    break
+                for item in page.items:
+                    await self.submit(item)
+                submitted += len(page.items)
+                if not page.has_more:
+                    break
+                await asyncio.sleep(crawl_interval)
+        return submitted
+
+    async def _worker(self, handle_item: Callable[[Any, "CreatorPipeline"], Awaitable[None]]):
+        while True:
+            item = await self.queue.get()
+            try:
+                await handle_item(item, self)
+                self.items_processed += 1
+            except Exception as e:
+                self.items_failed += 1
+                utils.logger.error(f"[CreatorPipeline] 处理内容出错: {e!r}")
+            finally:
+                self.queue.task_done()
@@ -2,8 +2,12 @@
 # -*- coding: utf-8 -*-
 
 
+from dataclasses import dataclass
+
 from pydantic import BaseModel, Field
 
+from .record import Record
+
 
 class NoteUrlInfo(BaseModel):
     note_id: str = Field(title="note id")
@@ -16,3 +20,47 @@ class CreatorUrlInfo(BaseModel):
     user_id: str = Field(title="user id (creator id)")
     xsec_token: str = Field(default="", title="xsec token")
     xsec_source: str = Field(default="", title="xsec source")
+
+
+@dataclass(slots=True)
+class XhsNoteRecord(Record):
+    """Xiaohongshu note as stored, built by build_xhs_note_item"""
+    note_id: str = ""  # Note ID
+    type: str = ""  # Note type
+    title: str = ""  # Note title
+    desc: str = ""  # Note description
+    video_url: str = ""  # Note video url
+    time: int = 0  # Note publish time
+    last_update_time: int = 0  # Note last update time
+    user_id: str = ""  # User ID
+    nickname: str = ""  # User nickname
+    avatar: str = ""  # User avatar
+    liked_count: str = ""  # Like count
+    collected_count: str = ""  # Collection count
+    comment_count: str = ""  # Comment count
+    share_count: str = ""  # Share count
+    ip_location: str = ""  # IP location
+    image_list: str = ""  # Image URLs
+    tag_list: str = ""  # Tags
+    last_modify_ts: int = 0  # Last modification timestamp
+    note_url: str = ""  # Note URL
+    source_keyword: str = ""  # Search keyword
+    xsec_token: str = ""  # xsec_token
+
+
+@dataclass(slots=True)
+class XhsNoteCommentRecord(Record):
+    """Xiaohongshu note comment as stored, built by build_xhs_comment_item"""
+    comment_id: str = ""  # Comment ID
+    create_time: int = 0  # Comment time
+    ip_location: str = ""  # IP location
+    note_id: str = ""  # Note ID
+    content: str = ""  # Comment content
+    user_id: str = ""  # User ID
+    nickname: str = ""  # User nickname
+    avatar: str = ""  # User avatar
+    sub_comment_count: str = ""  # Sub-comment count
+    pictures: str = ""  # Comment pictures
+    parent_comment_id: str = ""  # Parent comment ID
+    last_modify_ts: int = 0  # Last modification timestamp
+    like_count: str = ""  # Like count
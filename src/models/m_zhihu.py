@@ -1,72 +1,79 @@
 
 # -*- coding: utf-8 -*-
+from dataclasses import dataclass
 from typing import Optional
 
-from pydantic import BaseModel, Field
+from .record import Record
 
 
-class ZhihuContent(BaseModel):
+@dataclass(slots=True)
+class ZhihuContent(Record):
     """
     Zhihu content (answer, article, video)
     """
-    content_id: str = Field(default="", description="Content ID")
-    content_type: str = Field(default="", description="Content type (article | answer | zvideo)")
-    content_text: str = Field(default="", description="Content text, empty for video type")
-    content_url: str = Field(default="", description="Content landing page URL")
-    question_id: str = Field(default="", description="Question ID, has value when type is answer")
-    title: str = Field(default="", description="Content title")
-    desc: str = Field(default="", description="Content description")
-    created_time: int = Field(default=0, description="Create time")
-    updated_time: int = Field(default=0, description="Update time")
-    voteup_count: int = Field(default=0, description="Upvote count")
-    comment_count: int = Field(default=0, description="Comment count")
-    source_keyword: str = Field(default="", description="Source keyword")
+    content_id: str = ""  # Content ID
+    content_type: str = ""  # Content type (article | answer | zvideo)
+    content_text: str = ""  # Content text, empty for video type
+    content_url: str = ""  # Content landing page URL
+    question_id: str = ""  # Question ID, has value when type is answer
+    title: str = ""  # Content title
+    desc: str = ""  # Content description
+    created_time: int = 0  # Create time
+    updated_time: int = 0  # Update time
+    voteup_count: int = 0  # Upvote count
+    comment_count: int = 0  # Comment count
+    source_keyword: str = ""  # Source keyword
 
-    user_id: str = Field(default="", description="User ID")
-    user_link: str = Field(default="", description="User homepage link")
-    user_nickname: str = Field(default="", description="User nickname")
-    user_avatar: str = Field(default="", description="User avatar URL")
-    user_url_token: str = Field(default="", description="User url_token")
+    user_id: str = ""  # User ID
+    user_link: str = ""  # User homepage link
+    user_nickname: str = ""  # User nickname
+    user_avatar: str = ""  # User avatar URL
+    user_url_token: str = ""  # User url_token
+    last_modify_ts: int = 0  # Last modification timestamp, set when the record is stored
 
 
-class ZhihuComment(BaseModel):
+@dataclass(slots=True)
+class ZhihuComment(Record):
     """
     Zhihu comment
     """
 
-    comment_id: str = Field(default="", description="Comment ID")
-    parent_comment_id: str = Field(default="", description="Parent comment ID")
-    content: str = Field(default="", description="Comment content")
-    publish_time: int = Field(default=0, description="Publish time")
-    ip_location: Optional[str] = Field(default="", description="IP location")
-    sub_comment_count: int = Field(default=0, description="Sub-comment count")
-    like_count: int = Field(default=0, description="Like count")
-    dislike_count: int = Field(default=0, description="Dislike count")
-    content_id: str = Field(default="", description="Content ID")
-    content_type: str = Field(default="", description="Content type (article | answer | zvideo)")
+    comment_id: str = ""  # Comment ID
+    parent_comment_id: str = ""  # Parent comment ID
+    content: str = ""  # Comment content
+    publish_time: int = 0  # Publish time
+    ip_location: Optional[str] = ""  # IP location
+    sub_comment_count: int = 0  # Sub-comment count
+    like_count: int = 0  # Like count
+    dislike_count: int = 0  # Dislike count
+    content_id: str = ""  # Content ID
+    content_type: str = ""  # Content type (article | answer | zvideo)
 
-    user_id: str = Field(default="", description="User ID")
-    user_link: str = Field(default="", description="User homepage link")
-    user_nickname: str = Field(default="", description="User nickname")
-    user_avatar: str = Field(default="", description="User avatar URL")
+    user_id: str = ""  # User ID
+    user_link: str = ""  # User homepage link
+    user_nickname: str = ""  # User nickname
+    user_avatar: str = ""  # User avatar URL
+    last_modify_ts: int = 0  # Last modification timestamp, set when the record is stored
 
 
-class ZhihuCreator(BaseModel):
+@dataclass(slots=True)
+class ZhihuCreator(Record):
     """
     Zhihu creator
     """
-    user_id: str = Field(default="", description="User ID")
-    user_link: str = Field(default="", description="User homepage link")
-    user_nickname: str = Field(default="", description="User nickname")
-    user_avatar: str = Field(default="", description="User avatar URL")
-    url_token: str = Field(default="", description="User url_token")
-    gender: str = Field(default="", description="User gender")
-    ip_location: Optional[str] = Field(default="", description="IP location")
-    follows: int = Field(default=0, description="Follows count")
-    fans: int = Field(default=0, description="Fans count")
-    anwser_count: int = Field(default=0, description="Answer count")
-    video_count: int = Field(default=0, description="Video count")
-    question_count: int = Field(default=0, description="Question count")
-    article_count: int = Field(default=0, description="Article count")
-    column_count: int = Field(default=0, description="Column count")
-    get_voteup_count: int = Field(default=0, description="Total upvotes received")
+    user_id: str = ""  # User ID
+    user_link: str = ""  # User homepage link
+    user_nickname: str = ""  # User nickname
+    user_avatar: str = ""  # User avatar URL
+    url_token: str = ""  # User url_token
+    gender: str = ""  # User gender
+    ip_location: Optional[str] = ""  # IP location
+    follows: int = 0  # Follows count
+    fans: int = 0  # Fans count
+    anwser_count: int = 0  # Answer count
+    video_count: int = 0  # Video count
+    question_count: int = 0  # Question count
+    article_count: int = 0  # Article count
+    column_count: int = 0  # Column count
+    get_voteup_count: int = 0  # Total upvotes received
+    last_modify_ts: int = 0  # Last modification timestamp, set when the record is stored
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from dataclasses import dataclass, field
+from typing import Any, List, Union
+
+
+@dataclass(slots=True)
+class CursorPage:
+    """
+    One page yielded by the clients' iter_* pagination generators
+
+    cursor is the value to pass back as the start cursor of the same iter_* call to resume after this page, so a
+    consumer can checkpoint it once the page is stored. parent_id is the root comment of a sub comment page, empty for
+    first level pages.
+    """
+    items: List[Any] = field(default_factory=list)  # Comments / notes / contents of the page
+    cursor: Union[str, int] = ""  # Cursor (XHS) / offset (Zhihu) of the next page
+    has_more: bool = False  # False on the last page
+    parent_id: str = ""  # Root comment ID of a sub comment page
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+from dataclasses import MISSING, fields
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterator, Tuple, Union, get_args, get_origin
+
+
+@lru_cache(maxsize=None)
+def _field_names(cls) -> Tuple[str, ...]:
+    return tuple(field.name for field in fields(cls))
+
+
+@lru_cache(maxsize=None)
+def _values_getter(cls) -> Callable[[Any], Tuple]:
+    names = _field_names(cls)
+    getter = attrgetter(*names)
+    return getter if len(names) > 1 else lambda record: (getter(record),)
+
+
+@lru_cache(maxsize=None)
+def _field_specs(cls) -> Tuple[Tuple[str, type, bool, Any], ...]:
+    """(name, declared type, accepts None, default) of every field"""
+    specs = []
+    for field in fields(cls):
+        kind, optional = field.type, False
+        if get_origin(kind) is Union and type(None) in get_args(kind):
+            kind, optional = next(arg for arg in get_args(kind) if arg is not type(None)), True
+        default = None if field.default is MISSING else field.default
+        specs.append((field.name, kind, optional, default))
+    return tuple(specs)
+
+
+class Record:
+    """
+    Base of the slotted dataclass records the extractors produce and the stores consume
+
+    Subclasses are declared with @dataclass(slots=True): no per instance __dict__, no validation on construction or
+    assignment. A record is a read only mapping of its fields (keys/get/items/[]/dict(record)/**record), so the sinks
+    take it directly without an intermediate dict, and codec serializes it as a JSON object.
+    validate() checks and converts the field types, it is only needed for untrusted input (ENABLE_RECORD_VALIDATION).
+    """
+    __slots__ = ()
+
+    # ========== Mapping interface used by the sinks ==========
+
+    def keys(self):
+        return self.__dataclass_fields__.keys()
+
+    def values(self) -> Tuple:
+        return _values_getter(type(self))(self)
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return zip(_field_names(type(self)), self.values())
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_field_names(type(self)))
+
+    def __len__(self) -> int:
+        return len(_field_names(type(self)))
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.__dataclass_fields__
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__dataclass_fields__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in self.__dataclass_fields__:
+            return default
+        return getattr(self, key)
+
+    def model_dump(self) -> Dict[str, Any]:
+        """Fields as a new dict (same name as the pydantic method the records replace)"""
+        return dict(self.items())
+
+    # ========== Validation ==========
+
+    def validate(self) -> "Record":
+        """
+        Check the field values against the declared types, converting where the conversion is lossless:
+        numbers to str fields, numeric strings to int fields, None of a non optional field to the field default
+
+        Raises:
+            ValueError: A value cannot be converted
+        """
+        for name, kind, optional, default in _field_specs(type(self)):
+            value = getattr(self, name)
+            if value is None:
+                if not optional:
+                    setattr(self, name, default)
+            elif kind is str and not isinstance(value, str):
+                if not isinstance(value, (int, float)):
+                    raise ValueError(f"{type(self).__name__}.{name}: expected str, got {value!r}")
+                setattr(self, name, str(value))
+            elif kind is int and (not isinstance(value, int) or isinstance(value, bool)):
+                setattr(self, name, self._to_int(name, value))
+        return self
+
+    def _to_int(self, name: str, value: Any) -> int:
+        if isinstance(value, bool):
+            return int(value)
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if isinstance(value, str):
+            try:
+                return int(value.strip())
+            except ValueError:
+                pass
+        raise ValueError(f"{type(self).__name__}.{name}: expected int, got {value!r}")
+
+    @classmethod
+    def model_validate(cls, data: Dict[str, Any]) -> "Record":
+        """Build a record from a dict and validate it"""
+        return cls(**data).validate()
+
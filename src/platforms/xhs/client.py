@@ -1,6 +1,6 @@
 import asyncio
-import json
-from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Union
+from contextlib import aclosing
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, List, Optional, Union
 from urllib.parse import urlencode
 
 import httpx
@@ -9,13 +9,16 @@ from tenacity import retry, stop_after_attempt, wait_fixed
 
 import config
 from src.core.base_crawler import AbstractApiClient
+from src.models.page import CursorPage
+from src.services.archive import RawArchive
 from src.services.proxy.proxy_mixin import ProxyRefreshMixin
-from src.utils import utils
+from src.utils import codec, utils
 
 if TYPE_CHECKING:
+    from src.services.proxy.proxy_balancer import ProxyBalancer
     from src.services.proxy.proxy_ip_pool import ProxyIpPool
 
-from .exception import DataFetchError, IPBlockError
+from .exception import CaptchaError, DataFetchError, IPBlockError
 from .field import SearchNoteType, SearchSortType
 from .help import get_search_id
 from .extractor import XiaoHongShuExtractor
@@ -33,6 +36,7 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         playwright_page: Page,
         cookie_dict: Dict[str, str],
         proxy_ip_pool: Optional["ProxyIpPool"] = None,
+        proxy_balancer: Optional["ProxyBalancer"] = None,
     ):
         self.proxy = proxy
         self.timeout = timeout
@@ -46,8 +50,10 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         self.playwright_page = playwright_page
         self.cookie_dict = cookie_dict
         self._extractor = XiaoHongShuExtractor()
+        # Raw response archive for offline re-extraction (opt-in)
+        self.raw_archive: Optional[RawArchive] = RawArchive("xhs") if config.ENABLE_RAW_ARCHIVE else None
         # Initialize proxy pool (from ProxyRefreshMixin)
-        self.init_proxy_pool(proxy_ip_pool)
+        self.init_proxy_pool(proxy_ip_pool, proxy_balancer)
 
     async def _pre_headers(self, url: str, params: Optional[Dict] = None, payload: Optional[Dict] = None) -> Dict:
         """Request header parameter signing (using playwright injection method)
@@ -102,13 +108,10 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         Returns:
 
         """
-        # Check if proxy is expired before each request
-        await self._refresh_proxy_if_expired()
-
         # return response.text
         return_response = kwargs.pop("return_response", False)
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        # Proxy refresh / multi-proxy selection happens in _send_request
+        response = await self._send_request(method, url, timeout=self.timeout, **kwargs)
 
         if response.status_code == 471 or response.status_code == 461:
             # someday someone maybe will bypass captcha
@@ -116,11 +119,14 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
             verify_uuid = response.headers["Verifyuuid"]
             msg = f"CAPTCHA appeared, request failed, Verifytype: {verify_type}, Verifyuuid: {verify_uuid}, Response: {response}"
             utils.logger.error(msg)
-            raise Exception(msg)
+            raise CaptchaError(msg)
+
+        if self.raw_archive is not None and response.status_code == 200:
+            await self.raw_archive.archive_response(method, url, kwargs.get("data"), response)
 
         if return_response:
             return response.text
-        data: Dict = response.json()
+        data: Dict = codec.loads(response.content)
         if data["success"]:
             return data.get("data", data.get("success", {}))
         elif data["code"] == self.IP_ERROR_CODE:
@@ -157,7 +163,8 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
 
         """
         headers = await self._pre_headers(uri, payload=data)
-        json_str = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+        # Must be the exact string that was signed in _pre_headers
+        json_str = codec.dumps(data)
         return await self.request(
             method="POST",
             url=f"{self._host}{uri}",
@@ -167,27 +174,23 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         )
 
     async def get_note_media(self, url: str) -> Union[bytes, None]:
-        # Check if proxy is expired before request
-        await self._refresh_proxy_if_expired()
-
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            try:
-                response = await client.request("GET", url, timeout=self.timeout)
-                response.raise_for_status()
-                if not response.reason_phrase == "OK":
-                    utils.logger.error(
-                        f"[XiaoHongShuClient.get_note_media] request {url} err, res:{response.text}"
-                    )
-                    return None
-                else:
-                    return response.content
-            except (
-                httpx.HTTPError
-            ) as exc:  # some wrong when call httpx.request method, such as connection error, client error, server error or response status code is not 2xx
+        try:
+            response = await self._send_request("GET", url, timeout=self.timeout)
+            response.raise_for_status()
+            if not response.reason_phrase == "OK":
                 utils.logger.error(
-                    f"[XiaoHongShuClient.get_aweme_media] {exc.__class__.__name__} for {exc.request.url} - {exc}"
-                )  # Keep original exception type name for developer debugging
+                    f"[XiaoHongShuClient.get_note_media] request {url} err, res:{response.text}"
+                )
                 return None
+            else:
+                return response.content
+        except (
+            httpx.HTTPError
+        ) as exc:  # some wrong when call httpx.request method, such as connection error, client error, server error or response status code is not 2xx
+            utils.logger.error(
+                f"[XiaoHongShuClient.get_aweme_media] {exc.__class__.__name__} for {exc.request.url} - {exc}"
+            )  # Keep original exception type name for developer debugging
+            return None
 
     async def pong(self) -> bool:
         """
@@ -349,6 +352,117 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         }
         return await self.get(uri, params)
 
+    async def iter_note_comments(
+        self,
+        note_id: str,
+        xsec_token: str,
+        crawl_interval: float = 1.0,
+        cursor: str = "",
+        max_count: Optional[int] = None,
+        with_sub_comments: Optional[bool] = None,
+    ) -> AsyncIterator[CursorPage]:
+        """
+        Iterate the first-level comment pages of a note, each followed by the sub comment pages of its comments.
+        Pages are fetched lazily, nothing is accumulated: the consumer stores a page before the next one is requested
+        and may stop at any page (wrap the generator in contextlib.aclosing when breaking out early)
+        Args:
+            note_id: Note ID
+            xsec_token: Verification token
+            crawl_interval: Delay between two page requests (seconds)
+            cursor: First-level cursor to start from, the cursor of a yielded first-level page resumes after it
+            max_count: Maximum number of first-level comments, None for no limit
+            with_sub_comments: Also yield sub comment pages, defaults to ENABLE_GET_SUB_COMMENTS
+
+        Yields:
+            CursorPage: First-level pages (parent_id empty) and sub comment pages (parent_id is the root comment ID)
+        """
+        if with_sub_comments is None:
+            with_sub_comments = config.ENABLE_GET_SUB_COMMENTS
+        fetched = 0
+        has_more = True
+        while has_more and (max_count is None or fetched < max_count):
+            comments_res = await self.get_note_comments(note_id=note_id, xsec_token=xsec_token, cursor=cursor)
+            has_more = comments_res.get("has_more", False)
+            cursor = comments_res.get("cursor", "")
+            if "comments" not in comments_res:
+                utils.logger.info(
+                    f"[XiaoHongShuClient.iter_note_comments] No 'comments' key found in response: {comments_res}"
+                )
+                return
+            comments = comments_res["comments"]
+            if max_count is not None:
+                comments = comments[: max_count - fetched]
+            fetched += len(comments)
+            yield CursorPage(items=comments, cursor=cursor, has_more=has_more)
+
+            if with_sub_comments:
+                async with aclosing(
+                    self.iter_sub_comments(note_id, comments, xsec_token, crawl_interval=crawl_interval)
+                ) as sub_pages:
+                    async for sub_page in sub_pages:
+                        yield sub_page
+            if has_more:
+                await asyncio.sleep(crawl_interval)
+
+    async def iter_sub_comments(
+        self,
+        note_id: str,
+        comments: List[Dict],
+        xsec_token: str,
+        crawl_interval: float = 1.0,
+    ) -> AsyncIterator[CursorPage]:
+        """
+        Iterate the sub comment pages of first-level comments: the sub comments embedded in each comment first,
+        then the remaining pages from the sub comment API
+        Args:
+            note_id: Note ID
+            comments: First-level comments of the note
+            xsec_token: Verification token
+            crawl_interval: Delay between two page requests (seconds)
+
+        Yields:
+            CursorPage: Sub comment pages, parent_id is the root comment ID
+        """
+        for comment in comments:
+            root_comment_id = comment.get("id")
+            sub_comment_has_more = bool(comment.get("sub_comment_has_more"))
+            sub_comment_cursor = comment.get("sub_comment_cursor") or ""
+            if comment.get("sub_comments"):
+                yield CursorPage(
+                    items=comment["sub_comments"],
+                    cursor=sub_comment_cursor,
+                    has_more=sub_comment_has_more,
+                    parent_id=root_comment_id,
+                )
+
+            while sub_comment_has_more:
+                comments_res = await self.get_note_sub_comments(
+                    note_id=note_id,
+                    root_comment_id=root_comment_id,
+                    xsec_token=xsec_token,
+                    num=10,
+                    cursor=sub_comment_cursor,
+                )
+                if not comments_res:
+                    utils.logger.info(
+                        f"[XiaoHongShuClient.iter_sub_comments] No response found for note_id: {note_id}"
+                    )
+                    break
+                sub_comment_has_more = comments_res.get("has_more", False)
+                sub_comment_cursor = comments_res.get("cursor", "")
+                if "comments" not in comments_res:
+                    utils.logger.info(
+                        f"[XiaoHongShuClient.iter_sub_comments] No 'comments' key found in response: {comments_res}"
+                    )
+                    break
+                yield CursorPage(
+                    items=comments_res["comments"],
+                    cursor=sub_comment_cursor,
+                    has_more=sub_comment_has_more,
+                    parent_id=root_comment_id,
+                )
+                await asyncio.sleep(crawl_interval)
+
     async def get_note_all_comments(
         self,
         note_id: str,
@@ -359,6 +473,7 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
     ) -> List[Dict]:
         """
         Get all first-level comments under specified note, this method will continuously find all comment information under a post
+        Collects every page of iter_note_comments into a list, crawlers consume iter_note_comments directly instead
         Args:
             note_id: Note ID
             xsec_token: Verification token
@@ -369,33 +484,13 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
 
         """
         result = []
-        comments_has_more = True
-        comments_cursor = ""
-        while comments_has_more and len(result) < max_count:
-            comments_res = await self.get_note_comments(
-                note_id=note_id, xsec_token=xsec_token, cursor=comments_cursor
-            )
-            comments_has_more = comments_res.get("has_more", False)
-            comments_cursor = comments_res.get("cursor", "")
-            if "comments" not in comments_res:
-                utils.logger.info(
-                    f"[XiaoHongShuClient.get_note_all_comments] No 'comments' key found in response: {comments_res}"
-                )
-                break
-            comments = comments_res["comments"]
-            if len(result) + len(comments) > max_count:
-                comments = comments[: max_count - len(result)]
-            if callback:
-                await callback(note_id, comments)
-            await asyncio.sleep(crawl_interval)
-            result.extend(comments)
-            sub_comments = await self.get_comments_all_sub_comments(
-                comments=comments,
-                xsec_token=xsec_token,
-                crawl_interval=crawl_interval,
-                callback=callback,
-            )
-            result.extend(sub_comments)
+        async with aclosing(
+            self.iter_note_comments(note_id, xsec_token, crawl_interval=crawl_interval, max_count=max_count)
+        ) as pages:
+            async for page in pages:
+                if callback:
+                    await callback(note_id, page.items)
+                result.extend(page.items)
         return result
 
     async def get_comments_all_sub_comments(
@@ -407,6 +502,7 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
     ) -> List[Dict]:
         """
         Get all second-level comments under specified first-level comments, this method will continuously find all second-level comment information under first-level comments
+        Collects every page of iter_sub_comments into a list
         Args:
             comments: Comment list
             xsec_token: Verification token
@@ -421,47 +517,18 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
                 f"[XiaoHongShuCrawler.get_comments_all_sub_comments] Crawling sub_comment mode is not enabled"
             )
             return []
+        if not comments:
+            return []
 
         result = []
-        for comment in comments:
-            note_id = comment.get("note_id")
-            sub_comments = comment.get("sub_comments")
-            if sub_comments and callback:
-                await callback(note_id, sub_comments)
-
-            sub_comment_has_more = comment.get("sub_comment_has_more")
-            if not sub_comment_has_more:
-                continue
-
-            root_comment_id = comment.get("id")
-            sub_comment_cursor = comment.get("sub_comment_cursor")
-
-            while sub_comment_has_more:
-                comments_res = await self.get_note_sub_comments(
-                    note_id=note_id,
-                    root_comment_id=root_comment_id,
-                    xsec_token=xsec_token,
-                    num=10,
-                    cursor=sub_comment_cursor,
-                )
-
-                if comments_res is None:
-                    utils.logger.info(
-                        f"[XiaoHongShuClient.get_comments_all_sub_comments] No response found for note_id: {note_id}"
-                    )
-                    continue
-                sub_comment_has_more = comments_res.get("has_more", False)
-                sub_comment_cursor = comments_res.get("cursor", "")
-                if "comments" not in comments_res:
-                    utils.logger.info(
-                        f"[XiaoHongShuClient.get_comments_all_sub_comments] No 'comments' key found in response: {comments_res}"
-                    )
-                    break
-                comments = comments_res["comments"]
+        note_id = comments[0].get("note_id")
+        async with aclosing(
+            self.iter_sub_comments(note_id, comments, xsec_token, crawl_interval=crawl_interval)
+        ) as pages:
+            async for page in pages:
                 if callback:
-                    await callback(note_id, comments)
-                await asyncio.sleep(crawl_interval)
-                result.extend(comments)
+                    await callback(note_id, page.items)
+                result.extend(page.items)
         return result
 
     async def get_creator_info(
@@ -487,7 +554,7 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         html_content = await self.request(
             "GET", self._domain + uri, return_response=True, headers=self.headers
         )
-        return self._extractor.extract_creator_info_from_html(html_content)
+        return await self._extractor.extract_creator_info_from_html_async(html_content)
 
     async def get_notes_by_creator(
         self,
@@ -519,32 +586,35 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         }
         return await self.get(uri, params)
 
-    async def get_all_notes_by_creator(
+    async def iter_notes_by_creator(
         self,
         user_id: str,
         crawl_interval: float = 1.0,
-        callback: Optional[Callable] = None,
         xsec_token: str = "",
         xsec_source: str = "pc_feed",
-    ) -> List[Dict]:
+        cursor: str = "",
+        max_count: Optional[int] = None,
+    ) -> AsyncIterator[CursorPage]:
         """
-        Get all posts published by specified user, this method will continuously find all post information under a user
+        Iterate the pages of posts published by specified user, fetched lazily and never accumulated
         Args:
             user_id: User ID
-            crawl_interval: Crawl delay (seconds)
-            callback: Update callback function after one pagination crawl ends
+            crawl_interval: Delay between two page requests (seconds)
             xsec_token: Verification token
             xsec_source: Channel source
+            cursor: Cursor to start from, the cursor of a yielded page resumes after it
+            max_count: Maximum number of notes, defaults to CRAWLER_MAX_NOTES_COUNT
 
-        Returns:
-
+        Yields:
+            CursorPage: Note pages
         """
-        result = []
+        if max_count is None:
+            max_count = config.CRAWLER_MAX_NOTES_COUNT
+        fetched = 0
         notes_has_more = True
-        notes_cursor = ""
-        while notes_has_more and len(result) < config.CRAWLER_MAX_NOTES_COUNT:
+        while notes_has_more and fetched < max_count:
             notes_res = await self.get_notes_by_creator(
-                user_id, notes_cursor, xsec_token=xsec_token, xsec_source=xsec_source
+                user_id, cursor, xsec_token=xsec_token, xsec_source=xsec_source
             )
             if not notes_res:
                 utils.logger.error(
@@ -553,32 +623,58 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
                 break
 
             notes_has_more = notes_res.get("has_more", False)
-            notes_cursor = notes_res.get("cursor", "")
+            cursor = notes_res.get("cursor", "")
             if "notes" not in notes_res:
                 utils.logger.info(
-                    f"[XiaoHongShuClient.get_all_notes_by_creator] No 'notes' key found in response: {notes_res}"
+                    f"[XiaoHongShuClient.iter_notes_by_creator] No 'notes' key found in response: {notes_res}"
                 )
                 break
 
             notes = notes_res["notes"]
             utils.logger.info(
-                f"[XiaoHongShuClient.get_all_notes_by_creator] got user_id:{user_id} notes len : {len(notes)}"
+                f"[XiaoHongShuClient.iter_notes_by_creator] got user_id:{user_id} notes len : {len(notes)}"
             )
+            notes = notes[: max_count - fetched]
+            fetched += len(notes)
+            yield CursorPage(items=notes, cursor=cursor, has_more=notes_has_more)
+            if notes_has_more:
+                await asyncio.sleep(crawl_interval)
 
-            remaining = config.CRAWLER_MAX_NOTES_COUNT - len(result)
-            if remaining <= 0:
-                break
+        utils.logger.info(
+            f"[XiaoHongShuClient.iter_notes_by_creator] Finished getting notes for user {user_id}, total: {fetched}"
+        )
 
-            notes_to_add = notes[:remaining]
-            if callback:
-                await callback(notes_to_add)
+    async def get_all_notes_by_creator(
+        self,
+        user_id: str,
+        crawl_interval: float = 1.0,
+        callback: Optional[Callable] = None,
+        xsec_token: str = "",
+        xsec_source: str = "pc_feed",
+    ) -> List[Dict]:
+        """
+        Get all posts published by specified user, this method will continuously find all post information under a user
+        Collects every page of iter_notes_by_creator into a list, crawlers consume iter_notes_by_creator directly instead
+        Args:
+            user_id: User ID
+            crawl_interval: Crawl delay (seconds)
+            callback: Update callback function after one pagination crawl ends
+            xsec_token: Verification token
+            xsec_source: Channel source
 
-            result.extend(notes_to_add)
-            await asyncio.sleep(crawl_interval)
+        Returns:
 
-        utils.logger.info(
-            f"[XiaoHongShuClient.get_all_notes_by_creator] Finished getting notes for user {user_id}, total: {len(result)}"
-        )
+        """
+        result = []
+        async with aclosing(
+            self.iter_notes_by_creator(
+                user_id, crawl_interval=crawl_interval, xsec_token=xsec_token, xsec_source=xsec_source
+            )
+        ) as pages:
+            async for page in pages:
+                if callback:
+                    await callback(page.items)
+                result.extend(page.items)
         return result
 
     async def get_note_short_url(self, note_id: str) -> Dict:
@@ -628,4 +724,4 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
             method="GET", url=url, return_response=True, headers=copy_headers
         )
 
-        return self._extractor.extract_note_detail_from_html(note_id, html)
+        return await self._extractor.extract_note_detail_from_html_async(note_id, html)
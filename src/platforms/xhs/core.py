@@ -2,6 +2,8 @@ import asyncio
 import os
 import random
 from asyncio import Task
+from contextlib import aclosing
+from pathlib import Path
 from typing import Dict, List, Optional
 
 from playwright.async_api import (
@@ -15,8 +17,13 @@ from tenacity import RetryError
 
 import config
 from src.core.base_crawler import AbstractCrawler
+from src.core.pipeline import CreatorPipeline
 from config import CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES
 from src.models.m_xiaohongshu import NoteUrlInfo, CreatorUrlInfo
+from src.services.accounts import (AccountConfig, AccountPool, AccountSession, PooledClient,
+                                   launch_account_context, load_account_configs)
+from src.services.media import ContentAddressedStore, MediaDownloader, MediaTask, ThumbnailProcessor
+from src.services.proxy.proxy_balancer import ProxyBalancer, create_proxy_balancer
 from src.services.proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
 from src.storage import xhs as xhs_store
 from src.utils import utils
@@ -24,7 +31,7 @@ from src.utils.cdp_browser import CDPBrowserManager
 from src.core.var import crawler_type_var, source_keyword_var
 
 from .client import XiaoHongShuClient
-from .exception import DataFetchError
+from .exception import DataFetchError, is_account_blocked
 from .field import SearchSortType
 from .help import parse_note_info_from_note_url, parse_creator_info_from_url, get_search_id
 from .login import XiaoHongShuLogin
@@ -42,6 +49,10 @@ class XiaoHongShuCrawler(AbstractCrawler):
         self.user_agent = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"
         self.cdp_manager = None
         self.ip_proxy_pool = None  # Proxy IP pool for automatic proxy refresh
+        self.proxy_balancer: Optional[ProxyBalancer] = None  # Several proxies at once (ENABLE_MULTI_PROXY)
+        self.media_downloader: Optional[MediaDownloader] = None  # Media download pool, decoupled from note crawling
+        self.thumbnailer: Optional[ThumbnailProcessor] = None  # Thumbnail stage fed by the media download pool
+        self.account_pool: Optional[AccountPool] = None  # Multi-account session pool (ACCOUNTS)
 
     async def start(self) -> None:
         playwright_proxy_format, httpx_proxy_format = None, None
@@ -49,6 +60,9 @@ class XiaoHongShuCrawler(AbstractCrawler):
             self.ip_proxy_pool = await create_ip_pool(config.IP_PROXY_POOL_COUNT, enable_validate_ip=True)
             ip_proxy_info: IpInfoModel = await self.ip_proxy_pool.get_proxy()
             playwright_proxy_format, httpx_proxy_format = utils.format_proxy_info(ip_proxy_info)
+            if config.ENABLE_MULTI_PROXY:
+                # API requests are spread over several proxies, the browser keeps the first one
+                self.proxy_balancer = await create_proxy_balancer(self.ip_proxy_pool)
 
         async with async_playwright() as playwright:
             # Choose launch mode based on configuration
@@ -89,18 +103,50 @@ class XiaoHongShuCrawler(AbstractCrawler):
                 await login_obj.begin()
                 await self.xhs_client.update_cookies(browser_context=self.browser_context)
 
+            if config.ACCOUNTS:
+                # Spread the crawl over several logged-in accounts, each with its own client and rate budget
+                self.account_pool = await self.create_account_pool(
+                    playwright.chromium, playwright_proxy_format, httpx_proxy_format
+                )
+                self.xhs_client = PooledClient(self.account_pool)
+
             crawler_type_var.set(config.CRAWLER_TYPE)
-            if config.CRAWLER_TYPE == "search":
-                # Search for notes and retrieve their comment information.
-                await self.search()
-            elif config.CRAWLER_TYPE == "detail":
-                # Get the information and comments of the specified post
-                await self.get_specified_notes()
-            elif config.CRAWLER_TYPE == "creator":
-                # Get creator's information and their notes and comments
-                await self.get_creators_and_notes()
-            else:
-                pass
+            # One store per run, opened before crawling and flushed/closed even if crawling fails
+            await xhs_store.XhsStoreFactory.open_store()
+            if config.ENABLE_GET_MEIDAS:
+                self.media_downloader = MediaDownloader(
+                    proxy=httpx_proxy_format,
+                    headers={"User-Agent": self.user_agent},
+                    store=ContentAddressedStore() if config.MEDIA_STORE_CONTENT_ADDRESSED else None,
+                )
+                await self.media_downloader.start()
+                if config.MEDIA_THUMBNAIL_ENABLED:
+                    self.thumbnailer = ThumbnailProcessor()
+            try:
+                if config.CRAWLER_TYPE == "search":
+                    # Search for notes and retrieve their comment information.
+                    await self.search()
+                elif config.CRAWLER_TYPE == "detail":
+                    # Get the information and comments of the specified post
+                    await self.get_specified_notes()
+                elif config.CRAWLER_TYPE == "creator":
+                    # Get creator's information and their notes and comments
+                    await self.get_creators_and_notes()
+                else:
+                    pass
+            finally:
+                if self.media_downloader:
+                    # Wait for queued media downloads before closing the store
+                    await self.media_downloader.close()
+                if self.thumbnailer:
+                    await self.thumbnailer.close()
+                await xhs_store.XhsStoreFactory.close_store()
+                if self.account_pool:
+                    await self.account_pool.close()
+                if self.proxy_balancer:
+                    await self.proxy_balancer.close()
+                if self.ip_proxy_pool:
+                    await self.ip_proxy_pool.close()
 
             utils.logger.info("[XiaoHongShuCrawler.start] Xhs Crawler finished ...")
 
@@ -164,44 +210,62 @@ class XiaoHongShuCrawler(AbstractCrawler):
                     break
 
     async def get_creators_and_notes(self) -> None:
-        """Get creator's notes and retrieve their comment information."""
+        """Get creator's notes and retrieve their comment information.
+
+        Creators are crawled concurrently: their note pages stream into a CreatorPipeline whose workers fetch the
+        note details and comments, all requests share the MAX_CONCURRENCY_NUM budget
+        """
         utils.logger.info("[XiaoHongShuCrawler.get_creators_and_notes] Begin get Xiaohongshu creators")
-        for creator_url in config.XHS_CREATOR_ID_LIST:
-            try:
-                # Parse creator URL to get user_id and security tokens
-                creator_info: CreatorUrlInfo = parse_creator_info_from_url(creator_url)
-                utils.logger.info(f"[XiaoHongShuCrawler.get_creators_and_notes] Parse creator URL info: {creator_info}")
-                user_id = creator_info.user_id
-
-                # get creator detail info from web html content
-                createor_info: Dict = await self.xhs_client.get_creator_info(
-                    user_id=user_id,
-                    xsec_token=creator_info.xsec_token,
-                    xsec_source=creator_info.xsec_source
-                )
-                if createor_info:
-                    await xhs_store.save_creator(user_id, creator=createor_info)
-            except ValueError as e:
-                utils.logger.error(f"[XiaoHongShuCrawler.get_creators_and_notes] Failed to parse creator URL: {e}")
-                continue
+        pipeline = CreatorPipeline(name="xhs")
+        await pipeline.run(config.XHS_CREATOR_ID_LIST, self.crawl_creator, self.handle_creator_note)
 
-            # Use fixed crawling interval
-            crawl_interval = config.CRAWLER_MAX_SLEEP_SEC
-            # Get all note information of the creator
-            all_notes_list = await self.xhs_client.get_all_notes_by_creator(
+    async def crawl_creator(self, creator_url: str, pipeline: CreatorPipeline):
+        """Save one creator's profile and feed its note pages to the pipeline"""
+        try:
+            # Parse creator URL to get user_id and security tokens
+            creator_info: CreatorUrlInfo = parse_creator_info_from_url(creator_url)
+        except ValueError as e:
+            utils.logger.error(f"[XiaoHongShuCrawler.crawl_creator] Failed to parse creator URL: {e}")
+            return
+        utils.logger.info(f"[XiaoHongShuCrawler.crawl_creator] Parse creator URL info: {creator_info}")
+        user_id = creator_info.user_id
+
+        # get creator detail info from web html content
+        async with pipeline.budget:
+            createor_info: Dict = await self.xhs_client.get_creator_info(
                 user_id=user_id,
-                crawl_interval=crawl_interval,
-                callback=self.fetch_creator_notes_detail,
                 xsec_token=creator_info.xsec_token,
-                xsec_source=creator_info.xsec_source,
+                xsec_source=creator_info.xsec_source
             )
+        if createor_info:
+            await xhs_store.save_creator(user_id, creator=createor_info)
 
-            note_ids = []
-            xsec_tokens = []
-            for note_item in all_notes_list:
-                note_ids.append(note_item.get("note_id"))
-                xsec_tokens.append(note_item.get("xsec_token"))
-            await self.batch_get_note_comments(note_ids, xsec_tokens)
+        # The pipeline waits the crawl interval between pages, outside the concurrency budget
+        notes_count = await pipeline.feed(
+            self.xhs_client.iter_notes_by_creator(
+                user_id=user_id,
+                crawl_interval=0,
+                xsec_token=creator_info.xsec_token,
+                xsec_source=creator_info.xsec_source,
+            ),
+            crawl_interval=config.CRAWLER_MAX_SLEEP_SEC,
+        )
+        utils.logger.info(f"[XiaoHongShuCrawler.crawl_creator] Creator {user_id} queued {notes_count} notes")
+
+    async def handle_creator_note(self, note_item: Dict, pipeline: CreatorPipeline):
+        """Pipeline worker: fetch and save the detail of one creator note, then its comments"""
+        note_id, xsec_token = note_item.get("note_id"), note_item.get("xsec_token")
+        note_detail = await self.get_note_detail_async_task(
+            note_id=note_id,
+            xsec_source=note_item.get("xsec_source"),
+            xsec_token=xsec_token,
+            semaphore=pipeline.budget,
+        )
+        if note_detail:
+            await xhs_store.update_xhs_note(note_detail)
+            await self.get_notice_media(note_detail)
+        if config.ENABLE_GET_COMMENTS:
+            await self.get_comments(note_id=note_id, xsec_token=xsec_token, semaphore=pipeline.budget)
 
     async def fetch_creator_notes_detail(self, note_list: List[Dict]):
         """Concurrently obtain the specified post list and save the data"""
@@ -320,22 +384,71 @@ class XiaoHongShuCrawler(AbstractCrawler):
             utils.logger.info(f"[XiaoHongShuCrawler.get_comments] Begin get note id comments {note_id}")
             # Use fixed crawling interval
             crawl_interval = config.CRAWLER_MAX_SLEEP_SEC
-            await self.xhs_client.get_note_all_comments(
+            async with aclosing(self.xhs_client.iter_note_comments(
                 note_id=note_id,
                 xsec_token=xsec_token,
                 crawl_interval=crawl_interval,
-                callback=xhs_store.batch_update_xhs_note_comments,
                 max_count=CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES,
-            )
+            )) as pages:
+                async for page in pages:
+                    await xhs_store.batch_update_xhs_note_comments(note_id, page.items)
 
             # Sleep after fetching comments
             await asyncio.sleep(crawl_interval)
             utils.logger.info(f"[XiaoHongShuCrawler.get_comments] Sleeping for {crawl_interval} seconds after fetching comments for note {note_id}")
 
-    async def create_xhs_client(self, httpx_proxy: Optional[str]) -> XiaoHongShuClient:
-        """Create Xiaohongshu client"""
+    async def create_account_pool(
+        self,
+        chromium: BrowserType,
+        playwright_proxy: Optional[Dict],
+        httpx_proxy: Optional[str],
+    ) -> AccountPool:
+        """Build the account pool: the logged-in primary account first, then every ACCOUNTS entry"""
+        sessions = [AccountSession("primary", self.xhs_client, self.browser_context, self.context_page)]
+        for account in load_account_configs(config.PLATFORM):
+            try:
+                sessions.append(await self.create_account_session(chromium, account, playwright_proxy, httpx_proxy))
+            except Exception as e:
+                utils.logger.error(f"[XiaoHongShuCrawler.create_account_pool] Account {account.name} failed to start: {e}")
+        account_pool = AccountPool(sessions, is_blocked=is_account_blocked)
+        await account_pool.check_all()
+        return account_pool
+
+    async def create_account_session(
+        self,
+        chromium: BrowserType,
+        account: AccountConfig,
+        playwright_proxy: Optional[Dict],
+        httpx_proxy: Optional[str],
+    ) -> AccountSession:
+        """Launch an account's own browser context and signer page, log it in by cookies and create its client"""
+        browser_context = await launch_account_context(
+            chromium, account, playwright_proxy, self.user_agent, headless=config.HEADLESS
+        )
+        await browser_context.add_init_script(path="libs/stealth.min.js")
+        page = await browser_context.new_page()
+        await page.goto(self.index_url)
+        if account.cookies:
+            login_obj = XiaoHongShuLogin(
+                login_type=config.LOGIN_TYPE,
+                browser_context=browser_context,
+                context_page=page,
+                cookie_str=account.cookies,
+            )
+            await login_obj.login_by_cookies()
+        client = await self.create_xhs_client(httpx_proxy, browser_context=browser_context, context_page=page)
+        return AccountSession(account.name, client, browser_context, page, owns_context=True)
+
+    async def create_xhs_client(
+        self,
+        httpx_proxy: Optional[str],
+        browser_context: Optional[BrowserContext] = None,
+        context_page: Optional[Page] = None,
+    ) -> XiaoHongShuClient:
+        """Create Xiaohongshu client, for the crawler's own browser context unless another one is given"""
         utils.logger.info("[XiaoHongShuCrawler.create_xhs_client] Begin create Xiaohongshu API client ...")
-        cookie_str, cookie_dict = utils.convert_cookies(await self.browser_context.cookies())
+        browser_context = browser_context or self.browser_context
+        cookie_str, cookie_dict = utils.convert_cookies(await browser_context.cookies())
         xhs_client_obj = XiaoHongShuClient(
             proxy=httpx_proxy,
             headers={
@@ -356,9 +469,10 @@ class XiaoHongShuCrawler(AbstractCrawler):
                 "user-agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36",
                 "Cookie": cookie_str,
             },
-            playwright_page=self.context_page,
+            playwright_page=context_page or self.context_page,
             cookie_dict=cookie_dict,
             proxy_ip_pool=self.ip_proxy_pool,  # Pass proxy pool for automatic refresh
+            proxy_balancer=self.proxy_balancer,
         )
         return xhs_client_obj
 
@@ -439,7 +553,7 @@ class XiaoHongShuCrawler(AbstractCrawler):
         await self.get_notice_video(note_detail)
 
     async def get_note_images(self, note_item: Dict):
-        """Get note images. Please use get_notice_media
+        """Queue note images to the media download pool. Please use get_notice_media
 
         Args:
             note_item: Note item dictionary
@@ -455,21 +569,24 @@ class XiaoHongShuCrawler(AbstractCrawler):
 
         if not image_list:
             return
+        image_store = xhs_store.XiaoHongShuImage()
         picNum = 0
         for pic in image_list:
             url = pic.get("url")
             if not url:
                 continue
-            content = await self.xhs_client.get_note_media(url)
-            await asyncio.sleep(random.random())
-            if content is None:
-                continue
             extension_file_name = f"{picNum}.jpg"
             picNum += 1
-            await xhs_store.update_xhs_note_image(note_id, content, extension_file_name)
+            await self.media_downloader.submit(MediaTask(
+                url=url,
+                path=Path(image_store.make_save_file_name(note_id, extension_file_name)),
+                note_id=note_id,
+                kind="image",
+                on_complete=self.thumbnailer.on_media_complete if self.thumbnailer else None,
+            ))
 
     async def get_notice_video(self, note_item: Dict):
-        """Get note videos. Please use get_notice_media
+        """Queue note videos to the media download pool. Please use get_notice_media
 
         Args:
             note_item: Note item dictionary
@@ -482,12 +599,14 @@ class XiaoHongShuCrawler(AbstractCrawler):
 
         if not videos:
             return
+        video_store = xhs_store.XiaoHongShuVideo()
         videoNum = 0
         for url in videos:
-            content = await self.xhs_client.get_note_media(url)
-            await asyncio.sleep(random.random())
-            if content is None:
-                continue
             extension_file_name = f"{videoNum}.mp4"
             videoNum += 1
-            await xhs_store.update_xhs_note_video(note_id, content, extension_file_name)
+            await self.media_downloader.submit(MediaTask(
+                url=url,
+                path=Path(video_store.make_save_file_name(note_id, extension_file_name)),
+                note_id=note_id,
+                kind="video",
+            ))
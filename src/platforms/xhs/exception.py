@@ -8,3 +8,12 @@ class DataFetchError(RequestError):
 
 class IPBlockError(RequestError):
     """fetch so fast that the server block us ip"""
+
+
+class CaptchaError(RequestError):
+    """a captcha (HTTP 461/471) was returned instead of data"""
+
+
+def is_account_blocked(error: BaseException) -> bool:
+    """Captcha or IP block: the account should cool down before it is used again"""
+    return isinstance(error, (CaptchaError, IPBlockError))
@@ -1,9 +1,50 @@
-import json
 import re
-from typing import Dict, Optional
+from functools import lru_cache
+from typing import Any, Dict, Optional
 
 import humps
 
+from src.services.extraction import get_extraction_executor
+from src.utils import codec
+
+INITIAL_STATE_MARKER = "window.__INITIAL_STATE__="
+
+# `undefined` followed by a delimiter, a literal prefix keeps the scan fast on large states.
+# Only matches preceded by ":", "," or "[" are bare values, strings containing the word are left alone.
+_UNDEFINED_RE = re.compile(r"undefined(?=[,}\]])")
+
+
+def _slice_initial_state(html: str) -> Optional[str]:
+    """Return the object literal assigned to window.__INITIAL_STATE__, located with str.find"""
+    start = html.find(INITIAL_STATE_MARKER)
+    if start == -1:
+        return None
+    start += len(INITIAL_STATE_MARKER)
+    end = html.find("</script>", start)
+    if end == -1:
+        return None
+    return html[start:end].strip().rstrip(";")
+
+
+def _loads_state(state: str, undefined_as: str) -> Any:
+    state = _UNDEFINED_RE.sub(lambda m: undefined_as if state[m.start() - 1] in ":,[" else m.group(), state)
+    # Raw control characters inside strings are accepted, the codec retries those with the lenient stdlib decoder
+    return codec.loads(state, strict=False)
+
+
+@lru_cache(maxsize=4096)
+def _decamelize_key(key: str) -> str:
+    return humps.decamelize(key)
+
+
+def decamelize_tree(obj: Any) -> Any:
+    """humps.decamelize with the converted keys cached, the state uses the same few hundred keys over and over"""
+    if isinstance(obj, dict):
+        return {_decamelize_key(key): decamelize_tree(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [decamelize_tree(item) for item in obj]
+    return obj
+
 
 class XiaoHongShuExtractor:
     def __init__(self):
@@ -22,13 +63,12 @@ class XiaoHongShuExtractor:
             # Either a CAPTCHA appeared or the note doesn't exist
             return None
 
-        state = re.findall(r"window.__INITIAL_STATE__=({.*})</script>", html)[
-            0
-        ].replace("undefined", '""')
-        if state != "{}":
-            note_dict = humps.decamelize(json.loads(state))
-            return note_dict["note"]["note_detail_map"][note_id]["note"]
-        return None
+        state = _slice_initial_state(html)
+        if not state or state == "{}":
+            return None
+        # Undefined values become "" as they always have for notes, only the note subtree is decamelized
+        note_state = _loads_state(state, '""')
+        return decamelize_tree(note_state["note"]["noteDetailMap"][note_id]["note"])
 
     def extract_creator_info_from_html(self, html: str) -> Optional[Dict]:
         """Extract user information from HTML
@@ -39,12 +79,18 @@ class XiaoHongShuExtractor:
         Returns:
             Dict: User information dictionary
         """
-        match = re.search(
-            r"<script>window.__INITIAL_STATE__=(.+)<\/script>", html, re.M
-        )
-        if match is None:
+        state = _slice_initial_state(html)
+        if state is None:
             return None
-        info = json.loads(match.group(1).replace(":undefined", ":null"), strict=False)
+        info = _loads_state(state, "null")
         if info is None:
             return None
         return info.get("user").get("userPageData")
+
+    async def extract_note_detail_from_html_async(self, note_id: str, html: str) -> Optional[Dict]:
+        """extract_note_detail_from_html through the extraction executor, large pages are parsed in the process pool"""
+        return await get_extraction_executor().run(len(html), self.extract_note_detail_from_html, note_id, html)
+
+    async def extract_creator_info_from_html_async(self, html: str) -> Optional[Dict]:
+        """extract_creator_info_from_html through the extraction executor, large pages are parsed in the process pool"""
+        return await get_extraction_executor().run(len(html), self.extract_creator_info_from_html, html)
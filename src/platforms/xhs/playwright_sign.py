@@ -1,13 +1,15 @@
 # Generate Xiaohongshu signature by calling window.mnsv2 via Playwright injection
 
 import hashlib
-import json
 import time
 from typing import Any, Dict, Optional, Union
 from urllib.parse import urlparse, quote
 
 from playwright.async_api import Page
 
+from src.services.transport import is_replay_mode
+from src.utils import codec
+
 from .xhs_sign import b64_encode, encode_utf8, get_trace_id, mrc
 
 
@@ -27,7 +29,7 @@ def _build_sign_string(uri: str, data: Optional[Union[Dict, str]] = None, method
         c = uri
         if data is not None:
             if isinstance(data, dict):
-                c += json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+                c += codec.dumps(data)
             elif isinstance(data, str):
                 c += data
         return c
@@ -70,7 +72,7 @@ def _build_xs_payload(x3_value: str, data_type: str = "object") -> str:
         "x3": x3_value,
         "x4": data_type,
     }
-    return "XYS_" + b64_encode(encode_utf8(json.dumps(s, separators=(",", ":"))))
+    return "XYS_" + b64_encode(encode_utf8(codec.dumps(s, ensure_ascii=True)))
 
 
 def _build_xs_common(a1: str, b1: str, x_s: str, x_t: str) -> str:
@@ -91,7 +93,7 @@ def _build_xs_common(a1: str, b1: str, x_s: str, x_t: str) -> str:
         "x10": 154,
         "x11": "normal",
     }
-    return b64_encode(encode_utf8(json.dumps(payload, separators=(",", ":"))))
+    return b64_encode(encode_utf8(codec.dumps(payload, ensure_ascii=True)))
 
 
 async def get_b1_from_localstorage(page: Page) -> str:
@@ -170,8 +172,13 @@ async def sign_with_playwright(
     Returns:
         Dictionary containing x-s, x-t, x-s-common, x-b3-traceid
     """
-    b1 = await get_b1_from_localstorage(page)
-    x_s = await sign_xs_with_playwright(page, uri, data, method)
+    if is_replay_mode():
+        # Replayed responses do not depend on the signature, build it locally without the browser
+        b1 = ""
+        x_s = _build_xs_payload("", "object" if isinstance(data, (dict, list)) else "string")
+    else:
+        b1 = await get_b1_from_localstorage(page)
+        x_s = await sign_xs_with_playwright(page, uri, data, method)
     x_t = str(int(time.time() * 1000))
 
     return {
@@ -11,7 +11,6 @@
 4. 发布图文笔记 (publish_note)
 """
 
-import json
 import os
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
@@ -20,7 +19,7 @@ import httpx
 from PIL import Image
 from tenacity import retry, stop_after_attempt, wait_fixed
 
-from src.utils import utils
+from src.utils import codec, utils
 
 
 # 不可见字符，用于话题标记
@@ -141,7 +140,7 @@ class XiaoHongShuPublisher:
             # 部分接口返回非 JSON
             content_type = response.headers.get("content-type", "")
             if "application/json" in content_type:
-                data = response.json()
+                data = codec.loads(response.content)
                 if isinstance(data, dict) and data.get("success") is False:
                     raise Exception(f"API 错误: {data.get('msg', response.text)}")
                 return data
@@ -358,16 +357,16 @@ class XiaoHongShuPublisher:
                 "type": "normal",
                 "note_id": "",
                 "post_id": "",
-                "source": json.dumps({
+                "source": codec.dumps({
                     "type": "web",
                     "ids": "",
-                    "extraInfo": json.dumps({"systemId": "web"}),
+                    "extraInfo": codec.dumps({"systemId": "web"}),
                 }),
                 "title": title,
                 "desc": desc,
                 "ats": [],
                 "hash_tag": hash_tags,
-                "business_binds": json.dumps({
+                "business_binds": codec.dumps({
                     "version": 1,
                     "noteId": 0,
                     "bizType": 0,
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 import asyncio
-import json
-from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Union
+from contextlib import aclosing
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Union
 from urllib.parse import urlencode
 
 import httpx
@@ -13,10 +13,14 @@ import config
 from src.core.base_crawler import AbstractApiClient
 from src.utils import zhihu_const as zhihu_constant
 from src.models.m_zhihu import ZhihuComment, ZhihuContent, ZhihuCreator
+from src.models.page import CursorPage
+from src.services.archive import RawArchive
 from src.services.proxy.proxy_mixin import ProxyRefreshMixin
-from src.utils import utils
+from src.services.transport import is_replay_mode
+from src.utils import codec, utils
 
 if TYPE_CHECKING:
+    from src.services.proxy.proxy_balancer import ProxyBalancer
     from src.services.proxy.proxy_ip_pool import ProxyIpPool
 
 from .exception import DataFetchError, ForbiddenError
@@ -35,14 +39,17 @@ class ZhiHuClient(AbstractApiClient, ProxyRefreshMixin):
         playwright_page: Page,
         cookie_dict: Dict[str, str],
         proxy_ip_pool: Optional["ProxyIpPool"] = None,
+        proxy_balancer: Optional["ProxyBalancer"] = None,
     ):
         self.proxy = proxy
         self.timeout = timeout
         self.default_headers = headers
         self.cookie_dict = cookie_dict
         self._extractor = ZhihuExtractor()
+        # Raw response archive for offline re-extraction (opt-in)
+        self.raw_archive: Optional[RawArchive] = RawArchive("zhihu") if config.ENABLE_RAW_ARCHIVE else None
         # Initialize proxy pool (from ProxyRefreshMixin)
-        self.init_proxy_pool(proxy_ip_pool)
+        self.init_proxy_pool(proxy_ip_pool, proxy_balancer)
 
     async def _pre_headers(self, url: str) -> Dict:
         """
@@ -55,7 +62,11 @@ class ZhiHuClient(AbstractApiClient, ProxyRefreshMixin):
         d_c0 = self.cookie_dict.get("d_c0")
         if not d_c0:
             raise Exception("d_c0 not found in cookies")
-        sign_res = sign(url, self.default_headers["cookie"])
+        if is_replay_mode():
+            # Replayed responses do not depend on the signature, skip the JS runtime
+            sign_res = {"x-zst-81": "", "x-zse-96": "2.0_replay"}
+        else:
+            sign_res = sign(url, self.default_headers["cookie"])
         headers = self.default_headers.copy()
         headers['x-zst-81'] = sign_res["x-zst-81"]
         headers['x-zse-96'] = sign_res["x-zse-96"]
@@ -73,14 +84,10 @@ class ZhiHuClient(AbstractApiClient, ProxyRefreshMixin):
         Returns:
 
         """
-        # Check if proxy is expired before each request
-        await self._refresh_proxy_if_expired()
-
         # return response.text
         return_response = kwargs.pop('return_response', False)
-
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        # Proxy refresh / multi-proxy selection happens in _send_request
+        response = await self._send_request(method, url, timeout=self.timeout, **kwargs)
 
         if response.status_code != 200:
             utils.logger.error(f"[ZhiHuClient.request] Requset Url: {url}, Request error: {response.text}")
@@ -91,15 +98,18 @@ class ZhiHuClient(AbstractApiClient, ProxyRefreshMixin):
 
             raise DataFetchError(response.text)
 
+        if self.raw_archive is not None:
+            await self.raw_archive.archive_response(method, url, kwargs.get("data"), response)
+
         if return_response:
             return response.text
         try:
-            data: Dict = response.json()
+            data: Dict = codec.loads(response.content)
             if data.get("error"):
                 utils.logger.error(f"[ZhiHuClient.request] Request error: {data}")
                 raise DataFetchError(data.get("error", {}).get("message"))
             return data
-        except json.JSONDecodeError:
+        except codec.JSONDecodeError:
             utils.logger.error(f"[ZhiHuClient.request] Request error: {response.text}")
             raise DataFetchError(response.text)
 
@@ -200,9 +210,14 @@ class ZhiHuClient(AbstractApiClient, ProxyRefreshMixin):
             "sort": sort.value,
             "vertical": note_type.value,
         }
-        search_res = await self.get(uri, params)
-        utils.logger.info(f"[ZhiHuClient.get_note_by_keyword] Search result: {search_res}")
-        return self._extractor.extract_contents_from_search(search_res)
+        # The raw body is parsed together with the extraction, in the extraction process pool when it is large
+        search_text = await self.get(uri, params, return_response=True)
+        if not isinstance(search_text, str):
+            # 404 responses come back as an empty dict
+            return []
+        contents = await self._extractor.extract_contents_from_search_text_async(search_text)
+        utils.logger.info(f"[ZhiHuClient.get_note_by_keyword] Search result: {len(contents)} contents, {len(search_text)} chars")
+        return contents
 
     async def get_root_comments(
         self,
@@ -261,25 +276,29 @@ class ZhiHuClient(AbstractApiClient, ProxyRefreshMixin):
         }
         return await self.get(uri, params)
 
-    async def get_note_all_comments(
+    async def iter_note_comments(
         self,
         content: ZhihuContent,
         crawl_interval: float = 1.0,
-        callback: Optional[Callable] = None,
-    ) -> List[ZhihuComment]:
+        offset: str = "",
+        with_sub_comments: Optional[bool] = None,
+    ) -> AsyncIterator[CursorPage]:
         """
-        Get all root-level comments for a specified post, this method will retrieve all comment information under a post
+        Iterate the root-level comment pages of a post, each followed by the sub comment pages of its comments.
+        Pages are fetched lazily, nothing is accumulated: the consumer stores a page before the next one is requested
+        and may stop at any page (wrap the generator in contextlib.aclosing when breaking out early)
         Args:
             content: Content detail object (question|article|video)
-            crawl_interval: Crawl delay interval in seconds
-            callback: Callback after completing one crawl
-
-        Returns:
+            crawl_interval: Delay between two page requests in seconds
+            offset: Root-level offset to start from, the cursor of a yielded root-level page resumes after it
+            with_sub_comments: Also yield sub comment pages, defaults to ENABLE_GET_SUB_COMMENTS
 
+        Yields:
+            CursorPage: Root-level pages (parent_id empty) and sub comment pages (parent_id is the root comment ID)
         """
-        result: List[ZhihuComment] = []
+        if with_sub_comments is None:
+            with_sub_comments = config.ENABLE_GET_SUB_COMMENTS
         is_end: bool = False
-        offset: str = ""
         limit: int = 10
         while not is_end:
             root_comment_res = await self.get_root_comments(content.content_id, content.content_type, offset, limit)
@@ -293,36 +312,32 @@ class ZhiHuClient(AbstractApiClient, ProxyRefreshMixin):
             if not comments:
                 break
 
-            if callback:
-                await callback(comments)
-
-            result.extend(comments)
-            await self.get_comments_all_sub_comments(content, comments, crawl_interval=crawl_interval, callback=callback)
-            await asyncio.sleep(crawl_interval)
-        return result
+            yield CursorPage(items=comments, cursor=offset, has_more=not is_end)
+            if with_sub_comments:
+                async with aclosing(
+                    self.iter_sub_comments(content, comments, crawl_interval=crawl_interval)
+                ) as sub_pages:
+                    async for sub_page in sub_pages:
+                        yield sub_page
+            if not is_end:
+                await asyncio.sleep(crawl_interval)
 
-    async def get_comments_all_sub_comments(
+    async def iter_sub_comments(
         self,
         content: ZhihuContent,
         comments: List[ZhihuComment],
         crawl_interval: float = 1.0,
-        callback: Optional[Callable] = None,
-    ) -> List[ZhihuComment]:
+    ) -> AsyncIterator[CursorPage]:
         """
-        Get all sub-comments under specified comments
+        Iterate the sub comment pages under specified comments
         Args:
             content: Content detail object (question|article|video)
             comments: Comment list
-            crawl_interval: Crawl delay interval in seconds
-            callback: Callback after completing one crawl
-
-        Returns:
+            crawl_interval: Delay between two page requests in seconds
 
+        Yields:
+            CursorPage: Sub comment pages, parent_id is the root comment ID
         """
-        if not config.ENABLE_GET_SUB_COMMENTS:
-            return []
-
-        all_sub_comments: List[ZhihuComment] = []
         for parment_comment in comments:
             if parment_comment.sub_comment_count == 0:
                 continue
@@ -342,11 +357,64 @@ class ZhiHuClient(AbstractApiClient, ProxyRefreshMixin):
                 if not sub_comments:
                     break
 
+                yield CursorPage(
+                    items=sub_comments, cursor=offset, has_more=not is_end, parent_id=parment_comment.comment_id
+                )
+                await asyncio.sleep(crawl_interval)
+
+    async def get_note_all_comments(
+        self,
+        content: ZhihuContent,
+        crawl_interval: float = 1.0,
+        callback: Optional[Callable] = None,
+    ) -> List[ZhihuComment]:
+        """
+        Get all root-level comments for a specified post, this method will retrieve all comment information under a post
+        Collects every page of iter_note_comments into a list, crawlers consume iter_note_comments directly instead
+        Args:
+            content: Content detail object (question|article|video)
+            crawl_interval: Crawl delay interval in seconds
+            callback: Callback after completing one crawl
+
+        Returns:
+
+        """
+        result: List[ZhihuComment] = []
+        async with aclosing(self.iter_note_comments(content, crawl_interval=crawl_interval)) as pages:
+            async for page in pages:
                 if callback:
-                    await callback(sub_comments)
+                    await callback(page.items)
+                result.extend(page.items)
+        return result
 
-                all_sub_comments.extend(sub_comments)
-                await asyncio.sleep(crawl_interval)
+    async def get_comments_all_sub_comments(
+        self,
+        content: ZhihuContent,
+        comments: List[ZhihuComment],
+        crawl_interval: float = 1.0,
+        callback: Optional[Callable] = None,
+    ) -> List[ZhihuComment]:
+        """
+        Get all sub-comments under specified comments
+        Collects every page of iter_sub_comments into a list
+        Args:
+            content: Content detail object (question|article|video)
+            comments: Comment list
+            crawl_interval: Crawl delay interval in seconds
+            callback: Callback after completing one crawl
+
+        Returns:
+
+        """
+        if not config.ENABLE_GET_SUB_COMMENTS:
+            return []
+
+        all_sub_comments: List[ZhihuComment] = []
+        async with aclosing(self.iter_sub_comments(content, comments, crawl_interval=crawl_interval)) as pages:
+            async for page in pages:
+                if callback:
+                    await callback(page.items)
+                all_sub_comments.extend(page.items)
         return all_sub_comments
 
     async def get_creator_info(self, url_token: str) -> Optional[ZhihuCreator]:
@@ -360,7 +428,7 @@ class ZhiHuClient(AbstractApiClient, ProxyRefreshMixin):
         """
         uri = f"/people/{url_token}"
         html_content: str = await self.get(uri, return_response=True)
-        return self._extractor.extract_creator(url_token, html_content)
+        return await self._extractor.extract_creator_async(url_token, html_content)
 
     async def get_creator_answers(self, url_token: str, offset: int = 0, limit: int = 20) -> Dict:
         """
@@ -425,36 +493,81 @@ class ZhiHuClient(AbstractApiClient, ProxyRefreshMixin):
         }
         return await self.get(uri, params)
 
-    async def get_all_anwser_by_creator(self, creator: ZhihuCreator, crawl_interval: float = 1.0, callback: Optional[Callable] = None) -> List[ZhihuContent]:
+    async def _iter_creator_contents(
+        self,
+        fetch_page: Callable[[str, int, int], Awaitable[Dict]],
+        creator: ZhihuCreator,
+        crawl_interval: float = 1.0,
+        offset: int = 0,
+    ) -> AsyncIterator[CursorPage]:
         """
-        Get all answers by creator
+        Iterate the content pages of a creator listing (answers / articles / videos)
         Args:
+            fetch_page: get_creator_answers / get_creator_articles / get_creator_videos
             creator: Creator information
-            crawl_interval: Crawl delay interval in seconds
-            callback: Callback after completing one crawl
-
-        Returns:
+            crawl_interval: Delay between two page requests in seconds
+            offset: Offset to start from, the cursor of a yielded page resumes after it
 
+        Yields:
+            CursorPage: Content pages
         """
-        all_contents: List[ZhihuContent] = []
         is_end: bool = False
-        offset: int = 0
         limit: int = 20
         while not is_end:
-            res = await self.get_creator_answers(creator.url_token, offset, limit)
+            res = await fetch_page(creator.url_token, offset, limit)
             if not res:
                 break
-            utils.logger.info(f"[ZhiHuClient.get_all_anwser_by_creator] Get creator {creator.url_token} answers: {res}")
             paging_info = res.get("paging", {})
             is_end = paging_info.get("is_end")
             contents = self._extractor.extract_content_list_from_creator(res.get("data"))
-            if callback:
-                await callback(contents)
-            all_contents.extend(contents)
             offset += limit
-            await asyncio.sleep(crawl_interval)
+            yield CursorPage(items=contents, cursor=offset, has_more=not is_end)
+            if not is_end:
+                await asyncio.sleep(crawl_interval)
+
+    def iter_anwser_by_creator(
+        self, creator: ZhihuCreator, crawl_interval: float = 1.0, offset: int = 0
+    ) -> AsyncIterator[CursorPage]:
+        """Iterate the answer pages of a creator, fetched lazily and never accumulated"""
+        return self._iter_creator_contents(self.get_creator_answers, creator, crawl_interval, offset)
+
+    def iter_articles_by_creator(
+        self, creator: ZhihuCreator, crawl_interval: float = 1.0, offset: int = 0
+    ) -> AsyncIterator[CursorPage]:
+        """Iterate the article pages of a creator, fetched lazily and never accumulated"""
+        return self._iter_creator_contents(self.get_creator_articles, creator, crawl_interval, offset)
+
+    def iter_videos_by_creator(
+        self, creator: ZhihuCreator, crawl_interval: float = 1.0, offset: int = 0
+    ) -> AsyncIterator[CursorPage]:
+        """Iterate the video pages of a creator, fetched lazily and never accumulated"""
+        return self._iter_creator_contents(self.get_creator_videos, creator, crawl_interval, offset)
+
+    async def _collect_creator_contents(
+        self, pages: AsyncIterator[CursorPage], callback: Optional[Callable] = None
+    ) -> List[ZhihuContent]:
+        all_contents: List[ZhihuContent] = []
+        async with aclosing(pages):
+            async for page in pages:
+                if callback:
+                    await callback(page.items)
+                all_contents.extend(page.items)
         return all_contents
 
+    async def get_all_anwser_by_creator(self, creator: ZhihuCreator, crawl_interval: float = 1.0, callback: Optional[Callable] = None) -> List[ZhihuContent]:
+        """
+        Get all answers by creator
+        Collects every page of iter_anwser_by_creator into a list, crawlers consume iter_anwser_by_creator directly instead
+        Args:
+            creator: Creator information
+            crawl_interval: Crawl delay interval in seconds
+            callback: Callback after completing one crawl
+
+        Returns:
+
+        """
+        return await self._collect_creator_contents(self.iter_anwser_by_creator(creator, crawl_interval), callback)
+
     async def get_all_articles_by_creator(
         self,
         creator: ZhihuCreator,
@@ -471,23 +584,7 @@ class ZhiHuClient(AbstractApiClient, ProxyRefreshMixin):
         Returns:
 
         """
-        all_contents: List[ZhihuContent] = []
-        is_end: bool = False
-        offset: int = 0
-        limit: int = 20
-        while not is_end:
-            res = await self.get_creator_articles(creator.url_token, offset, limit)
-            if not res:
-                break
-            paging_info = res.get("paging", {})
-            is_end = paging_info.get("is_end")
-            contents = self._extractor.extract_content_list_from_creator(res.get("data"))
-            if callback:
-                await callback(contents)
-            all_contents.extend(contents)
-            offset += limit
-            await asyncio.sleep(crawl_interval)
-        return all_contents
+        return await self._collect_creator_contents(self.iter_articles_by_creator(creator, crawl_interval), callback)
 
     async def get_all_videos_by_creator(
         self,
@@ -505,23 +602,7 @@ class ZhiHuClient(AbstractApiClient, ProxyRefreshMixin):
         Returns:
 
         """
-        all_contents: List[ZhihuContent] = []
-        is_end: bool = False
-        offset: int = 0
-        limit: int = 20
-        while not is_end:
-            res = await self.get_creator_videos(creator.url_token, offset, limit)
-            if not res:
-                break
-            paging_info = res.get("paging", {})
-            is_end = paging_info.get("is_end")
-            contents = self._extractor.extract_content_list_from_creator(res.get("data"))
-            if callback:
-                await callback(contents)
-            all_contents.extend(contents)
-            offset += limit
-            await asyncio.sleep(crawl_interval)
-        return all_contents
+        return await self._collect_creator_contents(self.iter_videos_by_creator(creator, crawl_interval), callback)
 
     async def get_answer_info(
         self,
@@ -539,7 +620,7 @@ class ZhiHuClient(AbstractApiClient, ProxyRefreshMixin):
         """
         uri = f"/question/{question_id}/answer/{answer_id}"
         response_html = await self.get(uri, return_response=True)
-        return self._extractor.extract_answer_content_from_html(response_html)
+        return await self._extractor.extract_answer_content_from_html_async(response_html)
 
     async def get_article_info(self, article_id: str) -> Optional[ZhihuContent]:
         """
@@ -552,7 +633,7 @@ class ZhiHuClient(AbstractApiClient, ProxyRefreshMixin):
         """
         uri = f"/p/{article_id}"
         response_html = await self.get(uri, return_response=True)
-        return self._extractor.extract_article_content_from_html(response_html)
+        return await self._extractor.extract_article_content_from_html_async(response_html)
 
     async def get_video_info(self, video_id: str) -> Optional[ZhihuContent]:
         """
@@ -565,4 +646,4 @@ class ZhiHuClient(AbstractApiClient, ProxyRefreshMixin):
         """
         uri = f"/zvideo/{video_id}"
         response_html = await self.get(uri, return_response=True)
-        return self._extractor.extract_zvideo_content_from_html(response_html)
+        return await self._extractor.extract_zvideo_content_from_html_async(response_html)
@@ -4,6 +4,7 @@ import asyncio
 import os
 # import random  # Removed as we now use fixed config.CRAWLER_MAX_SLEEP_SEC intervals
 from asyncio import Task
+from contextlib import aclosing
 from typing import Dict, List, Optional, Tuple, cast
 
 from playwright.async_api import (
@@ -17,7 +18,11 @@ from playwright.async_api import (
 import config
 from src.utils import zhihu_const as constant
 from src.core.base_crawler import AbstractCrawler
+from src.core.pipeline import CreatorPipeline
 from src.models.m_zhihu import ZhihuContent, ZhihuCreator
+from src.services.accounts import (AccountConfig, AccountPool, AccountSession, PooledClient,
+                                   launch_account_context, load_account_configs)
+from src.services.proxy.proxy_balancer import ProxyBalancer, create_proxy_balancer
 from src.services.proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
 from src.storage import zhihu as zhihu_store
 from src.utils import utils
@@ -25,7 +30,7 @@ from src.utils.cdp_browser import CDPBrowserManager
 from src.core.var import crawler_type_var, source_keyword_var
 
 from .client import ZhiHuClient
-from .exception import DataFetchError
+from .exception import DataFetchError, is_account_blocked
 from .help import ZhihuExtractor, judge_zhihu_url
 from .login import ZhiHuLogin
 
@@ -43,6 +48,8 @@ class ZhihuCrawler(AbstractCrawler):
         self._extractor = ZhihuExtractor()
         self.cdp_manager = None
         self.ip_proxy_pool = None  # Proxy IP pool for automatic proxy refresh
+        self.proxy_balancer: Optional[ProxyBalancer] = None  # Several proxies at once (ENABLE_MULTI_PROXY)
+        self.account_pool: Optional[AccountPool] = None  # Multi-account session pool (ACCOUNTS)
 
     async def start(self) -> None:
         """
@@ -59,6 +66,9 @@ class ZhihuCrawler(AbstractCrawler):
             playwright_proxy_format, httpx_proxy_format = utils.format_proxy_info(
                 ip_proxy_info
             )
+            if config.ENABLE_MULTI_PROXY:
+                # API requests are spread over several proxies, the browser keeps the first one
+                self.proxy_balancer = await create_proxy_balancer(self.ip_proxy_pool)
 
         async with async_playwright() as playwright:
             # Choose launch mode based on configuration
@@ -108,18 +118,34 @@ class ZhihuCrawler(AbstractCrawler):
             await asyncio.sleep(5)
             await self.zhihu_client.update_cookies(browser_context=self.browser_context)
 
+            if config.ACCOUNTS:
+                # Spread the crawl over several logged-in accounts, each with its own client and rate budget
+                self.account_pool = await self.create_account_pool(playwright.chromium, httpx_proxy_format)
+                self.zhihu_client = PooledClient(self.account_pool)
+
             crawler_type_var.set(config.CRAWLER_TYPE)
-            if config.CRAWLER_TYPE == "search":
-                # Search for notes and retrieve their comment information.
-                await self.search()
-            elif config.CRAWLER_TYPE == "detail":
-                # Get the information and comments of the specified post
-                await self.get_specified_notes()
-            elif config.CRAWLER_TYPE == "creator":
-                # Get creator's information and their notes and comments
-                await self.get_creators_and_notes()
-            else:
-                pass
+            # One store per run, opened before crawling and flushed/closed even if crawling fails
+            await zhihu_store.ZhihuStoreFactory.open_store()
+            try:
+                if config.CRAWLER_TYPE == "search":
+                    # Search for notes and retrieve their comment information.
+                    await self.search()
+                elif config.CRAWLER_TYPE == "detail":
+                    # Get the information and comments of the specified post
+                    await self.get_specified_notes()
+                elif config.CRAWLER_TYPE == "creator":
+                    # Get creator's information and their notes and comments
+                    await self.get_creators_and_notes()
+                else:
+                    pass
+            finally:
+                await zhihu_store.ZhihuStoreFactory.close_store()
+                if self.account_pool:
+                    await self.account_pool.close()
+                if self.proxy_balancer:
+                    await self.proxy_balancer.close()
+                if self.ip_proxy_pool:
+                    await self.ip_proxy_pool.close()
 
             utils.logger.info("[ZhihuCrawler.start] Zhihu Crawler finished ...")
 
@@ -219,66 +245,78 @@ class ZhihuCrawler(AbstractCrawler):
             await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
             utils.logger.info(f"[ZhihuCrawler.get_comments] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds before fetching comments for content {content_item.content_id}")
 
-            await self.zhihu_client.get_note_all_comments(
+            async with aclosing(self.zhihu_client.iter_note_comments(
                 content=content_item,
                 crawl_interval=config.CRAWLER_MAX_SLEEP_SEC,
-                callback=zhihu_store.batch_update_zhihu_note_comments,
-            )
+            )) as pages:
+                async for page in pages:
+                    await zhihu_store.batch_update_zhihu_note_comments(page.items)
 
     async def get_creators_and_notes(self) -> None:
         """
         Get creator's information and their notes and comments
+        Creators are crawled concurrently and the ZHIHU_CREATOR_CONTENT_TYPES listings of a creator are paginated in
+        parallel, their pages stream into a CreatorPipeline whose workers save the contents and fetch the comments.
+        All requests share the MAX_CONCURRENCY_NUM budget
         Returns:
 
         """
         utils.logger.info(
-            "[ZhihuCrawler.get_creators_and_notes] Begin get xiaohongshu creators"
+            "[ZhihuCrawler.get_creators_and_notes] Begin get zhihu creators"
         )
-        for user_link in config.ZHIHU_CREATOR_URL_LIST:
-            utils.logger.info(
-                f"[ZhihuCrawler.get_creators_and_notes] Begin get creator {user_link}"
-            )
-            user_url_token = user_link.split("/")[-1]
-            # get creator detail info from web html content
+        pipeline = CreatorPipeline(name="zhihu")
+        await pipeline.run(config.ZHIHU_CREATOR_URL_LIST, self.crawl_creator, self.handle_creator_content)
+
+    async def crawl_creator(self, user_link: str, pipeline: CreatorPipeline):
+        """
+        Save one creator's information and feed its content pages to the pipeline
+        Args:
+            user_link: Creator homepage URL
+            pipeline:
+
+        Returns:
+
+        """
+        utils.logger.info(
+            f"[ZhihuCrawler.crawl_creator] Begin get creator {user_link}"
+        )
+        user_url_token = user_link.split("/")[-1]
+        # get creator detail info from web html content
+        async with pipeline.budget:
             createor_info: ZhihuCreator = await self.zhihu_client.get_creator_info(
                 url_token=user_url_token
             )
-            if not createor_info:
-                utils.logger.info(
-                    f"[ZhihuCrawler.get_creators_and_notes] Creator {user_url_token} not found"
-                )
-                continue
-
+        if not createor_info:
             utils.logger.info(
-                f"[ZhihuCrawler.get_creators_and_notes] Creator info: {createor_info}"
-            )
-            await zhihu_store.save_creator(creator=createor_info)
-
-            # By default, only answer information is extracted, uncomment below if articles and videos are needed
-
-            # Get all anwser information of the creator
-            all_content_list = await self.zhihu_client.get_all_anwser_by_creator(
-                creator=createor_info,
-                crawl_interval=config.CRAWLER_MAX_SLEEP_SEC,
-                callback=zhihu_store.batch_update_zhihu_contents,
+                f"[ZhihuCrawler.crawl_creator] Creator {user_url_token} not found"
             )
+            return
 
-            # Get all articles of the creator's contents
-            # all_content_list = await self.zhihu_client.get_all_articles_by_creator(
-            #     creator=createor_info,
-            #     crawl_interval=config.CRAWLER_MAX_SLEEP_SEC,
-            #     callback=zhihu_store.batch_update_zhihu_contents
-            # )
-
-            # Get all videos of the creator's contents
-            # all_content_list = await self.zhihu_client.get_all_videos_by_creator(
-            #     creator=createor_info,
-            #     crawl_interval=config.CRAWLER_MAX_SLEEP_SEC,
-            #     callback=zhihu_store.batch_update_zhihu_contents
-            # )
+        utils.logger.info(
+            f"[ZhihuCrawler.crawl_creator] Creator info: {createor_info}"
+        )
+        await zhihu_store.save_creator(creator=createor_info)
+
+        listings = {
+            "answer": self.zhihu_client.iter_anwser_by_creator,
+            "article": self.zhihu_client.iter_articles_by_creator,
+            "zvideo": self.zhihu_client.iter_videos_by_creator,
+        }
+        content_types = [t for t in config.ZHIHU_CREATOR_CONTENT_TYPES if t in listings]
+        # The pipeline waits the crawl interval between pages, outside the concurrency budget
+        counts = await asyncio.gather(*(
+            pipeline.feed(listings[t](createor_info, crawl_interval=0), crawl_interval=config.CRAWLER_MAX_SLEEP_SEC)
+            for t in content_types
+        ))
+        utils.logger.info(
+            f"[ZhihuCrawler.crawl_creator] Creator {user_url_token} queued {dict(zip(content_types, counts))}"
+        )
 
-            # Get all comments of the creator's contents
-            await self.batch_get_content_comments(all_content_list)
+    async def handle_creator_content(self, content_item: ZhihuContent, pipeline: CreatorPipeline):
+        """Pipeline worker: save one creator content, then fetch its comments"""
+        await zhihu_store.update_zhihu_content(content_item)
+        if config.ENABLE_GET_COMMENTS:
+            await self.get_comments(content_item, pipeline.budget)
 
     async def get_note_detail(
         self, full_note_url: str, semaphore: asyncio.Semaphore
@@ -369,13 +407,72 @@ class ZhihuCrawler(AbstractCrawler):
 
         await self.batch_get_content_comments(need_get_comment_notes)
 
-    async def create_zhihu_client(self, httpx_proxy: Optional[str]) -> ZhiHuClient:
-        """Create zhihu client"""
+    async def create_account_pool(self, chromium: BrowserType, httpx_proxy: Optional[str]) -> AccountPool:
+        """
+        Build the account pool: the logged-in primary account first, then every ACCOUNTS entry
+        Args:
+            chromium:
+            httpx_proxy:
+
+        Returns:
+
+        """
+        sessions = [AccountSession("primary", self.zhihu_client, self.browser_context, self.context_page)]
+        for account in load_account_configs(config.PLATFORM):
+            try:
+                sessions.append(await self.create_account_session(chromium, account, httpx_proxy))
+            except Exception as e:
+                utils.logger.error(f"[ZhihuCrawler.create_account_pool] Account {account.name} failed to start: {e}")
+        account_pool = AccountPool(sessions, is_blocked=is_account_blocked)
+        await account_pool.check_all()
+        return account_pool
+
+    async def create_account_session(
+        self, chromium: BrowserType, account: AccountConfig, httpx_proxy: Optional[str]
+    ) -> AccountSession:
+        """
+        Launch an account's own browser context and signer page, log it in by cookies and create its client
+        Args:
+            chromium:
+            account:
+            httpx_proxy:
+
+        Returns:
+
+        """
+        browser_context = await launch_account_context(
+            chromium, account, None, self.user_agent, headless=config.HEADLESS
+        )
+        await browser_context.add_init_script(path="libs/stealth.min.js")
+        page = await browser_context.new_page()
+        await page.goto(self.index_url, wait_until="domcontentloaded")
+        if account.cookies:
+            login_obj = ZhiHuLogin(
+                login_type=config.LOGIN_TYPE,
+                login_phone="",
+                browser_context=browser_context,
+                context_page=page,
+                cookie_str=account.cookies,
+            )
+            await login_obj.login_by_cookies()
+        # Same as the primary account: the search API needs the cookies set by the search page
+        await page.goto(f"{self.index_url}/search?q=python&search_source=Guess&utm_content=search_hot&type=content")
+        await asyncio.sleep(5)
+        client = await self.create_zhihu_client(httpx_proxy, browser_context=browser_context, context_page=page)
+        return AccountSession(account.name, client, browser_context, page, owns_context=True)
+
+    async def create_zhihu_client(
+        self,
+        httpx_proxy: Optional[str],
+        browser_context: Optional[BrowserContext] = None,
+        context_page: Optional[Page] = None,
+    ) -> ZhiHuClient:
+        """Create zhihu client, for the crawler's own browser context unless another one is given"""
         utils.logger.info(
             "[ZhihuCrawler.create_zhihu_client] Begin create zhihu API client ..."
         )
         cookie_str, cookie_dict = utils.convert_cookies(
-            await self.browser_context.cookies()
+            await (browser_context or self.browser_context).cookies()
         )
         zhihu_client_obj = ZhiHuClient(
             proxy=httpx_proxy,
@@ -391,9 +488,10 @@ class ZhihuCrawler(AbstractCrawler):
                 "x-requested-with": "fetch",
                 "x-zse-93": "101_3_3.0",
             },
-            playwright_page=self.context_page,
+            playwright_page=context_page or self.context_page,
             cookie_dict=cookie_dict,
             proxy_ip_pool=self.ip_proxy_pool,  # Pass proxy pool for automatic refresh
+            proxy_balancer=self.proxy_balancer,
         )
         return zhihu_client_obj
 
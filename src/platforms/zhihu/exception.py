@@ -11,3 +11,8 @@ class IPBlockError(RequestError):
 
 class ForbiddenError(RequestError):
     """Forbidden"""
+
+
+def is_account_blocked(error: BaseException) -> bool:
+    """Forbidden or IP block: the account should cool down before it is used again"""
+    return isinstance(error, (ForbiddenError, IPBlockError))
@@ -1,6 +1,7 @@
 
 # -*- coding: utf-8 -*-
 import json
+import re
 from typing import Dict, List, Optional
 from urllib.parse import parse_qs, urlparse
 
@@ -9,9 +10,12 @@ from parsel import Selector
 
 from src.utils import zhihu_const as zhihu_constant
 from src.models.m_zhihu import ZhihuComment, ZhihuContent, ZhihuCreator
-from src.utils import utils
+from src.services.extraction import get_extraction_executor
+from src.utils import codec, utils
 from src.utils.crawler_util import extract_text_from_html
 
+from .exception import DataFetchError
+
 ZHIHU_SGIN_JS = None
 
 
@@ -33,6 +37,93 @@ def sign(url: str, cookies: str) -> Dict:
     return ZHIHU_SGIN_JS.call("get_sign", url, cookies)
 
 
+JS_INITIAL_DATA_ID = "js-initialData"
+_json_decoder = json.JSONDecoder()
+_whitespace = re.compile(r"[ \t\n\r]*")
+
+
+def slice_script_text(html_content: str, script_id: str) -> Optional[str]:
+    """
+    slice the text of <script id="..."> out of the page by string offsets, without building a DOM
+    Args:
+        html_content: page html
+        script_id: id attribute of the script tag
+
+    Returns:
+        script text, None if the tag is not found
+    """
+    for attr in (f'id="{script_id}"', f"id='{script_id}'"):
+        attr_pos = html_content.find(attr)
+        if attr_pos != -1:
+            break
+    else:
+        return None
+
+    tag_start = html_content.rfind("<", 0, attr_pos)
+    tag_end = html_content.find(">", attr_pos)
+    if tag_start == -1 or tag_end == -1 or not html_content.startswith("<script", tag_start):
+        return None
+    text_end = html_content.find("</script>", tag_end)
+    if text_end == -1:
+        return None
+    return html_content[tag_end + 1:text_end]
+
+
+def _find_member(text: str, idx: int, key: str) -> int:
+    """
+    find the value of a direct member of the json object starting at idx, earlier sibling values are decoded to skip
+    them so keys nested inside them are never matched
+    Args:
+        text: json text
+        idx: offset of the object's opening brace
+        key: member name
+
+    Returns:
+        offset of the member value, -1 if the object has no such member
+    """
+    if text[idx] != "{":
+        raise ValueError(f"expected an object at {idx}")
+    idx = _whitespace.match(text, idx + 1).end()
+    while text[idx] != "}":
+        name, idx = _json_decoder.raw_decode(text, idx)
+        idx = _whitespace.match(text, idx).end()
+        if text[idx] != ":":
+            raise ValueError(f"expected ':' at {idx}")
+        idx = _whitespace.match(text, idx + 1).end()
+        if name == key:
+            return idx
+        _, idx = _json_decoder.raw_decode(text, idx)
+        idx = _whitespace.match(text, idx).end()
+        if text[idx] == ",":
+            idx = _whitespace.match(text, idx + 1).end()
+    return -1
+
+
+def _decode_initial_entities(js_init_data: str) -> Dict:
+    """
+    decode initialState.entities of js-initialData, only the entities branch is parsed
+    Args:
+        js_init_data: text of the js-initialData script
+
+    Returns:
+
+    """
+    js_init_data = js_init_data.strip()
+    if not js_init_data:
+        return {}
+    try:
+        state_pos = _find_member(js_init_data, 0, "initialState")
+        entities_pos = _find_member(js_init_data, state_pos, "entities") if state_pos != -1 else -1
+        if entities_pos != -1:
+            entities, _ = _json_decoder.raw_decode(js_init_data, entities_pos)
+            if isinstance(entities, dict):
+                return entities
+    except (ValueError, IndexError):
+        pass
+    json_data: Dict = codec.loads(js_init_data)
+    return json_data.get("initialState", {}).get("entities", {})
+
+
 class ZhihuExtractor:
     def __init__(self):
         pass
@@ -54,6 +145,34 @@ class ZhihuExtractor:
         return self._extract_content_list([sr_item.get("object") for sr_item in search_result if sr_item.get("object")])
 
 
+    def extract_contents_from_search_text(self, search_text: str) -> List[ZhihuContent]:
+        """
+        parse the raw search response and extract zhihu contents, runs in the extraction process pool for large responses
+        Args:
+            search_text: search_v3 response body
+
+        Returns:
+
+        """
+        try:
+            json_data: Dict = codec.loads(search_text)
+        except codec.JSONDecodeError:
+            raise DataFetchError(search_text)
+        if json_data.get("error"):
+            raise DataFetchError(json_data.get("error", {}).get("message"))
+        return self.extract_contents_from_search(json_data)
+
+    async def extract_contents_from_search_text_async(self, search_text: str) -> List[ZhihuContent]:
+        """
+        extract_contents_from_search_text through the extraction executor
+        Args:
+            search_text: search_v3 response body
+
+        Returns:
+
+        """
+        return await get_extraction_executor().run(len(search_text), self.extract_contents_from_search_text, search_text)
+
     def _extract_content_list(self, content_list: List[Dict]) -> List[ZhihuContent]:
         """
         extract zhihu content list
@@ -306,6 +425,29 @@ class ZhihuExtractor:
             return "Unknown"
 
 
+    @staticmethod
+    def _extract_initial_entities(html_content: str) -> Dict:
+        """
+        extract initialState.entities from the js-initialData script of a zhihu page
+        Args:
+            html_content: zhihu page html
+
+        Returns:
+
+        """
+        if not html_content:
+            return {}
+        js_init_data = slice_script_text(html_content, JS_INITIAL_DATA_ID)
+        if js_init_data is not None:
+            try:
+                return _decode_initial_entities(js_init_data)
+            except ValueError as e:
+                utils.logger.warning(f"[ZhihuExtractor._extract_initial_entities] sliced js-initialData invalid, fallback to dom parsing: {e}")
+
+        # fallback: full DOM parsing
+        js_init_data = Selector(text=html_content).xpath("//script[@id='js-initialData']/text()").get(default="")
+        return _decode_initial_entities(js_init_data)
+
     def extract_creator(self, user_url_token: str, html_content: str) -> Optional[ZhihuCreator]:
         """
         extract zhihu creator
@@ -319,12 +461,7 @@ class ZhihuExtractor:
         if not html_content:
             return None
 
-        js_init_data = Selector(text=html_content).xpath("//script[@id='js-initialData']/text()").get(default="").strip()
-        if not js_init_data:
-            return None
-
-        js_init_data_dict: Dict = json.loads(js_init_data)
-        users_info: Dict = js_init_data_dict.get("initialState", {}).get("entities", {}).get("users", {})
+        users_info: Dict = self._extract_initial_entities(html_content).get("users", {})
         if not users_info:
             return None
 
@@ -377,11 +514,7 @@ class ZhihuExtractor:
         Returns:
 
         """
-        js_init_data: str = Selector(text=html_content).xpath("//script[@id='js-initialData']/text()").get(default="")
-        if not js_init_data:
-            return None
-        json_data: Dict = json.loads(js_init_data)
-        answer_info: Dict = json_data.get("initialState", {}).get("entities", {}).get("answers", {})
+        answer_info: Dict = self._extract_initial_entities(html_content).get("answers", {})
         if not answer_info:
             return None
 
@@ -396,11 +529,7 @@ class ZhihuExtractor:
         Returns:
 
         """
-        js_init_data: str = Selector(text=html_content).xpath("//script[@id='js-initialData']/text()").get(default="")
-        if not js_init_data:
-            return None
-        json_data: Dict = json.loads(js_init_data)
-        article_info: Dict = json_data.get("initialState", {}).get("entities", {}).get("articles", {})
+        article_info: Dict = self._extract_initial_entities(html_content).get("articles", {})
         if not article_info:
             return None
 
@@ -415,12 +544,9 @@ class ZhihuExtractor:
         Returns:
 
         """
-        js_init_data: str = Selector(text=html_content).xpath("//script[@id='js-initialData']/text()").get(default="")
-        if not js_init_data:
-            return None
-        json_data: Dict = json.loads(js_init_data)
-        zvideo_info: Dict = json_data.get("initialState", {}).get("entities", {}).get("zvideos", {})
-        users: Dict = json_data.get("initialState", {}).get("entities", {}).get("users", {})
+        entities: Dict = self._extract_initial_entities(html_content)
+        zvideo_info: Dict = entities.get("zvideos", {})
+        users: Dict = entities.get("users", {})
         if not zvideo_info:
             return None
 
@@ -434,6 +560,30 @@ class ZhihuExtractor:
 
         return self._extract_zvideo_content(video_detail_info)
 
+    async def extract_creator_async(self, user_url_token: str, html_content: str) -> Optional[ZhihuCreator]:
+        """extract_creator through the extraction executor"""
+        return await get_extraction_executor().run(
+            len(html_content or ""), self.extract_creator, user_url_token, html_content
+        )
+
+    async def extract_answer_content_from_html_async(self, html_content: str) -> Optional[ZhihuContent]:
+        """extract_answer_content_from_html through the extraction executor"""
+        return await get_extraction_executor().run(
+            len(html_content or ""), self.extract_answer_content_from_html, html_content
+        )
+
+    async def extract_article_content_from_html_async(self, html_content: str) -> Optional[ZhihuContent]:
+        """extract_article_content_from_html through the extraction executor"""
+        return await get_extraction_executor().run(
+            len(html_content or ""), self.extract_article_content_from_html, html_content
+        )
+
+    async def extract_zvideo_content_from_html_async(self, html_content: str) -> Optional[ZhihuContent]:
+        """extract_zvideo_content_from_html through the extraction executor"""
+        return await get_extraction_executor().run(
+            len(html_content or ""), self.extract_zvideo_content_from_html, html_content
+        )
+
 
 def judge_zhihu_url(note_detail_url: str) -> str:
     """
@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+# @Desc    : Multi-account session pool entry point
+from .account_pool import (
+    AccountConfig,
+    AccountPool,
+    AccountSession,
+    NoHealthyAccountError,
+    PooledClient,
+    RateBudget,
+    launch_account_context,
+    load_account_configs,
+    unwrap_error,
+)
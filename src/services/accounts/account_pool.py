@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+"""
+多账号会话池模块
+
+每个账号拥有独立的浏览器上下文、签名页面、API 客户端和请求速率预算：
+- 账号来自 ACCOUNTS 配置（Cookie 字符串或独立的登录态目录），启动流程登录的主账号始终是第一个账号
+- 请求调度到预算最早可用的健康账号，吞吐随账号数量线性增长
+- 触发验证码 / IP 封禁的账号进入冷却，冷却结束后用 pong 重新检查，其余账号继续爬取
+- PooledClient 以原客户端的接口对外提供服务，爬虫代码无需感知账号池
+"""
+import asyncio
+import inspect
+import os
+import time
+from contextlib import aclosing, asynccontextmanager
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from playwright.async_api import BrowserContext, BrowserType, Page
+from tenacity import RetryError
+
+import config
+from src.utils import utils
+
+
+class NoHealthyAccountError(Exception):
+    """所有账号都不可用"""
+
+
+@dataclass
+class AccountConfig:
+    """ACCOUNTS 中的单个账号"""
+
+    name: str
+    cookies: str = ""  # Cookie 字符串，为空时使用登录态目录中保存的登录状态
+    user_data_dir: str = ""  # 登录态目录（SAVE_LOGIN_STATE）
+
+
+def load_account_configs(platform: str) -> List[AccountConfig]:
+    """
+    读取 ACCOUNTS 配置，未指定登录态目录的账号按 USER_DATA_DIR 生成独立目录
+
+    Args:
+        platform: 平台名称
+
+    Returns:
+        List[AccountConfig]: 账号列表
+    """
+    accounts = []
+    for index, item in enumerate(config.ACCOUNTS):
+        name = item.get("name") or f"account{index + 1}"
+        user_data_dir = item.get("user_data_dir") or os.path.join(
+            os.getcwd(), "browser_data", config.USER_DATA_DIR % f"{platform}_{name}"
+        )
+        accounts.append(AccountConfig(name=name, cookies=item.get("cookies", ""), user_data_dir=user_data_dir))
+    return accounts
+
+
+async def launch_account_context(
+    chromium: BrowserType,
+    account: AccountConfig,
+    playwright_proxy: Optional[Dict],
+    user_agent: Optional[str],
+    headless: bool = True,
+) -> BrowserContext:
+    """
+    为账号启动独立的浏览器上下文，SAVE_LOGIN_STATE 开启时使用账号自己的登录态目录
+
+    Args:
+        chromium: 浏览器类型
+        account: 账号配置
+        playwright_proxy: Playwright 代理配置
+        user_agent: 浏览器 UA
+        headless: 是否无头模式
+
+    Returns:
+        BrowserContext: 账号的浏览器上下文
+    """
+    viewport = {"width": 1920, "height": 1080}
+    if config.SAVE_LOGIN_STATE:
+        return await chromium.launch_persistent_context(
+            user_data_dir=account.user_data_dir,
+            accept_downloads=True,
+            headless=headless,
+            proxy=playwright_proxy,  # type: ignore
+            viewport=viewport,
+            user_agent=user_agent,
+        )
+    browser = await chromium.launch(headless=headless, proxy=playwright_proxy)  # type: ignore
+    return await browser.new_context(viewport=viewport, user_agent=user_agent)
+
+
+def unwrap_error(error: BaseException) -> BaseException:
+    """取出 tenacity 重试耗尽后 RetryError 包装的原始异常"""
+    while isinstance(error, RetryError) and error.last_attempt.failed:
+        error = error.last_attempt.exception()
+    return error
+
+
+class RateBudget:
+    """单个账号的请求速率预算，两次调用之间至少间隔 1 / rate 秒"""
+
+    def __init__(self, rate: float):
+        """
+        Args:
+            rate: 每秒调用数，<= 0 表示不限速
+        """
+        self.interval = 1 / rate if rate > 0 else 0.0
+        self.next_allowed = 0.0
+
+    def available_at(self) -> float:
+        """下一次调用最早可以开始的时间（time.monotonic）"""
+        return self.next_allowed
+
+    async def acquire(self):
+        """占用一次调用额度，额度未恢复时等待"""
+        if not self.interval:
+            return
+        now = time.monotonic()
+        start_at = max(now, self.next_allowed)
+        self.next_allowed = start_at + self.interval
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
+
+
+class AccountSession:
+    """一个已登录账号：浏览器上下文、签名页面、API 客户端和速率预算"""
+
+    def __init__(
+        self,
+        name: str,
+        client: Any,
+        browser_context: Optional[BrowserContext] = None,
+        page: Optional[Page] = None,
+        rate: Optional[float] = None,
+        owns_context: bool = False,
+    ):
+        """
+        Args:
+            name: 账号名
+            client: 平台 API 客户端（需提供 pong）
+            browser_context: 账号的浏览器上下文
+            page: 签名页面
+            rate: 每秒调用数，默认 ACCOUNT_RATE_LIMIT
+            owns_context: 关闭账号池时是否关闭浏览器上下文（主账号的上下文由爬虫自己管理）
+        """
+        self.name = name
+        self.client = client
+        self.browser_context = browser_context
+        self.page = page
+        self.budget = RateBudget(config.ACCOUNT_RATE_LIMIT if rate is None else rate)
+        self.owns_context = owns_context
+
+        self.healthy = True
+        self.failures = 0  # 连续失败次数
+        self.cooldown_until = 0.0
+        self.in_flight = 0
+        self.calls = 0
+        self.checking = False
+
+    async def close(self):
+        if not self.owns_context or self.browser_context is None:
+            return
+        browser = self.browser_context.browser
+        await self.browser_context.close()
+        if browser is not None:
+            await browser.close()
+        self.browser_context = None
+
+    def __repr__(self) -> str:
+        state = "healthy" if self.healthy else f"cooling down, {self.failures} failures"
+        return f"AccountSession({self.name}, {state}, calls={self.calls})"
+
+
+class AccountPool:
+    """多账号会话池，把调用调度到健康且预算最早可用的账号"""
+
+    def __init__(
+        self,
+        sessions: List[AccountSession],
+        is_blocked: Optional[Callable[[BaseException], bool]] = None,
+        cooldown: Optional[float] = None,
+        max_failures: Optional[int] = None,
+    ):
+        """
+        Args:
+            sessions: 账号列表，第一个为主账号
+            is_blocked: 判断异常是否表示账号被限制（验证码 / 封禁），此类异常会让账号进入冷却
+            cooldown: 冷却时间（秒），默认 ACCOUNT_COOLDOWN_SEC
+            max_failures: 连续失败次数上限，默认 ACCOUNT_MAX_FAILURES
+        """
+        if not sessions:
+            raise ValueError("AccountPool requires at least one session")
+        self.sessions = sessions
+        self._is_blocked = is_blocked or (lambda error: False)
+        self.cooldown = config.ACCOUNT_COOLDOWN_SEC if cooldown is None else cooldown
+        self.max_failures = config.ACCOUNT_MAX_FAILURES if max_failures is None else max_failures
+
+    @property
+    def primary(self) -> AccountSession:
+        return self.sessions[0]
+
+    def healthy_sessions(self) -> List[AccountSession]:
+        return [session for session in self.sessions if session.healthy]
+
+    def is_blocked(self, error: BaseException) -> bool:
+        return self._is_blocked(unwrap_error(error))
+
+    def mark_blocked(self, session: AccountSession, reason: Any = ""):
+        """账号触发验证码 / 封禁 / 健康检查失败，进入冷却"""
+        session.healthy = False
+        session.failures += 1
+        session.cooldown_until = time.monotonic() + self.cooldown
+        utils.logger.warning(
+            f"[AccountPool] 账号 {session.name} 进入冷却 {self.cooldown}s（连续失败 {session.failures} 次）: {reason}"
+        )
+
+    async def check_health(self, session: AccountSession) -> bool:
+        """用 pong 检查账号登录状态"""
+        session.checking = True
+        try:
+            ok = await session.client.pong()
+        except Exception as e:
+            ok = False
+            utils.logger.error(f"[AccountPool.check_health] 账号 {session.name} 检查出错: {e}")
+        finally:
+            session.checking = False
+        if ok:
+            session.healthy, session.failures = True, 0
+        else:
+            self.mark_blocked(session, "pong failed")
+        return ok
+
+    async def check_all(self) -> List[AccountSession]:
+        """并发检查所有账号，返回健康账号"""
+        await asyncio.gather(*(self.check_health(session) for session in self.sessions))
+        healthy = self.healthy_sessions()
+        utils.logger.info(f"[AccountPool.check_all] 健康账号 {len(healthy)}/{len(self.sessions)}: {self.sessions}")
+        return healthy
+
+    async def _pick(self) -> AccountSession:
+        while True:
+            now = time.monotonic()
+            for session in self.sessions:
+                if not session.healthy and not session.checking and session.cooldown_until <= now:
+                    await self.check_health(session)
+            healthy = self.healthy_sessions()
+            if healthy:
+                return min(healthy, key=lambda session: (session.budget.available_at(), session.in_flight))
+            if all(session.failures >= self.max_failures for session in self.sessions):
+                raise NoHealthyAccountError(f"All {len(self.sessions)} accounts are unavailable: {self.sessions}")
+            wait = min(session.cooldown_until for session in self.sessions) - time.monotonic()
+            utils.logger.warning(f"[AccountPool] 暂无健康账号，{max(wait, 0):.0f}s 后重新检查")
+            await asyncio.sleep(max(wait, 0.1))
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AccountSession]:
+        """选出一个健康账号并占用一次预算，退出前账号计为占用中"""
+        session = await self._pick()
+        session.in_flight += 1
+        try:
+            await session.budget.acquire()
+            session.calls += 1
+            yield session
+        finally:
+            session.in_flight -= 1
+
+    async def close(self):
+        """关闭账号池启动的浏览器上下文"""
+        await asyncio.gather(*(session.close() for session in self.sessions), return_exceptions=True)
+        utils.logger.info(f"[AccountPool.close] 账号调用统计: {[(s.name, s.calls) for s in self.sessions]}")
+
+
+class PooledClient:
+    """
+    以平台客户端接口对外的账号池代理
+
+    协程方法：每次调用选出一个账号执行，账号被限制时冷却并换下一个账号重试
+    iter_* 分页生成器：整个分页过程固定在同一个账号上（游标与账号绑定），每页占用一次预算
+    其余属性读取主账号的客户端
+    """
+
+    def __init__(self, pool: AccountPool):
+        self.pool = pool
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.pool.primary.client, name)
+        if not callable(attr):
+            return attr
+        method = getattr(type(self.pool.primary.client), name, attr)
+        if name.startswith("iter_") or inspect.isasyncgenfunction(method):
+            return partial(self._iterate, name)
+        if inspect.iscoroutinefunction(method):
+            return partial(self._call, name)
+        return attr
+
+    async def _call(self, name: str, *args, **kwargs):
+        attempts = len(self.pool.sessions)
+        for attempt in range(attempts):
+            async with self.pool.session() as session:
+                try:
+                    return await getattr(session.client, name)(*args, **kwargs)
+                except Exception as e:
+                    if not self.pool.is_blocked(e):
+                        raise
+                    self.pool.mark_blocked(session, e)
+                    if attempt + 1 >= attempts:
+                        raise
+
+    async def _iterate(self, name: str, *args, **kwargs):
+        async with self.pool.session() as session:
+            pages = getattr(session.client, name)(*args, **kwargs)
+            async with aclosing(pages):
+                page = None
+                while True:
+                    # The first page was paid for by session(), a page without has_more ends the pagination
+                    if page is not None and page.has_more:
+                        await session.budget.acquire()
+                        session.calls += 1
+                    try:
+                        page = await anext(pages, None)
+                    except Exception as e:
+                        if self.pool.is_blocked(e):
+                            self.pool.mark_blocked(session, e)
+                        raise
+                    if page is None:
+                        return
+                    yield page
@@ -0,0 +1,3 @@
+# -*- coding: utf-8 -*-
+# @Desc    : Raw response archive and offline re-extraction
+from .raw_archive import RAW_ARCHIVE_ROOT, RawArchive, classify_request, load_blob
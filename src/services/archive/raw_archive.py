@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+原始响应归档模块
+
+将平台客户端收到的原始 JSON/HTML 响应体按内容 SHA-256 压缩存储，供离线重新提取：
+- 响应体 gzip 压缩后存放在 data/raw_archive/<平台>/blobs/ab/<sha256>.gz，相同内容只保存一份
+- 索引 index.sqlite 按接口（endpoint）和实体 ID 记录每次请求，附带请求参数和爬取上下文
+- 只归档 ARCHIVE_ROUTES 中声明的接口，登录校验等请求不归档
+"""
+import asyncio
+import gzip
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlparse
+
+import config
+from src.core.var import crawler_type_var, source_keyword_var
+from src.utils import codec, utils
+
+RAW_ARCHIVE_ROOT = Path("data") / "raw_archive"
+
+# 平台 -> [(endpoint, 路径正则, 实体 ID 参数名)]
+# 实体 ID 参数名为 None 时取路径正则的 id 分组，否则从 query 参数或 JSON 请求体中读取
+ARCHIVE_ROUTES: Dict[str, List[Tuple[str, str, Optional[str]]]] = {
+    "xhs": [
+        ("search_notes", r"^/api/sns/web/v1/search/notes$", "keyword"),
+        ("note_feed", r"^/api/sns/web/v1/feed$", "source_note_id"),
+        ("note_comments", r"^/api/sns/web/v2/comment/page$", "note_id"),
+        ("note_sub_comments", r"^/api/sns/web/v2/comment/sub/page$", "note_id"),
+        ("creator_notes", r"^/api/sns/web/v1/user_posted$", "user_id"),
+        ("note_detail_html", r"^/explore/(?P<id>[^/]+)$", None),
+        ("creator_html", r"^/user/profile/(?P<id>[^/]+)$", None),
+    ],
+    "zhihu": [
+        ("search", r"^/api/v4/search_v3$", "q"),
+        ("root_comments", r"^/api/v4/comment_v5/(?P<content_type>\w+)s/(?P<id>\d+)/root_comment$", None),
+        ("child_comments", r"^/api/v4/comment_v5/comment/(?P<id>\d+)/child_comment$", None),
+        ("creator_answers", r"^/api/v4/members/(?P<id>[^/]+)/answers$", None),
+        ("creator_articles", r"^/api/v4/members/(?P<id>[^/]+)/articles$", None),
+        ("creator_videos", r"^/api/v4/members/(?P<id>[^/]+)/zvideos$", None),
+        ("creator_html", r"^/people/(?P<id>[^/]+)$", None),
+        ("answer_html", r"^/question/(?P<question_id>\d+)/answer/(?P<id>\d+)$", None),
+        ("article_html", r"^/p/(?P<id>\d+)$", None),
+        ("zvideo_html", r"^/zvideo/(?P<id>\d+)$", None),
+    ],
+}
+
+_COMPILED_ROUTES = {
+    platform: [(endpoint, re.compile(pattern), id_param) for endpoint, pattern, id_param in routes]
+    for platform, routes in ARCHIVE_ROUTES.items()
+}
+
+
+def blob_path(root: Path, sha256: str) -> Path:
+    """压缩响应体路径：blobs/<前2位>/<sha256>.gz"""
+    return Path(root) / "blobs" / sha256[:2] / f"{sha256}.gz"
+
+
+def load_blob(root: Path, sha256: str) -> str:
+    """读取并解压响应体"""
+    return gzip.decompress(blob_path(root, sha256).read_bytes()).decode("utf-8")
+
+
+def classify_request(platform: str, url: str, body: Optional[str] = None) -> Optional[Tuple[str, str, Dict]]:
+    """
+    匹配归档接口
+
+    Args:
+        platform: 平台名称
+        url: 请求 URL
+        body: POST 请求的 JSON 请求体
+
+    Returns:
+        (endpoint, 实体 ID, 请求参数)，未声明的接口返回 None
+    """
+    parsed = urlparse(url)
+    for endpoint, pattern, id_param in _COMPILED_ROUTES.get(platform, []):
+        match = pattern.match(parsed.path)
+        if not match:
+            continue
+        params: Dict = dict(parse_qsl(parsed.query))
+        if body:
+            try:
+                payload = codec.loads(body)
+                if isinstance(payload, dict):
+                    params.update(payload)
+            except ValueError:
+                pass
+        params.update({k: v for k, v in match.groupdict().items() if k != "id"})
+        entity_id = match.group("id") if id_param is None else params.get(id_param, "")
+        return endpoint, str(entity_id), params
+    return None
+
+
+class RawArchive:
+    """单个平台的原始响应归档"""
+
+    def __init__(self, platform: str, root: Path = RAW_ARCHIVE_ROOT, compress_level: Optional[int] = None):
+        """
+        Args:
+            platform: 平台名称（xhs、zhihu）
+            root: 归档根目录，平台数据位于 root/<平台>
+            compress_level: gzip 压缩级别，默认 RAW_ARCHIVE_COMPRESS_LEVEL
+        """
+        self.platform = platform
+        self.root = Path(root) / platform
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.compress_level = compress_level or config.RAW_ARCHIVE_COMPRESS_LEVEL
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.root / "index.sqlite", check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS raw_response ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, endpoint TEXT NOT NULL, entity_id TEXT, method TEXT, "
+            "url TEXT, params TEXT, sha256 TEXT NOT NULL, content_type TEXT, meta TEXT, fetched_ts INTEGER)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_raw_response_endpoint ON raw_response (endpoint, entity_id)"
+        )
+        self._conn.commit()
+
+    def put(self, method: str, url: str, body: Optional[str], content: bytes, content_type: str = "") -> Optional[str]:
+        """
+        归档一次响应
+
+        Args:
+            method: 请求方法
+            url: 请求 URL
+            body: POST 请求的 JSON 请求体
+            content: 原始响应体
+            content_type: 响应 Content-Type
+
+        Returns:
+            响应体 sha256，未声明的接口返回 None
+        """
+        route = classify_request(self.platform, url, body)
+        if route is None:
+            return None
+        endpoint, entity_id, params = route
+        sha256 = hashlib.sha256(content).hexdigest()
+        path = blob_path(self.root, sha256)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(path.name + f".{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(gzip.compress(content, compresslevel=self.compress_level))
+            tmp_path.replace(path)
+        meta = {"source_keyword": source_keyword_var.get(), "crawler_type": crawler_type_var.get()}
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO raw_response (endpoint, entity_id, method, url, params, sha256, content_type, meta, fetched_ts) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (endpoint, entity_id, method, url, codec.dumps(params), sha256,
+                 content_type, codec.dumps(meta), int(time.time())),
+            )
+            self._conn.commit()
+        return sha256
+
+    async def archive_response(self, method: str, url: str, body: Optional[str], response):
+        """在线程中归档 httpx 响应，归档失败只记录日志，不影响爬取"""
+        try:
+            # 以实际发出的 URL 为准：GET 请求的 params 由 httpx 拼接到 query 中，实体 ID 可能在其中
+            url = str(response.request.url)
+        except RuntimeError:
+            pass
+        try:
+            await asyncio.to_thread(
+                self.put, method, url, body, response.content, response.headers.get("content-type", "")
+            )
+        except Exception as e:
+            utils.logger.error(f"[RawArchive.archive_response] 归档 {url} 失败: {e}")
+
+    def iter_entries(self, endpoints: Optional[Sequence[str]] = None) -> Iterator[Dict]:
+        """
+        按写入顺序遍历索引
+
+        Args:
+            endpoints: 只返回这些接口，为空时返回全部
+        """
+        sql = "SELECT id, endpoint, entity_id, url, params, sha256, meta FROM raw_response"
+        args: Tuple = ()
+        if endpoints:
+            sql += f" WHERE endpoint IN ({','.join('?' * len(endpoints))})"
+            args = tuple(endpoints)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY id", args).fetchall()
+        for row_id, endpoint, entity_id, url, params, sha256, meta in rows:
+            yield {
+                "id": row_id,
+                "endpoint": endpoint,
+                "entity_id": entity_id,
+                "url": url,
+                "params": codec.loads(params or "{}"),
+                "sha256": sha256,
+                "meta": codec.loads(meta or "{}"),
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
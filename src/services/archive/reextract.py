@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""
+离线重新提取模块
+
+对原始响应归档重新执行平台提取器和存储规范化函数，全程不访问网络：
+- 归档按批次分发到多个工作进程，解压、解析 JSON/HTML、提取和规范化都在工作进程中完成
+- 主进程只负责把规范化后的记录写入 SAVE_DATA_OPTION 指定的存储
+- 知乎子评论需要根评论所属的内容，放在根评论之后的第二阶段处理
+
+用法:
+    python -m src.services.archive.reextract --platform xhs
+    python -m src.services.archive.reextract --platform zhihu --endpoint search --save-data-option jsonl
+"""
+import argparse
+import asyncio
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import config
+from src.core.var import crawler_type_var, source_keyword_var
+from src.services.extraction import create_process_pool
+from src.utils import codec, utils
+
+from .raw_archive import RAW_ARCHIVE_ROOT, RawArchive, load_blob
+
+# 一条待写入的记录：(存储方法名, 规范化后的记录)
+StoreRecord = Tuple[str, Dict]
+
+
+# ========== 小红书 ==========
+
+def _xhs_api_data(body: str) -> Optional[Dict]:
+    data = codec.loads(body)
+    if not data.get("success"):
+        return None
+    return data.get("data") or {}
+
+
+def _xhs_note(note: Optional[Dict], entry: Dict) -> List[StoreRecord]:
+    from src.storage.xhs import build_xhs_note_item
+
+    if not note:
+        return []
+    params = entry["params"]
+    note.update({"xsec_token": params.get("xsec_token", ""), "xsec_source": params.get("xsec_source", "")})
+    return [("store_content", build_xhs_note_item(note))]
+
+
+def _xhs_note_feed(entry: Dict, body: str, context: Dict) -> List[StoreRecord]:
+    data = _xhs_api_data(body)
+    if not data or not data.get("items"):
+        return []
+    return _xhs_note(data["items"][0]["note_card"], entry)
+
+
+def _xhs_note_detail_html(entry: Dict, body: str, context: Dict) -> List[StoreRecord]:
+    from src.platforms.xhs.extractor import XiaoHongShuExtractor
+
+    return _xhs_note(XiaoHongShuExtractor().extract_note_detail_from_html(entry["entity_id"], body), entry)
+
+
+def _xhs_comments(entry: Dict, body: str, context: Dict) -> List[StoreRecord]:
+    from src.storage.xhs import build_xhs_comment_item
+
+    data = _xhs_api_data(body)
+    if not data:
+        return []
+    note_id = entry["entity_id"]
+    records = []
+    for comment in data.get("comments", []):
+        records.append(("store_comment", build_xhs_comment_item(note_id, comment)))
+        # 一级评论接口内嵌的子评论，与爬取时一致受 ENABLE_GET_SUB_COMMENTS 控制
+        if entry["endpoint"] == "note_comments" and config.ENABLE_GET_SUB_COMMENTS:
+            for sub_comment in comment.get("sub_comments") or []:
+                records.append(("store_comment", build_xhs_comment_item(note_id, sub_comment)))
+    return records
+
+
+def _xhs_creator_html(entry: Dict, body: str, context: Dict) -> List[StoreRecord]:
+    from src.platforms.xhs.extractor import XiaoHongShuExtractor
+    from src.storage.xhs import build_xhs_creator_item
+
+    creator = XiaoHongShuExtractor().extract_creator_info_from_html(body)
+    if not creator:
+        return []
+    return [("store_creator", build_xhs_creator_item(entry["entity_id"], creator))]
+
+
+# ========== 知乎 ==========
+
+def _zhihu_contents(contents) -> List[StoreRecord]:
+    from src.storage.zhihu import build_zhihu_content_item
+
+    return [("store_content", build_zhihu_content_item(content)) for content in contents if content]
+
+
+def _zhihu_comments(content, comments: List[Dict]) -> List[StoreRecord]:
+    from src.platforms.zhihu.help import ZhihuExtractor
+    from src.storage.zhihu import build_zhihu_comment_item
+
+    return [
+        ("store_comment", build_zhihu_comment_item(comment))
+        for comment in ZhihuExtractor().extract_comments(content, comments)
+    ]
+
+
+def _zhihu_search(entry: Dict, body: str, context: Dict) -> List[StoreRecord]:
+    from src.platforms.zhihu.help import ZhihuExtractor
+
+    return _zhihu_contents(ZhihuExtractor().extract_contents_from_search(codec.loads(body)))
+
+
+def _zhihu_root_comments(entry: Dict, body: str, context: Dict) -> List[StoreRecord]:
+    from src.models.m_zhihu import ZhihuContent
+
+    content = ZhihuContent(content_id=entry["entity_id"], content_type=entry["params"].get("content_type", ""))
+    return _zhihu_comments(content, codec.loads(body).get("data"))
+
+
+def _zhihu_child_comments(entry: Dict, body: str, context: Dict) -> List[StoreRecord]:
+    from src.models.m_zhihu import ZhihuContent
+
+    parent = context.get("comment_contents", {}).get(entry["entity_id"])
+    if parent is None:
+        # 根评论不在归档中，无法确定所属内容
+        return []
+    content = ZhihuContent(content_id=parent[0], content_type=parent[1])
+    return _zhihu_comments(content, codec.loads(body).get("data"))
+
+
+def _zhihu_creator_contents(entry: Dict, body: str, context: Dict) -> List[StoreRecord]:
+    from src.platforms.zhihu.help import ZhihuExtractor
+
+    return _zhihu_contents(ZhihuExtractor().extract_content_list_from_creator(codec.loads(body).get("data")))
+
+
+def _zhihu_creator_html(entry: Dict, body: str, context: Dict) -> List[StoreRecord]:
+    from src.platforms.zhihu.help import ZhihuExtractor
+    from src.storage.zhihu import build_zhihu_creator_item
+
+    creator = ZhihuExtractor().extract_creator(entry["entity_id"], body)
+    return [("store_creator", build_zhihu_creator_item(creator))] if creator else []
+
+
+def _zhihu_content_html(method_name: str) -> Callable[[Dict, str, Dict], List[StoreRecord]]:
+    def replay(entry: Dict, body: str, context: Dict) -> List[StoreRecord]:
+        from src.platforms.zhihu.help import ZhihuExtractor
+
+        return _zhihu_contents([getattr(ZhihuExtractor(), method_name)(body)])
+
+    return replay
+
+
+# 平台 -> endpoint -> 重放函数，未列出的接口（如搜索/主页笔记列表摘要）爬取时不直接入库，跳过
+REPLAYERS: Dict[str, Dict[str, Callable[[Dict, str, Dict], List[StoreRecord]]]] = {
+    "xhs": {
+        "note_feed": _xhs_note_feed,
+        "note_detail_html": _xhs_note_detail_html,
+        "note_comments": _xhs_comments,
+        "note_sub_comments": _xhs_comments,
+        "creator_html": _xhs_creator_html,
+    },
+    "zhihu": {
+        "search": _zhihu_search,
+        "root_comments": _zhihu_root_comments,
+        "child_comments": _zhihu_child_comments,
+        "creator_answers": _zhihu_creator_contents,
+        "creator_articles": _zhihu_creator_contents,
+        "creator_videos": _zhihu_creator_contents,
+        "creator_html": _zhihu_creator_html,
+        "answer_html": _zhihu_content_html("extract_answer_content_from_html"),
+        "article_html": _zhihu_content_html("extract_article_content_from_html"),
+        "zvideo_html": _zhihu_content_html("extract_zvideo_content_from_html"),
+    },
+}
+
+# 依赖第一阶段结果的接口
+DEFERRED_ENDPOINTS: Dict[str, Tuple[str, ...]] = {
+    "zhihu": ("child_comments",),
+}
+
+
+def replay_entries(platform: str, root: str, entries: List[Dict], context: Dict) -> Tuple[List[StoreRecord], int]:
+    """
+    重放一批归档，在工作进程中执行
+
+    Args:
+        platform: 平台名称
+        root: 平台归档目录
+        entries: 索引条目
+        context: 跨阶段共享的数据（如知乎根评论所属内容）
+
+    Returns:
+        (规范化后的记录, 失败条数)
+    """
+    replayers = REPLAYERS[platform]
+    records: List[StoreRecord] = []
+    failed = 0
+    for entry in entries:
+        try:
+            source_keyword_var.set(entry["meta"].get("source_keyword", ""))
+            body = load_blob(Path(root), entry["sha256"])
+            records.extend(replayers[entry["endpoint"]](entry, body, context))
+        except Exception as e:
+            failed += 1
+            utils.logger.error(f"[reextract] 重放 {entry['endpoint']} {entry['entity_id']} 失败: {e}")
+    return records, failed
+
+
+def _get_store_factory(platform: str):
+    if platform == "xhs":
+        from src.storage.xhs import XhsStoreFactory
+        return XhsStoreFactory
+    if platform == "zhihu":
+        from src.storage.zhihu import ZhihuStoreFactory
+        return ZhihuStoreFactory
+    raise ValueError(f"Unsupported platform: {platform!r}")
+
+
+def _chunks(entries: List[Dict], size: int) -> List[List[Dict]]:
+    return [entries[i:i + size] for i in range(0, len(entries), size)]
+
+
+async def reextract(
+    platform: str,
+    root: Path = RAW_ARCHIVE_ROOT,
+    endpoints: Optional[Sequence[str]] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = 200,
+) -> Dict[str, int]:
+    """
+    重新提取平台归档并写入存储
+
+    Args:
+        platform: 平台名称
+        root: 归档根目录
+        endpoints: 只处理这些接口，为空时处理全部可重放接口
+        workers: 工作进程数，默认 RAW_ARCHIVE_REEXTRACT_WORKERS
+        chunk_size: 每批条目数
+
+    Returns:
+        Dict: 条目数、记录数、失败数
+    """
+    archive = RawArchive(platform, root)
+    replayable = [name for name in REPLAYERS[platform] if not endpoints or name in endpoints]
+    entries = list(archive.iter_entries(replayable))
+    archive.close()
+
+    deferred = DEFERRED_ENDPOINTS.get(platform, ())
+    phases = [
+        [entry for entry in entries if entry["endpoint"] not in deferred],
+        [entry for entry in entries if entry["endpoint"] in deferred],
+    ]
+    stats = {"entries": len(entries), "records": 0, "failed": 0}
+    context: Dict = {}
+    started = time.perf_counter()
+
+    crawler_type_var.set("reextract")
+    factory = _get_store_factory(platform)
+    store = await factory.open_store()
+    loop = asyncio.get_running_loop()
+    try:
+        with create_process_pool(workers or config.RAW_ARCHIVE_REEXTRACT_WORKERS) as executor:
+            for phase_entries in phases:
+                futures = [
+                    loop.run_in_executor(executor, replay_entries, platform, str(archive.root), chunk, context)
+                    for chunk in _chunks(phase_entries, chunk_size)
+                ]
+                comment_contents = {}
+                for future in asyncio.as_completed(futures):
+                    records, failed = await future
+                    stats["failed"] += failed
+                    for method, record in records:
+                        await getattr(store, method)(record)
+                        if method == "store_comment" and record.get("content_id"):
+                            comment_contents[str(record.get("comment_id"))] = (
+                                record.get("content_id"), record.get("content_type")
+                            )
+                    stats["records"] += len(records)
+                context["comment_contents"] = comment_contents
+    finally:
+        await factory.close_store()
+
+    utils.logger.info(
+        f"[reextract] {platform} 归档 {stats['entries']} 条，写入记录 {stats['records']} 条，"
+        f"失败 {stats['failed']} 条，耗时 {time.perf_counter() - started:.1f}s"
+    )
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线重新提取原始响应归档")
+    parser.add_argument("--platform", required=True, choices=sorted(REPLAYERS), help="平台")
+    parser.add_argument("--endpoint", action="append", help="只处理指定接口，可重复")
+    parser.add_argument("--root", type=Path, default=RAW_ARCHIVE_ROOT, help="归档根目录")
+    parser.add_argument("--workers", type=int, help="工作进程数")
+    parser.add_argument("--chunk-size", type=int, default=200, help="每批条目数")
+    parser.add_argument("--save-data-option", help="存储方式，默认 SAVE_DATA_OPTION，可用逗号分隔多个")
+    args = parser.parse_args()
+
+    if args.save_data_option:
+        config.SAVE_DATA_OPTION = args.save_data_option
+    asyncio.run(reextract(args.platform, args.root, args.endpoint, args.workers, args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+
+# -*- coding: utf-8 -*-
+# @Desc    : Asyncio redis cache, values are stored as JSON instead of pickle
+
+from typing import Any, Iterable, List, Optional
+
+from redis.asyncio import Redis
+
+from config import db_config
+from src.services.cache.abs_cache import AbstractCache
+from src.utils import codec
+
+# Keys per SCAN round trip / per MGET command
+SCAN_COUNT = 500
+MGET_BATCH_SIZE = 500
+
+
+class AsyncRedisCache(AbstractCache):
+    """
+    Redis cache for async code: every method is a coroutine and never blocks the event loop.
+    Values must be JSON serializable, entries that cannot be decoded (e.g. written by the pickle based RedisCache)
+    are treated as missing.
+    """
+
+    def __init__(self, client: Optional[Redis] = None) -> None:
+        """
+        :param client: redis.asyncio client, connects with db_config when omitted
+        """
+        self._redis_client = client if client is not None else self._connect_redis()
+
+    @staticmethod
+    def _connect_redis() -> Redis:
+        """
+        Create the redis.asyncio client, the connection is opened on first use
+        :return:
+        """
+        return Redis(
+            host=db_config.REDIS_DB_HOST,
+            port=db_config.REDIS_DB_PORT,
+            db=db_config.REDIS_DB_NUM,
+            password=db_config.REDIS_DB_PWD,
+        )
+
+    @staticmethod
+    def _loads(value: Optional[bytes]) -> Optional[Any]:
+        if value is None:
+            return None
+        try:
+            return codec.loads(value)
+        except ValueError:
+            return None
+
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        Get the value of a key from the cache and deserialize it
+        :param key:
+        :return:
+        """
+        return self._loads(await self._redis_client.get(key))
+
+    async def mget(self, keys: Iterable[str]) -> List[Optional[Any]]:
+        """
+        Get the values of several keys with MGET, in key order
+        :param keys:
+        :return: Values, None for missing keys
+        """
+        keys = list(keys)
+        values: List[Optional[Any]] = []
+        for start in range(0, len(keys), MGET_BATCH_SIZE):
+            values.extend(self._loads(value) for value in await self._redis_client.mget(keys[start:start + MGET_BATCH_SIZE]))
+        return values
+
+    async def set(self, key: str, value: Any, expire_time: int) -> None:
+        """
+        Set the value of a key in the cache and serialize it
+        :param key:
+        :param value:
+        :param expire_time:
+        :return:
+        """
+        await self._redis_client.set(key, codec.dumps_bytes(value), ex=expire_time)
+
+    async def keys(self, pattern: str) -> List[str]:
+        """
+        Get all keys matching the pattern, iterating with SCAN so redis is never blocked like with KEYS
+        """
+        return [
+            key.decode() if isinstance(key, bytes) else key
+            async for key in self._redis_client.scan_iter(match=pattern, count=SCAN_COUNT)
+        ]
+
+    async def close(self) -> None:
+        await self._redis_client.close()
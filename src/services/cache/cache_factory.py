@@ -22,5 +22,8 @@ class CacheFactory:
         elif cache_type == 'redis':
             from .redis_cache import RedisCache
             return RedisCache()
+        elif cache_type == 'redis_async':
+            from .async_redis_cache import AsyncRedisCache
+            return AsyncRedisCache(*args, **kwargs)
         else:
             raise ValueError(f'Unknown cache type: {cache_type}')
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+# @Desc    : Process pool for CPU-heavy parsing and event loop lag metrics
+from .executor import (ExtractionExecutor, LoopLagMonitor, close_extraction_executor, create_process_pool,
+                       get_extraction_executor, start_loop_lag_monitor, stop_loop_lag_monitor)
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+提取进程池
+
+大页面 HTML 解析、大搜索响应的 JSON 解析和正文提取都是纯 CPU 计算，在事件循环上执行会拖慢所有在途请求和签名：
+- 负载大小达到 EXTRACTION_OFFLOAD_MIN_BYTES 时提交到进程池，小负载仍在事件循环上直接执行，避免进程间传输的开销
+- 提交的函数和参数需要可 pickle（模块级函数或无状态提取器的绑定方法），返回值应远小于输入
+- EXTRACTION_POOL_WORKERS 为 0 时全部在事件循环上执行
+- 进程池在爬虫已启动线程（签名、SQLite 写入、to_thread 等）之后才按需创建，fork 会复制其他线程持有的锁，
+  因此工作进程用 forkserver（不支持时用 spawn）启动，并在启动时同步主进程运行时修改过的配置，见 create_process_pool
+- LoopLagMonitor 统计事件循环延迟，用于对比开启进程池前后的效果
+"""
+import asyncio
+import importlib
+import multiprocessing
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import config
+from src.utils import utils
+
+
+# 工作进程中会读取、且主进程运行时可能修改的模块：config 由命令行参数修改，知乎 URL 常量由基准测试指向模拟平台
+_SYNCED_MODULES = ("config", "src.utils.zhihu_const")
+
+
+def _module_settings(name: str) -> Dict[str, Any]:
+    return {key: value for key, value in vars(importlib.import_module(name)).items() if key.isupper()}
+
+
+def _apply_settings(settings: Dict[str, Dict[str, Any]]):
+    """工作进程初始化：写入主进程创建进程池时的配置"""
+    for name, values in settings.items():
+        module = importlib.import_module(name)
+        for key, value in values.items():
+            setattr(module, key, value)
+
+
+def create_process_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    创建不使用 fork 的进程池，提取、缩略图和离线重新提取共用
+
+    Args:
+        workers: 工作进程数
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    settings = {name: _module_settings(name) for name in _SYNCED_MODULES}
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(method),
+        initializer=_apply_settings,
+        initargs=(settings,),
+    )
+
+
+class ExtractionExecutor:
+    """按负载大小在事件循环和进程池之间分发提取任务"""
+
+    def __init__(self, workers: Optional[int] = None, min_bytes: Optional[int] = None):
+        """
+        Args:
+            workers: 工作进程数，默认 EXTRACTION_POOL_WORKERS，0 表示不使用进程池
+            min_bytes: 提交到进程池的最小负载大小，默认 EXTRACTION_OFFLOAD_MIN_BYTES
+        """
+        self.workers = config.EXTRACTION_POOL_WORKERS if workers is None else workers
+        self.min_bytes = config.EXTRACTION_OFFLOAD_MIN_BYTES if min_bytes is None else min_bytes
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+        # 统计信息
+        self.inline_calls = 0
+        self.offloaded_calls = 0
+        self.offloaded_bytes = 0
+        self.offloaded_seconds = 0.0
+
+    def should_offload(self, size: int) -> bool:
+        return self.workers > 0 and size >= self.min_bytes
+
+    async def run(self, size: int, func: Callable, *args) -> Any:
+        """
+        执行提取函数
+
+        Args:
+            size: 负载大小（字符数或字节数），决定是否提交到进程池
+            func: 提取函数
+            *args: 函数参数
+
+        Returns:
+            函数返回值
+        """
+        if not self.should_offload(size):
+            self.inline_calls += 1
+            return func(*args)
+
+        if self._executor is None:
+            self._executor = create_process_pool(self.workers)
+            utils.logger.info(
+                f"[ExtractionExecutor] 提取进程池已启动，进程数: {self.workers}，阈值: {self.min_bytes} 字节"
+            )
+        started = time.perf_counter()
+        result = await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        self.offloaded_calls += 1
+        self.offloaded_bytes += size
+        self.offloaded_seconds += time.perf_counter() - started
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "inline_calls": self.inline_calls,
+            "offloaded_calls": self.offloaded_calls,
+            "offloaded_bytes": self.offloaded_bytes,
+            "offloaded_seconds": round(self.offloaded_seconds, 3),
+        }
+
+    def close(self):
+        """关闭进程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            utils.logger.info(f"[ExtractionExecutor] 提取进程池已关闭，统计: {self.stats()}")
+
+
+class LoopLagMonitor:
+    """周期性休眠并记录实际唤醒时间的超出量，即事件循环被阻塞的时长"""
+
+    def __init__(self, interval: float = 0.05):
+        """
+        Args:
+            interval: 采样间隔（秒）
+        """
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+        self._expected = 0.0
+
+    def start(self) -> "LoopLagMonitor":
+        if self._task is None:
+            self._task = asyncio.create_task(self._sample())
+        return self
+
+    async def _sample(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - self._expected))
+
+    async def stop(self) -> Dict[str, float]:
+        """停止采样并返回统计（毫秒）"""
+        if self._task is not None:
+            # 阻塞一直持续到停止时，正在等待的这次采样也要计入
+            overdue = asyncio.get_running_loop().time() - self._expected
+            if self._expected and overdue > 0:
+                self.samples.append(overdue)
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        return self.summary()
+
+    def summary(self) -> Dict[str, float]:
+        if not self.samples:
+            return {"samples": 0, "mean_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        ordered = sorted(self.samples)
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        return {
+            "samples": len(ordered),
+            "mean_ms": round(statistics.fmean(ordered) * 1000, 2),
+            "p99_ms": round(p99 * 1000, 2),
+            "max_ms": round(ordered[-1] * 1000, 2),
+        }
+
+
+_extraction_executor: Optional[ExtractionExecutor] = None
+_loop_lag_monitor: Optional[LoopLagMonitor] = None
+
+
+def get_extraction_executor() -> ExtractionExecutor:
+    """进程内共享的提取执行器"""
+    global _extraction_executor
+    if _extraction_executor is None:
+        _extraction_executor = ExtractionExecutor()
+    return _extraction_executor
+
+
+def close_extraction_executor():
+    global _extraction_executor
+    if _extraction_executor is not None:
+        _extraction_executor.close()
+        _extraction_executor = None
+
+
+def start_loop_lag_monitor() -> Optional[LoopLagMonitor]:
+    """ENABLE_LOOP_LAG_MONITOR 开启时启动事件循环延迟监控"""
+    global _loop_lag_monitor
+    if config.ENABLE_LOOP_LAG_MONITOR and _loop_lag_monitor is None:
+        _loop_lag_monitor = LoopLagMonitor(config.LOOP_LAG_MONITOR_INTERVAL_MS / 1000).start()
+    return _loop_lag_monitor
+
+
+async def stop_loop_lag_monitor():
+    global _loop_lag_monitor
+    if _loop_lag_monitor is not None:
+        summary = await _loop_lag_monitor.stop()
+        _loop_lag_monitor = None
+        utils.logger.info(f"[LoopLagMonitor] 事件循环延迟: {summary}")
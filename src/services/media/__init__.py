@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+# @Desc    : Media download and processing entry point
+from .cas_store import ContentAddressedStore
+from .downloader import MediaDownloader, MediaTask
+from .thumbnails import ThumbnailProcessor, make_thumbnail_bytes
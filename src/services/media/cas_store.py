@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+内容寻址媒体存储模块
+
+媒体文件按内容 SHA-256 存放在分片目录中（objects/ab/cd/<sha256>.<ext>），相同内容只保存一份：
+- 帖子目录下的文件是指向对象的硬链接，文件系统不支持硬链接时改为写入 manifest.json
+- URL -> 哈希索引记录已下载的 URL 及其大小、ETag，重复运行时直接复用，不再下载
+- 未知 URL 可先比较 HEAD 返回的大小和 ETag，与已有对象一致时同样跳过下载
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.utils import codec, utils
+
+MEDIA_STORE_ROOT = Path("data") / "media"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(path: Path) -> str:
+    """分块计算文件 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ContentAddressedStore:
+    """按内容哈希存储媒体文件，并维护 URL -> 哈希索引"""
+
+    def __init__(self, root: Path = MEDIA_STORE_ROOT):
+        """
+        Args:
+            root: 存储根目录，对象位于 root/objects，索引位于 root/index.sqlite
+        """
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.root / "index.sqlite", check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS media_url ("
+            "url TEXT PRIMARY KEY, sha256 TEXT NOT NULL, size INTEGER, etag TEXT, ext TEXT, updated_ts INTEGER)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_media_url_etag ON media_url (etag, size)")
+        self._conn.commit()
+
+    def object_path(self, sha256: str, ext: str = "") -> Path:
+        """对象路径：objects/<前2位>/<3-4位>/<sha256><ext>"""
+        return self.objects_dir / sha256[:2] / sha256[2:4] / f"{sha256}{ext}"
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        """
+        查询 URL 对应的已存储对象
+
+        Returns:
+            Dict: sha256/size/etag/path，对象文件不存在时返回 None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sha256, size, etag, ext FROM media_url WHERE url = ?", (url,)
+            ).fetchone()
+        return self._to_entry(row)
+
+    def lookup_by_etag(self, etag: str, size: Optional[int]) -> Optional[Dict]:
+        """按 ETag 和大小查询已存储对象（同一内容可能有多个不同的 URL）"""
+        if not etag:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sha256, size, etag, ext FROM media_url WHERE etag = ? AND (size = ? OR ? IS NULL) LIMIT 1",
+                (etag, size, size),
+            ).fetchone()
+        return self._to_entry(row)
+
+    def _to_entry(self, row) -> Optional[Dict]:
+        if row is None:
+            return None
+        sha256, size, etag, ext = row
+        path = self.object_path(sha256, ext or "")
+        if not path.exists():
+            return None
+        return {"sha256": sha256, "size": size, "etag": etag, "path": path}
+
+    def record(self, url: str, sha256: str, size: int, etag: Optional[str], ext: str):
+        """记录 URL -> 哈希"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO media_url (url, sha256, size, etag, ext, updated_ts) VALUES (?, ?, ?, ?, ?, ?)",
+                (url, sha256, size, etag, ext, int(time.time())),
+            )
+            self._conn.commit()
+
+    def ingest(self, file_path: Path, url: str, etag: Optional[str] = None) -> Path:
+        """
+        将下载完成的文件移入对象存储，内容已存在时丢弃该文件
+
+        Args:
+            file_path: 下载完成的临时文件
+            url: 来源 URL
+            etag: 响应 ETag
+
+        Returns:
+            Path: 对象路径
+        """
+        sha256 = file_sha256(file_path)
+        ext = "".join(Path(file_path.name.removesuffix(".part")).suffixes)
+        size = file_path.stat().st_size
+        object_path = self.object_path(sha256, ext)
+        if object_path.exists():
+            file_path.unlink()
+        else:
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(file_path, object_path)
+        self.record(url, sha256, size, etag, ext)
+        return object_path
+
+    def link(self, object_path: Path, target: Path):
+        """
+        在帖子目录下创建指向对象的硬链接，不支持硬链接时写入 manifest.json
+
+        Args:
+            object_path: 对象路径
+            target: 帖子目录下的文件路径
+        """
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if target.exists():
+            return
+        try:
+            os.link(object_path, target)
+        except OSError as e:
+            utils.logger.debug(f"[ContentAddressedStore.link] 无法创建硬链接 {target}: {e}，改为写入 manifest")
+            self._write_manifest(target, object_path)
+
+    def _write_manifest(self, target: Path, object_path: Path):
+        manifest_path = target.parent / "manifest.json"
+        with self._lock:
+            manifest = {}
+            if manifest_path.exists():
+                try:
+                    manifest = codec.loads(manifest_path.read_bytes())
+                except codec.JSONDecodeError:
+                    manifest = {}
+            manifest[target.name] = os.path.relpath(object_path, target.parent)
+            manifest_path.write_text(codec.dumps(manifest, indent=True), encoding="utf-8")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
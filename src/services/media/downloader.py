@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+"""
+媒体下载模块
+
+独立于帖子爬取的有界异步下载池：
+- 响应通过 aiter_bytes 流式写入临时文件，完成后原子重命名，大视频不会整体驻留内存
+- 临时文件保留已下载部分，重试时通过 HTTP Range + If-Range 断点续传，远端文件变化时从头下载
+- 按 CDN 域名限速，并定期输出下载速度（bytes/s）
+- 可选内容寻址存储（ContentAddressedStore），已下载过的 URL/内容不再重复下载
+"""
+import asyncio
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+import aiofiles
+import httpx
+
+import config
+from src.utils import utils
+
+from .cas_store import ContentAddressedStore
+
+CHUNK_SIZE = 64 * 1024
+
+_CONTENT_RANGE_RE = re.compile(r"bytes (?:(\d+)-\d+|\*)/(\d+|\*)")
+
+
+class _RestartDownload(Exception):
+    """已下载部分不能续传（远端文件已变化或服务端返回的范围不对），丢弃临时文件后从头下载"""
+
+
+@dataclass
+class MediaTask:
+    """单个媒体下载任务"""
+
+    url: str
+    path: Path  # 最终保存路径
+    note_id: str = ""
+    kind: str = "image"  # image / video
+    headers: Dict[str, str] = field(default_factory=dict)
+    # 下载完成后的回调，供后续处理阶段（如缩略图）使用
+    on_complete: Optional[Callable[["MediaTask", Path], Awaitable[None]]] = None
+
+
+class HostRateLimiter:
+    """按域名限速，同一域名两次请求之间至少间隔 1 / rate 秒"""
+
+    def __init__(self, rate_limits: Dict[str, float], default_rate: float):
+        """
+        Args:
+            rate_limits: 域名后缀 -> 每秒请求数
+            default_rate: 未匹配域名的每秒请求数，<= 0 表示不限速
+        """
+        self.rate_limits = rate_limits
+        self.default_rate = default_rate
+        self._next_allowed: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    def _rate_for(self, host: str) -> tuple:
+        for suffix, rate in self.rate_limits.items():
+            if host == suffix or host.endswith("." + suffix):
+                return suffix, rate
+        return host, self.default_rate
+
+    async def acquire(self, url: str):
+        key, rate = self._rate_for(urlparse(url).hostname or "")
+        if rate <= 0:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_allowed.get(key, 0.0))
+            self._next_allowed[key] = start_at + 1 / rate
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
+
+
+class MediaDownloader:
+    """有界异步媒体下载池"""
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        proxy: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 60,
+        retries: Optional[int] = None,
+        store: Optional[ContentAddressedStore] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        初始化下载池
+
+        Args:
+            concurrency: 并发下载数，默认 MEDIA_DOWNLOAD_CONCURRENCY
+            queue_size: 待下载队列长度，默认 MEDIA_DOWNLOAD_QUEUE_SIZE
+            proxy: httpx 代理地址
+            headers: 公共请求头
+            timeout: 单次请求超时（秒）
+            retries: 失败重试次数，默认 MEDIA_DOWNLOAD_RETRIES
+            store: 内容寻址存储，为空时直接保存到任务路径
+            transport: httpx 传输层，为空时直接访问网络（测试时传入 MockTransport）
+        """
+        self.concurrency = concurrency or config.MEDIA_DOWNLOAD_CONCURRENCY
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size or config.MEDIA_DOWNLOAD_QUEUE_SIZE)
+        self.proxy = proxy
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.retries = config.MEDIA_DOWNLOAD_RETRIES if retries is None else retries
+        self.store = store
+        self.transport = transport
+        self.rate_limiter = HostRateLimiter(config.MEDIA_DOWNLOAD_RATE_LIMITS, config.MEDIA_DOWNLOAD_DEFAULT_RATE)
+
+        self.client: Optional[httpx.AsyncClient] = None
+        self._workers: List[asyncio.Task] = []
+        self._reporter: Optional[asyncio.Task] = None
+        self._started_at = 0.0
+
+        # 统计信息
+        self.bytes_downloaded = 0
+        self.files_downloaded = 0
+        self.files_skipped = 0
+        self.files_deduplicated = 0
+        self.files_failed = 0
+
+    async def start(self):
+        """启动下载池"""
+        if self.client is not None:
+            return
+        self.client = httpx.AsyncClient(
+            proxy=self.proxy,
+            headers=self.headers,
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=self.concurrency * 2),
+            transport=self.transport,
+        )
+        self._started_at = time.monotonic()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"media-downloader-{i}")
+            for i in range(self.concurrency)
+        ]
+        self._reporter = asyncio.create_task(self._report_loop(), name="media-downloader-report")
+        utils.logger.info(f"[MediaDownloader.start] 媒体下载池已启动，并发数: {self.concurrency}")
+
+    async def submit(self, task: MediaTask):
+        """
+        提交下载任务，仅在队列满时等待
+
+        Args:
+            task: 下载任务
+        """
+        if self.client is None:
+            await self.start()
+        await self.queue.put(task)
+
+    async def join(self):
+        """等待已提交的任务全部完成"""
+        await self.queue.join()
+
+    async def close(self):
+        """等待剩余任务完成并关闭下载池"""
+        if self.client is None:
+            return
+        await self.join()
+        for task in [*self._workers, self._reporter]:
+            task.cancel()
+        await asyncio.gather(*self._workers, self._reporter, return_exceptions=True)
+        self._workers, self._reporter = [], None
+        await self.client.aclose()
+        self.client = None
+        if self.store is not None:
+            await asyncio.to_thread(self.store.close)
+        utils.logger.info(f"[MediaDownloader.close] 媒体下载池已关闭，{self._format_stats()}")
+
+    def stats(self) -> Dict[str, float]:
+        """下载统计：文件数、字节数、平均速度"""
+        elapsed = max(time.monotonic() - self._started_at, 1e-6) if self._started_at else 0
+        return {
+            "files_downloaded": self.files_downloaded,
+            "files_skipped": self.files_skipped,
+            "files_deduplicated": self.files_deduplicated,
+            "files_failed": self.files_failed,
+            "bytes_downloaded": self.bytes_downloaded,
+            "bytes_per_second": self.bytes_downloaded / elapsed if elapsed else 0,
+            "pending": self.queue.qsize(),
+        }
+
+    def _format_stats(self) -> str:
+        stats = self.stats()
+        return (
+            f"成功 {stats['files_downloaded']} 个，跳过 {stats['files_skipped']} 个，"
+            f"去重 {stats['files_deduplicated']} 个，失败 {stats['files_failed']} 个，"
+            f"共 {stats['bytes_downloaded'] / 1024 / 1024:.2f} MB，平均 {stats['bytes_per_second'] / 1024:.1f} KB/s，"
+            f"排队 {stats['pending']} 个"
+        )
+
+    async def _report_loop(self):
+        last_bytes, last_time = 0, time.monotonic()
+        while True:
+            await asyncio.sleep(config.MEDIA_DOWNLOAD_REPORT_INTERVAL)
+            now = time.monotonic()
+            speed = (self.bytes_downloaded - last_bytes) / max(now - last_time, 1e-6)
+            last_bytes, last_time = self.bytes_downloaded, now
+            utils.logger.info(f"[MediaDownloader] 当前速度 {speed / 1024:.1f} KB/s，{self._format_stats()}")
+
+    async def _worker(self):
+        while True:
+            task = await self.queue.get()
+            try:
+                await self._process(task)
+            except Exception as e:
+                self.files_failed += 1
+                utils.logger.error(f"[MediaDownloader] 处理 {task.url} 出错: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def _process(self, task: MediaTask):
+        if task.path.exists():
+            self.files_skipped += 1
+            return
+        if self.store is not None and await self._reuse_stored(task):
+            self.files_deduplicated += 1
+        else:
+            etag = await self._download(task)
+            if etag is False:
+                self.files_failed += 1
+                return
+            if self.store is not None:
+                object_path = await asyncio.to_thread(self.store.ingest, task.path, task.url, etag)
+                await asyncio.to_thread(self.store.link, object_path, task.path)
+            self.files_downloaded += 1
+        if task.on_complete is not None:
+            await task.on_complete(task, task.path)
+
+    async def _reuse_stored(self, task: MediaTask) -> bool:
+        """
+        已下载过的 URL 直接链接到已有对象；未知 URL 先用 HEAD 的大小和 ETag 匹配已有对象
+        索引查询和链接都是阻塞的 sqlite / 文件操作，放到线程中执行，不阻塞事件循环
+
+        Returns:
+            bool: 是否复用了已有对象
+        """
+        entry = await asyncio.to_thread(self.store.lookup, task.url)
+        if entry is None and config.MEDIA_STORE_HEAD_CHECK:
+            size, etag = await self._head(task)
+            entry = await asyncio.to_thread(self.store.lookup_by_etag, etag, size)
+            if entry is not None:
+                await asyncio.to_thread(
+                    self.store.record, task.url, entry["sha256"], entry["size"], entry["etag"],
+                    "".join(entry["path"].suffixes),
+                )
+        if entry is None:
+            return False
+        await asyncio.to_thread(self.store.link, entry["path"], task.path)
+        return True
+
+    async def _head(self, task: MediaTask) -> tuple:
+        """HEAD 请求获取 (Content-Length, ETag)，失败时返回 (None, None)"""
+        await self.rate_limiter.acquire(task.url)
+        try:
+            response = await self.client.head(task.url, headers=task.headers)
+            response.raise_for_status()
+        except httpx.HTTPError:
+            return None, None
+        size = response.headers.get("Content-Length")
+        return (int(size) if size and size.isdigit() else None), response.headers.get("ETag")
+
+    async def _download(self, task: MediaTask):
+        """
+        下载到临时文件并原子重命名，失败时保留临时文件，重试时从已下载位置续传
+
+        续传请求带 If-Range（首次响应的强 ETag 或 Last-Modified，保存在 .part.validator 中），远端文件变化或服务端
+        不支持 Range 时返回 200 全量内容，此时截断临时文件从头写；没有可用的校验值时不续传
+
+        Returns:
+            下载成功时返回响应的 ETag（可能为 None），失败时返回 False
+        """
+        task.path.parent.mkdir(parents=True, exist_ok=True)
+        part_path = task.path.with_name(task.path.name + ".part")
+        validator_path = task.path.with_name(task.path.name + ".part.validator")
+        etag = None
+
+        for attempt in range(self.retries + 1):
+            offset = part_path.stat().st_size if part_path.exists() else 0
+            validator = validator_path.read_text(encoding="utf-8") if validator_path.exists() else ""
+            headers = dict(task.headers)
+            if offset and validator:
+                headers["Range"] = f"bytes={offset}-"
+                headers["If-Range"] = validator
+            await self.rate_limiter.acquire(task.url)
+            try:
+                async with self.client.stream("GET", task.url, headers=headers) as response:
+                    if response.status_code == 416 and "Range" in headers:
+                        # 临时文件已包含完整内容时服务端返回 416，总大小不一致说明远端文件已变化
+                        if self._content_range(response)[1] != offset:
+                            raise _RestartDownload(f"416, Content-Range {response.headers.get('Content-Range')}")
+                        etag = response.headers.get("ETag")
+                        break
+                    response.raise_for_status()
+                    etag = response.headers.get("ETag")
+                    if response.status_code == 206:
+                        if "Range" not in headers or self._content_range(response)[0] != offset:
+                            raise _RestartDownload(f"206, Content-Range {response.headers.get('Content-Range')}")
+                        mode = "ab"
+                    else:
+                        # 200 全量内容（首次下载、服务端忽略 Range 或 If-Range 不匹配），从头写
+                        mode = "wb"
+                        self._save_validator(validator_path, response)
+                    async with aiofiles.open(part_path, mode) as f:
+                        async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                            await f.write(chunk)
+                            self.bytes_downloaded += len(chunk)
+                break
+            except _RestartDownload as e:
+                utils.logger.warning(f"[MediaDownloader._download] {task.url} 无法续传（{e}），从头下载")
+                part_path.unlink(missing_ok=True)
+                validator_path.unlink(missing_ok=True)
+            except httpx.HTTPStatusError as e:
+                utils.logger.error(f"[MediaDownloader._download] {task.url} 状态码 {e.response.status_code}")
+                if e.response.status_code < 500 and e.response.status_code != 429:
+                    part_path.unlink(missing_ok=True)
+                    validator_path.unlink(missing_ok=True)
+                    return False
+            except httpx.HTTPError as e:
+                utils.logger.warning(
+                    f"[MediaDownloader._download] {task.url} 第 {attempt + 1} 次下载中断: {e.__class__.__name__} {e}"
+                )
+            await asyncio.sleep(self._backoff(attempt))
+        else:
+            utils.logger.error(f"[MediaDownloader._download] {task.url} 重试 {self.retries} 次后仍失败")
+            return False
+
+        os.replace(part_path, task.path)
+        validator_path.unlink(missing_ok=True)
+        utils.logger.info(f"[MediaDownloader._download] 保存 {task.kind} {task.path} 成功")
+        return etag
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        """第 attempt 次失败后的重试等待（秒）"""
+        return min(2 ** attempt, 10)
+
+    @staticmethod
+    def _content_range(response: httpx.Response) -> tuple:
+        """解析 Content-Range，返回 (起始位置, 总大小)，缺失的部分为 None"""
+        match = _CONTENT_RANGE_RE.fullmatch(response.headers.get("Content-Range", "").strip())
+        if match is None:
+            return None, None
+        start, total = match.groups()
+        return (int(start) if start else None), (int(total) if total and total != "*" else None)
+
+    @staticmethod
+    def _save_validator(validator_path: Path, response: httpx.Response):
+        """保存 If-Range 校验值：弱 ETag 不能用于 If-Range，改用 Last-Modified；都没有时不续传"""
+        etag = response.headers.get("ETag", "")
+        validator = etag if etag and not etag.startswith("W/") else response.headers.get("Last-Modified", "")
+        if validator:
+            validator_path.write_text(validator, encoding="utf-8")
+        else:
+            validator_path.unlink(missing_ok=True)
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+媒体后处理模块
+
+在进程池中完成 Pillow 解码、缩放和 WEBP/AVIF 编码，不占用事件循环：
+- 由媒体下载池的 MediaTask.on_complete 回调驱动，图片下载完成后在原图旁生成缩略图
+- JPEG 使用 draft 模式按目标尺寸缩小解码，避免完整解码大图
+- 输出 <原文件名>.thumb.<格式>，已存在时跳过，重复运行只处理新图片
+- 统计处理数量、输入/输出字节数和吞吐量（张/秒）
+"""
+import asyncio
+import io
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+from PIL import Image
+
+import config
+from src.services.extraction import create_process_pool
+from src.utils import utils
+
+try:
+    import pillow_avif  # noqa: F401  注册 AVIF 编解码插件
+    AVIF_AVAILABLE = True
+except ImportError:
+    AVIF_AVAILABLE = "AVIF" in Image.SAVE
+
+FORMAT_EXTENSIONS = {"WEBP": ".webp", "AVIF": ".avif", "JPEG": ".jpg"}
+
+
+def resolve_format(fmt: str) -> str:
+    """规范化输出格式，AVIF 不可用时回退为 WEBP"""
+    fmt = fmt.upper()
+    if fmt not in FORMAT_EXTENSIONS:
+        raise ValueError(f"不支持的缩略图格式: {fmt}")
+    if fmt == "AVIF" and not AVIF_AVAILABLE:
+        utils.logger.warning("[thumbnails] 未安装 pillow-avif-plugin，缩略图格式回退为 WEBP")
+        return "WEBP"
+    return fmt
+
+
+def thumbnail_path(original: Path, fmt: str) -> Path:
+    """缩略图路径：与原图同目录的 <原文件名>.thumb.<格式>"""
+    return original.with_name(f"{original.stem}.thumb{FORMAT_EXTENSIONS[fmt]}")
+
+
+def _encode_thumbnail(image: "Image.Image", max_size: int, fmt: str, quality: int) -> Tuple[bytes, int, int]:
+    # JPEG 可直接以缩小的尺寸解码
+    image.draft("RGB", (max_size, max_size))
+    image.thumbnail((max_size, max_size))
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+    if fmt == "JPEG" and image.mode == "RGBA":
+        image = image.convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, quality=quality)
+    return buffer.getvalue(), image.width, image.height
+
+
+def make_thumbnail(src: str, dst: str, max_size: int, fmt: str, quality: int) -> Tuple[int, int, int]:
+    """
+    生成缩略图文件，在工作进程中执行
+
+    Args:
+        src: 原图路径
+        dst: 缩略图路径
+        max_size: 最长边像素
+        fmt: 输出格式 WEBP/AVIF/JPEG
+        quality: 编码质量
+
+    Returns:
+        Tuple[int, int, int]: (原图字节数, 缩略图字节数, 缩略图最长边)
+    """
+    with Image.open(src) as image:
+        data, width, height = _encode_thumbnail(image, max_size, fmt, quality)
+    tmp_path = Path(dst + ".tmp")
+    tmp_path.write_bytes(data)
+    tmp_path.replace(dst)
+    return Path(src).stat().st_size, len(data), max(width, height)
+
+
+def make_thumbnail_bytes(data: bytes, max_size: int, fmt: str = "WEBP", quality: int = 80) -> bytes:
+    """
+    从内存中的图片生成缩略图
+
+    Args:
+        data: 原图内容
+        max_size: 最长边像素
+        fmt: 输出格式
+        quality: 编码质量
+
+    Returns:
+        bytes: 缩略图内容
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        return _encode_thumbnail(image, max_size, resolve_format(fmt), quality)[0]
+
+
+class ThumbnailProcessor:
+    """基于进程池的缩略图生成阶段"""
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        fmt: Optional[str] = None,
+        quality: Optional[int] = None,
+        workers: Optional[int] = None,
+    ):
+        """
+        Args:
+            max_size: 缩略图最长边像素，默认 MEDIA_THUMBNAIL_MAX_SIZE
+            fmt: 输出格式，默认 MEDIA_THUMBNAIL_FORMAT
+            quality: 编码质量，默认 MEDIA_THUMBNAIL_QUALITY
+            workers: 工作进程数，默认 MEDIA_THUMBNAIL_WORKERS
+        """
+        self.max_size = max_size or config.MEDIA_THUMBNAIL_MAX_SIZE
+        self.fmt = resolve_format(fmt or config.MEDIA_THUMBNAIL_FORMAT)
+        self.quality = quality or config.MEDIA_THUMBNAIL_QUALITY
+        self.workers = workers or config.MEDIA_THUMBNAIL_WORKERS
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # 限制同时在途的任务数，进程池满时下载回调会等待
+        self._slots = asyncio.Semaphore(self.workers * 2)
+        self._pending: Set[asyncio.Task] = set()
+        self._started_at = 0.0
+
+        # 统计信息
+        self.images_processed = 0
+        self.images_skipped = 0
+        self.images_failed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def start(self):
+        """启动进程池"""
+        if self._executor is None:
+            self._executor = create_process_pool(self.workers)
+            self._started_at = time.monotonic()
+            utils.logger.info(
+                f"[ThumbnailProcessor.start] 缩略图进程池已启动，进程数: {self.workers}，格式: {self.fmt}，最长边: {self.max_size}"
+            )
+
+    async def on_media_complete(self, task, path: Path):
+        """MediaTask.on_complete 回调，只处理图片，生成任务在后台执行"""
+        if task.kind != "image":
+            return
+        await self.submit(path)
+
+    async def submit(self, path: Path):
+        """
+        提交一张图片，仅在在途任务已满时等待
+
+        Args:
+            path: 原图路径
+        """
+        self.start()
+        await self._slots.acquire()
+        job = asyncio.create_task(self._run(Path(path)))
+        self._pending.add(job)
+        job.add_done_callback(self._pending.discard)
+
+    async def _run(self, path: Path):
+        try:
+            dst = thumbnail_path(path, self.fmt)
+            if dst.exists():
+                self.images_skipped += 1
+                return
+            loop = asyncio.get_running_loop()
+            size_in, size_out, _ = await loop.run_in_executor(
+                self._executor, make_thumbnail, str(path), str(dst), self.max_size, self.fmt, self.quality
+            )
+            self.images_processed += 1
+            self.bytes_in += size_in
+            self.bytes_out += size_out
+        except Exception as e:
+            self.images_failed += 1
+            utils.logger.error(f"[ThumbnailProcessor] 生成 {path} 缩略图失败: {e}")
+        finally:
+            self._slots.release()
+
+    def stats(self) -> Dict[str, float]:
+        """处理统计：数量、字节数、吞吐量"""
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0
+        return {
+            "images_processed": self.images_processed,
+            "images_skipped": self.images_skipped,
+            "images_failed": self.images_failed,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "images_per_second": self.images_processed / elapsed if elapsed else 0,
+            "pending": len(self._pending),
+        }
+
+    async def close(self):
+        """等待在途任务完成并关闭进程池"""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        stats = self.stats()
+        utils.logger.info(
+            f"[ThumbnailProcessor.close] 缩略图进程池已关闭，生成 {stats['images_processed']} 张，"
+            f"跳过 {stats['images_skipped']} 张，失败 {stats['images_failed']} 张，"
+            f"{stats['bytes_in'] / 1024 / 1024:.2f} MB -> {stats['bytes_out'] / 1024 / 1024:.2f} MB，"
+            f"{stats['images_per_second']:.1f} 张/秒"
+        )
@@ -2,3 +2,4 @@
 # -*- coding: utf-8 -*-
 # @Desc    : IP proxy pool entry point
 from .base_proxy import *
+from .proxy_balancer import ProxyBalancer, ProxyEndpoint, create_proxy_balancer
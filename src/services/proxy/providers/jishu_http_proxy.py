@@ -7,7 +7,7 @@ import httpx
 
 from src.services.proxy import IpCache, IpGetError, ProxyProvider
 from src.services.proxy.types import IpInfoModel
-from src.utils import utils
+from src.utils import codec, utils
 
 
 class JiSuHttpProxy(ProxyProvider):
@@ -38,7 +38,7 @@ class JiSuHttpProxy(ProxyProvider):
         """
 
         # Prioritize getting IP from cache
-        ip_cache_list = self.ip_cache.load_all_ip(proxy_brand_name=self.proxy_brand_name)
+        ip_cache_list = await self.ip_cache.load_all_ip(proxy_brand_name=self.proxy_brand_name)
         if len(ip_cache_list) >= num:
             return ip_cache_list[:num]
 
@@ -52,7 +52,7 @@ class JiSuHttpProxy(ProxyProvider):
             response = await client.get(url, headers={
                 "User-Agent": "LittleCrawler https://github.com/NanmiCoder/LittleCrawler",
             })
-            res_dict: Dict = response.json()
+            res_dict: Dict = codec.loads(response.content)
             if res_dict.get("code") == 0:
                 data: List[Dict] = res_dict.get("data")
                 current_ts = utils.get_unix_timestamp()
@@ -67,7 +67,7 @@ class JiSuHttpProxy(ProxyProvider):
                     ip_key = f"JISUHTTP_{ip_info_model.ip}_{ip_info_model.port}_{ip_info_model.user}_{ip_info_model.password}"
                     ip_value = ip_info_model.json()
                     ip_infos.append(ip_info_model)
-                    self.ip_cache.set_ip(ip_key, ip_value, ex=ip_info_model.expired_time_ts - current_ts)
+                    await self.ip_cache.set_ip(ip_key, ip_value, ex=ip_info_model.expired_time_ts - current_ts)
             else:
                 raise IpGetError(res_dict.get("msg", "unkown err"))
         return ip_cache_list + ip_infos
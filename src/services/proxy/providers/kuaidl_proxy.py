@@ -9,7 +9,7 @@ from pydantic import BaseModel, Field
 
 from src.services.proxy import IpCache, IpInfoModel, ProxyProvider
 from src.services.proxy.types import ProviderNameEnum
-from src.utils import utils
+from src.utils import codec, utils
 
 # KuaiDaili IP proxy expiration time is moved forward by 5 seconds to avoid critical time usage failure
 DELTA_EXPIRED_SECOND = 5
@@ -82,7 +82,7 @@ class KuaiDaiLiProxy(ProxyProvider):
         uri = "/api/getdps/"
 
         # Prioritize getting IP from cache
-        ip_cache_list = self.ip_cache.load_all_ip(proxy_brand_name=self.proxy_brand_name)
+        ip_cache_list = await self.ip_cache.load_all_ip(proxy_brand_name=self.proxy_brand_name)
         if len(ip_cache_list) >= num:
             return ip_cache_list[:num]
 
@@ -98,7 +98,7 @@ class KuaiDaiLiProxy(ProxyProvider):
                 utils.logger.error(f"[KuaiDaiLiProxy.get_proxies] statuc code not 200 and response.txt:{response.text}, status code: {response.status_code}")
                 raise Exception("get ip error from proxy provider and status code not 200 ...")
 
-            ip_response: Dict = response.json()
+            ip_response: Dict = codec.loads(response.content)
             if ip_response.get("code") != 0:
                 utils.logger.error(f"[KuaiDaiLiProxy.get_proxies]  code not 0 and msg:{ip_response.get('msg')}")
                 raise Exception("get ip error from proxy provider and  code not 0 ...")
@@ -118,7 +118,7 @@ class KuaiDaiLiProxy(ProxyProvider):
                 )
                 ip_key = f"{self.proxy_brand_name}_{ip_info_model.ip}_{ip_info_model.port}"
                 # Cache expiration time uses relative time (seconds), also needs to subtract buffer time
-                self.ip_cache.set_ip(ip_key, ip_info_model.model_dump_json(), ex=proxy_model.expire_ts - DELTA_EXPIRED_SECOND)
+                await self.ip_cache.set_ip(ip_key, ip_info_model.model_dump_json(), ex=proxy_model.expire_ts - DELTA_EXPIRED_SECOND)
                 ip_infos.append(ip_info_model)
 
         return ip_cache_list + ip_infos
@@ -8,7 +8,7 @@ import httpx
 
 from src.services.proxy import IpCache, IpGetError, ProxyProvider
 from src.services.proxy.types import IpInfoModel
-from src.utils import utils
+from src.utils import codec, utils
 
 
 class WanDouHttpProxy(ProxyProvider):
@@ -34,7 +34,7 @@ class WanDouHttpProxy(ProxyProvider):
         """
 
         # Prioritize getting IP from cache
-        ip_cache_list = self.ip_cache.load_all_ip(
+        ip_cache_list = await self.ip_cache.load_all_ip(
             proxy_brand_name=self.proxy_brand_name
         )
         if len(ip_cache_list) >= num:
@@ -53,7 +53,7 @@ class WanDouHttpProxy(ProxyProvider):
                     "User-Agent": "LittleCrawler https://github.com/NanmiCoder/LittleCrawler",
                 },
             )
-            res_dict: Dict = response.json()
+            res_dict: Dict = codec.loads(response.content)
             if res_dict.get("code") == 200:
                 data: List[Dict] = res_dict.get("data", [])
                 current_ts = utils.get_unix_timestamp()
@@ -70,7 +70,7 @@ class WanDouHttpProxy(ProxyProvider):
                     ip_key = f"WANDOUHTTP_{ip_info_model.ip}_{ip_info_model.port}"
                     ip_value = ip_info_model.model_dump_json()
                     ip_infos.append(ip_info_model)
-                    self.ip_cache.set_ip(
+                    await self.ip_cache.set_ip(
                         ip_key, ip_value, ex=ip_info_model.expired_time_ts - current_ts
                     )
             else:
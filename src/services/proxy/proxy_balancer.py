@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""
+多代理负载均衡模块
+
+同时绑定代理池中的多个代理 IP，每个代理一个长连接 httpx 客户端：
+- 请求按 健康分 / (EWMA 延迟 * (占用中请求数 + 1)) 加权随机分配，慢代理和失败代理分到的请求更少
+- 代理连续失败达到 PROXY_MAX_FAILURES 次后被隔离，并从代理池换入新代理；池中无代理时隔离到期后再试用
+- 剩余有效期不足 PROXY_ROTATE_AHEAD_SEC 的代理在使用前替换
+- 健康分和 EWMA 延迟按 ip:port 保存到 PROXY_SCORE_FILE，下次运行绑定到同一代理时沿用
+"""
+import asyncio
+import random
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import httpx
+
+import config
+from src.services.transport import create_async_client
+from src.utils import codec, utils
+
+from .types import IpInfoModel
+
+if TYPE_CHECKING:
+    from src.services.proxy.proxy_ip_pool import ProxyIpPool
+
+# 代理本身出错的响应状态码（代理认证失败 / 代理网关错误）
+PROXY_ERROR_STATUS = {407, 502, 503, 504}
+
+# 代理池取不到新代理后，多久再尝试替换（秒）
+_REPLACE_RETRY_SEC = 10
+
+
+class ProxyEndpoint:
+    """一个绑定中的代理：长连接客户端、健康分和 EWMA 延迟"""
+
+    def __init__(self, proxy: IpInfoModel, client: httpx.AsyncClient, score: float = 1.0, latency: float = 0.0):
+        """
+        Args:
+            proxy: 代理 IP 信息
+            client: 通过该代理发送请求的客户端
+            score: 健康分（0 ~ 1），成功请求向 1 靠拢，失败请求向 0 衰减
+            latency: EWMA 延迟（秒），0 表示还没有测量
+        """
+        self.proxy = proxy
+        self.client = client
+        self.score = score
+        self.latency = latency
+
+        self.in_flight = 0
+        self.failures = 0  # 连续失败次数
+        self.quarantined_until = 0.0
+        self.requests = 0
+        self.retired = False  # 已被替换，占用中的请求结束后关闭客户端
+
+    @property
+    def key(self) -> str:
+        return f"{self.proxy.ip}:{self.proxy.port}"
+
+    def weight(self, default_latency: float) -> float:
+        latency = self.latency or default_latency
+        return max(self.score, 0.01) / (max(latency, 0.001) * (self.in_flight + 1))
+
+    def __repr__(self) -> str:
+        return (
+            f"ProxyEndpoint({self.key}, score={self.score:.2f}, latency={self.latency * 1000:.0f}ms, "
+            f"requests={self.requests})"
+        )
+
+
+class ProxyBalancer:
+    """多代理并发使用，按健康分和 EWMA 延迟分配请求"""
+
+    def __init__(
+        self,
+        ip_pool: "ProxyIpPool",
+        size: Optional[int] = None,
+        score_file: Optional[str] = None,
+        alpha: Optional[float] = None,
+        max_failures: Optional[int] = None,
+        quarantine: Optional[float] = None,
+    ):
+        """
+        Args:
+            ip_pool: 代理 IP 池，绑定和替换代理时从中获取
+            size: 同时绑定的代理数量，默认 IP_PROXY_POOL_COUNT
+            score_file: 健康分持久化文件，默认 PROXY_SCORE_FILE，为空时不持久化
+            alpha: EWMA 平滑系数，默认 PROXY_EWMA_ALPHA
+            max_failures: 连续失败多少次后隔离，默认 PROXY_MAX_FAILURES
+            quarantine: 隔离时长（秒），默认 PROXY_QUARANTINE_SEC
+        """
+        self.ip_pool = ip_pool
+        self.size = max(size or config.IP_PROXY_POOL_COUNT, 1)
+        self.score_file = config.PROXY_SCORE_FILE if score_file is None else score_file
+        self.alpha = config.PROXY_EWMA_ALPHA if alpha is None else alpha
+        self.max_failures = config.PROXY_MAX_FAILURES if max_failures is None else max_failures
+        self.quarantine = config.PROXY_QUARANTINE_SEC if quarantine is None else quarantine
+
+        self.endpoints: List[ProxyEndpoint] = []
+        self._scores: Dict[str, Dict] = {}
+        self._lock = asyncio.Lock()
+        self._next_replace_at = 0.0
+
+    async def start(self) -> "ProxyBalancer":
+        """读取历史健康分并绑定 size 个代理"""
+        self._scores = self._load_scores()
+        for _ in range(self.size):
+            proxy = await self._next_proxy()
+            if proxy is None:
+                break
+            self.endpoints.append(self._open(proxy))
+        if not self.endpoints:
+            raise RuntimeError("[ProxyBalancer.start] No proxy available from the IP pool")
+        utils.logger.info(f"[ProxyBalancer.start] 已绑定 {len(self.endpoints)} 个代理: {self.endpoints}")
+        return self
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        选出一个代理发送请求，并按结果更新该代理的延迟和健康分
+
+        Args:
+            method: 请求方法
+            url: 请求 URL
+            **kwargs: httpx 请求参数
+
+        Returns:
+            httpx.Response: 响应
+        """
+        endpoint = await self.acquire()
+        endpoint.in_flight += 1
+        endpoint.requests += 1
+        started = time.monotonic()
+        try:
+            response = await endpoint.client.request(method, url, **kwargs)
+        except httpx.TransportError as e:
+            self.report(endpoint, time.monotonic() - started, ok=False, reason=e)
+            raise
+        finally:
+            endpoint.in_flight -= 1
+            if endpoint.retired and not endpoint.in_flight:
+                await endpoint.client.aclose()
+        self.report(
+            endpoint, time.monotonic() - started, ok=response.status_code not in PROXY_ERROR_STATUS,
+            reason=f"HTTP {response.status_code}",
+        )
+        return response
+
+    async def acquire(self) -> ProxyEndpoint:
+        """替换过期 / 隔离中的代理后，按权重随机选出一个代理"""
+        now = time.monotonic()
+        if now >= self._next_replace_at and any(self._needs_replace(endpoint, now) for endpoint in self.endpoints):
+            await self._replace_unhealthy()
+            now = time.monotonic()
+        candidates = [endpoint for endpoint in self.endpoints if endpoint.quarantined_until <= now]
+        if not candidates:
+            # 全部隔离中且换不到新代理，只能用最早解除隔离的代理
+            candidates = [min(self.endpoints, key=lambda endpoint: endpoint.quarantined_until)]
+        known = sorted(endpoint.latency for endpoint in candidates if endpoint.latency)
+        default_latency = known[len(known) // 2] if known else 1.0
+        weights = [endpoint.weight(default_latency) for endpoint in candidates]
+        return random.choices(candidates, weights=weights)[0]
+
+    def report(self, endpoint: ProxyEndpoint, latency: float, ok: bool, reason: object = ""):
+        """
+        记录一次请求结果
+
+        Args:
+            endpoint: 发送请求的代理
+            latency: 请求耗时（秒）
+            ok: 代理是否正常工作
+            reason: 失败原因（日志用）
+        """
+        if ok:
+            endpoint.latency = latency if not endpoint.latency else self.alpha * latency + (1 - self.alpha) * endpoint.latency
+            endpoint.score = (1 - self.alpha) * endpoint.score + self.alpha
+            endpoint.failures = 0
+            return
+        endpoint.score *= 1 - self.alpha
+        endpoint.failures += 1
+        if endpoint.failures >= self.max_failures and endpoint.quarantined_until <= time.monotonic():
+            endpoint.quarantined_until = time.monotonic() + self.quarantine
+            # 隔离的代理立即尝试替换
+            self._next_replace_at = 0.0
+            utils.logger.warning(
+                f"[ProxyBalancer] 代理 {endpoint.key} 连续失败 {endpoint.failures} 次，隔离 {self.quarantine}s: {reason!r}"
+            )
+
+    def stats(self) -> List[Dict]:
+        return [
+            {"proxy": endpoint.key, "score": round(endpoint.score, 3), "latency": round(endpoint.latency, 3),
+             "requests": endpoint.requests, "quarantined": endpoint.quarantined_until > time.monotonic()}
+            for endpoint in self.endpoints
+        ]
+
+    async def close(self):
+        """保存健康分并关闭所有客户端"""
+        utils.logger.info(f"[ProxyBalancer.close] 代理统计: {self.stats()}")
+        for endpoint in self.endpoints:
+            self._remember(endpoint)
+        self._save_scores()
+        await asyncio.gather(*(endpoint.client.aclose() for endpoint in self.endpoints), return_exceptions=True)
+        self.endpoints = []
+
+    def _needs_replace(self, endpoint: ProxyEndpoint, now: float) -> bool:
+        return endpoint.quarantined_until > now or endpoint.proxy.is_expired(config.PROXY_ROTATE_AHEAD_SEC)
+
+    async def _replace_unhealthy(self):
+        async with self._lock:
+            now = time.monotonic()
+            for index, endpoint in enumerate(self.endpoints):
+                if not self._needs_replace(endpoint, now):
+                    continue
+                proxy = await self._next_proxy()
+                if proxy is None:
+                    self._next_replace_at = time.monotonic() + _REPLACE_RETRY_SEC
+                    return
+                self.endpoints[index] = self._open(proxy)
+                self._retire(endpoint)
+                utils.logger.info(f"[ProxyBalancer] 代理 {endpoint.key} 已替换为 {self.endpoints[index].key}")
+
+    async def _next_proxy(self) -> Optional[IpInfoModel]:
+        bound = {endpoint.key for endpoint in self.endpoints}
+        try:
+            proxy = await self.ip_pool.get_proxy()
+        except Exception as e:
+            utils.logger.error(f"[ProxyBalancer] 从代理池获取代理失败: {e}")
+            return None
+        if f"{proxy.ip}:{proxy.port}" in bound:
+            return None
+        return proxy
+
+    def _open(self, proxy: IpInfoModel) -> ProxyEndpoint:
+        _, proxy_url = utils.format_proxy_info(proxy)
+        endpoint = ProxyEndpoint(proxy, create_async_client(proxy=proxy_url))
+        history = self._scores.get(endpoint.key)
+        if history:
+            endpoint.score = history.get("score", endpoint.score)
+            endpoint.latency = history.get("latency", endpoint.latency)
+        return endpoint
+
+    def _retire(self, endpoint: ProxyEndpoint):
+        self._remember(endpoint)
+        endpoint.retired = True
+        if not endpoint.in_flight:
+            asyncio.create_task(endpoint.client.aclose())
+
+    def _remember(self, endpoint: ProxyEndpoint):
+        self._scores[endpoint.key] = {"score": round(endpoint.score, 4), "latency": round(endpoint.latency, 4)}
+
+    def _load_scores(self) -> Dict[str, Dict]:
+        if not self.score_file or not Path(self.score_file).exists():
+            return {}
+        try:
+            return codec.loads(Path(self.score_file).read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            utils.logger.warning(f"[ProxyBalancer] 读取代理健康分失败，忽略历史数据: {e}")
+            return {}
+
+    def _save_scores(self):
+        if not self.score_file:
+            return
+        path = Path(self.score_file)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(codec.dumps(self._scores, indent=True), encoding="utf-8")
+        except OSError as e:
+            utils.logger.warning(f"[ProxyBalancer] 保存代理健康分失败: {e}")
+
+
+async def create_proxy_balancer(ip_pool: "ProxyIpPool", size: Optional[int] = None) -> ProxyBalancer:
+    """
+    创建并启动多代理负载均衡器
+
+    Args:
+        ip_pool: 代理 IP 池
+        size: 同时绑定的代理数量，默认 IP_PROXY_POOL_COUNT
+
+    Returns:
+        ProxyBalancer: 已绑定代理的负载均衡器
+    """
+    return await ProxyBalancer(ip_pool, size=size).start()
@@ -2,13 +2,17 @@
 """
 代理 IP 池模块
 
-管理代理 IP 的获取、验证、刷新等功能。
+管理代理 IP 的获取、验证、刷新等功能：
+- 从服务商拉取的一批代理并发验证（PROXY_VALIDATE_URL，超时 PROXY_VALIDATE_TIMEOUT），只有通过验证的代理进入池中
+- 池中可用代理低于 PROXY_POOL_LOW_WATER 时在后台补充，取代理时不必等待拉取和验证
+- 当前代理剩余有效期不足 PROXY_ROTATE_AHEAD_SEC 时提前切换到池中的代理
 """
+import asyncio
 import random
-from typing import Dict, List
+import ssl
+from typing import Dict, List, Optional
 
 import httpx
-from tenacity import retry, stop_after_attempt, wait_fixed
 
 import config
 from src.services.proxy.providers import (
@@ -17,7 +21,7 @@ from src.services.proxy.providers import (
 )
 from src.utils import utils
 
-from .base_proxy import ProxyProvider
+from .base_proxy import IpGetError, ProxyProvider
 from .types import IpInfoModel, ProviderNameEnum
 
 
@@ -31,20 +35,38 @@ class ProxyIpPool:
         初始化代理 IP 池
 
         Args:
-            ip_pool_count: IP 池大小
+            ip_pool_count: IP 池大小（每次从服务商拉取的数量）
             enable_validate_ip: 是否验证 IP 有效性
             ip_provider: IP 代理提供商实例
         """
-        self.valid_ip_url = "https://echo.apifox.cn/"  # 用于验证 IP 有效性的 URL
+        self.valid_ip_url = config.PROXY_VALIDATE_URL  # 用于验证 IP 有效性的 URL
+        self.validate_timeout = config.PROXY_VALIDATE_TIMEOUT
+        self.low_water = config.PROXY_POOL_LOW_WATER
         self.ip_pool_count = ip_pool_count
         self.enable_validate_ip = enable_validate_ip
         self.proxy_list: List[IpInfoModel] = []
         self.ip_provider: ProxyProvider = ip_provider
         self.current_proxy: IpInfoModel | None = None  # 当前使用的代理
+        self._refill_lock = asyncio.Lock()
+        self._refill_task: Optional[asyncio.Task] = None
+        # 验证客户端共用一个 SSL 上下文，每个客户端单独加载证书耗时约 100ms
+        self._ssl_context: Optional[ssl.SSLContext] = None
 
     async def load_proxies(self) -> None:
         """加载代理 IP 到池中"""
-        self.proxy_list = await self.ip_provider.get_proxy(self.ip_pool_count)
+        self.proxy_list = await self._fetch_valid_proxies()
+
+    async def _fetch_valid_proxies(self) -> List[IpInfoModel]:
+        """从服务商拉取一批代理，开启验证时并发验证并只保留有效的代理"""
+        proxies = await self.ip_provider.get_proxy(self.ip_pool_count)
+        if not self.enable_validate_ip or not proxies:
+            return proxies
+        if self._ssl_context is None:
+            self._ssl_context = httpx.create_ssl_context()
+        results = await asyncio.gather(*(self._is_valid_proxy(proxy) for proxy in proxies))
+        valid = [proxy for proxy, ok in zip(proxies, results) if ok]
+        utils.logger.info(f"[ProxyIpPool._fetch_valid_proxies] 本批代理 {len(proxies)} 个，验证通过 {len(valid)} 个")
+        return valid
 
     async def _is_valid_proxy(self, proxy: IpInfoModel) -> bool:
         """
@@ -54,39 +76,36 @@ class ProxyIpPool:
             proxy: 代理 IP 信息
 
         Returns:
-            bool: 是否有效
+            bool: 是否有效，连接失败或超时视为无效
         """
-        utils.logger.info(f"[ProxyIpPool._is_valid_proxy] 正在验证 {proxy.ip} 是否有效...")
+        _, proxy_url = utils.format_proxy_info(proxy)
         try:
-            # httpx 0.28.1 需要直接传代理 URL 字符串
-            if proxy.user and proxy.password:
-                proxy_url = f"http://{proxy.user}:{proxy.password}@{proxy.ip}:{proxy.port}"
-            else:
-                proxy_url = f"http://{proxy.ip}:{proxy.port}"
-
-            async with httpx.AsyncClient(proxy=proxy_url) as client:
+            async with httpx.AsyncClient(
+                proxy=proxy_url, timeout=self.validate_timeout, verify=self._ssl_context or True
+            ) as client:
                 response = await client.get(self.valid_ip_url)
             return response.status_code == 200
         except Exception as e:
-            utils.logger.info(f"[ProxyIpPool._is_valid_proxy] 验证 {proxy.ip} 失败: {e}")
-            raise e
+            utils.logger.info(f"[ProxyIpPool._is_valid_proxy] 验证 {proxy.ip}:{proxy.port} 失败: {e!r}")
+            return False
 
-    @retry(stop=stop_after_attempt(3), wait=wait_fixed(1))
     async def get_proxy(self) -> IpInfoModel:
         """
-        从代理池中随机获取一个代理 IP
+        从代理池中随机获取一个代理 IP，池中没有可用代理时同步补充一次
 
         Returns:
             IpInfoModel: 代理 IP 信息
         """
+        self._drop_expired()
         if len(self.proxy_list) == 0:
             await self._reload_proxies()
+            self._drop_expired()
+        if len(self.proxy_list) == 0:
+            raise IpGetError("[ProxyIpPool.get_proxy] 代理服务商没有返回可用的代理 IP")
 
         proxy = random.choice(self.proxy_list)
         self.proxy_list.remove(proxy)  # 取出后从池中移除
-        if self.enable_validate_ip:
-            if not await self._is_valid_proxy(proxy):
-                raise Exception("[ProxyIpPool.get_proxy] 当前 IP 无效，重新获取")
+        self._schedule_refill()
         self.current_proxy = proxy  # 保存当前使用的代理
         return proxy
 
@@ -108,7 +127,7 @@ class ProxyIpPool:
         """
         获取当前代理，过期则自动刷新
 
-        应在每次请求前调用，确保代理有效
+        剩余有效期不足 PROXY_ROTATE_AHEAD_SEC 时，如果池中已有验证过的代理则提前切换，否则继续使用当前代理并在后台补充
 
         Args:
             buffer_seconds: 缓冲时间（秒），提前多少秒视为过期
@@ -121,12 +140,46 @@ class ProxyIpPool:
                 "[ProxyIpPool.get_or_refresh_proxy] 当前代理已过期或未设置，正在获取新代理..."
             )
             return await self.get_proxy()
+        if self.is_current_proxy_expired(buffer_seconds + config.PROXY_ROTATE_AHEAD_SEC):
+            self._drop_expired()
+            if self.proxy_list:
+                utils.logger.info("[ProxyIpPool.get_or_refresh_proxy] 当前代理即将过期，提前切换")
+                return await self.get_proxy()
+            self._schedule_refill()
         return self.current_proxy
 
+    async def close(self):
+        """取消后台补充任务"""
+        if self._refill_task is not None and not self._refill_task.done():
+            self._refill_task.cancel()
+            await asyncio.gather(self._refill_task, return_exceptions=True)
+        self._refill_task = None
+
     async def _reload_proxies(self):
-        """重新加载代理池"""
-        self.proxy_list = []
-        await self.load_proxies()
+        """补充代理池，并发调用时只拉取一次"""
+        if self._refill_lock.locked():
+            # 已经在补充（通常是后台任务），等它完成即可
+            async with self._refill_lock:
+                return
+        async with self._refill_lock:
+            try:
+                proxies = await self._fetch_valid_proxies()
+            except Exception as e:
+                utils.logger.error(f"[ProxyIpPool._reload_proxies] 补充代理失败: {e!r}")
+                return
+            pooled = {(proxy.ip, proxy.port) for proxy in self.proxy_list}
+            self.proxy_list.extend(proxy for proxy in proxies if (proxy.ip, proxy.port) not in pooled)
+
+    def _schedule_refill(self):
+        """可用代理低于低水位时启动后台补充"""
+        if len(self.proxy_list) >= self.low_water:
+            return
+        if self._refill_task is not None and not self._refill_task.done():
+            return
+        self._refill_task = asyncio.create_task(self._reload_proxies(), name="proxy-pool-refill")
+
+    def _drop_expired(self):
+        self.proxy_list = [proxy for proxy in self.proxy_list if not proxy.is_expired()]
 
 
 # 代理服务商映射
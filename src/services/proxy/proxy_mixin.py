@@ -6,17 +6,23 @@
 
 使用方法:
 1. API 客户端类继承此 Mixin
-2. 在 __init__ 中调用 init_proxy_pool(proxy_ip_pool)
-3. 每次请求前调用 await _refresh_proxy_if_expired()
+2. 在 __init__ 中调用 init_proxy_pool(proxy_ip_pool, proxy_balancer)
+3. 通过 await _send_request(method, url, **kwargs) 发送请求：
+   - 多代理模式（传入 proxy_balancer）下由负载均衡器选择代理
+   - 否则在请求前刷新过期代理，使用 self.proxy 发送
 
 要求:
 - 客户端类必须有 self.proxy 属性存储当前代理 URL
 """
 from typing import TYPE_CHECKING, Optional
 
+import httpx
+
+from src.services.transport import create_async_client
 from src.utils import utils
 
 if TYPE_CHECKING:
+    from src.services.proxy.proxy_balancer import ProxyBalancer
     from src.services.proxy.proxy_ip_pool import ProxyIpPool
 
 
@@ -28,35 +34,53 @@ class ProxyRefreshMixin:
     """
 
     _proxy_ip_pool: Optional["ProxyIpPool"] = None
+    _proxy_balancer: Optional["ProxyBalancer"] = None
 
-    def init_proxy_pool(self, proxy_ip_pool: Optional["ProxyIpPool"]) -> None:
+    def init_proxy_pool(
+        self, proxy_ip_pool: Optional["ProxyIpPool"], proxy_balancer: Optional["ProxyBalancer"] = None
+    ) -> None:
         """
         初始化代理池引用
 
         Args:
             proxy_ip_pool: 代理 IP 池实例
+            proxy_balancer: 多代理负载均衡器（ENABLE_MULTI_PROXY），传入后请求由它分配代理
         """
         self._proxy_ip_pool = proxy_ip_pool
+        self._proxy_balancer = proxy_balancer
+
+    async def _send_request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        通过代理发送请求
+
+        Args:
+            method: 请求方法
+            url: 请求 URL
+            **kwargs: httpx 请求参数
+
+        Returns:
+            httpx.Response: 响应
+        """
+        if self._proxy_balancer is not None:
+            return await self._proxy_balancer.request(method, url, **kwargs)
+        await self._refresh_proxy_if_expired()
+        async with create_async_client(proxy=self.proxy) as client:
+            return await client.request(method, url, **kwargs)
 
     async def _refresh_proxy_if_expired(self) -> None:
         """
-        检查代理是否过期，过期则自动刷新
+        检查代理是否过期或即将过期，是则切换到代理池的新代理
 
-        应在每次请求前调用，确保代理有效
+        应在每次请求前调用，确保代理有效；代理池在当前代理仍有效时不会发起网络请求
         """
         if self._proxy_ip_pool is None:
             return
 
-        if self._proxy_ip_pool.is_current_proxy_expired():
-            utils.logger.info(
-                f"[{self.__class__.__name__}._refresh_proxy_if_expired] 代理已过期，正在刷新..."
-            )
-            new_proxy = await self._proxy_ip_pool.get_or_refresh_proxy()
-            # 更新 httpx 代理 URL
-            if new_proxy.user and new_proxy.password:
-                self.proxy = f"http://{new_proxy.user}:{new_proxy.password}@{new_proxy.ip}:{new_proxy.port}"
-            else:
-                self.proxy = f"http://{new_proxy.ip}:{new_proxy.port}"
+        new_proxy = await self._proxy_ip_pool.get_or_refresh_proxy()
+        # 更新 httpx 代理 URL
+        _, proxy_url = utils.format_proxy_info(new_proxy)
+        if proxy_url != self.proxy:
+            self.proxy = proxy_url
             utils.logger.info(
                 f"[{self.__class__.__name__}._refresh_proxy_if_expired] 新代理: {new_proxy.ip}:{new_proxy.port}"
             )
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+# @Desc    : Pluggable HTTP transport with record/replay/passthrough modes
+from .cassette import (Cassette, RecordTransport, ReplayTransport, create_async_client, get_transport,
+                       get_transport_mode, is_replay_mode, request_key, reset_transports)
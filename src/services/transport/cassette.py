@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP 录制/回放传输层
+
+平台客户端的 httpx 请求通过可插拔的传输层发出，支持三种模式（HTTP_TRANSPORT_MODE）：
+- passthrough: 直接访问网络（默认）
+- record: 正常访问网络，同时把请求/响应写入 cassette 文件（JSONL，每行一次交互）
+- replay: 完全不访问网络，从 cassette 返回响应，可配置模拟延迟；签名逻辑同时替换为本地桩
+
+请求按 方法 + URL（去掉易变参数后排序的 query）+ 请求体 匹配，同一请求录制多次时按录制顺序依次返回，
+用完后重复返回最后一次响应。
+"""
+import asyncio
+import base64
+import json
+import random
+import threading
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+import httpx
+
+import config
+from src.utils import codec, utils
+
+MODE_PASSTHROUGH = "passthrough"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+
+# 解码后保存的响应体不再带有这些头
+_DROP_RESPONSE_HEADERS = {"content-encoding", "transfer-encoding", "content-length", "connection"}
+
+
+def get_transport_mode() -> str:
+    return (config.HTTP_TRANSPORT_MODE or MODE_PASSTHROUGH).lower()
+
+
+def is_replay_mode() -> bool:
+    return get_transport_mode() == MODE_REPLAY
+
+
+def _strip_volatile(params: Dict) -> Dict:
+    return {k: v for k, v in params.items() if k not in config.HTTP_CASSETTE_IGNORE_PARAMS}
+
+
+def request_key(method: str, url: str, body: bytes = b"") -> str:
+    """
+    请求匹配键：方法 + 去掉易变参数的 URL + 请求体
+
+    Args:
+        method: 请求方法
+        url: 请求 URL
+        body: 请求体
+    """
+    parsed = urlparse(str(url))
+    query = urlencode(sorted(_strip_volatile(dict(parse_qsl(parsed.query, keep_blank_values=True))).items()))
+    text = body.decode("utf-8", errors="replace") if body else ""
+    if text:
+        try:
+            payload = codec.loads(text)
+            if isinstance(payload, dict):
+                # Keys of recorded cassettes use the stdlib layout, keep it byte for byte
+                text = json.dumps(_strip_volatile(payload), sort_keys=True, ensure_ascii=False)
+        except ValueError:
+            pass
+    return f"{method.upper()} {parsed.scheme}://{parsed.netloc}{parsed.path}?{query} {text}"
+
+
+class Cassette:
+    """录制的请求/响应集合"""
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: cassette 文件路径（JSONL）
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._interactions: Dict[str, Deque[Dict]] = defaultdict(deque)
+        self._last: Dict[str, Dict] = {}
+
+    def load(self) -> "Cassette":
+        """读取 cassette 文件，用于回放"""
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    interaction = codec.loads(line)
+                    self._interactions[interaction["key"]].append(interaction["response"])
+        utils.logger.info(
+            f"[Cassette.load] 从 {self.path} 读取 {sum(map(len, self._interactions.values()))} 次交互"
+        )
+        return self
+
+    def append(self, request: httpx.Request, response: httpx.Response):
+        """追加一次交互到 cassette 文件"""
+        content = response.content
+        try:
+            body, encoding = content.decode("utf-8"), "utf-8"
+        except UnicodeDecodeError:
+            body, encoding = base64.b64encode(content).decode("ascii"), "base64"
+        interaction = {
+            "key": request_key(request.method, str(request.url), request.content),
+            "request": {"method": request.method, "url": str(request.url)},
+            "response": {
+                "status_code": response.status_code,
+                "headers": [
+                    [name, value] for name, value in response.headers.multi_items()
+                    if name.lower() not in _DROP_RESPONSE_HEADERS
+                ],
+                "body": body,
+                "encoding": encoding,
+            },
+        }
+        line = codec.dumps(interaction) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+    def match(self, request: httpx.Request) -> Optional[Dict]:
+        """取出与请求匹配的下一次响应，录制次数用完后重复最后一次"""
+        key = request_key(request.method, str(request.url), request.content)
+        with self._lock:
+            queue = self._interactions.get(key)
+            if queue:
+                self._last[key] = queue.popleft()
+            return self._last.get(key)
+
+
+def _build_response(recorded: Dict, request: httpx.Request) -> httpx.Response:
+    body = recorded["body"]
+    content = base64.b64decode(body) if recorded.get("encoding") == "base64" else body.encode("utf-8")
+    return httpx.Response(
+        recorded["status_code"],
+        headers=[tuple(header) for header in recorded["headers"]],
+        content=content,
+        request=request,
+    )
+
+
+class RecordTransport(httpx.AsyncBaseTransport):
+    """访问网络并录制每次交互"""
+
+    def __init__(self, cassette: Cassette, proxy: Optional[str] = None):
+        self.cassette = cassette
+        self._transport = httpx.AsyncHTTPTransport(proxy=proxy)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        response = await self._transport.handle_async_request(request)
+        try:
+            await response.aread()
+        finally:
+            await response.aclose()
+        # 原始响应流已读完，返回解码后的内容
+        response = httpx.Response(
+            response.status_code,
+            headers=[
+                (name, value) for name, value in response.headers.multi_items()
+                if name.lower() not in _DROP_RESPONSE_HEADERS
+            ],
+            content=response.content,
+            request=request,
+        )
+        self.cassette.append(request, response)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """从 cassette 返回响应，不访问网络"""
+
+    def __init__(self, cassette: Cassette, latency_ms: float = 0, jitter_ms: float = 0, strict: bool = True):
+        """
+        Args:
+            cassette: 已加载的 cassette
+            latency_ms: 每次响应的模拟延迟（毫秒）
+            jitter_ms: 延迟随机抖动上限（毫秒）
+            strict: 未录制的请求是否抛出异常，否则返回 404
+        """
+        self.cassette = cassette
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.strict = strict
+        self.misses: List[str] = []
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        delay = self.latency_ms + (random.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        recorded = self.cassette.match(request)
+        if recorded is None:
+            key = request_key(request.method, str(request.url), request.content)
+            self.misses.append(key)
+            if self.strict:
+                raise httpx.ConnectError(f"No recorded response for {key}", request=request)
+            return httpx.Response(404, content=b"", request=request)
+        return _build_response(recorded, request)
+
+
+_cassettes: Dict[Tuple[str, str], Cassette] = {}
+_replay_transport: Optional[ReplayTransport] = None
+
+
+def _get_cassette(path: str, mode: str) -> Cassette:
+    key = (str(path), mode)
+    if key not in _cassettes:
+        cassette = Cassette(Path(path))
+        _cassettes[key] = cassette.load() if mode == MODE_REPLAY else cassette
+    return _cassettes[key]
+
+
+def get_transport(proxy: Optional[str] = None) -> Optional[httpx.AsyncBaseTransport]:
+    """
+    按 HTTP_TRANSPORT_MODE 创建传输层
+
+    Args:
+        proxy: 录制模式下实际访问网络使用的代理
+
+    Returns:
+        passthrough 模式返回 None，使用 httpx 默认传输层
+    """
+    global _replay_transport
+    mode = get_transport_mode()
+    if mode == MODE_PASSTHROUGH:
+        return None
+    if mode == MODE_RECORD:
+        return RecordTransport(_get_cassette(config.HTTP_CASSETTE_PATH, mode), proxy=proxy)
+    if mode == MODE_REPLAY:
+        if _replay_transport is None or _replay_transport.cassette.path != Path(config.HTTP_CASSETTE_PATH):
+            _replay_transport = ReplayTransport(
+                _get_cassette(config.HTTP_CASSETTE_PATH, mode),
+                latency_ms=config.HTTP_REPLAY_LATENCY_MS,
+                jitter_ms=config.HTTP_REPLAY_JITTER_MS,
+            )
+        return _replay_transport
+    raise ValueError(f"Unsupported HTTP_TRANSPORT_MODE: {config.HTTP_TRANSPORT_MODE!r}")
+
+
+def create_async_client(proxy: Optional[str] = None, **kwargs) -> httpx.AsyncClient:
+    """
+    创建使用当前传输层的 httpx.AsyncClient，替代 httpx.AsyncClient(proxy=...)
+
+    Args:
+        proxy: 代理地址，录制模式下由传输层使用，回放模式下忽略
+        **kwargs: 其他 httpx.AsyncClient 参数
+    """
+    transport = get_transport(proxy)
+    if transport is None:
+        return httpx.AsyncClient(proxy=proxy, **kwargs)
+    # 环境变量中的代理会挂载到 transport 之前，需要关闭
+    kwargs.setdefault("trust_env", False)
+    return httpx.AsyncClient(transport=transport, **kwargs)
+
+
+def reset_transports():
+    """清空缓存的 cassette 和回放传输层（切换 cassette 或模式后调用）"""
+    global _replay_transport
+    _cassettes.clear()
+    _replay_transport = None
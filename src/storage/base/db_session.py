@@ -9,6 +9,16 @@ from config.db_config import mysql_db_config, sqlite_db_config
 # Keep a cache of engines
 _engines = {}
 
+DB_TYPES = ("db", "mysql", "sqlite")
+
+
+def _default_db_type() -> str:
+    """The database option of SAVE_DATA_OPTION, which may list several sinks (e.g. "sqlite,jsonl")"""
+    from src.storage.base.fanout_store import get_save_data_options
+
+    options = get_save_data_options()
+    return next((option for option in options if option in DB_TYPES), options[0] if options else None)
+
 
 async def create_database_if_not_exists(db_type: str):
     if db_type == "mysql" or db_type == "db":
@@ -22,7 +32,7 @@ async def create_database_if_not_exists(db_type: str):
 
 def get_async_engine(db_type: str = None):
     if db_type is None:
-        db_type = config.SAVE_DATA_OPTION
+        db_type = _default_db_type()
 
     if db_type in _engines:
         return _engines[db_type]
@@ -44,7 +54,7 @@ def get_async_engine(db_type: str = None):
 
 async def create_tables(db_type: str = None):
     if db_type is None:
-        db_type = config.SAVE_DATA_OPTION
+        db_type = _default_db_type()
     await create_database_if_not_exists(db_type)
     engine = get_async_engine(db_type)
     if engine:
@@ -53,8 +63,8 @@ async def create_tables(db_type: str = None):
 
 
 @asynccontextmanager
-async def get_session() -> AsyncSession:
-    engine = get_async_engine(config.SAVE_DATA_OPTION)
+async def get_session(db_type: str = None) -> AsyncSession:
+    engine = get_async_engine(db_type)
     if not engine:
         yield None
         return
@@ -12,12 +12,14 @@ from pathlib import Path
 
 try:
     import openpyxl
-    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
     from openpyxl.utils import get_column_letter
     EXCEL_AVAILABLE = True
 except ImportError:
     EXCEL_AVAILABLE = False
 
+import config
 from src.core.base_crawler import AbstractStore
 from src.utils import utils
 
@@ -60,12 +62,26 @@ class ExcelStoreBase(AbstractStore):
         with cls._lock:
             for key, instance in cls._instances.items():
                 try:
-                    instance.flush()
+                    instance.save()
                     utils.logger.info(f"[ExcelStoreBase] Flushed instance: {key}")
                 except Exception as e:
                     utils.logger.error(f"[ExcelStoreBase] Error flushing {key}: {e}")
             cls._instances.clear()
 
+    async def close(self):
+        """
+        Save the workbook once the run is finished and drop the singleton instance
+        """
+        with self._lock:
+            for key, instance in list(self._instances.items()):
+                if instance is self:
+                    del self._instances[key]
+        try:
+            self.save()
+        except Exception:
+            # Already logged by save, keep the crawler shutdown going
+            pass
+
     def __init__(self, platform: str, crawler_type: str = "search"):
         """
         Initialize Excel store
@@ -314,7 +330,7 @@ class ExcelStoreBase(AbstractStore):
 
         utils.logger.info(f"[ExcelStoreBase] Stored dynamic to Excel: {dynamic_item.get('dynamic_id', 'N/A')}")
 
-    def flush(self):
+    def save(self):
         """
         Save workbook to file
         """
@@ -352,3 +368,204 @@ class ExcelStoreBase(AbstractStore):
         except Exception as e:
             utils.logger.error(f"[ExcelStoreBase] Error saving Excel file: {e}")
             raise
+
+
+class _StreamingSheet:
+    """State of one entity sheet in streaming mode"""
+
+    def __init__(self, title: str, headers: List[str]):
+        self.title = title
+        self.headers = headers
+        self.widths: List[float] = []
+        self.sample: List[List[Any]] = []
+        self.worksheet = None
+        self.rows = 0
+
+
+class StreamingExcelStoreBase(ExcelStoreBase):
+    """
+    Streaming Excel storage implementation (EXCEL_STREAMING_MODE)
+    Uses openpyxl write-only workbooks: rows are spooled to disk as they arrive instead of
+    being kept in memory, cells share named styles, column widths are estimated from the
+    first rows of each sheet and a new file is started once a sheet reaches the row limit
+    """
+
+    HEADER_STYLE = "lc_header"
+    CELL_STYLE = "lc_cell"
+
+    def __init__(self, platform: str, crawler_type: str = "search",
+                 max_rows: int = None, sample_rows: int = None):
+        """
+        Initialize streaming Excel store
+
+        Args:
+            platform: Platform name (xhs, zhihu)
+            crawler_type: Type of crawler (search, detail, creator)
+            max_rows: Max data rows per sheet and file, default EXCEL_STREAMING_MAX_ROWS
+            sample_rows: Rows buffered to estimate column widths, default EXCEL_STREAMING_SAMPLE_ROWS
+        """
+        if not EXCEL_AVAILABLE:
+            raise ImportError(
+                "openpyxl is required for Excel export. "
+                "Install it with: pip install openpyxl"
+            )
+
+        self.platform = platform
+        self.crawler_type = crawler_type
+        self.max_rows = max_rows or config.EXCEL_STREAMING_MAX_ROWS
+        self.sample_rows = sample_rows or config.EXCEL_STREAMING_SAMPLE_ROWS
+
+        self.data_dir = Path("data") / platform
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        self.sheets: Dict[str, _StreamingSheet] = {}
+        self.part = 0
+        self.workbook = None
+        self.filename = None
+        self.saved_files: List[Path] = []
+        self._new_workbook()
+
+        utils.logger.info(f"[StreamingExcelStoreBase] Initialized streaming Excel export to: {self.filename}")
+
+    def _new_workbook(self):
+        """Start the next part file, sheets are created lazily on their first row"""
+        self.part += 1
+        suffix = "" if self.part == 1 else f"_part{self.part}"
+        self.filename = self.data_dir / f"{self.platform}_{self.crawler_type}_{self.timestamp}{suffix}.xlsx"
+
+        self.workbook = openpyxl.Workbook(write_only=True)
+        border_side = Side(style='thin')
+        border = Border(left=border_side, right=border_side, top=border_side, bottom=border_side)
+        self.workbook.add_named_style(NamedStyle(
+            name=self.HEADER_STYLE,
+            fill=PatternFill(start_color="366092", end_color="366092", fill_type="solid"),
+            font=Font(bold=True, color="FFFFFF", size=11),
+            alignment=Alignment(horizontal="center", vertical="center", wrap_text=True),
+            border=border,
+        ))
+        self.workbook.add_named_style(NamedStyle(
+            name=self.CELL_STYLE,
+            alignment=Alignment(vertical="top", wrap_text=True),
+            border=border,
+        ))
+        for sheet in self.sheets.values():
+            sheet.worksheet = None
+            sheet.rows = 0
+
+    @staticmethod
+    def _to_row(item: Dict[str, Any], headers: List[str]) -> List[Any]:
+        row = []
+        for header in headers:
+            value = item.get(header, "")
+            if isinstance(value, (list, dict)):
+                value = str(value)
+            elif value is None:
+                value = ""
+            row.append(value)
+        return row
+
+    def _estimate_widths(self, sheet: _StreamingSheet):
+        """Column widths from the header and sampled rows, same bounds as the in-memory mode"""
+        widths = []
+        for index, header in enumerate(sheet.headers):
+            max_length = len(str(header))
+            for row in sheet.sample:
+                if row[index] != "":
+                    max_length = max(max_length, len(str(row[index])))
+            widths.append(min(max(max_length + 2, 10), 50))
+        sheet.widths = widths
+
+    def _open_worksheet(self, sheet: _StreamingSheet):
+        """Create the worksheet in the current workbook, set widths and write the header"""
+        worksheet = self.workbook.create_sheet(sheet.title)
+        for index, width in enumerate(sheet.widths, 1):
+            worksheet.column_dimensions[get_column_letter(index)].width = width
+        worksheet.append([self._styled(worksheet, header, self.HEADER_STYLE) for header in sheet.headers])
+        sheet.worksheet = worksheet
+        sheet.rows = 0
+
+    @staticmethod
+    def _styled(worksheet, value: Any, style: str):
+        cell = WriteOnlyCell(worksheet, value=value)
+        cell.style = style
+        return cell
+
+    def _append(self, sheet: _StreamingSheet, row: List[Any]):
+        if sheet.worksheet is None:
+            self._open_worksheet(sheet)
+        elif sheet.rows >= self.max_rows:
+            self._rollover()
+            self._open_worksheet(sheet)
+        worksheet = sheet.worksheet
+        worksheet.append([self._styled(worksheet, value, self.CELL_STYLE) for value in row])
+        sheet.rows += 1
+
+    def _drain_sample(self, sheet: _StreamingSheet):
+        if not sheet.widths:
+            self._estimate_widths(sheet)
+        sample, sheet.sample = sheet.sample, []
+        for row in sample:
+            self._append(sheet, row)
+
+    def _rollover(self):
+        """Save the current part file and continue in a new one"""
+        self.save()
+        self._new_workbook()
+        utils.logger.info(f"[StreamingExcelStoreBase] Row limit reached, continuing in: {self.filename}")
+
+    def _store(self, key: str, title: str, item: Dict):
+        sheet = self.sheets.get(key)
+        if sheet is None:
+            sheet = self.sheets[key] = _StreamingSheet(title, list(item.keys()))
+        row = self._to_row(item, sheet.headers)
+        if not sheet.widths:
+            # Buffer the first rows until widths can be estimated, write-only sheets need them up front
+            sheet.sample.append(row)
+            if len(sheet.sample) >= self.sample_rows:
+                self._drain_sample(sheet)
+        else:
+            self._append(sheet, row)
+
+    async def store_content(self, content_item: Dict):
+        self._store("contents", "Contents", content_item)
+        content_id = content_item.get('note_id') or content_item.get('content_id') or 'N/A'
+        utils.logger.debug(f"[StreamingExcelStoreBase] Stored content to Excel: {content_id}")
+
+    async def store_comment(self, comment_item: Dict):
+        self._store("comments", "Comments", comment_item)
+        utils.logger.debug(f"[StreamingExcelStoreBase] Stored comment to Excel: {comment_item.get('comment_id', 'N/A')}")
+
+    async def store_creator(self, creator: Dict):
+        self._store("creators", "Creators", creator)
+        utils.logger.debug(f"[StreamingExcelStoreBase] Stored creator to Excel: {creator.get('user_id', 'N/A')}")
+
+    async def store_contact(self, contact_item: Dict):
+        self._store("contacts", "Contacts", contact_item)
+
+    async def store_dynamic(self, dynamic_item: Dict):
+        self._store("dynamics", "Dynamics", dynamic_item)
+
+    def save(self):
+        """
+        Write buffered sample rows and save the current part file
+        """
+        for sheet in self.sheets.values():
+            if sheet.sample:
+                self._drain_sample(sheet)
+
+        if self.workbook is None or len(self.workbook.sheetnames) == 0:
+            utils.logger.info(f"[StreamingExcelStoreBase] No data to save, skipping file creation: {self.filename}")
+            return
+
+        try:
+            self.workbook.save(self.filename)
+            self.saved_files.append(self.filename)
+            utils.logger.info(f"[StreamingExcelStoreBase] Excel file saved successfully: {self.filename}")
+        except Exception as e:
+            utils.logger.error(f"[StreamingExcelStoreBase] Error saving Excel file: {e}")
+            raise
+        finally:
+            # A write-only workbook can only be saved once
+            self.workbook = None
+
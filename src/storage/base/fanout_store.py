@@ -0,0 +1,183 @@
+"""
+Fan-out store: writes every record to several sinks in a single crawl
+Each sink gets its own bounded queue and worker task, so a slow sink only backs up
+its own queue and a failing sink does not stop the others.
+Records are handed to the sinks without waiting: when a sink's queue is full they go to
+that sink's backlog (SAVE_DATA_BACKLOG_SIZE), and once the backlog is full too the sink
+drops new records and logs how many it lost. The crawl never waits for a single sink.
+"""
+
+import asyncio
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import config
+from src.core.base_crawler import AbstractStore
+from src.utils import utils
+
+_STOP = object()
+
+
+def get_save_data_options(option: Union[str, Sequence[str], None] = None) -> List[str]:
+    """
+    Normalize SAVE_DATA_OPTION to a list of sink names
+
+    Accepts a single option ("sqlite"), a comma separated string ("sqlite,jsonl") or a list.
+
+    Args:
+        option: Raw option value, default config.SAVE_DATA_OPTION
+    """
+    if option is None:
+        option = config.SAVE_DATA_OPTION
+    if isinstance(option, str):
+        option = option.split(",")
+    options = []
+    for name in option:
+        name = str(getattr(name, "value", name)).strip().lower()
+        if name and name not in options:
+            options.append(name)
+    return options
+
+
+class _Sink:
+    """One sink of the fan-out store with its queue and worker"""
+
+    def __init__(self, name: str, store: AbstractStore, queue_size: int, backlog_size: int):
+        self.name = name
+        self.store = store
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        # Records that did not fit in the queue, moved to the queue in order as the worker frees slots
+        self.backlog: deque = deque()
+        self.backlog_size = backlog_size
+        self.worker: Optional[asyncio.Task] = None
+        self.enabled = True
+        self.written = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def offer(self, item: Tuple[str, Dict]):
+        """Hand a record to the sink without waiting, see the module docstring for the overflow policy"""
+        if not self.backlog:
+            try:
+                self.queue.put_nowait(item)
+                return
+            except asyncio.QueueFull:
+                pass
+        if len(self.backlog) >= self.backlog_size:
+            if not self.dropped:
+                utils.logger.error(
+                    f"[FanOutStore] Sink {self.name} is {self.queue.maxsize + self.backlog_size} records behind, "
+                    f"dropping new records for it"
+                )
+            self.dropped += 1
+            return
+        self.backlog.append(item)
+
+    def _refill(self):
+        while self.backlog and not self.queue.full():
+            self.queue.put_nowait(self.backlog.popleft())
+
+    async def run(self):
+        while True:
+            item = await self.queue.get()
+            try:
+                if item is _STOP:
+                    return
+                method, record = item
+                try:
+                    await getattr(self.store, method)(record)
+                    self.written += 1
+                except Exception as e:
+                    self.failed += 1
+                    utils.logger.error(f"[FanOutStore] Sink {self.name} {method} failed: {e}")
+            finally:
+                # Refill before task_done, so queue.join() also waits for the backlog
+                self._refill()
+                self.queue.task_done()
+
+
+class FanOutStore(AbstractStore):
+    """
+    Store writing the same records to several sinks concurrently
+    Created by the platform store factories when SAVE_DATA_OPTION lists more than one option
+    """
+
+    def __init__(self, stores: Sequence[Tuple[str, AbstractStore]], queue_size: Optional[int] = None,
+                 backlog_size: Optional[int] = None):
+        """
+        Initialize fan-out store
+
+        Args:
+            stores: (option name, store instance) of every sink
+            queue_size: Max records queued per sink, default SAVE_DATA_QUEUE_SIZE
+            backlog_size: Max records kept per sink once its queue is full, default SAVE_DATA_BACKLOG_SIZE
+        """
+        queue_size = queue_size or config.SAVE_DATA_QUEUE_SIZE
+        backlog_size = config.SAVE_DATA_BACKLOG_SIZE if backlog_size is None else backlog_size
+        self.sinks: List[_Sink] = [_Sink(name, store, queue_size, backlog_size) for name, store in stores]
+        self._started = False
+
+    def _start(self):
+        if self._started:
+            return
+        self._started = True
+        for sink in self.sinks:
+            if sink.enabled:
+                sink.worker = asyncio.create_task(sink.run(), name=f"fanout-sink-{sink.name}")
+
+    async def open(self):
+        for sink in self.sinks:
+            try:
+                await sink.store.open()
+            except Exception as e:
+                # A sink that cannot be opened is skipped for the whole run
+                sink.enabled = False
+                utils.logger.error(f"[FanOutStore] Sink {sink.name} disabled, open failed: {e}")
+        self._start()
+
+    async def _dispatch(self, method: str, item: Dict):
+        self._start()
+        for sink in self.sinks:
+            if sink.enabled:
+                # Records are shared read only, only sinks that modify them get their own copy
+                sink.offer((method, dict(item) if sink.store.mutates_records else item))
+
+    async def store_content(self, content_item: Dict):
+        await self._dispatch("store_content", content_item)
+
+    async def store_comment(self, comment_item: Dict):
+        await self._dispatch("store_comment", comment_item)
+
+    async def store_creator(self, creator: Dict):
+        await self._dispatch("store_creator", creator)
+
+    async def flush(self):
+        """Wait until every sink consumed its queue, then flush the sinks concurrently"""
+        await asyncio.gather(*(self._flush_sink(sink) for sink in self.sinks if sink.enabled))
+
+    async def _flush_sink(self, sink: _Sink):
+        await sink.queue.join()
+        try:
+            await sink.store.flush()
+        except Exception as e:
+            utils.logger.error(f"[FanOutStore] Sink {sink.name} flush failed: {e}")
+
+    async def close(self):
+        """Drain every queue, stop the workers and close the sinks concurrently"""
+        await asyncio.gather(*(self._close_sink(sink) for sink in self.sinks if sink.enabled))
+        summary = ", ".join(
+            f"{sink.name}: {sink.written} ok / {sink.failed} failed / {sink.dropped} dropped" for sink in self.sinks
+        )
+        utils.logger.info(f"[FanOutStore] Closed sinks ({summary})")
+
+    async def _close_sink(self, sink: _Sink):
+        if sink.worker is not None:
+            # Drain queue and backlog first, the stop marker must come after the last record
+            await sink.queue.join()
+            await sink.queue.put(_STOP)
+            await sink.worker
+            sink.worker = None
+        try:
+            await sink.store.close()
+        except Exception as e:
+            utils.logger.error(f"[FanOutStore] Sink {sink.name} close failed: {e}")
@@ -1,10 +1,28 @@
 """MongoDB storage base class: Provides connection management and common storage methods"""
 import asyncio
-from typing import Dict, List, Optional
+import time
+from typing import Dict, List, Optional, Set, Tuple
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase, AsyncIOMotorCollection
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 from config import db_config
 from src.utils import utils
 
+# Upsert key of every collection, a unique index is ensured on it once per connection
+UNIQUE_INDEXES: Dict[str, str] = {
+    "xhs_contents": "note_id",
+    "xhs_comments": "comment_id",
+    "xhs_creators": "user_id",
+    "zhihu_contents": "content_id",
+    "zhihu_comments": "comment_id",
+    "zhihu_creators": "user_id",
+}
+
+
+# Write error codes worth sending again: duplicate key (two upserts of a new key raced), interrupted / not primary /
+# network errors during failover
+RETRYABLE_WRITE_ERRORS = {11000, 6, 7, 89, 91, 189, 262, 9001, 10107, 11600, 11602, 13435, 13436}
+
 
 class MongoDBConnection:
     """MongoDB connection management (singleton pattern)"""
@@ -50,13 +68,30 @@ class MongoDBConnection:
             else:
                 connection_url = f"mongodb://{host}:{port}/"
 
-            self._client = AsyncIOMotorClient(connection_url, serverSelectionTimeoutMS=5000)
+            self._client = AsyncIOMotorClient(
+                connection_url,
+                serverSelectionTimeoutMS=5000,
+                maxPoolSize=mongo_config.get("max_pool_size", 20),
+                minPoolSize=mongo_config.get("min_pool_size", 0),
+                maxIdleTimeMS=mongo_config.get("max_idle_time_ms", 60000),
+            )
             await self._client.server_info()  # Test connection
             self._db = self._client[db_name]
             utils.logger.info(f"[MongoDBConnection] Connected to {host}:{port}/{db_name}")
         except Exception as e:
             utils.logger.error(f"[MongoDBConnection] Connection failed: {e}")
             raise
+        await self._ensure_indexes(self._db)
+
+    @staticmethod
+    async def _ensure_indexes(db: AsyncIOMotorDatabase):
+        """Ensure unique indexes on the upsert keys, create_index is a no-op when the index exists"""
+        for collection_name, key in UNIQUE_INDEXES.items():
+            try:
+                await db[collection_name].create_index([(key, 1)], unique=True)
+            except Exception as e:
+                # Existing duplicated documents prevent a unique index, upserts still work without it
+                utils.logger.error(f"[MongoDBConnection] Ensure unique index {collection_name}.{key} failed: {e}")
 
     async def close(self):
         """Close connection"""
@@ -67,6 +102,151 @@ class MongoDBConnection:
             utils.logger.info("[MongoDBConnection] Connection closed")
 
 
+class MongoBulkWriter:
+    """
+    Buffered upserts shared by every MongoDBStoreBase of the run
+    Operations are grouped per collection and sent as unordered bulk_write calls, a batch is sent once it holds
+    MONGODB_BULK_SIZE operations or MONGODB_BULK_FLUSH_INTERVAL_MS after its first operation (timer, so a quiet
+    collection is flushed too). Operations of a failed batch that were not written, or failed with a retryable error,
+    are put back into the buffer up to MONGODB_BULK_MAX_RETRIES times.
+    """
+
+    # collection name -> upsert key -> $set data, later records of the same key are merged
+    _buffers: Dict[str, Dict[Tuple, Dict]] = {}
+    _first_buffered_at: Dict[str, float] = {}
+    # collection name -> upsert key -> failed attempts of the buffered operation
+    _attempts: Dict[str, Dict[Tuple, int]] = {}
+    _timers: Dict[str, asyncio.TimerHandle] = {}
+    _timer_tasks: Set[asyncio.Task] = set()
+
+    @classmethod
+    async def add(cls, db: AsyncIOMotorDatabase, collection_name: str, query: Dict, data: Dict) -> bool:
+        """
+        Buffer one upsert, send the collection batch once it is full or old enough
+
+        Returns:
+            bool: False when the triggered batch failed
+        """
+        buffer = cls._buffers.setdefault(collection_name, {})
+        key = tuple(sorted(query.items()))
+        if key in buffer:
+            buffer[key].update(data)
+        else:
+            buffer[key] = dict(data)
+        if collection_name not in cls._first_buffered_at:
+            cls._first_buffered_at[collection_name] = time.monotonic()
+            cls._schedule_flush(db, collection_name)
+
+        age_ms = (time.monotonic() - cls._first_buffered_at[collection_name]) * 1000
+        if len(buffer) >= db_config.MONGODB_BULK_SIZE or age_ms >= db_config.MONGODB_BULK_FLUSH_INTERVAL_MS:
+            return await cls.flush(db, collection_name)
+        return True
+
+    @classmethod
+    def _schedule_flush(cls, db: AsyncIOMotorDatabase, collection_name: str):
+        """Flush the collection MONGODB_BULK_FLUSH_INTERVAL_MS after its first buffered operation"""
+
+        def fire():
+            cls._timers.pop(collection_name, None)
+            task = asyncio.ensure_future(cls.flush(db, collection_name))
+            cls._timer_tasks.add(task)
+            task.add_done_callback(cls._timer_tasks.discard)
+
+        cls._cancel_timer(collection_name)
+        cls._timers[collection_name] = asyncio.get_running_loop().call_later(
+            db_config.MONGODB_BULK_FLUSH_INTERVAL_MS / 1000, fire
+        )
+
+    @classmethod
+    def _cancel_timer(cls, collection_name: str):
+        timer = cls._timers.pop(collection_name, None)
+        if timer is not None:
+            timer.cancel()
+
+    @classmethod
+    async def flush(cls, db: AsyncIOMotorDatabase, collection_name: str) -> bool:
+        """Send buffered upserts of one collection"""
+        # Swap the buffer before awaiting so concurrent adds go to a new batch
+        buffer = cls._buffers.pop(collection_name, None)
+        cls._first_buffered_at.pop(collection_name, None)
+        cls._cancel_timer(collection_name)
+        if not buffer:
+            return True
+
+        keys = list(buffer)
+        operations = [UpdateOne(dict(key), {"$set": buffer[key]}, upsert=True) for key in keys]
+        try:
+            result = await db[collection_name].bulk_write(operations, ordered=False)
+            utils.logger.info(
+                f"[MongoBulkWriter] {collection_name}: {len(operations)} ops, "
+                f"upserted {result.upserted_count}, modified {result.modified_count}"
+            )
+            cls._forget(collection_name, keys)
+            return True
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            utils.logger.error(f"[MongoBulkWriter] {collection_name}: {len(errors)}/{len(operations)} ops failed: {errors[:3]}")
+            failed = {keys[error["index"]] for error in errors}
+            # Unordered batch: every operation without a write error was applied
+            cls._forget(collection_name, [key for key in keys if key not in failed])
+            retry_keys = [keys[error["index"]] for error in errors if cls._is_retryable(error)]
+            cls._forget(collection_name, failed - set(retry_keys))
+            cls._requeue(db, collection_name, {key: buffer[key] for key in retry_keys})
+            return False
+        except Exception as e:
+            # Nothing is known to be written, the whole batch is retried
+            utils.logger.error(f"[MongoBulkWriter] Bulk write failed ({collection_name}): {e}")
+            cls._requeue(db, collection_name, buffer)
+            return False
+
+    @staticmethod
+    def _is_retryable(error: Dict) -> bool:
+        """Duplicate key races of concurrent upserts and transient server errors succeed when sent again"""
+        return error.get("code") in RETRYABLE_WRITE_ERRORS or "RetryableWriteError" in error.get("errorLabels", ())
+
+    @classmethod
+    def _requeue(cls, db: AsyncIOMotorDatabase, collection_name: str, failed: Dict[Tuple, Dict]):
+        """Put failed operations back in front of the newer buffered data of the same keys"""
+        attempts = cls._attempts.setdefault(collection_name, {})
+        buffer = cls._buffers.setdefault(collection_name, {})
+        dropped = 0
+        for key, data in failed.items():
+            attempts[key] = attempts.get(key, 0) + 1
+            if attempts[key] > db_config.MONGODB_BULK_MAX_RETRIES:
+                attempts.pop(key)
+                dropped += 1
+                continue
+            merged = dict(data)
+            merged.update(buffer.get(key, {}))
+            buffer[key] = merged
+        if dropped:
+            utils.logger.error(
+                f"[MongoBulkWriter] {collection_name}: {dropped} ops dropped after {db_config.MONGODB_BULK_MAX_RETRIES} retries"
+            )
+        if not buffer:
+            cls._buffers.pop(collection_name)
+        elif collection_name not in cls._first_buffered_at:
+            cls._first_buffered_at[collection_name] = time.monotonic()
+            cls._schedule_flush(db, collection_name)
+
+    @classmethod
+    def _forget(cls, collection_name: str, keys):
+        attempts = cls._attempts.get(collection_name)
+        if attempts:
+            for key in keys:
+                attempts.pop(key, None)
+
+    @classmethod
+    async def flush_all(cls, db: AsyncIOMotorDatabase) -> bool:
+        """Send buffered upserts of every collection"""
+        results = [await cls.flush(db, collection_name) for collection_name in list(cls._buffers)]
+        return all(results)
+
+    @classmethod
+    def pending_count(cls) -> int:
+        return sum(len(buffer) for buffer in cls._buffers.values())
+
+
 class MongoDBStoreBase:
     """MongoDB storage base class: Provides common CRUD operations"""
 
@@ -85,15 +265,31 @@ class MongoDBStoreBase:
         return db[collection_name]
 
     async def save_or_update(self, collection_suffix: str, query: Dict, data: Dict) -> bool:
-        """Save or update data (upsert)"""
+        """Save or update data (upsert), buffered and sent in bulk, see MongoBulkWriter"""
         try:
-            collection = await self.get_collection(collection_suffix)
-            await collection.update_one(query, {"$set": data}, upsert=True)
-            return True
+            db = await self._connection.get_db()
+            return await MongoBulkWriter.add(db, f"{self.collection_prefix}_{collection_suffix}", query, data)
         except Exception as e:
             utils.logger.error(f"[MongoDBStoreBase] Save failed ({self.collection_prefix}_{collection_suffix}): {e}")
             return False
 
+    @staticmethod
+    async def flush_all() -> bool:
+        """
+        Send all buffered upserts
+        Should be called at the end of crawler execution
+        """
+        if MongoBulkWriter.pending_count() == 0:
+            return True
+        db = await MongoDBConnection().get_db()
+        # Re-buffered operations are retried right away, each pass spends one retry of every failed operation
+        ok = True
+        for _ in range(db_config.MONGODB_BULK_MAX_RETRIES + 1):
+            ok = await MongoBulkWriter.flush_all(db)
+            if MongoBulkWriter.pending_count() == 0:
+                break
+        return ok
+
     async def find_one(self, collection_suffix: str, query: Dict) -> Optional[Dict]:
         """Query a single record"""
         try:
@@ -0,0 +1,136 @@
+"""
+Convert existing JSON/CSV/JSONL outputs to the partitioned Parquet dataset
+
+Input files follow the AsyncFileWriter layout data/{platform}/{json|csv|jsonl}/{crawler_type}_{entity}_{date}.{ext},
+platform, entity and date are inferred from the path unless given explicitly.
+
+Usage:
+    python -m src.storage.base.parquet_converter data/xhs/json/search_comments_2025-01-01.json
+    python -m src.storage.base.parquet_converter data/zhihu/csv/*.csv --row-group-size 50000
+    python -m src.storage.base.parquet_converter data/xhs/jsonl/*.jsonl
+"""
+
+import argparse
+import csv
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import config
+from src.storage.base.parquet_store_base import (PARQUET_AVAILABLE, PARQUET_BASE_DIR, build_schema,
+                                                coerce_value, partition_dir)
+from src.utils import codec
+
+if PARQUET_AVAILABLE:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+FILE_NAME_PATTERN = re.compile(r"^(?P<crawler_type>\w+?)_(?P<entity>contents|comments|creators)_(?P<date>\d{4}-\d{2}-\d{2})$")
+
+
+def get_entity_fields(platform: str) -> Dict[str, Dict[str, str]]:
+    """Fixed entity schemas of a platform, the same ones the parquet store writes"""
+    if platform == "xhs":
+        from src.storage.xhs._store_impl import XHS_PARQUET_FIELDS
+        return XHS_PARQUET_FIELDS
+    if platform == "zhihu":
+        from src.storage.zhihu._store_impl import ZHIHU_PARQUET_FIELDS
+        return ZHIHU_PARQUET_FIELDS
+    raise ValueError(f"Unsupported platform: {platform!r}")
+
+
+def read_records(file_path: Path) -> Iterator[Dict]:
+    """Yield records of a JSON array file, a CSV file or a JSON lines file"""
+    if file_path.suffix == ".json":
+        with open(file_path, "rb") as f:
+            data = codec.loads(f.read())
+        yield from (data if isinstance(data, list) else [data])
+    elif file_path.suffix == ".csv":
+        with open(file_path, "r", encoding="utf-8-sig", newline="") as f:
+            yield from csv.DictReader(f)
+    elif file_path.suffix == ".jsonl":
+        with open(file_path, "rb") as f:
+            yield from (codec.loads(line) for line in f if line.strip())
+    else:
+        raise ValueError(f"Unsupported file type: {file_path.suffix}")
+
+
+def _chunks(records: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def convert_file(file_path: Path, platform: Optional[str] = None, entity: Optional[str] = None,
+                 date: Optional[str] = None, row_group_size: int = 10000,
+                 base_dir: Path = PARQUET_BASE_DIR) -> Path:
+    """
+    Convert one JSON/CSV/JSONL output file to a Parquet file of the partitioned dataset
+
+    Args:
+        file_path: Source file path
+        platform: Platform name, default inferred from data/{platform}/...
+        entity: contents/comments/creators, default inferred from the file name
+        date: Partition date (YYYY-MM-DD), default inferred from the file name
+        row_group_size: Records per row group
+        base_dir: Root directory of the partitioned dataset
+
+    Returns:
+        Path: Written Parquet file
+    """
+    file_path = Path(file_path)
+    match = FILE_NAME_PATTERN.match(file_path.stem)
+    platform = platform or file_path.parent.parent.name
+    entity = entity or (match and match.group("entity"))
+    date = date or (match and match.group("date"))
+    if not entity or not date:
+        raise ValueError(f"Cannot infer entity/date from {file_path.name}, pass them explicitly")
+
+    fields = get_entity_fields(platform)[entity]
+    schema = build_schema(fields)
+    directory = partition_dir(platform, date, entity, Path(base_dir))
+    directory.mkdir(parents=True, exist_ok=True)
+    output_path = directory / f"{file_path.stem}_{file_path.suffix[1:]}.parquet"
+
+    with pq.ParquetWriter(output_path, schema, compression=config.PARQUET_COMPRESSION) as writer:
+        for chunk in _chunks(read_records(file_path), row_group_size):
+            columns = {
+                name: [coerce_value(record.get(name), type_name) for record in chunk]
+                for name, type_name in fields.items()
+            }
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema), row_group_size=row_group_size)
+    return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert JSON/CSV/JSONL outputs to the partitioned Parquet dataset")
+    parser.add_argument("files", nargs="+", type=Path, help="JSON/CSV/JSONL files to convert")
+    parser.add_argument("--platform", choices=["xhs", "zhihu"], help="Platform, default inferred from the path")
+    parser.add_argument("--entity", choices=["contents", "comments", "creators"], help="Entity, default inferred from the file name")
+    parser.add_argument("--date", help="Partition date YYYY-MM-DD, default inferred from the file name")
+    parser.add_argument("--row-group-size", type=int, default=10000, help="Records per row group")
+    parser.add_argument("--output-dir", type=Path, default=PARQUET_BASE_DIR, help="Root directory of the dataset")
+    args = parser.parse_args()
+
+    if not PARQUET_AVAILABLE:
+        parser.error("pyarrow is required for Parquet export. Install it with: pip install pyarrow")
+
+    for file_path in args.files:
+        output_path = convert_file(
+            file_path,
+            platform=args.platform,
+            entity=args.entity,
+            date=args.date,
+            row_group_size=args.row_group_size,
+            base_dir=args.output_dir,
+        )
+        print(f"{file_path} -> {output_path}")
+
+
+if __name__ == "__main__":
+    main()
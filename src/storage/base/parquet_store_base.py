@@ -0,0 +1,175 @@
+"""
+Parquet Store Base Implementation
+Buffers records into Arrow record batches with a fixed schema per entity and writes them
+as zstd compressed row groups, partitioned hive-style by platform, date and entity:
+
+    data/parquet/platform=xhs/date=2025-01-01/entity=contents/search_103000_ab12cd34.parquet
+
+Partitioned directories can be read directly by pandas (pd.read_parquet) and DuckDB
+(read_parquet('data/parquet/**/*.parquet', hive_partitioning = true)).
+"""
+
+import asyncio
+import dataclasses
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+import config
+from src.core.base_crawler import AbstractStore
+from src.utils import codec, utils
+
+PARQUET_BASE_DIR = Path("data") / "parquet"
+
+# Field type names of entity schemas, kept as plain strings so schemas can be declared without pyarrow
+STRING = "string"
+INT64 = "int64"
+
+
+def fields_from_model(model, **extra_fields: str) -> Dict[str, str]:
+    """
+    Build entity fields from a record dataclass or a pydantic model, int fields map to int64 and everything else to string
+
+    Args:
+        model: record dataclass or pydantic model class
+        extra_fields: Additional columns not declared on the model, e.g. last_modify_ts=INT64
+    """
+    if dataclasses.is_dataclass(model):
+        annotations = {field.name: field.type for field in dataclasses.fields(model)}
+    else:
+        annotations = {name: field.annotation for name, field in model.model_fields.items()}
+    fields = {name: INT64 if annotation is int else STRING for name, annotation in annotations.items()}
+    fields.update(extra_fields)
+    return fields
+
+
+def build_schema(fields: Dict[str, str]) -> "pa.Schema":
+    """Build the Arrow schema of an entity from its field type names"""
+    types = {STRING: pa.string(), INT64: pa.int64()}
+    return pa.schema([(name, types[type_name]) for name, type_name in fields.items()])
+
+
+def coerce_value(value: Any, type_name: str) -> Any:
+    """Coerce a record value to the column type, values that cannot be converted become null"""
+    if value is None:
+        return None
+    if type_name == INT64:
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+    if isinstance(value, (list, dict)):
+        return codec.dumps(value)
+    return str(value)
+
+
+def partition_dir(platform: str, date: str, entity: str, base_dir: Path = PARQUET_BASE_DIR) -> Path:
+    return base_dir / f"platform={platform}" / f"date={date}" / f"entity={entity}"
+
+
+class ParquetStoreBase(AbstractStore):
+    """
+    Base class for Parquet storage implementation
+    One ParquetWriter per (date, entity) partition is kept open for the whole run, every
+    PARQUET_ROW_GROUP_SIZE buffered records of an entity are written as one row group
+    """
+
+    def __init__(self, platform: str, entity_fields: Dict[str, Dict[str, str]], crawler_type: str = "search",
+                 row_group_size: Optional[int] = None, base_dir: Path = PARQUET_BASE_DIR):
+        """
+        Initialize Parquet store
+
+        Args:
+            platform: Platform name (xhs, zhihu)
+            entity_fields: Entity name (contents/comments/creators) -> column name -> field type name
+            crawler_type: Type of crawler (search, detail, creator), used as file name prefix
+            row_group_size: Records per row group, default PARQUET_ROW_GROUP_SIZE
+            base_dir: Root directory of the partitioned dataset
+        """
+        if not PARQUET_AVAILABLE:
+            raise ImportError(
+                "pyarrow is required for Parquet export. "
+                "Install it with: pip install pyarrow"
+            )
+
+        super().__init__()
+        self.platform = platform
+        self.crawler_type = crawler_type
+        self.entity_fields = entity_fields
+        self.schemas = {entity: build_schema(fields) for entity, fields in entity_fields.items()}
+        self.row_group_size = row_group_size or config.PARQUET_ROW_GROUP_SIZE
+        self.base_dir = Path(base_dir)
+        self.file_stem = f"{crawler_type}_{datetime.now().strftime('%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+        self._buffers: Dict[str, List[Dict[str, Any]]] = {entity: [] for entity in entity_fields}
+        self._writers: Dict[Tuple[str, str], "pq.ParquetWriter"] = {}
+        self._lock = asyncio.Lock()
+        self.written_rows = 0
+
+    def _to_record_batch(self, entity: str, records: List[Dict[str, Any]]) -> "pa.RecordBatch":
+        fields = self.entity_fields[entity]
+        columns = {
+            name: [coerce_value(record.get(name), type_name) for record in records]
+            for name, type_name in fields.items()
+        }
+        return pa.RecordBatch.from_pydict(columns, schema=self.schemas[entity])
+
+    def _writer(self, date: str, entity: str) -> "pq.ParquetWriter":
+        key = (date, entity)
+        writer = self._writers.get(key)
+        if writer is None:
+            directory = partition_dir(self.platform, date, entity, self.base_dir)
+            directory.mkdir(parents=True, exist_ok=True)
+            file_path = directory / f"{self.file_stem}.parquet"
+            writer = pq.ParquetWriter(file_path, self.schemas[entity], compression=config.PARQUET_COMPRESSION)
+            self._writers[key] = writer
+            utils.logger.info(f"[ParquetStoreBase] Writing {entity} to: {file_path}")
+        return writer
+
+    def _write_row_group(self, date: str, entity: str, records: List[Dict[str, Any]]):
+        batch = self._to_record_batch(entity, records)
+        self._writer(date, entity).write_batch(batch, row_group_size=len(records))
+        self.written_rows += len(records)
+
+    async def _store(self, entity: str, item: Dict):
+        async with self._lock:
+            buffer = self._buffers[entity]
+            buffer.append(item)
+            if len(buffer) < self.row_group_size:
+                return
+            self._buffers[entity] = []
+            await asyncio.to_thread(self._write_row_group, utils.get_current_date(), entity, buffer)
+
+    async def store_content(self, content_item: Dict):
+        await self._store("contents", content_item)
+
+    async def store_comment(self, comment_item: Dict):
+        await self._store("comments", comment_item)
+
+    async def store_creator(self, creator: Dict):
+        await self._store("creators", creator)
+
+    async def flush(self):
+        """Write every buffered record as a (possibly smaller) row group"""
+        async with self._lock:
+            date = utils.get_current_date()
+            for entity, buffer in self._buffers.items():
+                if buffer:
+                    self._buffers[entity] = []
+                    await asyncio.to_thread(self._write_row_group, date, entity, buffer)
+
+    async def close(self):
+        """Write remaining records and close the Parquet files (writes the footers)"""
+        await self.flush()
+        writers, self._writers = self._writers, {}
+        for writer in writers.values():
+            await asyncio.to_thread(writer.close)
+        utils.logger.info(f"[ParquetStoreBase] Parquet files closed, written rows: {self.written_rows}")
@@ -0,0 +1,293 @@
+"""
+SQLite single-writer implementation
+One dedicated thread owns the write connection, drains a queue of records and
+commits them in groups with prepared upsert statements (executemany).
+Readers (API, exports) should use read-only connections from open_readonly_connection.
+"""
+
+import asyncio
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import db_config
+from src.utils import utils
+
+
+@dataclass(frozen=True)
+class UpsertSpec:
+    """
+    Upsert description of one table
+
+    Rows are matched on `key`; existing rows only get `update_columns` refreshed,
+    new rows are inserted with all `columns`.
+    """
+
+    table: str
+    key: str
+    columns: Tuple[str, ...]
+    update_columns: Tuple[str, ...]
+
+    @classmethod
+    def from_model(cls, model, key: str, update_columns: Optional[Tuple[str, ...]] = None) -> "UpsertSpec":
+        """
+        Build spec from an ORM model, all columns except the primary key are written
+
+        Args:
+            model: SQLAlchemy ORM model class
+            key: Business unique column (note_id, comment_id, user_id...)
+            update_columns: Columns refreshed on existing rows, default all columns except key and add_ts
+        """
+        columns = tuple(column.name for column in model.__table__.columns if not column.primary_key)
+        if update_columns is None:
+            update_columns = tuple(column for column in columns if column not in (key, "add_ts"))
+        return cls(table=model.__tablename__, key=key, columns=columns, update_columns=update_columns)
+
+    @property
+    def update_sql(self) -> str:
+        assignments = ", ".join(f'"{column}" = ?' for column in self.update_columns)
+        return f'UPDATE "{self.table}" SET {assignments} WHERE "{self.key}" = ?'
+
+    @property
+    def insert_sql(self) -> str:
+        columns = ", ".join(f'"{column}"' for column in self.columns)
+        placeholders = ", ".join("?" for _ in self.columns)
+        return (
+            f'INSERT INTO "{self.table}" ({columns}) SELECT {placeholders} '
+            f'WHERE NOT EXISTS (SELECT 1 FROM "{self.table}" WHERE "{self.key}" = ?)'
+        )
+
+    def update_params(self, row: Dict[str, Any]) -> Tuple:
+        return tuple(row.get(column) for column in self.update_columns) + (row[self.key],)
+
+    def insert_params(self, row: Dict[str, Any]) -> Tuple:
+        return tuple(row.get(column) for column in self.columns) + (row[self.key],)
+
+
+class SqliteWriteError(Exception):
+    """Records that could not be committed, raised by flush / close"""
+
+    def __init__(self, failures: List[Tuple[str, Any, str]]):
+        self.failures = failures
+        sample = "; ".join(f"{table}[{key}]: {error}" for table, key, error in failures[:5])
+        super().__init__(f"{len(failures)} record(s) could not be committed: {sample}")
+
+
+class _Barrier:
+    """Queue marker, set once every record queued before it is committed"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        # (table, key, error) of the records dropped since the previous barrier
+        self.failures: List[Tuple[str, Any, str]] = []
+
+
+_STOP = object()
+
+
+class SqliteWriter:
+    """
+    Dedicated SQLite writer thread with group commit
+    Uses singleton pattern so every store of the run shares one write connection
+    """
+
+    _instance: Optional["SqliteWriter"] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> "SqliteWriter":
+        """
+        Get or create (and start) the writer of the configured SQLite database
+
+        Returns:
+            SqliteWriter instance
+        """
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls(
+                    db_path=db_config.SQLITE_DB_PATH,
+                    batch_size=db_config.SQLITE_WRITER_BATCH_SIZE,
+                    flush_interval_ms=db_config.SQLITE_WRITER_FLUSH_INTERVAL_MS,
+                    queue_size=db_config.SQLITE_WRITER_QUEUE_SIZE,
+                )
+                cls._instance.start()
+            return cls._instance
+
+    @classmethod
+    def close_all(cls):
+        """
+        Commit pending records and stop the writer thread
+        Should be called at the end of crawler execution
+        """
+        with cls._lock:
+            if cls._instance is not None:
+                try:
+                    cls._instance.close()
+                finally:
+                    cls._instance = None
+
+    def __init__(self, db_path: str, batch_size: int = 500, flush_interval_ms: int = 200, queue_size: int = 10000):
+        """
+        Initialize writer
+
+        Args:
+            db_path: SQLite database file path
+            batch_size: Commit once this many records are pending
+            flush_interval_ms: Commit pending records at least this often
+            queue_size: Max records waiting in the queue before producers are slowed down
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self.committed_rows = 0
+        self.failed_rows = 0
+        # Records dropped since the last barrier, handed to the next flush / close (writer thread only)
+        self._failures: List[Tuple[str, Any, str]] = []
+
+    def start(self):
+        """Start the writer thread"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+        self._thread.start()
+        utils.logger.info(f"[SqliteWriter] Writer thread started: {self.db_path}")
+
+    async def submit(self, spec: UpsertSpec, row: Dict[str, Any]):
+        """
+        Queue one record for upsert, only waits when the queue is full
+
+        Args:
+            spec: Target table upsert spec
+            row: Column name -> value, must contain spec.key
+        """
+        try:
+            self._queue.put_nowait((spec, row))
+        except queue.Full:
+            await asyncio.to_thread(self._queue.put, (spec, row))
+
+    async def flush(self):
+        """
+        Wait until every record submitted so far is committed
+
+        Raises:
+            SqliteWriteError: Records submitted since the previous flush were rejected by SQLite
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return
+        barrier = _Barrier()
+        await asyncio.to_thread(self._queue.put, barrier)
+        await asyncio.to_thread(barrier.event.wait)
+        if barrier.failures:
+            raise SqliteWriteError(barrier.failures)
+
+    def close(self):
+        """
+        Commit pending records, close the connection and join the thread
+
+        Raises:
+            SqliteWriteError: Records submitted since the last flush were rejected by SQLite
+        """
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+        utils.logger.info(
+            f"[SqliteWriter] Writer thread stopped, committed rows: {self.committed_rows}, failed rows: {self.failed_rows}"
+        )
+        failures, self._failures = self._failures, []
+        if failures:
+            raise SqliteWriteError(failures)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def _run(self):
+        conn = self._connect()
+        # spec -> key -> row, later records of the same key replace earlier ones
+        pending: Dict[UpsertSpec, Dict[Any, Dict[str, Any]]] = {}
+        pending_count = 0
+        deadline = time.monotonic() + self.flush_interval
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    item = None
+
+                if item is _STOP or isinstance(item, _Barrier):
+                    self._commit(conn, pending)
+                    pending, pending_count = {}, 0
+                    deadline = time.monotonic() + self.flush_interval
+                    if item is _STOP:
+                        break
+                    item.failures, self._failures = self._failures, []
+                    item.event.set()
+                    continue
+
+                if item is not None:
+                    spec, row = item
+                    pending.setdefault(spec, {})[row[spec.key]] = row
+                    pending_count += 1
+
+                if pending_count >= self.batch_size or time.monotonic() >= deadline:
+                    self._commit(conn, pending)
+                    pending, pending_count = {}, 0
+                    deadline = time.monotonic() + self.flush_interval
+        finally:
+            conn.close()
+
+    def _commit(self, conn: sqlite3.Connection, pending: Dict[UpsertSpec, Dict[Any, Dict[str, Any]]]):
+        if not pending:
+            return
+        try:
+            with conn:
+                for spec, rows in pending.items():
+                    values = list(rows.values())
+                    conn.executemany(spec.update_sql, [spec.update_params(row) for row in values])
+                    conn.executemany(spec.insert_sql, [spec.insert_params(row) for row in values])
+        except sqlite3.Error as e:
+            tables = ", ".join(spec.table for spec in pending)
+            utils.logger.warning(f"[SqliteWriter] Group commit failed ({tables}): {e}, retrying record by record")
+            self._commit_one_by_one(conn, pending)
+            return
+        self.committed_rows += sum(len(rows) for rows in pending.values())
+
+    def _commit_one_by_one(self, conn: sqlite3.Connection, pending: Dict[UpsertSpec, Dict[Any, Dict[str, Any]]]):
+        """Commit every record in its own transaction so one bad record only loses itself"""
+        for spec, rows in pending.items():
+            for key, row in rows.items():
+                try:
+                    with conn:
+                        conn.execute(spec.update_sql, spec.update_params(row))
+                        conn.execute(spec.insert_sql, spec.insert_params(row))
+                    self.committed_rows += 1
+                except sqlite3.Error as e:
+                    self.failed_rows += 1
+                    self._failures.append((spec.table, key, str(e)))
+                    utils.logger.error(f"[SqliteWriter] Record {spec.table}[{key}] dropped: {e}")
+
+
+def open_readonly_connection(db_path: Optional[str] = None) -> sqlite3.Connection:
+    """
+    Open a read-only connection, it never takes the write lock held by the writer thread
+
+    Args:
+        db_path: SQLite database file path, default configured database
+
+    Returns:
+        sqlite3.Connection
+    """
+    db_path = db_path or db_config.SQLITE_DB_PATH
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    return conn
@@ -1,7 +1,10 @@
-from typing import List
+from typing import List, Optional
 
 import config
 from src.core.var import source_keyword_var
+from src.models.m_xiaohongshu import XhsNoteCommentRecord, XhsNoteRecord
+from src.storage.base.fanout_store import FanOutStore, get_save_data_options
+from src.utils import codec
 
 from .xhs_store_media import *
 from ._store_impl import *
@@ -12,17 +15,44 @@ class XhsStoreFactory:
         "csv": XhsCsvStoreImplement,
         "db": XhsDbStoreImplement,
         "json": XhsJsonStoreImplement,
+        "jsonl": XhsJsonlStoreImplement,
         "sqlite": XhsSqliteStoreImplement,
         "mongodb": XhsMongoStoreImplement,
         "excel": XhsExcelStoreImplement,
+        "parquet": XhsParquetStoreImplement,
     }
 
+    _store: Optional[AbstractStore] = None
+
     @staticmethod
     def create_store() -> AbstractStore:
-        store_class = XhsStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
-        if not store_class:
-            raise ValueError("[XhsStoreFactory.create_store] Invalid save option only supported csv or db or json or sqlite or mongodb or excel ...")
-        return store_class()
+        """
+        Get the store of the current run, it is created once and reused for every record
+        When SAVE_DATA_OPTION lists several options (e.g. "sqlite,jsonl") records are fanned out to all of them
+        """
+        if XhsStoreFactory._store is None:
+            stores = []
+            for option in get_save_data_options():
+                store_class = XhsStoreFactory.STORES.get(option)
+                if not store_class:
+                    raise ValueError(f"[XhsStoreFactory.create_store] Invalid save option {option!r}, only supported csv or db or json or sqlite or jsonl or mongodb or excel or parquet ...")
+                stores.append((option, store_class()))
+            XhsStoreFactory._store = stores[0][1] if len(stores) == 1 else FanOutStore(stores)
+        return XhsStoreFactory._store
+
+    @staticmethod
+    async def open_store() -> AbstractStore:
+        """Create and open the store, called by the crawler before crawling"""
+        store = XhsStoreFactory.create_store()
+        await store.open()
+        return store
+
+    @staticmethod
+    async def close_store():
+        """Flush and close the store, called by the crawler after crawling"""
+        store, XhsStoreFactory._store = XhsStoreFactory._store, None
+        if store is not None:
+            await store.close()
 
 
 def get_video_url_arr(note_item: Dict) -> List:
@@ -59,11 +89,11 @@ def get_video_url_arr(note_item: Dict) -> List:
     return videoArr
 
 
-async def update_xhs_note(note_item: Dict):
+def build_xhs_note_item(note_item: Dict) -> XhsNoteRecord:
     """
-    Update Xiaohongshu note
+    Normalize a note detail to the stored content record
     Args:
-        note_item:
+        note_item: Note detail from the feed API or the note page
 
     Returns:
 
@@ -80,29 +110,44 @@ async def update_xhs_note(note_item: Dict):
 
     video_url = ','.join(get_video_url_arr(note_item))
 
-    local_db_item = {
-        "note_id": note_item.get("note_id"),  # Note ID
-        "type": note_item.get("type"),  # Note type
-        "title": note_item.get("title") or note_item.get("desc", "")[:255],  # Note title
-        "desc": note_item.get("desc", ""),  # Note description
-        "video_url": video_url,  # Note video url
-        "time": note_item.get("time"),  # Note publish time
-        "last_update_time": note_item.get("last_update_time", 0),  # Note last update time
-        "user_id": user_info.get("user_id"),  # User ID
-        "nickname": user_info.get("nickname"),  # User nickname
-        "avatar": user_info.get("avatar"),  # User avatar
-        "liked_count": interact_info.get("liked_count"),  # Like count
-        "collected_count": interact_info.get("collected_count"),  # Collection count
-        "comment_count": interact_info.get("comment_count"),  # Comment count
-        "share_count": interact_info.get("share_count"),  # Share count
-        "ip_location": note_item.get("ip_location", ""),  # IP location
-        "image_list": ','.join([img.get('url', '') for img in image_list]),  # Image URLs
-        "tag_list": ','.join([tag.get('name', '') for tag in tag_list if tag.get('type') == 'topic']),  # Tags
-        "last_modify_ts": utils.get_current_timestamp(),  # Last modification timestamp (Generated by LittleCrawler, mainly used to record the latest update time of a record in DB storage)
-        "note_url": f"https://www.xiaohongshu.com/explore/{note_id}?xsec_token={note_item.get('xsec_token')}&xsec_source=pc_search",  # Note URL
-        "source_keyword": source_keyword_var.get(),  # Search keyword
-        "xsec_token": note_item.get("xsec_token"),  # xsec_token
-    }
+    local_db_item = XhsNoteRecord(
+        note_id=note_item.get("note_id"),  # Note ID
+        type=note_item.get("type"),  # Note type
+        title=note_item.get("title") or note_item.get("desc", "")[:255],  # Note title
+        desc=note_item.get("desc", ""),  # Note description
+        video_url=video_url,  # Note video url
+        time=note_item.get("time"),  # Note publish time
+        last_update_time=note_item.get("last_update_time", 0),  # Note last update time
+        user_id=user_info.get("user_id"),  # User ID
+        nickname=user_info.get("nickname"),  # User nickname
+        avatar=user_info.get("avatar"),  # User avatar
+        liked_count=interact_info.get("liked_count"),  # Like count
+        collected_count=interact_info.get("collected_count"),  # Collection count
+        comment_count=interact_info.get("comment_count"),  # Comment count
+        share_count=interact_info.get("share_count"),  # Share count
+        ip_location=note_item.get("ip_location", ""),  # IP location
+        image_list=','.join([img.get('url', '') for img in image_list]),  # Image URLs
+        tag_list=','.join([tag.get('name', '') for tag in tag_list if tag.get('type') == 'topic']),  # Tags
+        last_modify_ts=utils.get_current_timestamp(),  # Last modification timestamp (Generated by LittleCrawler, mainly used to record the latest update time of a record in DB storage)
+        note_url=f"https://www.xiaohongshu.com/explore/{note_id}?xsec_token={note_item.get('xsec_token')}&xsec_source=pc_search",  # Note URL
+        source_keyword=source_keyword_var.get(),  # Search keyword
+        xsec_token=note_item.get("xsec_token"),  # xsec_token
+    )
+    if config.ENABLE_RECORD_VALIDATION:
+        local_db_item.validate()
+    return local_db_item
+
+
+async def update_xhs_note(note_item: Dict):
+    """
+    Update Xiaohongshu note
+    Args:
+        note_item:
+
+    Returns:
+
+    """
+    local_db_item = build_xhs_note_item(note_item)
     utils.logger.info(f"[store.xhs.update_xhs_note] xhs note: {local_db_item}")
     await XhsStoreFactory.create_store().store_content(local_db_item)
 
@@ -123,12 +168,12 @@ async def batch_update_xhs_note_comments(note_id: str, comments: List[Dict]):
         await update_xhs_note_comment(note_id, comment_item)
 
 
-async def update_xhs_note_comment(note_id: str, comment_item: Dict):
+def build_xhs_comment_item(note_id: str, comment_item: Dict) -> XhsNoteCommentRecord:
     """
-    Update Xiaohongshu note comment
+    Normalize a comment to the stored comment record
     Args:
         note_id:
-        comment_item:
+        comment_item: Comment from the comment page APIs
 
     Returns:
 
@@ -137,28 +182,44 @@ async def update_xhs_note_comment(note_id: str, comment_item: Dict):
     comment_id = comment_item.get("id")
     comment_pictures = [item.get("url_default", "") for item in comment_item.get("pictures", [])]
     target_comment = comment_item.get("target_comment", {})
-    local_db_item = {
-        "comment_id": comment_id,  # Comment ID
-        "create_time": comment_item.get("create_time"),  # Comment time
-        "ip_location": comment_item.get("ip_location"),  # IP location
-        "note_id": note_id,  # Note ID
-        "content": comment_item.get("content"),  # Comment content
-        "user_id": user_info.get("user_id"),  # User ID
-        "nickname": user_info.get("nickname"),  # User nickname
-        "avatar": user_info.get("image"),  # User avatar
-        "sub_comment_count": comment_item.get("sub_comment_count", 0),  # Sub-comment count
-        "pictures": ",".join(comment_pictures),  # Comment pictures
-        "parent_comment_id": target_comment.get("id", 0),  # Parent comment ID
-        "last_modify_ts": utils.get_current_timestamp(),  # Last modification timestamp (Generated by LittleCrawler, mainly used to record the latest update time of a record in DB storage)
-        "like_count": comment_item.get("like_count", 0),
-    }
+    local_db_item = XhsNoteCommentRecord(
+        comment_id=comment_id,  # Comment ID
+        create_time=comment_item.get("create_time"),  # Comment time
+        ip_location=comment_item.get("ip_location"),  # IP location
+        note_id=note_id,  # Note ID
+        content=comment_item.get("content"),  # Comment content
+        user_id=user_info.get("user_id"),  # User ID
+        nickname=user_info.get("nickname"),  # User nickname
+        avatar=user_info.get("image"),  # User avatar
+        sub_comment_count=comment_item.get("sub_comment_count", 0),  # Sub-comment count
+        pictures=",".join(comment_pictures),  # Comment pictures
+        parent_comment_id=target_comment.get("id", 0),  # Parent comment ID
+        last_modify_ts=utils.get_current_timestamp(),  # Last modification timestamp (Generated by LittleCrawler, mainly used to record the latest update time of a record in DB storage)
+        like_count=comment_item.get("like_count", 0),
+    )
+    if config.ENABLE_RECORD_VALIDATION:
+        local_db_item.validate()
+    return local_db_item
+
+
+async def update_xhs_note_comment(note_id: str, comment_item: Dict):
+    """
+    Update Xiaohongshu note comment
+    Args:
+        note_id:
+        comment_item:
+
+    Returns:
+
+    """
+    local_db_item = build_xhs_comment_item(note_id, comment_item)
     utils.logger.info(f"[store.xhs.update_xhs_note_comment] xhs note comment:{local_db_item}")
     await XhsStoreFactory.create_store().store_comment(local_db_item)
 
 
-async def save_creator(user_id: str, creator: Dict):
+def build_xhs_creator_item(user_id: str, creator: Dict) -> Dict:
     """
-    Save Xiaohongshu creator
+    Normalize creator info from the profile page to the stored creator record
     Args:
         user_id:
         creator:
@@ -197,10 +258,24 @@ async def save_creator(user_id: str, creator: Dict):
         'follows': follows,  # Following count
         'fans': fans,  # Fans count
         'interaction': interaction,  # Interaction count
-        'tag_list': json.dumps({tag.get('tagType'): tag.get('name')
-                                for tag in creator.get('tags')}, ensure_ascii=False),  # Tags
+        'tag_list': codec.dumps({tag.get('tagType'): tag.get('name')
+                                 for tag in creator.get('tags')}),  # Tags
         "last_modify_ts": utils.get_current_timestamp(),  # Last modification timestamp (Generated by LittleCrawler, mainly used to record the latest update time of a record in DB storage)
     }
+    return local_db_item
+
+
+async def save_creator(user_id: str, creator: Dict):
+    """
+    Save Xiaohongshu creator
+    Args:
+        user_id:
+        creator:
+
+    Returns:
+
+    """
+    local_db_item = build_xhs_creator_item(user_id, creator)
     utils.logger.info(f"[store.xhs.save_creator] creator:{local_db_item}")
     await XhsStoreFactory.create_store().store_creator(local_db_item)
 
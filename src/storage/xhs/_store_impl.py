@@ -1,15 +1,17 @@
 # @Author  : persist1@126.com
 # @Time    : 2025/9/5 19:34
 # @Desc    : Xiaohongshu storage implementation class
-import json
+import asyncio
 import os
 from datetime import datetime
 from typing import List, Dict, Any
 
-from sqlalchemy import select, update, delete
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+import config
+from config import db_config
 from src.core.base_crawler import AbstractStore
 from src.storage.base.db_session import get_session
 from src.storage.base.models import XhsNote, XhsNoteComment, XhsCreator
@@ -18,7 +20,10 @@ from src.utils.async_file_writer import AsyncFileWriter
 from src.utils.time_util import get_current_timestamp
 from src.core.var import crawler_type_var
 from src.storage.base.mongodb_store_base import MongoDBStoreBase
-from src.utils import utils
+from src.storage.base.sqlite_writer import SqliteWriter, UpsertSpec
+from src.storage.base.parquet_store_base import ParquetStoreBase, STRING, INT64, fields_from_model
+from src.models.m_xiaohongshu import XhsNoteCommentRecord, XhsNoteRecord
+from src.utils import codec, utils
 from src.storage.base.excel_store_base import ExcelStoreBase
 
 class XhsCsvStoreImplement(AbstractStore):
@@ -46,15 +51,16 @@ class XhsCsvStoreImplement(AbstractStore):
     async def store_creator(self, creator_item: Dict):
         pass
 
-    def flush(self):
-        pass
-
 
 class XhsJsonStoreImplement(AbstractStore):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.writer = AsyncFileWriter(platform="xhs", crawler_type=crawler_type_var.get())
 
+    async def close(self):
+        """Generate the comment wordcloud once the run is finished (ENABLE_GET_WORDCLOUD)"""
+        await self.writer.generate_wordcloud_from_comments()
+
     async def store_content(self, content_item: Dict):
         """
         store content data to json file
@@ -74,16 +80,28 @@ class XhsJsonStoreImplement(AbstractStore):
     async def store_creator(self, creator_item: Dict):
         pass
 
-    def flush(self):
-        """
-        flush data to json file
-        :return:
-        """
-        pass
 
 
+class XhsJsonlStoreImplement(AbstractStore):
+    """Xiaohongshu JSON Lines storage implementation, appends one record per line"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.writer = AsyncFileWriter(platform="xhs", crawler_type=crawler_type_var.get())
+
+    async def store_content(self, content_item: Dict):
+        await self.writer.write_to_jsonl(item_type="contents", item=content_item)
+
+    async def store_comment(self, comment_item: Dict):
+        await self.writer.write_to_jsonl(item_type="comments", item=comment_item)
+
+    async def store_creator(self, creator: Dict):
+        await self.writer.write_to_jsonl(item_type="creators", item=creator)
+
 
 class XhsDbStoreImplement(AbstractStore):
+    db_type = "db"
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
@@ -91,16 +109,20 @@ class XhsDbStoreImplement(AbstractStore):
         note_id = content_item.get("note_id")
         if not note_id:
             return
-        async with get_session() as session:
+        async with get_session(self.db_type) as session:
             if await self.content_is_exist(session, note_id):
                 await self.update_content(session, content_item)
             else:
                 await self.add_content(session, content_item)
 
     async def add_content(self, session: AsyncSession, content_item: Dict):
+        await session.execute(insert(XhsNote).values(self._content_row(content_item)))
+
+    @staticmethod
+    def _content_row(content_item: Dict) -> Dict:
         add_ts = int(get_current_timestamp())
         last_modify_ts = int(get_current_timestamp())
-        note = XhsNote(
+        return dict(
             user_id=content_item.get("user_id"),
             nickname=content_item.get("nickname"),
             avatar=content_item.get("avatar"),
@@ -118,13 +140,12 @@ class XhsDbStoreImplement(AbstractStore):
             collected_count=str(content_item.get("collected_count")),
             comment_count=str(content_item.get("comment_count")),
             share_count=str(content_item.get("share_count")),
-            image_list=json.dumps(content_item.get("image_list")),
-            tag_list=json.dumps(content_item.get("tag_list")),
+            image_list=codec.dumps(content_item.get("image_list")),
+            tag_list=codec.dumps(content_item.get("tag_list")),
             note_url=content_item.get("note_url"),
             source_keyword=content_item.get("source_keyword", ""),
             xsec_token=content_item.get("xsec_token", "")
         )
-        session.add(note)
 
     async def update_content(self, session: AsyncSession, content_item: Dict):
         note_id = content_item.get("note_id")
@@ -148,7 +169,7 @@ class XhsDbStoreImplement(AbstractStore):
     async def store_comment(self, comment_item: Dict):
         if not comment_item:
             return
-        async with get_session() as session:
+        async with get_session(self.db_type) as session:
             comment_id = comment_item.get("comment_id")
             if not comment_id:
                 return
@@ -158,9 +179,13 @@ class XhsDbStoreImplement(AbstractStore):
                 await self.add_comment(session, comment_item)
 
     async def add_comment(self, session: AsyncSession, comment_item: Dict):
+        await session.execute(insert(XhsNoteComment).values(self._comment_row(comment_item)))
+
+    @staticmethod
+    def _comment_row(comment_item: Dict) -> Dict:
         add_ts = int(get_current_timestamp())
         last_modify_ts = int(get_current_timestamp())
-        comment = XhsNoteComment(
+        return dict(
             user_id=comment_item.get("user_id"),
             nickname=comment_item.get("nickname"),
             avatar=comment_item.get("avatar"),
@@ -172,11 +197,10 @@ class XhsDbStoreImplement(AbstractStore):
             note_id=comment_item.get("note_id"),
             content=comment_item.get("content"),
             sub_comment_count=comment_item.get("sub_comment_count"),
-            pictures=json.dumps(comment_item.get("pictures")),
+            pictures=codec.dumps(comment_item.get("pictures")),
             parent_comment_id=comment_item.get("parent_comment_id"),
             like_count=str(comment_item.get("like_count"))
         )
-        session.add(comment)
 
     async def update_comment(self, session: AsyncSession, comment_item: Dict):
         comment_id = comment_item.get("comment_id")
@@ -198,16 +222,20 @@ class XhsDbStoreImplement(AbstractStore):
         user_id = creator_item.get("user_id")
         if not user_id:
             return
-        async with get_session() as session:
+        async with get_session(self.db_type) as session:
             if await self.creator_is_exist(session, user_id):
                 await self.update_creator(session, creator_item)
             else:
                 await self.add_creator(session, creator_item)
 
     async def add_creator(self, session: AsyncSession, creator_item: Dict):
+        await session.execute(insert(XhsCreator).values(self._creator_row(creator_item)))
+
+    @staticmethod
+    def _creator_row(creator_item: Dict) -> Dict:
         add_ts = int(get_current_timestamp())
         last_modify_ts = int(get_current_timestamp())
-        creator = XhsCreator(
+        return dict(
             user_id=creator_item.get("user_id"),
             nickname=creator_item.get("nickname"),
             avatar=creator_item.get("avatar"),
@@ -219,9 +247,8 @@ class XhsDbStoreImplement(AbstractStore):
             follows=str(creator_item.get("follows")),
             fans=str(creator_item.get("fans")),
             interaction=str(creator_item.get("interaction")),
-            tag_list=json.dumps(creator_item.get("tag_list"))
+            tag_list=codec.dumps(creator_item.get("tag_list"))
         )
-        session.add(creator)
 
     async def update_creator(self, session: AsyncSession, creator_item: Dict):
         user_id = creator_item.get("user_id")
@@ -234,7 +261,7 @@ class XhsDbStoreImplement(AbstractStore):
             "follows": str(creator_item.get("follows")),
             "fans": str(creator_item.get("fans")),
             "interaction": str(creator_item.get("interaction")),
-            "tag_list": json.dumps(creator_item.get("tag_list"))
+            "tag_list": codec.dumps(creator_item.get("tag_list"))
         }
         stmt = update(XhsCreator).where(XhsCreator.user_id == user_id).values(**update_data)
         await session.execute(stmt)
@@ -245,21 +272,69 @@ class XhsDbStoreImplement(AbstractStore):
         return result.first() is not None
 
     async def get_all_content(self) -> List[Dict]:
-        async with get_session() as session:
+        async with get_session(self.db_type) as session:
             stmt = select(XhsNote)
             result = await session.execute(stmt)
             return [item.__dict__ for item in result.scalars().all()]
 
     async def get_all_comments(self) -> List[Dict]:
-        async with get_session() as session:
+        async with get_session(self.db_type) as session:
             stmt = select(XhsNoteComment)
             result = await session.execute(stmt)
             return [item.__dict__ for item in result.scalars().all()]
 
 
 class XhsSqliteStoreImplement(XhsDbStoreImplement):
+    """Xiaohongshu SQLite storage implementation, writes through the single writer thread when enabled"""
+
+    db_type = "sqlite"
+
+    content_spec = UpsertSpec.from_model(
+        XhsNote, key="note_id",
+        update_columns=("last_modify_ts", "liked_count", "collected_count", "comment_count", "share_count", "last_update_time"),
+    )
+    comment_spec = UpsertSpec.from_model(
+        XhsNoteComment, key="comment_id",
+        update_columns=("last_modify_ts", "like_count", "sub_comment_count"),
+    )
+    creator_spec = UpsertSpec.from_model(
+        XhsCreator, key="user_id",
+        update_columns=("last_modify_ts", "nickname", "avatar", "desc", "follows", "fans", "interaction", "tag_list"),
+    )
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        self.writer = SqliteWriter.get_instance() if db_config.SQLITE_SINGLE_WRITER else None
+
+    async def flush(self):
+        if self.writer is not None:
+            await self.writer.flush()
+
+    async def close(self):
+        if self.writer is not None:
+            await asyncio.to_thread(SqliteWriter.close_all)
+            self.writer = None
+
+    async def store_content(self, content_item: Dict):
+        if self.writer is None:
+            return await super().store_content(content_item)
+        if not content_item.get("note_id"):
+            return
+        await self.writer.submit(self.content_spec, self._content_row(content_item))
+
+    async def store_comment(self, comment_item: Dict):
+        if self.writer is None:
+            return await super().store_comment(comment_item)
+        if not comment_item or not comment_item.get("comment_id"):
+            return
+        await self.writer.submit(self.comment_spec, self._comment_row(comment_item))
+
+    async def store_creator(self, creator_item: Dict):
+        if self.writer is None:
+            return await super().store_creator(creator_item)
+        if not creator_item.get("user_id"):
+            return
+        await self.writer.submit(self.creator_spec, self._creator_row(creator_item))
 
 
 class XhsMongoStoreImplement(AbstractStore):
@@ -269,6 +344,9 @@ class XhsMongoStoreImplement(AbstractStore):
         super().__init__(**kwargs)
         self.mongo_store = MongoDBStoreBase(collection_prefix="xhs")
 
+    async def flush(self):
+        await MongoDBStoreBase.flush_all()
+
     async def store_content(self, content_item: Dict):
         """
         Store note content to MongoDB
@@ -284,7 +362,7 @@ class XhsMongoStoreImplement(AbstractStore):
             query={"note_id": note_id},
             data=content_item
         )
-        utils.logger.info(f"[XhsMongoStoreImplement.store_content] Saved note {note_id} to MongoDB")
+        utils.logger.debug(f"[XhsMongoStoreImplement.store_content] Queued note {note_id} for MongoDB")
 
     async def store_comment(self, comment_item: Dict):
         """
@@ -301,7 +379,7 @@ class XhsMongoStoreImplement(AbstractStore):
             query={"comment_id": comment_id},
             data=comment_item
         )
-        utils.logger.info(f"[XhsMongoStoreImplement.store_comment] Saved comment {comment_id} to MongoDB")
+        utils.logger.debug(f"[XhsMongoStoreImplement.store_comment] Queued comment {comment_id} for MongoDB")
 
     async def store_creator(self, creator_item: Dict):
         """
@@ -318,15 +396,36 @@ class XhsMongoStoreImplement(AbstractStore):
             query={"user_id": user_id},
             data=creator_item
         )
-        utils.logger.info(f"[XhsMongoStoreImplement.store_creator] Saved creator {user_id} to MongoDB")
+        utils.logger.debug(f"[XhsMongoStoreImplement.store_creator] Queued creator {user_id} for MongoDB")
 
 
 class XhsExcelStoreImplement:
     """Xiaohongshu Excel storage implementation - Global singleton"""
 
     def __new__(cls, *args, **kwargs):
-        from src.storage.base.excel_store_base import ExcelStoreBase
-        return ExcelStoreBase.get_instance(
+        from src.storage.base.excel_store_base import ExcelStoreBase, StreamingExcelStoreBase
+        store_class = StreamingExcelStoreBase if config.EXCEL_STREAMING_MODE else ExcelStoreBase
+        return store_class.get_instance(
             platform="xhs",
             crawler_type=crawler_type_var.get()
         )
+
+
+# Fixed Parquet schema per entity, counts stay strings because the API returns values like "1.2万"
+XHS_PARQUET_FIELDS = {
+    "contents": fields_from_model(XhsNoteRecord),
+    "comments": fields_from_model(XhsNoteCommentRecord),
+    "creators": {
+        "user_id": STRING, "nickname": STRING, "gender": STRING, "avatar": STRING, "desc": STRING,
+        "ip_location": STRING, "follows": STRING, "fans": STRING, "interaction": STRING,
+        "tag_list": STRING, "last_modify_ts": INT64,
+    },
+}
+
+
+class XhsParquetStoreImplement(ParquetStoreBase):
+    """Xiaohongshu Parquet storage implementation"""
+
+    def __init__(self, **kwargs):
+        super().__init__(platform="xhs", entity_fields=XHS_PARQUET_FIELDS, crawler_type=crawler_type_var.get())
+
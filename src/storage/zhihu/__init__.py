@@ -1,16 +1,19 @@
 
 # -*- coding: utf-8 -*-
-from typing import List
+from typing import List, Optional
 
 import config
 from src.core.base_crawler import AbstractStore
+from src.storage.base.fanout_store import FanOutStore, get_save_data_options
 from src.models.m_zhihu import ZhihuComment, ZhihuContent, ZhihuCreator
 from ._store_impl import (ZhihuCsvStoreImplement,
                                           ZhihuDbStoreImplement,
                                           ZhihuJsonStoreImplement,
+                                          ZhihuJsonlStoreImplement,
                                           ZhihuSqliteStoreImplement,
                                           ZhihuMongoStoreImplement,
-                                          ZhihuExcelStoreImplement)
+                                          ZhihuExcelStoreImplement,
+                                          ZhihuParquetStoreImplement)
 from src.utils import utils
 from src.core.var import source_keyword_var
 
@@ -20,17 +23,44 @@ class ZhihuStoreFactory:
         "csv": ZhihuCsvStoreImplement,
         "db": ZhihuDbStoreImplement,
         "json": ZhihuJsonStoreImplement,
+        "jsonl": ZhihuJsonlStoreImplement,
         "sqlite": ZhihuSqliteStoreImplement,
         "mongodb": ZhihuMongoStoreImplement,
         "excel": ZhihuExcelStoreImplement,
+        "parquet": ZhihuParquetStoreImplement,
     }
 
+    _store: Optional[AbstractStore] = None
+
     @staticmethod
     def create_store() -> AbstractStore:
-        store_class = ZhihuStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
-        if not store_class:
-            raise ValueError("[ZhihuStoreFactory.create_store] Invalid save option only supported csv or db or json or sqlite or mongodb or excel ...")
-        return store_class()
+        """
+        Get the store of the current run, it is created once and reused for every record
+        When SAVE_DATA_OPTION lists several options (e.g. "sqlite,jsonl") records are fanned out to all of them
+        """
+        if ZhihuStoreFactory._store is None:
+            stores = []
+            for option in get_save_data_options():
+                store_class = ZhihuStoreFactory.STORES.get(option)
+                if not store_class:
+                    raise ValueError(f"[ZhihuStoreFactory.create_store] Invalid save option {option!r}, only supported csv or db or json or sqlite or jsonl or mongodb or excel or parquet ...")
+                stores.append((option, store_class()))
+            ZhihuStoreFactory._store = stores[0][1] if len(stores) == 1 else FanOutStore(stores)
+        return ZhihuStoreFactory._store
+
+    @staticmethod
+    async def open_store() -> AbstractStore:
+        """Create and open the store, called by the crawler before crawling"""
+        store = ZhihuStoreFactory.create_store()
+        await store.open()
+        return store
+
+    @staticmethod
+    async def close_store():
+        """Flush and close the store, called by the crawler after crawling"""
+        store, ZhihuStoreFactory._store = ZhihuStoreFactory._store, None
+        if store is not None:
+            await store.close()
 
 async def batch_update_zhihu_contents(contents: List[ZhihuContent]):
     """
@@ -47,6 +77,22 @@ async def batch_update_zhihu_contents(contents: List[ZhihuContent]):
     for content_item in contents:
         await update_zhihu_content(content_item)
 
+def build_zhihu_content_item(content_item: ZhihuContent) -> ZhihuContent:
+    """
+    Normalize a Zhihu content record for the stores, the record itself is handed to the sinks
+    Args:
+        content_item:
+
+    Returns:
+
+    """
+    content_item.source_keyword = source_keyword_var.get()
+    content_item.last_modify_ts = utils.get_current_timestamp()
+    if config.ENABLE_RECORD_VALIDATION:
+        content_item.validate()
+    return content_item
+
+
 async def update_zhihu_content(content_item: ZhihuContent):
     """
     Update Zhihu content
@@ -56,9 +102,7 @@ async def update_zhihu_content(content_item: ZhihuContent):
     Returns:
 
     """
-    content_item.source_keyword = source_keyword_var.get()
-    local_db_item = content_item.model_dump()
-    local_db_item.update({"last_modify_ts": utils.get_current_timestamp()})
+    local_db_item = build_zhihu_content_item(content_item)
     utils.logger.info(f"[store.zhihu.update_zhihu_content] zhihu content: {local_db_item}")
     await ZhihuStoreFactory.create_store().store_content(local_db_item)
 
@@ -80,6 +124,21 @@ async def batch_update_zhihu_note_comments(comments: List[ZhihuComment]):
         await update_zhihu_content_comment(comment_item)
 
 
+def build_zhihu_comment_item(comment_item: ZhihuComment) -> ZhihuComment:
+    """
+    Normalize a Zhihu comment record for the stores, the record itself is handed to the sinks
+    Args:
+        comment_item:
+
+    Returns:
+
+    """
+    comment_item.last_modify_ts = utils.get_current_timestamp()
+    if config.ENABLE_RECORD_VALIDATION:
+        comment_item.validate()
+    return comment_item
+
+
 async def update_zhihu_content_comment(comment_item: ZhihuComment):
     """
     Update Zhihu content comment
@@ -89,12 +148,26 @@ async def update_zhihu_content_comment(comment_item: ZhihuComment):
     Returns:
 
     """
-    local_db_item = comment_item.model_dump()
-    local_db_item.update({"last_modify_ts": utils.get_current_timestamp()})
+    local_db_item = build_zhihu_comment_item(comment_item)
     utils.logger.info(f"[store.zhihu.update_zhihu_note_comment] zhihu content comment:{local_db_item}")
     await ZhihuStoreFactory.create_store().store_comment(local_db_item)
 
 
+def build_zhihu_creator_item(creator: ZhihuCreator) -> ZhihuCreator:
+    """
+    Normalize a Zhihu creator record for the stores, the record itself is handed to the sinks
+    Args:
+        creator:
+
+    Returns:
+
+    """
+    creator.last_modify_ts = utils.get_current_timestamp()
+    if config.ENABLE_RECORD_VALIDATION:
+        creator.validate()
+    return creator
+
+
 async def save_creator(creator: ZhihuCreator):
     """
     Save Zhihu creator information
@@ -106,6 +179,5 @@ async def save_creator(creator: ZhihuCreator):
     """
     if not creator:
         return
-    local_db_item = creator.model_dump()
-    local_db_item.update({"last_modify_ts": utils.get_current_timestamp()})
+    local_db_item = build_zhihu_creator_item(creator)
     await ZhihuStoreFactory.create_store().store_creator(local_db_item)
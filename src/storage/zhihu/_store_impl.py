@@ -11,10 +11,11 @@ import pathlib
 from typing import Dict
 
 import aiofiles
-from sqlalchemy import select
+from sqlalchemy import insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 import config
+from config import db_config
 from src.core.base_crawler import AbstractStore
 from src.storage.base.db_session import get_session
 from src.storage.base.models import ZhihuContent, ZhihuComment, ZhihuCreator
@@ -22,6 +23,11 @@ from src.utils import utils, words
 from src.core.var import crawler_type_var
 from src.utils.async_file_writer import AsyncFileWriter
 from src.storage.base.mongodb_store_base import MongoDBStoreBase
+from src.storage.base.sqlite_writer import SqliteWriter, UpsertSpec
+from src.storage.base.parquet_store_base import ParquetStoreBase, fields_from_model
+from src.models.m_zhihu import (ZhihuContent as ZhihuContentModel,
+                                ZhihuComment as ZhihuCommentModel,
+                                ZhihuCreator as ZhihuCreatorModel)
 
 def calculate_number_of_files(file_store_path: str) -> int:
     """Calculate the prefix sorting number for data save files, supporting writing to different files for each run
@@ -77,7 +83,26 @@ class ZhihuCsvStoreImplement(AbstractStore):
         await self.writer.write_to_csv(item_type="creators", item=creator)
 
 
+class ZhihuJsonlStoreImplement(AbstractStore):
+    """Zhihu JSON Lines storage implementation, appends one record per line"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.writer = AsyncFileWriter(platform="zhihu", crawler_type=crawler_type_var.get())
+
+    async def store_content(self, content_item: Dict):
+        await self.writer.write_to_jsonl(item_type="contents", item=content_item)
+
+    async def store_comment(self, comment_item: Dict):
+        await self.writer.write_to_jsonl(item_type="comments", item=comment_item)
+
+    async def store_creator(self, creator: Dict):
+        await self.writer.write_to_jsonl(item_type="creators", item=creator)
+
+
 class ZhihuDbStoreImplement(AbstractStore):
+    db_type = "db"
+
     async def store_content(self, content_item: Dict):
         """
         Zhihu content DB storage implementation
@@ -85,16 +110,12 @@ class ZhihuDbStoreImplement(AbstractStore):
             content_item: content item dict
         """
         content_id = content_item.get("content_id")
-        async with get_session() as session:
-            stmt = select(ZhihuContent).where(ZhihuContent.content_id == content_id)
-            result = await session.execute(stmt)
-            existing_content = result.scalars().first()
-            if existing_content:
-                for key, value in content_item.items():
-                    setattr(existing_content, key, value)
-            else:
-                new_content = ZhihuContent(**content_item)
-                session.add(new_content)
+        row = dict(content_item)
+        async with get_session(self.db_type) as session:
+            # Plain UPDATE/INSERT statements, no ORM object is loaded or built per record
+            result = await session.execute(update(ZhihuContent).where(ZhihuContent.content_id == content_id).values(row))
+            if result.rowcount == 0:
+                await session.execute(insert(ZhihuContent).values(row))
             await session.commit()
 
     async def store_comment(self, comment_item: Dict):
@@ -104,16 +125,12 @@ class ZhihuDbStoreImplement(AbstractStore):
             comment_item: comment item dict
         """
         comment_id = comment_item.get("comment_id")
-        async with get_session() as session:
-            stmt = select(ZhihuComment).where(ZhihuComment.comment_id == comment_id)
-            result = await session.execute(stmt)
-            existing_comment = result.scalars().first()
-            if existing_comment:
-                for key, value in comment_item.items():
-                    setattr(existing_comment, key, value)
-            else:
-                new_comment = ZhihuComment(**comment_item)
-                session.add(new_comment)
+        row = dict(comment_item)
+        async with get_session(self.db_type) as session:
+            # Plain UPDATE/INSERT statements, no ORM object is loaded or built per record
+            result = await session.execute(update(ZhihuComment).where(ZhihuComment.comment_id == comment_id).values(row))
+            if result.rowcount == 0:
+                await session.execute(insert(ZhihuComment).values(row))
             await session.commit()
 
     async def store_creator(self, creator: Dict):
@@ -123,16 +140,12 @@ class ZhihuDbStoreImplement(AbstractStore):
             creator: creator dict
         """
         user_id = creator.get("user_id")
-        async with get_session() as session:
-            stmt = select(ZhihuCreator).where(ZhihuCreator.user_id == user_id)
-            result = await session.execute(stmt)
-            existing_creator = result.scalars().first()
-            if existing_creator:
-                for key, value in creator.items():
-                    setattr(existing_creator, key, value)
-            else:
-                new_creator = ZhihuCreator(**creator)
-                session.add(new_creator)
+        row = dict(creator)
+        async with get_session(self.db_type) as session:
+            # Plain UPDATE/INSERT statements, no ORM object is loaded or built per record
+            result = await session.execute(update(ZhihuCreator).where(ZhihuCreator.user_id == user_id).values(row))
+            if result.rowcount == 0:
+                await session.execute(insert(ZhihuCreator).values(row))
             await session.commit()
 
 
@@ -141,6 +154,10 @@ class ZhihuJsonStoreImplement(AbstractStore):
         super().__init__(**kwargs)
         self.writer = AsyncFileWriter(platform="zhihu", crawler_type=crawler_type_var.get())
 
+    async def close(self):
+        """Generate the comment wordcloud once the run is finished (ENABLE_GET_WORDCLOUD)"""
+        await self.writer.generate_wordcloud_from_comments()
+
     async def store_content(self, content_item: Dict):
         """
         content JSON storage implementation
@@ -178,8 +195,48 @@ class ZhihuJsonStoreImplement(AbstractStore):
 class ZhihuSqliteStoreImplement(ZhihuDbStoreImplement):
     """
     Zhihu content SQLite storage implementation
+    Writes through the single writer thread when SQLITE_SINGLE_WRITER is enabled
     """
-    pass
+
+    db_type = "sqlite"
+
+    content_spec = UpsertSpec.from_model(ZhihuContent, key="content_id")
+    comment_spec = UpsertSpec.from_model(ZhihuComment, key="comment_id")
+    creator_spec = UpsertSpec.from_model(ZhihuCreator, key="user_id")
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.writer = SqliteWriter.get_instance() if db_config.SQLITE_SINGLE_WRITER else None
+
+    async def flush(self):
+        if self.writer is not None:
+            await self.writer.flush()
+
+    async def close(self):
+        if self.writer is not None:
+            await asyncio.to_thread(SqliteWriter.close_all)
+            self.writer = None
+
+    async def store_content(self, content_item: Dict):
+        if self.writer is None:
+            return await super().store_content(content_item)
+        if not content_item.get("content_id"):
+            return
+        await self.writer.submit(self.content_spec, content_item)
+
+    async def store_comment(self, comment_item: Dict):
+        if self.writer is None:
+            return await super().store_comment(comment_item)
+        if not comment_item.get("comment_id"):
+            return
+        await self.writer.submit(self.comment_spec, comment_item)
+
+    async def store_creator(self, creator: Dict):
+        if self.writer is None:
+            return await super().store_creator(creator)
+        if not creator.get("user_id"):
+            return
+        await self.writer.submit(self.creator_spec, creator)
 
 
 class ZhihuMongoStoreImplement(AbstractStore):
@@ -188,22 +245,25 @@ class ZhihuMongoStoreImplement(AbstractStore):
     def __init__(self):
         self.mongo_store = MongoDBStoreBase(collection_prefix="zhihu")
 
+    async def flush(self):
+        await MongoDBStoreBase.flush_all()
+
     async def store_content(self, content_item: Dict):
         """
         Store content to MongoDB
         Args:
             content_item: Content data
         """
-        note_id = content_item.get("note_id")
-        if not note_id:
+        content_id = content_item.get("content_id")
+        if not content_id:
             return
 
         await self.mongo_store.save_or_update(
             collection_suffix="contents",
-            query={"note_id": note_id},
+            query={"content_id": content_id},
             data=content_item
         )
-        utils.logger.info(f"[ZhihuMongoStoreImplement.store_content] Saved note {note_id} to MongoDB")
+        utils.logger.debug(f"[ZhihuMongoStoreImplement.store_content] Queued content {content_id} for MongoDB")
 
     async def store_comment(self, comment_item: Dict):
         """
@@ -220,7 +280,7 @@ class ZhihuMongoStoreImplement(AbstractStore):
             query={"comment_id": comment_id},
             data=comment_item
         )
-        utils.logger.info(f"[ZhihuMongoStoreImplement.store_comment] Saved comment {comment_id} to MongoDB")
+        utils.logger.debug(f"[ZhihuMongoStoreImplement.store_comment] Queued comment {comment_id} for MongoDB")
 
     async def store_creator(self, creator_item: Dict):
         """
@@ -237,15 +297,32 @@ class ZhihuMongoStoreImplement(AbstractStore):
             query={"user_id": user_id},
             data=creator_item
         )
-        utils.logger.info(f"[ZhihuMongoStoreImplement.store_creator] Saved creator {user_id} to MongoDB")
+        utils.logger.debug(f"[ZhihuMongoStoreImplement.store_creator] Queued creator {user_id} for MongoDB")
 
 
 class ZhihuExcelStoreImplement:
     """Zhihu Excel storage implementation - Global singleton"""
 
     def __new__(cls, *args, **kwargs):
-        from src.storage.base.excel_store_base import ExcelStoreBase
-        return ExcelStoreBase.get_instance(
+        from src.storage.base.excel_store_base import ExcelStoreBase, StreamingExcelStoreBase
+        store_class = StreamingExcelStoreBase if config.EXCEL_STREAMING_MODE else ExcelStoreBase
+        return store_class.get_instance(
             platform="zhihu",
             crawler_type=crawler_type_var.get()
         )
+
+
+# Fixed Parquet schema per entity, derived from the record types the crawler produces
+ZHIHU_PARQUET_FIELDS = {
+    "contents": fields_from_model(ZhihuContentModel),
+    "comments": fields_from_model(ZhihuCommentModel),
+    "creators": fields_from_model(ZhihuCreatorModel),
+}
+
+
+class ZhihuParquetStoreImplement(ParquetStoreBase):
+    """Zhihu Parquet storage implementation"""
+
+    def __init__(self, **kwargs):
+        super().__init__(platform="zhihu", entity_fields=ZHIHU_PARQUET_FIELDS, crawler_type=crawler_type_var.get())
+
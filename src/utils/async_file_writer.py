@@ -2,11 +2,10 @@
 """
 异步文件写入模块
 
-提供线程安全的异步文件写入功能，支持 CSV 和 JSON 格式。
+提供线程安全的异步文件写入功能，支持 CSV、JSON 和 JSONL 格式。
 """
 import asyncio
 import csv
-import json
 import os
 import pathlib
 from typing import Dict, List
@@ -14,6 +13,7 @@ from typing import Dict, List
 import aiofiles
 
 import config
+from src.utils import codec
 from src.utils.utils import utils
 from src.utils.words import AsyncWordCloudGenerator
 
@@ -41,7 +41,7 @@ class AsyncFileWriter:
         生成文件保存路径
 
         Args:
-            file_type: 文件类型 (csv/json)
+            file_type: 文件类型 (csv/json/jsonl)
             item_type: 数据类型 (contents/comments)
 
         Returns:
@@ -87,16 +87,30 @@ class AsyncFileWriter:
                     try:
                         content = await f.read()
                         if content:
-                            existing_data = json.loads(content)
+                            existing_data = codec.loads(content)
                         if not isinstance(existing_data, list):
                             existing_data = [existing_data]
-                    except json.JSONDecodeError:
+                    except codec.JSONDecodeError:
                         existing_data = []
 
             existing_data.append(item)
 
             async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
-                await f.write(json.dumps(existing_data, ensure_ascii=False, indent=4))
+                await f.write(codec.dumps(existing_data, indent=True))
+
+    async def write_to_jsonl(self, item: Dict, item_type: str):
+        """
+        异步追加单条数据到 JSONL 文件（每行一条 JSON，无需重写整个文件）
+
+        Args:
+            item: 要写入的数据字典
+            item_type: 数据类型
+        """
+        file_path = self._get_file_path("jsonl", item_type)
+        line = codec.dumps(item) + "\n"
+        async with self.lock:
+            async with aiofiles.open(file_path, "a", encoding="utf-8") as f:
+                await f.write(line)
 
     async def generate_wordcloud_from_comments(self):
         """
@@ -130,7 +144,7 @@ class AsyncFileWriter:
                     )
                     return
 
-                comments_data = json.loads(content)
+                comments_data = codec.loads(content)
                 if not isinstance(comments_data, list):
                     comments_data = [comments_data]
 
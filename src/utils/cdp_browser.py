@@ -10,7 +10,7 @@ from playwright.async_api import Browser, BrowserContext, Playwright
 
 import config
 from src.utils.browser_launcher import BrowserLauncher
-from src.utils import utils
+from src.utils import codec, utils
 
 
 class CDPBrowserManager:
@@ -215,7 +215,7 @@ class CDPBrowserManager:
                     f"http://localhost:{debug_port}/json/version", timeout=10
                 )
                 if response.status_code == 200:
-                    data = response.json()
+                    data = codec.loads(response.content)
                     ws_url = data.get("webSocketDebuggerUrl")
                     if ws_url:
                         utils.logger.info(
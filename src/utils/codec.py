@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+JSON 编解码
+
+签名、请求体、响应解析、存储和 API 响应统一使用这里的 dumps/loads，按已安装的库选择后端：
+- orjson > msgspec > 标准库 json，orjson 和 msgspec 均为可选依赖（pip install orjson）
+- dumps 默认输出紧凑格式且不转义非 ASCII 字符，与 json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+  逐字节一致，签名字符串和 POST 请求体依赖这一点；浮点数在指数形式（1e+16 / 1e16）上可能不同，签名参数中没有浮点数
+- indent=True 固定为 4 空格缩进，始终由标准库生成，与原先的 json.dumps(obj, indent=4, ensure_ascii=False) 逐字节一致
+  （orjson 只支持 2 空格缩进，已有的 JSON 文件和词频文件需要保持原格式）
+- NaN/Infinity 不是合法 JSON：orjson 和 msgspec 将其写为 null，标准库（包括 indent=True）写为 NaN/Infinity，
+  需要保留这些值时先自行转换
+- dataclass（包括 src.models.record.Record 记录）在所有后端上都序列化为 JSON 对象
+- ensure_ascii=True、快速后端不支持的对象（超过 64 位的整数、非字符串键等）回退到标准库
+- loads 解析失败时用标准库重试，错误仍为 json.JSONDecodeError（ValueError 的子类）
+"""
+import dataclasses
+import json
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+JSONDecodeError = json.JSONDecodeError
+
+_COMPACT_SEPARATORS = (",", ":")
+_ENCODE_ERRORS = (TypeError, ValueError, OverflowError)
+_DECODE_ERRORS = (ValueError, TypeError)
+
+BACKEND = "orjson" if orjson is not None else "msgspec" if msgspec is not None else "json"
+
+if msgspec is not None:
+    _ENCODE_ERRORS += (msgspec.EncodeError,)
+    _DECODE_ERRORS += (msgspec.DecodeError,)
+    _msgspec_encoder = msgspec.json.Encoder()
+    _msgspec_decoder = msgspec.json.Decoder()
+
+
+def set_backend(name: str):
+    """
+    切换后端，用于测试和基准对比
+
+    Args:
+        name: orjson / msgspec / json
+    """
+    global BACKEND
+    if name not in ("orjson", "msgspec", "json"):
+        raise ValueError(f"Unsupported JSON backend: {name!r}")
+    if (name == "orjson" and orjson is None) or (name == "msgspec" and msgspec is None):
+        raise ImportError(f"JSON backend {name} is not installed")
+    BACKEND = name
+
+
+def _dataclass_default(obj: Any) -> Any:
+    """标准库的 default，与 orjson/msgspec 一样按字段顺序序列化 dataclass"""
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {field.name: getattr(obj, field.name) for field in dataclasses.fields(obj)}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _stdlib_dumps(obj: Any, indent: bool, sort_keys: bool, ensure_ascii: bool, default: Optional[Callable]) -> str:
+    default = default or _dataclass_default
+    if indent:
+        return json.dumps(obj, indent=4, sort_keys=sort_keys, ensure_ascii=ensure_ascii, default=default)
+    return json.dumps(
+        obj, separators=_COMPACT_SEPARATORS, sort_keys=sort_keys, ensure_ascii=ensure_ascii, default=default
+    )
+
+
+def dumps_bytes(obj: Any, *, indent: bool = False, sort_keys: bool = False, ensure_ascii: bool = False,
+                default: Optional[Callable] = None) -> bytes:
+    """
+    序列化为 UTF-8 编码的 JSON
+
+    Args:
+        obj: 待序列化对象
+        indent: 是否使用 4 空格缩进，为 True 时使用标准库
+        sort_keys: 是否按键排序
+        ensure_ascii: 是否转义非 ASCII 字符，为 True 时使用标准库
+        default: 无法序列化的对象的转换函数
+
+    Returns:
+        JSON 字节串
+    """
+    if not ensure_ascii and not indent:
+        try:
+            if BACKEND == "orjson":
+                return orjson.dumps(obj, default=default, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+            if BACKEND == "msgspec":
+                if default is not None or sort_keys:
+                    return msgspec.json.encode(obj, enc_hook=default, order="sorted" if sort_keys else None)
+                return _msgspec_encoder.encode(obj)
+        except _ENCODE_ERRORS:
+            pass
+    return _stdlib_dumps(obj, indent, sort_keys, ensure_ascii, default).encode("utf-8")
+
+
+def dumps(obj: Any, *, indent: bool = False, sort_keys: bool = False, ensure_ascii: bool = False,
+          default: Optional[Callable] = None) -> str:
+    """
+    序列化为 JSON 字符串，参数同 dumps_bytes
+    """
+    if BACKEND == "json" or ensure_ascii or indent:
+        return _stdlib_dumps(obj, indent, sort_keys, ensure_ascii, default)
+    return dumps_bytes(obj, indent=indent, sort_keys=sort_keys, default=default).decode("utf-8")
+
+
+def loads(data: Union[str, bytes, bytearray, memoryview], *, strict: bool = True) -> Any:
+    """
+    解析 JSON
+
+    Args:
+        data: JSON 文本或字节串
+        strict: 为 False 时允许字符串中出现未转义的控制字符（仅标准库支持，快速后端失败后回退）
+
+    Returns:
+        解析结果
+    """
+    try:
+        if BACKEND == "orjson":
+            return orjson.loads(data)
+        if BACKEND == "msgspec":
+            return _msgspec_decoder.decode(data)
+    except _DECODE_ERRORS:
+        # 控制字符、NaN/Infinity 等标准库接受的输入，以及真正的错误都交给标准库给出
+        pass
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data, strict=strict)
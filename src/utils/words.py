@@ -1,6 +1,5 @@
 
 import asyncio
-import json
 import logging
 from collections import Counter
 
@@ -10,7 +9,7 @@ import matplotlib.pyplot as plt
 from wordcloud import WordCloud
 
 import config
-from src.utils import utils
+from src.utils import codec, utils
 
 plot_lock = asyncio.Lock()
 
@@ -36,7 +35,7 @@ class AsyncWordCloudGenerator:
         # Save word frequency to file
         freq_file = f"{save_words_prefix}_word_freq.json"
         async with aiofiles.open(freq_file, 'w', encoding='utf-8') as file:
-            await file.write(json.dumps(word_freq, ensure_ascii=False, indent=4))
+            await file.write(codec.dumps(word_freq, indent=True))
 
         # Try to acquire the plot lock without waiting
         if plot_lock.locked():
@@ -0,0 +1,400 @@
+# -*- coding: utf-8 -*-
+"""
+Deterministic, realistically shaped inputs for the micro benchmarks and the extractor equivalence tests
+
+The XHS pages embed window.__INITIAL_STATE__ as a JS object literal (camelCase keys, bare `undefined`
+values, many unrelated store branches), the Zhihu pages embed the js-initialData script among other
+scripts and styles. Sizes are controlled by `scale` so the same builders produce small pages for
+equivalence tests and multi-hundred-KB pages for benchmarks.
+"""
+import json
+import random
+from typing import Dict, List
+
+WORDS = [
+    "咖啡", "拿铁", "探店", "周末", "city", "walk", "推荐", "好物", "露营", "教程", "穿搭", "早餐",
+    "攻略", "vlog", "旅行", "上海", "美食", "日常", "分享", "学习", "Python", "数据",
+]
+
+
+def _rng(*key) -> random.Random:
+    return random.Random(":".join(map(str, key)))
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _js_literal(value) -> str:
+    """Serialize like the page does: compact JSON where None becomes a bare `undefined`"""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).replace("null", "undefined")
+
+
+# ========== XHS ==========
+
+def xhs_note_card(note_id: str, desc_words: int = 80, images: int = 6) -> Dict:
+    """A note as returned by the feed API (snake_case, as the crawler stores it)"""
+    rng = _rng("xhs-note", note_id)
+    user_id = f"{rng.randrange(16 ** 24):024x}"
+    return {
+        "note_id": note_id,
+        "type": "normal",
+        "title": _text(rng, 8),
+        "desc": _text(rng, desc_words) + " #" + rng.choice(WORDS) + "[话题]#",
+        "time": 1700000000000 + rng.randrange(10 ** 9),
+        "last_update_time": 1700000000000 + rng.randrange(10 ** 9),
+        "ip_location": rng.choice(["上海", "北京", "广东"]),
+        "xsec_token": f"AB{rng.randrange(16 ** 40):040x}",
+        "xsec_source": "pc_search",
+        "user": {
+            "user_id": user_id,
+            "nickname": _text(rng, 2),
+            "avatar": f"https://sns-avatar-qc.xhscdn.com/avatar/{user_id}.jpg",
+            "xsec_token": f"AB{rng.randrange(16 ** 40):040x}",
+        },
+        "interact_info": {
+            "liked": False,
+            "liked_count": str(rng.randrange(10 ** 5)),
+            "collected": False,
+            "collected_count": str(rng.randrange(10 ** 4)),
+            "comment_count": str(rng.randrange(10 ** 3)),
+            "share_count": str(rng.randrange(10 ** 3)),
+            "followed": False,
+            "relation": "none",
+        },
+        "image_list": [
+            {
+                "url_default": f"http://sns-webpic-qc.xhscdn.com/{note_id}/{i}!nd_dft_wlteh_webp_3",
+                "url_pre": f"http://sns-webpic-qc.xhscdn.com/{note_id}/{i}!nd_prv_wlteh_webp_3",
+                "url": "",
+                "width": 1080,
+                "height": 1440,
+                "live_photo": False,
+                "info_list": [
+                    {"image_scene": "WB_PRV", "url": f"http://sns-webpic-qc.xhscdn.com/{note_id}/{i}!prv"},
+                    {"image_scene": "WB_DFT", "url": f"http://sns-webpic-qc.xhscdn.com/{note_id}/{i}!dft"},
+                ],
+            }
+            for i in range(images)
+        ],
+        "tag_list": [{"id": f"{rng.randrange(16 ** 24):024x}", "name": rng.choice(WORDS), "type": "topic"} for _ in range(5)],
+        "at_user_list": [],
+    }
+
+
+def _camelize(value):
+    if isinstance(value, dict):
+        return {
+            "".join(part if i == 0 else part.capitalize() for i, part in enumerate(key.split("_"))): _camelize(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_camelize(item) for item in value]
+    return value
+
+
+def xhs_initial_state(note_id: str, scale: int = 1) -> Dict:
+    """window.__INITIAL_STATE__ of a note page, `scale` controls the size of the unrelated branches"""
+    note = _camelize(xhs_note_card(note_id))
+    note["lastUpdateTime"] = None
+    note["shareInfo"] = {"unShare": False}
+    feeds = [_camelize(xhs_note_card(f"{note_id}f{i:04d}", desc_words=20, images=2)) for i in range(20 * scale)]
+    return {
+        "global": {"appSettings": {"notificationInterval": 30, "prefetchTimeout": 3001}, "serverTime": 1700000000000},
+        "user": {"loggedIn": False, "activated": False, "userInfo": {}, "follow": [], "userPageData": {}},
+        "feed": {"query": {"cursorScore": "", "num": 18, "refreshType": 1, "noteIndex": 0}, "feeds": feeds},
+        "search": {"searchContext": {"keyword": "", "page": 1, "pageSize": 20}, "feeds": [], "currentSearchType": None},
+        "note": {
+            "prevRouteData": {},
+            "prevRoute": "Empty",
+            "commentTarget": {},
+            "isImgFullscreen": False,
+            "gotoPage": "",
+            "firstNoteId": note_id,
+            "autoOpenNote": False,
+            "noteDetailMap": {
+                note_id: {
+                    "comments": {"list": [], "cursor": "", "hasMore": True, "loading": False, "firstRequestFinish": False},
+                    "currentTime": 1700000000000,
+                    "note": note,
+                }
+            },
+            "serverRequestInfo": {"state": "success", "errorCode": 0, "errMsg": ""},
+            "volume": 0,
+            "recommendVideoMap": {},
+            "videoFeedType": "CreatorTab",
+            "rate": 1,
+            "currentNoteId": None,
+        },
+        "layout": {"layoutInfoReady": False, "columns": 4},
+    }
+
+
+def _html_page(head_scripts: List[str], body: str, scale: int) -> str:
+    rng = _rng("page", scale)
+    styles = "".join(f".c{i}{{margin:{i}px;padding:{rng.randrange(20)}px}}" for i in range(300 * scale))
+    return (
+        "<!doctype html><html><head><meta charset=\"utf-8\"><title>page</title>"
+        f"<style>{styles}</style>"
+        + "".join(f"\n<script>{script}</script>" for script in head_scripts)
+        + f"\n</head><body>{body}"
+        + "".join(f"<script src=\"https://fe-static.xhscdn.com/chunk-{i}.js\"></script>" for i in range(10))
+        + "</body></html>"
+    )
+
+
+def xhs_note_html(note_id: str, scale: int = 1) -> str:
+    """Note detail page with the initial state among other inline scripts"""
+    state = xhs_initial_state(note_id, scale)
+    body = "<div id=\"app\"></div>" + "".join(
+        f"<section class=\"note-item\"><a href=\"/explore/{note_id}{i}\">{_text(_rng('a', i), 6)}</a></section>"
+        for i in range(50 * scale)
+    )
+    scripts = [
+        "window.__SSR__=true",
+        f"window.__INITIAL_STATE__={_js_literal(state)}",
+        "window.__REDUX_DEVTOOLS__=undefined",
+    ]
+    return _html_page(scripts, body, scale)
+
+
+def xhs_creator_html(user_id: str, scale: int = 1) -> str:
+    """Creator profile page, the user branch carries userPageData"""
+    rng = _rng("xhs-creator", user_id)
+    state = xhs_initial_state(f"{user_id}n", scale)
+    state["user"]["userPageData"] = {
+        "basicInfo": {"nickname": _text(rng, 2), "desc": _text(rng, 20), "gender": 1, "ipLocation": "上海", "imageb": None},
+        "interactions": [
+            {"type": "follows", "name": "关注", "count": str(rng.randrange(1000))},
+            {"type": "fans", "name": "粉丝", "count": str(rng.randrange(10 ** 5))},
+            {"type": "interaction", "name": "获赞与收藏", "count": str(rng.randrange(10 ** 6))},
+        ],
+        "tags": [{"tagType": "info", "name": _text(rng, 1)}],
+    }
+    scripts = [f"window.__INITIAL_STATE__={_js_literal(state)}"]
+    return _html_page(scripts, "<div id=\"app\"></div>", scale)
+
+
+def xhs_sign_inputs() -> Dict:
+    """Inputs of the signing helpers as they look for search/comment requests"""
+    return {
+        "uri": "/api/sns/web/v1/search/notes",
+        "post_data": {
+            "keyword": "上海 咖啡 探店 推荐",
+            "page": 3,
+            "page_size": 20,
+            "search_id": "2e7b1bq0zkzk5h1mnc9p3",
+            "sort": "general",
+            "note_type": 0,
+            "ext_flags": [],
+            "image_formats": ["jpg", "webp", "avif"],
+        },
+        "get_uri": "/api/sns/web/v2/comment/page",
+        "get_params": {
+            "note_id": "65a1b2c3d4e5f60718293a4b",
+            "cursor": "65a1b2c3d4e5f60718293a4c",
+            "top_comment_id": "",
+            "image_formats": ["jpg", "webp", "avif"],
+            "xsec_token": "ABcdefghijklmnopqrstuvwxyz0123456789=",
+        },
+        "a1": "18c4d5e6f7a8b9c0d1e2f3a4b5c6d7e8f9a0b1c2d3e4f50000",
+        "b1": "I38rHdgsjopgIvesdVwgIC+oIELmBZ5e3VwXLgFTIxS3bqwErFeexd0ekncAzMFYnqthIhJeSnMDKutRI3KsYorWHPtGrbV0P9WfIi/eWc6eYqtyQApPI37ekmR6QL+5Ii6sdneeSfqYHqwl2qt5B0DoIx+PGDi/sVtkIxdsxuwr4qtiIhuaIE3e3LV0I3VTIC7e0utl2ADmsLveDSKsSPw5IEvsiVtJOqw8BuwfPpdeTFWOIx4TIiu6ZPwrPut5IvlaLbgs3qtxIxes1VwHIkumIkIyejgsY/WTge7eSqte/D7sDcpipedeYrDtIC6eDVw2IENsSqtlnlSuNjVtIvoekqt3cZ7sVo4gIESyIhEyJqwKIxdeWuwaIveeffdsbVwuIEpo/+wreVw1Ikde0W9eDPw/+qt0I3hMzqtzIifWBdKs2utGIESYsPtYpVwJIk4jg7ef+Yquh0q0IxW5Ih7sSjvuB70sTUGyIEMtIvbqrVwPIhY/eZW6IveskP7sfPtQIvusSWVgIxDgIvOsdMkVIkYoI3Qj9PwTIEQDJnI+Ii3sWdDF+Ev7IiA7IhMrIEQsjqwqI3m8b0/eYVwt",
+        "x_t": "1700000000000",
+        "x_s": "XYS_2UQhPsHCH0c1Pjh9HjIj2erjwjQhyoPTqBPT49pjHjIj2eHjwjQgynEDJ74AHjIj2ePjwjQTJdPIPAZlg/+Ez9VF",
+    }
+
+
+# ========== Zhihu ==========
+
+def _zhihu_author(rng: random.Random) -> Dict:
+    token = f"member-{rng.randrange(10 ** 6)}"
+    return {
+        "id": f"{rng.randrange(16 ** 32):032x}",
+        "url_token": token,
+        "name": _text(rng, 2),
+        "avatar_url": f"https://pic1.zhimg.com/v2-{rng.randrange(16 ** 32):032x}_l.jpg",
+        "headline": _text(rng, 6),
+        "gender": rng.choice([0, 1, -1]),
+        "user_type": "people",
+    }
+
+
+def zhihu_answer_html_body(rng: random.Random, paragraphs: int) -> str:
+    """Answer body HTML with figures, links, code and an inline script"""
+    parts = []
+    for i in range(paragraphs):
+        parts.append(f"<p data-pid=\"p{i}\">{_text(rng, 40)} <b>{_text(rng, 3)}</b> <a href=\"https://link.zhihu.com/?target={i}\" class=\"external\">{_text(rng, 2)}</a></p>")
+        if i % 5 == 0:
+            parts.append(
+                f"<figure data-size=\"normal\"><img src=\"https://pic2.zhimg.com/v2-{i:032x}_b.jpg\" "
+                f"data-caption=\"\" data-rawwidth=\"1080\" data-rawheight=\"720\" class=\"origin_image zh-lightbox-thumb\"/></figure>"
+            )
+        if i % 7 == 0:
+            parts.append(f"<div class=\"highlight\"><pre><code class=\"language-python\">print({i})</code></pre></div>")
+        if i % 11 == 0:
+            parts.append("<script>window.__trace && window.__trace('p')</script><style>.x{color:red}</style>")
+    return "".join(parts)
+
+
+def zhihu_answer(answer_id: str, paragraphs: int = 20) -> Dict:
+    rng = _rng("zhihu-answer", answer_id)
+    return {
+        "type": "answer",
+        "id": answer_id,
+        "question": {"id": str(rng.randrange(10 ** 9)), "name": _text(rng, 8), "type": "question"},
+        "title": f"<em>{_text(rng, 3)}</em>{_text(rng, 5)}",
+        "excerpt": _text(rng, 30),
+        "content": zhihu_answer_html_body(rng, paragraphs),
+        "created_time": 1700000000 + rng.randrange(10 ** 6),
+        "updated_time": 1700000000 + rng.randrange(10 ** 6),
+        "voteup_count": rng.randrange(10 ** 4),
+        "comment_count": rng.randrange(10 ** 3),
+        "author": _zhihu_author(rng),
+    }
+
+
+def zhihu_article(article_id: str, paragraphs: int = 20) -> Dict:
+    rng = _rng("zhihu-article", article_id)
+    return {
+        "type": "article",
+        "id": article_id,
+        "title": _text(rng, 8),
+        "excerpt": _text(rng, 30),
+        "content": zhihu_answer_html_body(rng, paragraphs),
+        "created": 1700000000 + rng.randrange(10 ** 6),
+        "updated": 1700000000 + rng.randrange(10 ** 6),
+        "voteup_count": rng.randrange(10 ** 4),
+        "comment_count": rng.randrange(10 ** 3),
+        "author": _zhihu_author(rng),
+    }
+
+
+def zhihu_zvideo(zvideo_id: str, author_token: str) -> Dict:
+    rng = _rng("zhihu-zvideo", zvideo_id)
+    return {
+        "type": "zvideo",
+        "id": zvideo_id,
+        "title": _text(rng, 8),
+        "description": _text(rng, 30),
+        "video_url": f"https://www.zhihu.com/zvideo/{zvideo_id}",
+        "created_at": 1700000000 + rng.randrange(10 ** 6),
+        "voteup_count": rng.randrange(10 ** 4),
+        "comment_count": rng.randrange(10 ** 3),
+        "author": author_token,
+    }
+
+
+def zhihu_search_response(results: int = 20, paragraphs: int = 10) -> Dict:
+    """search_v3 response with answers and articles plus non content cards"""
+    data = []
+    for i in range(results):
+        content = zhihu_answer(str(10 ** 9 + i), paragraphs) if i % 3 else zhihu_article(str(2 * 10 ** 9 + i), paragraphs)
+        data.append({"type": "search_result", "highlight": {"title": _text(_rng("h", i), 3)}, "object": content})
+        if i % 6 == 0:
+            data.append({"type": "relevant_query", "query_list": [{"query": _text(_rng("q", i), 2)}]})
+    return {"paging": {"is_end": False, "next": "https://www.zhihu.com/api/v4/search_v3?offset=20"}, "data": data}
+
+
+def zhihu_comments(content_id: str, count: int = 20) -> List[Dict]:
+    comments = []
+    for i in range(count):
+        rng = _rng("zhihu-comment", content_id, i)
+        comments.append({
+            "type": "comment",
+            "id": str(10 ** 10 + i),
+            "content": f"<p>{_text(rng, 15)}</p>" + (f"<a href=\"https://www.zhihu.com/people/x\">@{_text(rng, 1)}</a>" if i % 4 == 0 else ""),
+            "created_time": 1700000000 + rng.randrange(10 ** 6),
+            "child_comment_count": rng.randrange(10),
+            "like_count": rng.randrange(100),
+            "dislike_count": 0,
+            "reply_comment_id": "0",
+            "comment_tag": [{"type": "hot", "text": "热评"}, {"type": "ip_info", "text": "IP 属地上海"}],
+            "author": _zhihu_author(rng),
+        })
+    return comments
+
+
+def _zhihu_page(initial_data: Dict, scale: int) -> str:
+    rng = _rng("zhihu-page", scale)
+    noise = "".join(
+        f"<div class=\"Card\"><div class=\"RichText\">{_text(rng, 20)}</div><button class=\"Button VoteButton\">赞同 {i}</button></div>"
+        for i in range(150 * scale)
+    )
+    scripts = "".join(f"<script src=\"https://static.zhihu.com/heifetz/chunk-{i}.js\"></script>" for i in range(20))
+    return (
+        "<!doctype html><html lang=\"zh\"><head><meta charset=\"utf-8\"/><title>知乎</title>"
+        + "".join(f"<style data-emotion-css=\"{i}\">.css-{i}{{display:flex;margin:{i}px}}</style>" for i in range(200 * scale))
+        + "<script nonce=\"abc\">window.__ZH__ = {}</script>"
+        + f"</head><body><div id=\"root\">{noise}</div>"
+        + "<script id=\"js-clientConfig\" type=\"text/json\">{\"host\":\"zhihu.com\"}</script>"
+        + "<script id=\"js-initialData\" type=\"text/json\">"
+        + json.dumps(initial_data, ensure_ascii=False, separators=(",", ":")).replace("</", "\\u003c/")
+        + "</script>"
+        + scripts
+        + "</body></html>"
+    )
+
+
+def _zhihu_initial_data(entities: Dict, scale: int) -> Dict:
+    users = dict(entities.pop("users", {}))
+    for i in range(20 * scale):
+        author = _zhihu_author(_rng("zhihu-user", i))
+        users[author["url_token"]] = author
+    return {
+        "initialState": {
+            "common": {"ask": {}},
+            "loading": {"global": {"count": 0}, "local": {}},
+            "entities": {
+                "users": users,
+                "questions": {},
+                "answers": {},
+                "articles": {},
+                "zvideos": {},
+                "comments": {},
+                **entities,
+            },
+            "currentUser": "",
+            "account": {"lockLevel": {}, "unlockTicketStatus": False},
+            "settings": {"socialBind": None, "inboxMsg": None, "notification": {}},
+        },
+        "subAppName": "main",
+        "spanName": "QuestionPage",
+    }
+
+
+def zhihu_answer_html(answer_id: str = "1000000001", scale: int = 1) -> str:
+    answer = zhihu_answer(answer_id, paragraphs=30 * scale)
+    return _zhihu_page(_zhihu_initial_data({"answers": {answer_id: answer}}, scale), scale)
+
+
+def zhihu_article_html(article_id: str = "2000000001", scale: int = 1) -> str:
+    article = zhihu_article(article_id, paragraphs=30 * scale)
+    return _zhihu_page(_zhihu_initial_data({"articles": {article_id: article}}, scale), scale)
+
+
+def zhihu_zvideo_html(zvideo_id: str = "3000000001", scale: int = 1) -> str:
+    author = _zhihu_author(_rng("zhihu-zvideo-author", zvideo_id))
+    zvideo = zhihu_zvideo(zvideo_id, author["url_token"])
+    entities = {"zvideos": {zvideo_id: zvideo}, "users": {author["url_token"]: author}}
+    return _zhihu_page(_zhihu_initial_data(entities, scale), scale)
+
+
+def zhihu_creator_html(url_token: str = "member-creator", scale: int = 1) -> str:
+    rng = _rng("zhihu-creator", url_token)
+    creator = {
+        "id": f"{rng.randrange(16 ** 32):032x}",
+        "urlToken": url_token,
+        "name": _text(rng, 2),
+        "avatarUrl": f"https://pic1.zhimg.com/v2-{rng.randrange(16 ** 32):032x}_l.jpg",
+        "gender": 1,
+        "ipInfo": "IP 属地北京",
+        "followingCount": rng.randrange(1000),
+        "followerCount": rng.randrange(10 ** 5),
+        "answerCount": rng.randrange(1000),
+        "zvideoCount": rng.randrange(100),
+        "questionCount": rng.randrange(100),
+        "articlesCount": rng.randrange(100),
+        "columnsCount": rng.randrange(10),
+        "voteupCount": rng.randrange(10 ** 6),
+    }
+    return _zhihu_page(_zhihu_initial_data({"users": {url_token: creator}}, scale), scale)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Event loop lag while large pages are extracted, inline on the loop versus through the extraction process pool
+
+The monitor's periodic wake ups stand in for the other in-flight requests, their lateness is the time
+those requests would have waited. Usage:
+    python -m tests.benchmarks.loop_lag --pages 40 --scale 10 --workers 2
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List, Tuple
+
+from src.platforms.xhs.extractor import XiaoHongShuExtractor
+from src.platforms.zhihu.help import ZhihuExtractor
+from src.services.extraction import executor as extraction
+from tests.benchmarks import fixtures
+
+
+def build_pages(pages: int, scale: int) -> Tuple[List[Tuple[str, str]], List[str], str]:
+    note_ids = [f"65a1b2c3d4e5f6{i:010d}" for i in range(pages)]
+    xhs_pages = [(note_id, fixtures.xhs_note_html(note_id, scale=scale)) for note_id in note_ids]
+    zhihu_pages = [fixtures.zhihu_answer_html(str(10 ** 9 + i), scale=scale) for i in range(pages)]
+    search_text = json.dumps(fixtures.zhihu_search_response(results=20, paragraphs=30 * scale), ensure_ascii=False)
+    return xhs_pages, zhihu_pages, search_text
+
+
+async def _extract_all(xhs_pages: List[Tuple[str, str]], zhihu_pages: List[str], search_text: str) -> int:
+    xhs, zhihu = XiaoHongShuExtractor(), ZhihuExtractor()
+    jobs = []
+    for (note_id, html), answer_html in zip(xhs_pages, zhihu_pages):
+        jobs.append(xhs.extract_note_detail_from_html_async(note_id, html))
+        jobs.append(zhihu.extract_answer_content_from_html_async(answer_html))
+        jobs.append(zhihu.extract_contents_from_search_text_async(search_text))
+    results = await asyncio.gather(*jobs)
+    return sum(1 for result in results if result)
+
+
+async def measure(pages: int, scale: int, workers: int, min_bytes: int) -> Dict:
+    inputs = build_pages(pages, scale)
+    extraction._extraction_executor = extraction.ExtractionExecutor(workers=workers, min_bytes=min_bytes)
+    if workers:
+        # Start the workers before measuring, process start up is a one off cost
+        await extraction.get_extraction_executor().run(min_bytes, time.sleep, 0)
+    monitor = extraction.LoopLagMonitor(interval=0.005).start()
+    started = time.perf_counter()
+    extracted = await _extract_all(*inputs)
+    elapsed = time.perf_counter() - started
+    lag = await monitor.stop()
+    stats = extraction.get_extraction_executor().stats()
+    extraction.close_extraction_executor()
+    return {"workers": workers, "extracted": extracted, "seconds": round(elapsed, 3), **lag, **stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event loop lag with and without the extraction process pool")
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--min-bytes", type=int, default=128 * 1024)
+    args = parser.parse_args()
+
+    for workers in (0, args.workers):
+        print(asyncio.run(measure(args.pages, args.scale, workers, args.min_bytes)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+# -*- coding: utf-8 -*-
+"""
+Local ASGI mock of the XHS edith and Zhihu API endpoints used by the crawlers
+
+Responses are generated deterministically from the seed and the request (note id, cursor, ...),
+so every run against the same MockPlatformConfig sees the same data. Latency and failure
+injection (461 captcha, 300012 IP block) are configurable per run.
+"""
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+WORDS = ["咖啡", "拿铁", "探店", "周末", "city", "walk", "推荐", "好物", "露营", "教程", "穿搭", "早餐", "攻略", "vlog"]
+
+
+@dataclass
+class MockPlatformConfig:
+    """Data sizes, latency and failure injection of the mock platform"""
+
+    search_pages: int = 2  # XHS/Zhihu search pages returned before has_more=false / empty page
+    notes_per_page: int = 20
+    comment_pages: int = 2
+    comments_per_page: int = 10
+    sub_comments_per_comment: int = 2  # Sub comments embedded in a first level comment
+    sub_comment_pages: int = 1  # Extra sub comment pages per first level comment
+    desc_words: int = 60
+    latency_ms: float = 0
+    jitter_ms: float = 0
+    captcha_every: int = 0  # Every N-th XHS request returns 461 (0 disables)
+    ip_block_every: int = 0  # Every N-th XHS request returns code 300012 (0 disables)
+    seed: int = 0
+
+
+class MockPlatform:
+    """Request handlers and counters of one mock platform instance"""
+
+    def __init__(self, cfg: MockPlatformConfig):
+        self.cfg = cfg
+        self.requests: Counter = Counter()
+        self.injected: Counter = Counter()
+        self._xhs_requests = 0
+
+    # ========== helpers ==========
+
+    def _rng(self, *key) -> random.Random:
+        return random.Random(f"{self.cfg.seed}:{':'.join(map(str, key))}")
+
+    def _text(self, rng: random.Random, words: int) -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(words))
+
+    async def _latency(self):
+        delay = self.cfg.latency_ms
+        if self.cfg.jitter_ms:
+            delay += random.uniform(0, self.cfg.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+    def _xhs_failure(self) -> Optional[Response]:
+        self._xhs_requests += 1
+        n = self._xhs_requests
+        if self.cfg.captcha_every and n % self.cfg.captcha_every == 0:
+            self.injected["461"] += 1
+            return Response(status_code=461, headers={"Verifytype": "102", "Verifyuuid": f"mock-{n}"})
+        if self.cfg.ip_block_every and n % self.cfg.ip_block_every == 0:
+            self.injected["300012"] += 1
+            return JSONResponse({"success": False, "code": 300012, "msg": "ip blocked"})
+        return None
+
+    @staticmethod
+    def _xhs_ok(data: Dict) -> JSONResponse:
+        return JSONResponse({"success": True, "code": 0, "msg": "成功", "data": data})
+
+    def _xhs_user(self, rng: random.Random) -> Dict:
+        user_id = f"u{rng.randrange(10 ** 8):08d}"
+        return {"user_id": user_id, "nickname": f"user_{user_id}", "avatar": f"https://sns-avatar.mock/{user_id}.jpg"}
+
+    def _xhs_comment(self, note_id: str, comment_id: str, with_sub: bool) -> Dict:
+        rng = self._rng("xhs-comment", comment_id)
+        user = self._xhs_user(rng)
+        comment = {
+            "id": comment_id,
+            "note_id": note_id,
+            "content": self._text(rng, 12),
+            "create_time": 1700000000000 + rng.randrange(10 ** 9),
+            "ip_location": rng.choice(["上海", "北京", "广东"]),
+            "like_count": str(rng.randrange(1000)),
+            "user_info": {"user_id": user["user_id"], "nickname": user["nickname"], "image": user["avatar"]},
+            "pictures": [],
+            "sub_comment_count": "0",
+            "sub_comments": [],
+            "sub_comment_has_more": False,
+            "sub_comment_cursor": "",
+        }
+        if with_sub:
+            comment["sub_comments"] = [
+                self._xhs_comment(note_id, f"{comment_id}s{i}", with_sub=False)
+                for i in range(self.cfg.sub_comments_per_comment)
+            ]
+            comment["sub_comment_count"] = str(len(comment["sub_comments"]) * (1 + self.cfg.sub_comment_pages))
+            comment["sub_comment_has_more"] = self.cfg.sub_comment_pages > 0
+            comment["sub_comment_cursor"] = "0"
+        return comment
+
+    # ========== XHS ==========
+
+    async def xhs_search_notes(self, request: Request) -> Response:
+        self.requests["xhs_search_notes"] += 1
+        await self._latency()
+        if failure := self._xhs_failure():
+            return failure
+        payload = json.loads(await request.body())
+        page = int(payload.get("page", 1))
+        items = [
+            {
+                "id": f"n{self.cfg.seed}k{page:04d}{i:04d}",
+                "model_type": "note",
+                "xsec_token": f"tok{page}{i}",
+                "xsec_source": "pc_search",
+            }
+            for i in range(self.cfg.notes_per_page)
+        ] if page <= self.cfg.search_pages else []
+        return self._xhs_ok({"has_more": page <= self.cfg.search_pages, "items": items})
+
+    async def xhs_feed(self, request: Request) -> Response:
+        self.requests["xhs_feed"] += 1
+        await self._latency()
+        if failure := self._xhs_failure():
+            return failure
+        note_id = json.loads(await request.body())["source_note_id"]
+        rng = self._rng("xhs-note", note_id)
+        note = {
+            "note_id": note_id,
+            "type": rng.choice(["normal", "video"]),
+            "title": self._text(rng, 6),
+            "desc": self._text(rng, self.cfg.desc_words),
+            "time": 1700000000000 + rng.randrange(10 ** 9),
+            "last_update_time": 1700000000000 + rng.randrange(10 ** 9),
+            "user": self._xhs_user(rng),
+            "interact_info": {
+                "liked_count": str(rng.randrange(10 ** 5)),
+                "collected_count": str(rng.randrange(10 ** 4)),
+                "comment_count": str(self.cfg.comment_pages * self.cfg.comments_per_page),
+                "share_count": str(rng.randrange(1000)),
+            },
+            "ip_location": rng.choice(["上海", "北京", "广东"]),
+            "image_list": [
+                {"url_default": f"https://sns-img.mock/{note_id}/{i}.jpg", "url": "", "width": 1080, "height": 1440}
+                for i in range(rng.randrange(1, 6))
+            ],
+            "tag_list": [{"id": str(i), "name": rng.choice(WORDS), "type": "topic"} for i in range(rng.randrange(4))],
+        }
+        return self._xhs_ok({"items": [{"id": note_id, "model_type": "note", "note_card": note}]})
+
+    async def xhs_comment_page(self, request: Request) -> Response:
+        self.requests["xhs_comment_page"] += 1
+        await self._latency()
+        if failure := self._xhs_failure():
+            return failure
+        note_id = request.query_params["note_id"]
+        page = int(request.query_params.get("cursor") or 0)
+        comments = [
+            self._xhs_comment(note_id, f"{note_id}c{page}_{i}", with_sub=True)
+            for i in range(self.cfg.comments_per_page)
+        ] if page < self.cfg.comment_pages else []
+        has_more = page + 1 < self.cfg.comment_pages
+        return self._xhs_ok({"comments": comments, "cursor": str(page + 1) if has_more else "", "has_more": has_more})
+
+    async def xhs_sub_comment_page(self, request: Request) -> Response:
+        self.requests["xhs_sub_comment_page"] += 1
+        await self._latency()
+        if failure := self._xhs_failure():
+            return failure
+        note_id = request.query_params["note_id"]
+        root_id = request.query_params["root_comment_id"]
+        page = int(request.query_params.get("cursor") or 0)
+        comments = [
+            self._xhs_comment(note_id, f"{root_id}p{page}_{i}", with_sub=False)
+            for i in range(int(request.query_params.get("num", 10)))
+        ]
+        has_more = page + 1 < self.cfg.sub_comment_pages
+        return self._xhs_ok({"comments": comments, "cursor": str(page + 1) if has_more else "", "has_more": has_more})
+
+    async def xhs_user_posted(self, request: Request) -> Response:
+        self.requests["xhs_user_posted"] += 1
+        await self._latency()
+        if failure := self._xhs_failure():
+            return failure
+        user_id = request.query_params["user_id"]
+        page = int(request.query_params.get("cursor") or 0)
+        notes = [
+            {"note_id": f"{user_id}p{page}_{i}", "xsec_token": f"tok{page}{i}", "type": "normal"}
+            for i in range(int(request.query_params.get("num", 30)))
+        ] if page < self.cfg.search_pages else []
+        has_more = page + 1 < self.cfg.search_pages
+        return self._xhs_ok({"notes": notes, "cursor": str(page + 1) if has_more else "", "has_more": has_more})
+
+    # ========== Zhihu ==========
+
+    def _zhihu_author(self, rng: random.Random) -> Dict:
+        token = f"member-{rng.randrange(10 ** 6)}"
+        return {"id": token.replace("-", ""), "url_token": token, "name": token, "avatar_url": f"https://pic.mock/{token}.jpg"}
+
+    async def zhihu_search(self, request: Request) -> Response:
+        self.requests["zhihu_search"] += 1
+        await self._latency()
+        offset = int(request.query_params.get("offset", 0))
+        limit = int(request.query_params.get("limit", 20))
+        page = offset // max(limit, 1) + 1
+        data = []
+        if page <= self.cfg.search_pages:
+            for i in range(self.cfg.notes_per_page):
+                answer_id = str(10 ** 9 + page * 10000 + i)
+                rng = self._rng("zhihu-answer", answer_id)
+                data.append({
+                    "type": "search_result",
+                    "object": {
+                        "type": "answer",
+                        "id": answer_id,
+                        "question": {"id": str(rng.randrange(10 ** 8)), "name": self._text(rng, 6)},
+                        "title": f"<em>{self._text(rng, 4)}</em>",
+                        "excerpt": self._text(rng, 20),
+                        "content": "<p>" + self._text(rng, self.cfg.desc_words) + "</p>",
+                        "created_time": 1700000000 + rng.randrange(10 ** 6),
+                        "updated_time": 1700000000 + rng.randrange(10 ** 6),
+                        "voteup_count": rng.randrange(10 ** 4),
+                        "comment_count": self.cfg.comment_pages * self.cfg.comments_per_page,
+                        "author": self._zhihu_author(rng),
+                    },
+                })
+        return JSONResponse({"data": data, "paging": {"is_end": page >= self.cfg.search_pages}})
+
+    def _zhihu_comment(self, comment_id: str, child_count: int) -> Dict:
+        rng = self._rng("zhihu-comment", comment_id)
+        return {
+            "type": "comment",
+            "id": comment_id,
+            "content": "<p>" + self._text(rng, 12) + "</p>",
+            "created_time": 1700000000 + rng.randrange(10 ** 6),
+            "child_comment_count": child_count,
+            "like_count": rng.randrange(100),
+            "dislike_count": 0,
+            "reply_comment_id": "0",
+            "comment_tag": [{"type": "ip_info", "text": "IP 属地上海"}],
+            "author": self._zhihu_author(rng),
+        }
+
+    def _zhihu_paging(self, request: Request, page: int, pages: int) -> Dict:
+        is_end = page + 1 >= pages
+        return {"is_end": is_end, "next": "" if is_end else f"{request.url.path}?offset={page + 1}&limit=10"}
+
+    async def zhihu_root_comment(self, request: Request) -> Response:
+        self.requests["zhihu_root_comment"] += 1
+        await self._latency()
+        content_id = request.path_params["content_id"]
+        page = int(request.query_params.get("offset") or 0)
+        children = self.cfg.sub_comments_per_comment * self.cfg.sub_comment_pages
+        data = [
+            self._zhihu_comment(f"{content_id}{page:03d}{i:03d}", children)
+            for i in range(self.cfg.comments_per_page)
+        ] if page < self.cfg.comment_pages else []
+        return JSONResponse({"data": data, "paging": self._zhihu_paging(request, page, self.cfg.comment_pages)})
+
+    async def zhihu_child_comment(self, request: Request) -> Response:
+        self.requests["zhihu_child_comment"] += 1
+        await self._latency()
+        root_id = request.path_params["comment_id"]
+        page = int(request.query_params.get("offset") or 0)
+        data = [
+            self._zhihu_comment(f"{root_id}{page:02d}{i:02d}", 0)
+            for i in range(self.cfg.sub_comments_per_comment)
+        ]
+        return JSONResponse({"data": data, "paging": self._zhihu_paging(request, page, self.cfg.sub_comment_pages)})
+
+    async def stats(self, request: Request) -> Response:
+        return JSONResponse({"requests": dict(self.requests), "injected": dict(self.injected)})
+
+
+def create_app(cfg: Optional[MockPlatformConfig] = None) -> Starlette:
+    """Create the mock ASGI app, GET /__stats returns request and injected failure counters"""
+    platform = MockPlatform(cfg or MockPlatformConfig())
+    routes: List[Route] = [
+        Route("/api/sns/web/v1/search/notes", platform.xhs_search_notes, methods=["POST"]),
+        Route("/api/sns/web/v1/feed", platform.xhs_feed, methods=["POST"]),
+        Route("/api/sns/web/v2/comment/page", platform.xhs_comment_page),
+        Route("/api/sns/web/v2/comment/sub/page", platform.xhs_sub_comment_page),
+        Route("/api/sns/web/v1/user_posted", platform.xhs_user_posted),
+        Route("/api/v4/search_v3", platform.zhihu_search),
+        Route("/api/v4/comment_v5/{content_type}s/{content_id}/root_comment", platform.zhihu_root_comment),
+        Route("/api/v4/comment_v5/comment/{comment_id}/child_comment", platform.zhihu_child_comment),
+        Route("/__stats", platform.stats),
+    ]
+    app = Starlette(routes=routes)
+    app.state.platform = platform
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class MockPlatformServer:
+    """Runs the mock app with uvicorn in a background thread"""
+
+    def __init__(self, cfg: Optional[MockPlatformConfig] = None, port: Optional[int] = None):
+        import uvicorn
+
+        self.cfg = cfg or MockPlatformConfig()
+        self.port = port or free_port()
+        self.app = create_app(self.cfg)
+        self._server = uvicorn.Server(uvicorn.Config(self.app, host="127.0.0.1", port=self.port, log_level="warning"))
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def platform(self) -> MockPlatform:
+        return self.app.state.platform
+
+    def start(self) -> "MockPlatformServer":
+        self._thread = threading.Thread(target=self._server.run, name="mock-platform", daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Mock platform server did not start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self):
+        self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+    def __enter__(self) -> "MockPlatformServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def serve(cfg_dict: Dict, port: int):
+    """Process entry point, runs the server until the process is terminated"""
+    import uvicorn
+
+    uvicorn.run(create_app(MockPlatformConfig(**cfg_dict)), host="127.0.0.1", port=port, log_level="warning")
+
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Memory and throughput of the slotted records against the pydantic models / dicts they replaced
+
+For Zhihu comments the whole hot path is timed: extract from the API payload, build the store record and serialize
+it for the JSONL sink. The legacy pydantic models are rebuilt from the record fields and patched into the extractor.
+Usage:
+    python -m tests.benchmarks.record_footprint --count 20000
+"""
+import argparse
+import dataclasses
+import gc
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+from unittest import mock
+
+from pydantic import BaseModel, create_model
+
+from src.models.m_zhihu import ZhihuComment, ZhihuContent, ZhihuCreator
+from src.platforms.zhihu import help as zhihu_help
+from src.storage.xhs import build_xhs_comment_item
+from src.utils import codec, utils
+from tests.benchmarks import fixtures
+
+
+def legacy_model(record_type) -> type:
+    """The pydantic model a record type replaced, last_modify_ts was added to the dumped dict by the store helpers"""
+    fields = {
+        field.name: (field.type, field.default)
+        for field in dataclasses.fields(record_type) if field.name != "last_modify_ts"
+    }
+    return create_model(record_type.__name__, __base__=BaseModel, **fields)
+
+
+LEGACY = {cls: legacy_model(cls) for cls in (ZhihuContent, ZhihuComment, ZhihuCreator)}
+
+
+def legacy_comment_row(comment: BaseModel) -> Dict:
+    row = comment.model_dump()
+    row.update({"last_modify_ts": utils.get_current_timestamp()})
+    return row
+
+
+def record_comment_row(comment: ZhihuComment) -> ZhihuComment:
+    comment.last_modify_ts = utils.get_current_timestamp()
+    return comment
+
+
+def measure(label: str, build: Callable[[], List], serialize: Callable = codec.dumps) -> Dict:
+    """Time the build without tracing, then build again under tracemalloc for the retained memory of the rows"""
+    gc.collect()
+    started = time.perf_counter()
+    rows = build()
+    built = time.perf_counter() - started
+    started = time.perf_counter()
+    for row in rows:
+        serialize(row)
+    serialized = time.perf_counter() - started
+    del rows
+    gc.collect()
+    tracemalloc.start()
+    rows = build()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "variant": label, "rows": len(rows), "build_s": round(built, 3), "serialize_s": round(serialized, 3),
+        "retained_mb": round(retained / 2 ** 20, 2),
+    }
+
+
+def zhihu_comments(payload: List[Dict], legacy: bool) -> List:
+    content = ZhihuContent(content_id="1000000001", content_type="answer")
+    extractor = zhihu_help.ZhihuExtractor()
+    if not legacy:
+        return [record_comment_row(comment) for comment in extractor.extract_comments(content, payload)]
+    with mock.patch.object(zhihu_help, "ZhihuComment", LEGACY[ZhihuComment]), \
+            mock.patch.object(zhihu_help, "ZhihuCreator", LEGACY[ZhihuCreator]):
+        return [legacy_comment_row(comment) for comment in extractor.extract_comments(content, payload)]
+
+
+def xhs_comments(count: int, legacy: bool) -> List:
+    """The legacy rows are the same fields as dicts, only their memory and serialization are comparable"""
+    comment = {
+        "id": "65a1b2c3d4e5f6071829", "content": "评论内容" * 8, "create_time": 1700000000000, "ip_location": "上海",
+        "like_count": "12", "sub_comment_count": "3", "user_info": {"user_id": "u1", "nickname": "n", "image": "i"},
+        "pictures": [], "target_comment": {},
+    }
+    rows = [build_xhs_comment_item("65a1b2c3d4e5f60718293a4b", comment) for _ in range(count)]
+    return [row.model_dump() for row in rows] if legacy else rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Slotted records versus pydantic models / dicts")
+    parser.add_argument("--count", type=int, default=20000)
+    args = parser.parse_args()
+
+    payload = fixtures.zhihu_comments("1000000001", count=args.count)
+    print(measure("zhihu comments, pydantic + model_dump", lambda: zhihu_comments(payload, True)))
+    print(measure("zhihu comments, slotted record", lambda: zhihu_comments(payload, False)))
+    print(measure("xhs comments, dict rows (record + model_dump)", lambda: xhs_comments(args.count, True)))
+    print(measure("xhs comments, slotted record", lambda: xhs_comments(args.count, False)))
+
+
+if __name__ == "__main__":
+    main()
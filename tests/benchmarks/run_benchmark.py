@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+"""
+End-to-end throughput benchmark of the crawlers against the local mock platform
+
+The real XiaoHongShuCrawler.search / ZhihuCrawler.search pipelines run against the mock server
+(tests/benchmarks/mock_platform.py), once per sink and each in a fresh process so that peak RSS
+and CPU time are measured per sink. The mock server runs in its own process.
+
+Usage:
+    python -m tests.benchmarks.run_benchmark --platform xhs --sinks json,jsonl,sqlite,parquet
+    python -m tests.benchmarks.run_benchmark --platform zhihu --search-pages 5 --latency-ms 20
+    python -m tests.benchmarks.run_benchmark --captcha-every 40 --ip-block-every 55 --output bench.json
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from tests.benchmarks.mock_platform import MockPlatformConfig, free_port, serve
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_SINKS = "json,jsonl,csv,sqlite,parquet"
+
+
+class FakePage:
+    """Stands in for the Playwright page used by XHS signing, the local part of the signature still runs"""
+
+    async def evaluate(self, expression: str):
+        if "localStorage" in expression:
+            return {"b1": "benchmark-b1"}
+        return "benchmark-mnsv2"
+
+
+class LatencyRecorder:
+    """Wraps a client's request method and records client side latency of every call (retries included)"""
+
+    def __init__(self, client):
+        self.latencies: List[float] = []
+        self.errors = 0
+        request = client.request
+
+        async def timed_request(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await request(*args, **kwargs)
+            except Exception:
+                self.errors += 1
+                raise
+            finally:
+                self.latencies.append(time.perf_counter() - started)
+
+        client.request = timed_request
+
+    def percentile(self, q: int) -> float:
+        if len(self.latencies) < 2:
+            return self.latencies[0] * 1000 if self.latencies else 0.0
+        return statistics.quantiles(self.latencies, n=100, method="inclusive")[q - 1] * 1000
+
+
+def _configure(sink: str, options: Dict):
+    import config
+    from config import db_config
+
+    config.SAVE_DATA_OPTION = sink
+    config.KEYWORDS = "benchmark"
+    config.CRAWLER_TYPE = "search"
+    config.START_PAGE = 1
+    config.CRAWLER_MAX_NOTES_COUNT = 20 * options["search_pages"]
+    config.CRAWLER_MAX_SLEEP_SEC = 0
+    config.MAX_CONCURRENCY_NUM = options["concurrency"]
+    config.ENABLE_GET_COMMENTS = True
+    config.ENABLE_GET_SUB_COMMENTS = options["sub_comments"]
+    config.ENABLE_GET_MEIDAS = False
+    config.ENABLE_GET_WORDCLOUD = False
+    config.ENABLE_RAW_ARCHIVE = False
+    config.HTTP_TRANSPORT_MODE = "passthrough"
+    sqlite_path = str(Path.cwd() / "benchmark.db")
+    db_config.SQLITE_DB_PATH = sqlite_path
+    db_config.sqlite_db_config["db_path"] = sqlite_path
+
+
+def _build_xhs(base_url: str, options: Dict):
+    from src.platforms.xhs import core as xhs_core
+    from src.platforms.xhs.client import XiaoHongShuClient
+    from src.storage.xhs import XhsStoreFactory
+
+    # Comments per note are capped by a module level constant imported from config
+    xhs_core.CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES = options["max_comments"]
+    crawler = xhs_core.XiaoHongShuCrawler()
+    client = XiaoHongShuClient(
+        headers={"Cookie": "a1=benchmark", "content-type": "application/json;charset=UTF-8"},
+        playwright_page=FakePage(),
+        cookie_dict={"a1": "benchmark"},
+    )
+    client._host = base_url
+    client._domain = base_url
+    crawler.xhs_client = client
+    return crawler, client, XhsStoreFactory
+
+
+def _build_zhihu(base_url: str, options: Dict):
+    from src.platforms.zhihu import client as zhihu_client_module
+    from src.platforms.zhihu import core as zhihu_core
+    from src.platforms.zhihu.client import ZhiHuClient
+    from src.storage.zhihu import ZhihuStoreFactory
+    from src.utils import zhihu_const
+
+    zhihu_const.ZHIHU_URL = base_url
+    zhihu_const.ZHIHU_ZHUANLAN_URL = base_url
+    # Signing runs the real JS through node, compile it before leaving the project directory
+    zhihu_client_module.sign("/api/v4/search_v3", "d_c0=benchmark")
+    crawler = zhihu_core.ZhihuCrawler()
+    client = ZhiHuClient(
+        headers={"cookie": "d_c0=benchmark"},
+        playwright_page=None,
+        cookie_dict={"d_c0": "benchmark"},
+    )
+    crawler.zhihu_client = client
+    return crawler, client, ZhihuStoreFactory
+
+
+async def _run_crawler(platform: str, sink: str, base_url: str, options: Dict) -> Dict:
+    from src.core.var import crawler_type_var
+    from src.storage.base import db
+
+    build = _build_xhs if platform == "xhs" else _build_zhihu
+    crawler, client, factory = build(base_url, options)
+    os.chdir(options["workdir"])
+    _configure(sink, options)
+    if sink == "sqlite":
+        await db.init_db("sqlite")
+
+    recorder = LatencyRecorder(client)
+    counts = {"contents": 0, "comments": 0}
+    crawler_type_var.set("search")
+    store = await factory.open_store()
+    for method, key in (("store_content", "contents"), ("store_comment", "comments")):
+        original = getattr(store, method)
+
+        async def counted(item, _original=original, _key=key):
+            counts[_key] += 1
+            await _original(item)
+
+        setattr(store, method, counted)
+
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    started = time.perf_counter()
+    try:
+        await crawler.search()
+    finally:
+        await factory.close_store()
+    elapsed = time.perf_counter() - started
+    usage_after = resource.getrusage(resource.RUSAGE_SELF)
+
+    cpu = (usage_after.ru_utime - usage_before.ru_utime) + (usage_after.ru_stime - usage_before.ru_stime)
+    return {
+        "platform": platform,
+        "sink": sink,
+        "contents": counts["contents"],
+        "comments": counts["comments"],
+        "seconds": round(elapsed, 3),
+        "contents_per_second": round(counts["contents"] / elapsed, 2),
+        "comments_per_second": round(counts["comments"] / elapsed, 2),
+        "requests": len(recorder.latencies),
+        "failed_requests": recorder.errors,
+        "p50_ms": round(recorder.percentile(50), 2),
+        "p99_ms": round(recorder.percentile(99), 2),
+        # ru_maxrss is reported in kilobytes on Linux
+        "peak_rss_mb": round(usage_after.ru_maxrss / 1024, 1),
+        "cpu_seconds": round(cpu, 3),
+        "cpu_percent": round(cpu / elapsed * 100, 1),
+    }
+
+
+def run_single(platform: str, sink: str, base_url: str, options: Dict) -> Dict:
+    """Run one platform/sink benchmark in the current process"""
+    os.chdir(PROJECT_ROOT)
+    return asyncio.run(_run_crawler(platform, sink, base_url, options))
+
+
+def _run_in_child(platform: str, sink: str, base_url: str, options: Dict) -> Dict:
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(1) as pool:
+        return pool.apply(run_single, (platform, sink, base_url, options))
+
+
+def run_benchmark(
+    platforms: List[str],
+    sinks: List[str],
+    mock_cfg: MockPlatformConfig,
+    concurrency: int = 4,
+    sub_comments: bool = True,
+    isolated: bool = True,
+) -> List[Dict]:
+    """
+    Start the mock platform and benchmark every platform/sink combination
+
+    Args:
+        platforms: xhs and/or zhihu
+        sinks: SAVE_DATA_OPTION values to compare
+        mock_cfg: Data sizes, latency and failure injection of the mock platform
+        concurrency: MAX_CONCURRENCY_NUM of the crawlers
+        sub_comments: ENABLE_GET_SUB_COMMENTS
+        isolated: Run every combination in a fresh process (needed for per sink RSS/CPU)
+    """
+    ctx = multiprocessing.get_context("spawn")
+    port = free_port()
+    server = ctx.Process(target=serve, args=(asdict(mock_cfg), port), daemon=True)
+    server.start()
+    base_url = f"http://127.0.0.1:{port}"
+    _wait_for_server(base_url)
+
+    results = []
+    try:
+        for platform in platforms:
+            for sink in sinks:
+                with tempfile.TemporaryDirectory(prefix=f"bench_{platform}_{sink}_") as workdir:
+                    options = {
+                        "workdir": workdir,
+                        "search_pages": mock_cfg.search_pages,
+                        "max_comments": mock_cfg.comment_pages * mock_cfg.comments_per_page,
+                        "concurrency": concurrency,
+                        "sub_comments": sub_comments,
+                    }
+                    runner = _run_in_child if isolated else run_single
+                    results.append(runner(platform, sink, base_url, options))
+    finally:
+        server.terminate()
+        server.join()
+    return results
+
+
+def _wait_for_server(base_url: str, timeout: float = 15):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            httpx.get(f"{base_url}/__stats", timeout=1)
+            return
+        except httpx.HTTPError:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Mock platform not reachable at {base_url}")
+            time.sleep(0.1)
+
+
+def format_results(results: List[Dict]) -> str:
+    columns = [
+        ("platform", "platform"), ("sink", "sink"), ("contents/s", "contents_per_second"),
+        ("comments/s", "comments_per_second"), ("p50 ms", "p50_ms"), ("p99 ms", "p99_ms"),
+        ("peak RSS MB", "peak_rss_mb"), ("CPU s", "cpu_seconds"), ("CPU %", "cpu_percent"),
+        ("requests", "requests"), ("failed", "failed_requests"),
+    ]
+    rows = [[title for title, _ in columns]] + [[str(result[key]) for _, key in columns] for result in results]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    return "\n".join("  ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in rows)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark the crawlers against the local mock platform")
+    parser.add_argument("--platform", action="append", choices=["xhs", "zhihu"], help="Platform, repeatable (default both)")
+    parser.add_argument("--sinks", default=DEFAULT_SINKS, help=f"Comma separated sinks (default {DEFAULT_SINKS})")
+    parser.add_argument("--search-pages", type=int, default=2)
+    parser.add_argument("--comment-pages", type=int, default=2)
+    parser.add_argument("--comments-per-page", type=int, default=10)
+    parser.add_argument("--sub-comments", type=int, default=2, help="Sub comments per first level comment")
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--captcha-every", type=int, default=0, help="Every N-th XHS request returns 461")
+    parser.add_argument("--ip-block-every", type=int, default=0, help="Every N-th XHS request returns 300012")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    args = parser.parse_args(argv)
+
+    mock_cfg = MockPlatformConfig(
+        search_pages=args.search_pages,
+        comment_pages=args.comment_pages,
+        comments_per_page=args.comments_per_page,
+        sub_comments_per_comment=args.sub_comments,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        captcha_every=args.captcha_every,
+        ip_block_every=args.ip_block_every,
+        seed=args.seed,
+    )
+    results = run_benchmark(
+        platforms=args.platform or ["xhs", "zhihu"],
+        sinks=[sink.strip() for sink in args.sinks.split(",") if sink.strip()],
+        mock_cfg=mock_cfg,
+        concurrency=args.concurrency,
+    )
+    print(format_results(results))
+    if args.output:
+        args.output.write_text(json.dumps({"mock": asdict(mock_cfg), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
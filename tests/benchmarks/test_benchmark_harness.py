@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Smoke tests of the mock platform and the benchmark runner with tiny data sizes"""
+import httpx
+import pytest
+
+from tests.benchmarks.mock_platform import MockPlatformConfig, create_app
+from tests.benchmarks.run_benchmark import DEFAULT_SINKS, run_benchmark
+
+
+@pytest.mark.asyncio
+async def test_mock_platform_injects_failures_deterministically():
+    app = create_app(MockPlatformConfig(notes_per_page=3, captcha_every=2, ip_block_every=3))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://mock") as client:
+        statuses = []
+        for _ in range(4):
+            response = await client.post("/api/sns/web/v1/search/notes", json={"page": 1})
+            statuses.append((response.status_code, response.json().get("code") if response.content else None))
+        first = (await client.post("/api/sns/web/v1/feed", json={"source_note_id": "n1"})).json()
+        stats = (await client.get("/__stats")).json()
+
+    assert statuses == [(200, 0), (461, None), (200, 300012), (461, None)]
+    assert stats["injected"] == {"461": 2, "300012": 1}
+    # Request 5 is not a failure, the note is generated from the seed and note id only
+    assert first["data"]["items"][0]["note_card"]["note_id"] == "n1"
+
+
+def test_xhs_search_benchmark_recovers_from_injected_failures():
+    cfg = MockPlatformConfig(
+        search_pages=1,
+        notes_per_page=3,
+        comment_pages=1,
+        comments_per_page=2,
+        sub_comments_per_comment=1,
+        captcha_every=7,
+        ip_block_every=11,
+    )
+    [result] = run_benchmark(platforms=["xhs"], sinks=["jsonl"], mock_cfg=cfg, concurrency=2)
+
+    assert result["contents"] == 3
+    # 2 first level comments per note, each with 1 embedded sub comment and one page of 10 (the crawler's num)
+    assert result["comments"] == 3 * 2 * (1 + 1 + 10)
+    assert result["failed_requests"] == 0
+    assert result["p99_ms"] >= result["p50_ms"] > 0
+
+
+@pytest.mark.parametrize("platform", ["xhs", "zhihu"])
+def test_default_sinks_all_complete(platform):
+    cfg = MockPlatformConfig(search_pages=1, notes_per_page=2, comment_pages=1, comments_per_page=2,
+                             sub_comments_per_comment=0, sub_comment_pages=0)
+    sinks = DEFAULT_SINKS.split(",")
+    results = run_benchmark(platforms=[platform], sinks=sinks, mock_cfg=cfg, concurrency=2, sub_comments=False)
+
+    assert [result["sink"] for result in results] == sinks
+    # Every sink stores the same crawl
+    assert {(result["contents"], result["comments"], result["failed_requests"]) for result in results} == {(2, 4, 0)}
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Micro benchmarks of the CPU hot paths (signing helpers, HTML/JSON extraction, record building)
+
+Run and compare with the stored baseline (fails when a mean regresses by more than 25%):
+    pytest tests/benchmarks/test_micro_benchmarks.py --benchmark-only \
+        --benchmark-storage=file://tests/benchmarks/baselines \
+        --benchmark-compare=0001 --benchmark-compare-fail=mean:25%
+
+Refresh the baseline after an intended change:
+    pytest tests/benchmarks/test_micro_benchmarks.py --benchmark-only \
+        --benchmark-storage=file://tests/benchmarks/baselines --benchmark-save=baseline
+
+CI also runs this file against the src/ of the pull request's base branch. Every benchmark therefore imports the
+code it measures through `require`, so benchmarks of code the base branch does not have yet are skipped there
+instead of breaking the whole run.
+"""
+import copy
+import json
+from typing import Any
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from tests.benchmarks import fixtures
+
+
+
+def require(module: str, name: str) -> Any:
+    """Import `name` from `module`, skipping the benchmark when the tree under test does not provide it"""
+    value = getattr(pytest.importorskip(module), name, None)
+    if value is None:
+        pytest.skip(f"{module}.{name} is not available")
+    return value
+
+
+NOTE_ID = "65a1b2c3d4e5f60718293a4b"
+SIGN = fixtures.xhs_sign_inputs()
+
+
+@pytest.fixture(scope="module")
+def xs_common_json() -> str:
+    payload = {
+        "s0": 3, "s1": "", "x0": "1", "x1": "4.2.2", "x2": "Mac OS", "x3": "xhs-pc-web", "x4": "4.74.0",
+        "x5": SIGN["a1"], "x6": SIGN["x_t"], "x7": SIGN["x_s"], "x8": SIGN["b1"], "x9": 0, "x10": 154, "x11": "normal",
+    }
+    return json.dumps(payload, separators=(",", ":"))
+
+
+# ========== XHS signing ==========
+
+XHS_SIGN = "src.platforms.xhs.xhs_sign"
+PLAYWRIGHT_SIGN = "src.platforms.xhs.playwright_sign"
+
+
+@pytest.mark.benchmark(group="xhs_sign")
+def test_mrc(benchmark):
+    benchmark(require(XHS_SIGN, "mrc"), SIGN["x_t"] + SIGN["x_s"] + SIGN["b1"])
+
+
+@pytest.mark.benchmark(group="xhs_sign")
+def test_encode_utf8(benchmark, xs_common_json):
+    benchmark(require(XHS_SIGN, "encode_utf8"), xs_common_json + json.dumps(SIGN["post_data"], ensure_ascii=False))
+
+
+@pytest.mark.benchmark(group="xhs_sign")
+def test_b64_encode(benchmark, xs_common_json):
+    benchmark(require(XHS_SIGN, "b64_encode"), require(XHS_SIGN, "encode_utf8")(xs_common_json))
+
+
+@pytest.mark.benchmark(group="xhs_sign")
+def test_build_sign_string_post(benchmark):
+    benchmark(require(PLAYWRIGHT_SIGN, "_build_sign_string"), SIGN["uri"], SIGN["post_data"], "POST")
+
+
+@pytest.mark.benchmark(group="xhs_sign")
+def test_build_sign_string_get(benchmark):
+    benchmark(require(PLAYWRIGHT_SIGN, "_build_sign_string"), SIGN["get_uri"], SIGN["get_params"], "GET")
+
+
+@pytest.mark.benchmark(group="xhs_sign")
+def test_build_xs_headers(benchmark):
+    build_xs_payload = require(PLAYWRIGHT_SIGN, "_build_xs_payload")
+    build_xs_common = require(PLAYWRIGHT_SIGN, "_build_xs_common")
+
+    def build():
+        x_s = build_xs_payload("mns0101_" + "a" * 120, "object")
+        return build_xs_common(SIGN["a1"], SIGN["b1"], x_s, SIGN["x_t"])
+
+    benchmark(build)
+
+
+# ========== XHS extraction and records ==========
+
+def xhs_extractor():
+    return require("src.platforms.xhs.extractor", "XiaoHongShuExtractor")()
+
+
+@pytest.mark.benchmark(group="xhs_extract")
+@pytest.mark.parametrize("scale", [1, 10])
+def test_extract_note_detail_from_html(benchmark, scale):
+    html = fixtures.xhs_note_html(NOTE_ID, scale=scale)
+    note = benchmark(xhs_extractor().extract_note_detail_from_html, NOTE_ID, html)
+    assert note["note_id"] == NOTE_ID
+
+
+@pytest.mark.benchmark(group="xhs_extract")
+def test_extract_creator_info_from_html(benchmark):
+    html = fixtures.xhs_creator_html("5f0e1d2c3b4a596877665544", scale=5)
+    assert benchmark(xhs_extractor().extract_creator_info_from_html, html)["basicInfo"]
+
+
+@pytest.mark.benchmark(group="xhs_extract")
+def test_build_xhs_note_item(benchmark):
+    build_xhs_note_item = require("src.storage.xhs", "build_xhs_note_item")
+    note = fixtures.xhs_note_card(NOTE_ID)
+    # build_xhs_note_item updates the image urls in place, give every round a fresh copy
+    benchmark.pedantic(build_xhs_note_item, setup=lambda: ((copy.deepcopy(note),), {}), rounds=2000)
+
+
+# ========== Zhihu extraction ==========
+
+def zhihu_extractor():
+    return require("src.platforms.zhihu.help", "ZhihuExtractor")()
+
+
+@pytest.mark.benchmark(group="html_text")
+@pytest.mark.parametrize("paragraphs", [5, 200])
+def test_extract_text_from_html(benchmark, paragraphs):
+    html = fixtures.zhihu_answer(str(paragraphs), paragraphs=paragraphs)["content"]
+    assert benchmark(require("src.utils.crawler_util", "extract_text_from_html"), html)
+
+
+@pytest.mark.benchmark(group="zhihu_extract")
+def test_extract_contents_from_search(benchmark):
+    data = fixtures.zhihu_search_response(results=20, paragraphs=20)
+    assert len(benchmark(zhihu_extractor().extract_contents_from_search, data)) == 20
+
+
+@pytest.mark.benchmark(group="zhihu_extract")
+def test_extract_comments(benchmark):
+    content = require("src.models.m_zhihu", "ZhihuContent")(content_id="1000000001", content_type="answer")
+    comments = fixtures.zhihu_comments("1000000001", count=20)
+    assert len(benchmark(zhihu_extractor().extract_comments, content, comments)) == 20
+
+
+@pytest.mark.benchmark(group="zhihu_extract")
+@pytest.mark.parametrize("method, builder", [
+    ("extract_answer_content_from_html", fixtures.zhihu_answer_html),
+    ("extract_article_content_from_html", fixtures.zhihu_article_html),
+    ("extract_zvideo_content_from_html", fixtures.zhihu_zvideo_html),
+])
+def test_extract_content_from_html(benchmark, method, builder):
+    html = builder(scale=5)
+    extract = getattr(zhihu_extractor(), method)
+    assert benchmark(extract, html).content_id
+
+
+@pytest.mark.benchmark(group="zhihu_extract")
+def test_extract_creator(benchmark):
+    html = fixtures.zhihu_creator_html("member-creator", scale=5)
+    assert benchmark(zhihu_extractor().extract_creator, "member-creator", html).user_nickname
+
+
+# ========== JSON codec ==========
+
+@pytest.mark.benchmark(group="codec")
+def test_codec_dumps_records(benchmark):
+    comments = fixtures.zhihu_comments("1000000001", count=200)
+    assert benchmark(require("src.utils.codec", "dumps"), comments).startswith("[")
+
+
+@pytest.mark.benchmark(group="codec")
+def test_codec_loads_response(benchmark):
+    body = json.dumps({"data": fixtures.zhihu_comments("1000000001", count=200)}).encode()
+    assert len(benchmark(require("src.utils.codec", "loads"), body)["data"]) == 200
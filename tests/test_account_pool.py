@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""Multi-account pool: scheduling over healthy accounts, rate budgets, cooldown of blocked accounts"""
+import asyncio
+import time
+
+import pytest
+from tenacity import retry, stop_after_attempt
+
+import config
+from src.models.page import CursorPage
+from src.platforms.xhs.exception import CaptchaError, DataFetchError, is_account_blocked
+from src.services.accounts import (AccountPool, AccountSession, NoHealthyAccountError, PooledClient, RateBudget,
+                                   load_account_configs)
+
+
+class FakeClient:
+    def __init__(self, name, healthy=True, blocked=False):
+        self.name = name
+        self.healthy = healthy
+        self.blocked = blocked
+        self.calls = []
+        self.cookie_dict = {"a1": name}
+
+    async def pong(self):
+        return self.healthy
+
+    @retry(stop=stop_after_attempt(2))
+    async def get_note_by_id(self, note_id):
+        self.calls.append(note_id)
+        if self.blocked:
+            raise CaptchaError("CAPTCHA appeared")
+        return {"note_id": note_id, "account": self.name}
+
+    async def broken(self):
+        raise DataFetchError("bad note")
+
+    async def iter_note_comments(self, note_id):
+        for page in range(3):
+            self.calls.append((note_id, page))
+            yield CursorPage(items=[self.name], cursor=str(page + 1), has_more=page < 2)
+
+
+def make_pool(*clients, rate=0, **kwargs):
+    sessions = [AccountSession(client.name, client, rate=rate) for client in clients]
+    return AccountPool(sessions, is_blocked=is_account_blocked, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_rate_budget_spaces_calls():
+    budget = RateBudget(rate=50)
+    started = time.monotonic()
+    for _ in range(4):
+        await budget.acquire()
+    assert time.monotonic() - started >= 3 / 50 * 0.9
+    assert RateBudget(rate=0).interval == 0
+
+
+@pytest.mark.asyncio
+async def test_calls_are_spread_over_accounts_by_budget():
+    clients = [FakeClient("a"), FakeClient("b"), FakeClient("c")]
+    client = PooledClient(make_pool(*clients, rate=20))
+    started = time.monotonic()
+    results = await asyncio.gather(*(client.get_note_by_id(str(i)) for i in range(9)))
+    # Three accounts at 20 calls/s each: 9 calls need ~0.1s instead of ~0.4s on one account
+    assert time.monotonic() - started < 0.3
+    assert sorted(len(c.calls) for c in clients) == [3, 3, 3]
+    assert {r["account"] for r in results} == {"a", "b", "c"}
+    assert client.cookie_dict == {"a1": "a"}
+
+
+@pytest.mark.asyncio
+async def test_blocked_account_cools_down_and_the_call_moves_on():
+    blocked, ok = FakeClient("blocked", blocked=True), FakeClient("ok")
+    pool = make_pool(blocked, ok, cooldown=60)
+    client = PooledClient(pool)
+
+    results = [await client.get_note_by_id(str(i)) for i in range(3)]
+    assert [r["account"] for r in results] == ["ok"] * 3
+    assert len(blocked.calls) == 2  # the client's own retries, then never again during the cooldown
+    assert pool.healthy_sessions() == [pool.sessions[1]] and pool.sessions[0].failures == 1
+
+    with pytest.raises(DataFetchError):
+        await client.broken()
+    assert pool.sessions[1].healthy  # ordinary errors do not cool an account down
+
+
+@pytest.mark.asyncio
+async def test_cooled_down_accounts_are_rechecked_with_pong():
+    flaky = FakeClient("flaky", healthy=False)
+    pool = make_pool(flaky, cooldown=0.05, max_failures=3)
+    assert await pool.check_all() == []
+
+    flaky.healthy = True
+    assert (await PooledClient(pool).get_note_by_id("1"))["account"] == "flaky"
+    assert pool.sessions[0].healthy and pool.sessions[0].failures == 0
+
+
+@pytest.mark.asyncio
+async def test_all_accounts_failing_stops_the_crawl():
+    pool = make_pool(FakeClient("a", healthy=False), FakeClient("b", healthy=False), cooldown=0.01, max_failures=2)
+    await pool.check_all()
+    with pytest.raises(NoHealthyAccountError):
+        await PooledClient(pool).get_note_by_id("1")
+
+
+@pytest.mark.asyncio
+async def test_pagination_is_pinned_to_one_account():
+    clients = [FakeClient("a"), FakeClient("b")]
+    pool = make_pool(*clients)
+    pages = [page async for page in PooledClient(pool).iter_note_comments("n1")]
+    assert len(pages) == 3 and len({page.items[0] for page in pages}) == 1
+    assert sum(session.calls for session in pool.sessions) == 3
+
+
+def test_account_configs_get_their_own_login_state_dir(monkeypatch):
+    monkeypatch.setattr(config, "ACCOUNTS", [{"name": "alice", "cookies": "a1=x"}, {"user_data_dir": "/tmp/bob"}])
+    alice, second = load_account_configs("xhs")
+    assert alice.cookies == "a1=x" and alice.user_data_dir.endswith(config.USER_DATA_DIR % "xhs_alice")
+    assert second.name == "account2" and second.user_data_dir == "/tmp/bob"
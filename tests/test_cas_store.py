@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""Content addressed media store: deduplication, URL / ETag reuse, the manifest fallback and off-loop index access"""
+import os
+import threading
+
+import httpx
+import pytest
+
+import config
+from src.services.media import ContentAddressedStore, MediaDownloader, MediaTask
+from src.services.media.cas_store import file_sha256
+from src.utils import codec
+
+CONTENT = b"\x89PNG" + bytes(range(256)) * 16
+
+
+class FakeCdn:
+    """Every URL serves CONTENT with the same ETag"""
+
+    def __init__(self):
+        self.requests = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append((request.method, str(request.url)))
+        return httpx.Response(200, headers={"ETag": '"same"', "Content-Length": str(len(CONTENT))},
+                              content=b"" if request.method == "HEAD" else CONTENT)
+
+
+@pytest.fixture(autouse=True)
+def no_waiting(monkeypatch):
+    monkeypatch.setattr(config, "MEDIA_DOWNLOAD_DEFAULT_RATE", 0)
+    monkeypatch.setattr(config, "MEDIA_DOWNLOAD_RATE_LIMITS", {})
+    monkeypatch.setattr(config, "MEDIA_STORE_HEAD_CHECK", True)
+
+
+async def download(cdn, root, tasks):
+    downloader = MediaDownloader(concurrency=1, store=ContentAddressedStore(root / "media"),
+                                 transport=httpx.MockTransport(cdn.handler))
+    for url, path in tasks:
+        await downloader.submit(MediaTask(url=url, path=path))
+    await downloader.close()
+    return downloader
+
+
+@pytest.mark.asyncio
+async def test_same_content_is_stored_once_and_hardlinked(tmp_path):
+    cdn = FakeCdn()
+    first, second = tmp_path / "note1" / "0.png", tmp_path / "note2" / "0.png"
+    downloader = await download(cdn, tmp_path, [("https://cdn.example.com/a.png", first),
+                                                ("https://cdn.example.com/b.png", second)])
+
+    objects = [path for path in (tmp_path / "media" / "objects").rglob("*") if path.is_file()]
+    assert [path.name for path in objects] == [f"{file_sha256(first)}.png"]
+    assert os.path.samefile(first, objects[0]) and os.path.samefile(second, objects[0])
+    # b.png matched the stored object by HEAD size + ETag, only a.png was downloaded
+    assert [method for method, _ in cdn.requests] == ["HEAD", "GET", "HEAD"]
+    assert (downloader.files_downloaded, downloader.files_deduplicated) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_known_url_is_reused_on_the_next_run_without_requests(tmp_path):
+    url = "https://cdn.example.com/a.png"
+    await download(FakeCdn(), tmp_path, [(url, tmp_path / "run1" / "0.png")])
+
+    cdn = FakeCdn()
+    downloader = await download(cdn, tmp_path, [(url, tmp_path / "run2" / "0.png")])
+    assert cdn.requests == [] and downloader.files_deduplicated == 1
+    assert (tmp_path / "run2" / "0.png").read_bytes() == CONTENT
+
+
+@pytest.mark.asyncio
+async def test_manifest_is_written_when_hardlinks_are_unsupported(tmp_path, monkeypatch):
+    def no_hardlinks(src, dst):
+        raise OSError("hard links not supported")
+
+    monkeypatch.setattr(os, "link", no_hardlinks)
+    note_dir = tmp_path / "note1"
+    await download(FakeCdn(), tmp_path, [("https://cdn.example.com/a.png", note_dir / "0.png"),
+                                         ("https://cdn.example.com/b.png", note_dir / "1.png")])
+
+    assert not (note_dir / "0.png").exists()
+    manifest = codec.loads((note_dir / "manifest.json").read_bytes())
+    assert sorted(manifest) == ["0.png", "1.png"] and manifest["0.png"] == manifest["1.png"]
+    assert (note_dir / manifest["0.png"]).resolve().read_bytes() == CONTENT
+
+
+@pytest.mark.asyncio
+async def test_index_is_queried_off_the_event_loop_thread(tmp_path, monkeypatch):
+    threads = set()
+    lookup = ContentAddressedStore.lookup
+
+    def recording_lookup(self, url):
+        threads.add(threading.get_ident())
+        return lookup(self, url)
+
+    monkeypatch.setattr(ContentAddressedStore, "lookup", recording_lookup)
+    await download(FakeCdn(), tmp_path, [("https://cdn.example.com/a.png", tmp_path / "0.png")])
+    assert threads and threading.get_ident() not in threads
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Record/replay transport: a session recorded against the mock platform replays offline, volatile params ignored"""
+import httpx
+import pytest
+
+import config
+from src.services.transport import create_async_client, get_transport, request_key, reset_transports
+from src.utils import codec
+from tests.benchmarks.mock_platform import MockPlatformConfig, MockPlatformServer
+
+SEARCH = "/api/sns/web/v1/search/notes"
+COMMENTS = "/api/sns/web/v2/comment/page"
+
+
+@pytest.fixture(autouse=True)
+def cassette_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "HTTP_CASSETTE_PATH", str(tmp_path / "session.jsonl"))
+    monkeypatch.setattr(config, "HTTP_CASSETTE_IGNORE_PARAMS", ["search_id", "t"])
+    monkeypatch.setattr(config, "HTTP_REPLAY_LATENCY_MS", 0)
+    monkeypatch.setattr(config, "HTTP_REPLAY_JITTER_MS", 0)
+    monkeypatch.setattr(config, "HTTP_TRANSPORT_MODE", "passthrough")
+    reset_transports()
+    yield
+    reset_transports()
+
+
+def use_mode(mode):
+    # Restored by the monkeypatch of cassette_config
+    config.HTTP_TRANSPORT_MODE = mode
+    reset_transports()
+
+
+async def session(client: httpx.AsyncClient, base_url: str, search_id: str, t: int):
+    """Same requests as a crawl would send: the search POST twice, then a comment page GET"""
+    responses = []
+    for _ in range(2):
+        responses.append(await client.post(f"{base_url}{SEARCH}", json={"keyword": "咖啡", "page": 1,
+                                                                        "search_id": search_id}))
+    responses.append(await client.get(f"{base_url}{COMMENTS}", params={"note_id": "n1", "cursor": "", "t": t}))
+    return [(response.status_code, response.content) for response in responses]
+
+
+async def record_session():
+    # Every 2nd request is a captcha, so the two identical search POSTs get different responses
+    with MockPlatformServer(MockPlatformConfig(notes_per_page=2, captcha_every=2)) as server:
+        use_mode("record")
+        async with create_async_client() as client:
+            recorded = await session(client, server.base_url, search_id="first", t=1)
+    return server.base_url, recorded
+
+
+@pytest.mark.asyncio
+async def test_recorded_session_replays_without_network():
+    base_url, recorded = await record_session()
+    assert [status for status, _ in recorded] == [200, 461, 200]
+
+    lines = [codec.loads(line) for line in open(config.HTTP_CASSETTE_PATH, encoding="utf-8")]
+    assert len(lines) == 3 and all("first" not in line["key"] for line in lines)
+
+    # The server is gone and the volatile params differ: every response comes from the cassette, in recorded order
+    use_mode("replay")
+    async with create_async_client() as client:
+        replayed = await session(client, base_url, search_id="second", t=2)
+        assert replayed == recorded
+        # Recorded responses used up: the last one repeats
+        again = await client.post(f"{base_url}{SEARCH}", json={"page": 1, "keyword": "咖啡", "search_id": "third"})
+        assert again.status_code == 461
+
+
+@pytest.mark.asyncio
+async def test_unrecorded_request_is_a_miss():
+    base_url, _ = await record_session()
+    use_mode("replay")
+    transport = get_transport()
+    async with create_async_client() as client:
+        # Only the ignored search_id may differ, a different page is another request
+        with pytest.raises(httpx.ConnectError, match="No recorded response"):
+            await client.post(f"{base_url}{SEARCH}", json={"keyword": "咖啡", "page": 2, "search_id": "first"})
+    missed_body = codec.dumps_bytes({"keyword": "咖啡", "page": 2})
+    assert transport.misses == [request_key("POST", f"{base_url}{SEARCH}", missed_body)]
+
+    transport.strict = False
+    async with create_async_client() as client:
+        response = await client.get(f"{base_url}{COMMENTS}", params={"note_id": "n2", "cursor": ""})
+    assert response.status_code == 404 and len(transport.misses) == 2
+
+
+def test_request_key_ignores_volatile_params_only():
+    url = "https://edith.example.com/api?b=2&t=123&a=1"
+    assert request_key("get", url) == request_key("GET", "https://edith.example.com/api?a=1&b=2&t=999")
+    assert request_key("POST", url, b'{"search_id": "x", "page": 1}') == request_key("POST", url, b'{"page": 1}')
+    assert request_key("POST", url, b'{"page": 1}') != request_key("POST", url, b'{"page": 2}')
+    # Bodies that are not JSON objects are matched as sent
+    assert request_key("POST", url, b"a=1") != request_key("POST", url, b"a=2")
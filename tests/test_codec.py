@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""Every codec backend against the stdlib layouts the signing and the stores relied on"""
+import json
+
+import pytest
+
+hypothesis = pytest.importorskip("hypothesis")
+from hypothesis import given, strategies as st
+
+from src.platforms.xhs.playwright_sign import _build_sign_string, _build_xs_common, _build_xs_payload
+from src.utils import codec
+from tests.benchmarks import fixtures
+
+BACKENDS = ["json"] + [name for name, module in (("orjson", codec.orjson), ("msgspec", codec.msgspec)) if module]
+
+# Values the signing payloads and the stores carry, floats are excluded as their exponent form is backend specific
+json_values = st.recursive(
+    st.none() | st.booleans() | st.integers(-2 ** 63, 2 ** 63 - 1) | st.text(),
+    lambda children: st.lists(children, max_size=5) | st.dictionaries(st.text(), children, max_size=5),
+    max_leaves=20,
+)
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    previous = codec.BACKEND
+    codec.set_backend(request.param)
+    yield request.param
+    codec.set_backend(previous)
+
+
+@given(value=json_values)
+def test_compact_and_indented_layouts_match_stdlib(value):
+    previous = codec.BACKEND
+    for name in BACKENDS:
+        codec.set_backend(name)
+        try:
+            assert codec.dumps(value) == json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+            assert codec.dumps(value, indent=True) == json.dumps(value, indent=4, ensure_ascii=False)
+            assert codec.loads(codec.dumps_bytes(value)) == value
+        finally:
+            codec.set_backend(previous)
+
+
+def test_sign_string_is_byte_identical(backend):
+    inputs = fixtures.xhs_sign_inputs()
+    legacy = inputs["uri"] + json.dumps(inputs["post_data"], separators=(",", ":"), ensure_ascii=False)
+    assert _build_sign_string(inputs["uri"], inputs["post_data"]) == legacy
+    assert _build_sign_string(inputs["uri"], inputs["post_data"]) == inputs["uri"] + codec.dumps(inputs["post_data"])
+
+
+def test_ascii_payloads_keep_stdlib_escaping(backend):
+    inputs = fixtures.xhs_sign_inputs()
+    assert codec.dumps({"x": "上海"}, ensure_ascii=True) == '{"x":"\\u4e0a\\u6d77"}'
+    args = (inputs["a1"], inputs["b1"], inputs["x_s"], inputs["x_t"])
+    common, payload = _build_xs_common(*args), _build_xs_payload("mns0101_abc", "object")
+    codec.set_backend("json")
+    assert (common, payload) == (_build_xs_common(*args), _build_xs_payload("mns0101_abc", "object"))
+
+
+def test_unsupported_values_fall_back_to_stdlib(backend):
+    assert codec.dumps({"id": 2 ** 70}) == '{"id":1180591620717411303424}'
+    assert codec.dumps({1: "a", None: "b"}) == '{"1":"a","null":"b"}'
+    assert codec.dumps({"b": 1, "a": [2]}, sort_keys=True) == '{"a":[2],"b":1}'
+
+
+def test_non_finite_floats_follow_the_documented_backend_behaviour(backend):
+    values = [float("nan"), float("inf"), -float("inf")]
+    expected = "[NaN,Infinity,-Infinity]" if backend == "json" else "[null,null,null]"
+    assert codec.dumps(values) == expected
+    # Indented output always comes from the stdlib
+    assert codec.dumps(values, indent=True) == json.dumps(values, indent=4)
+
+
+def test_loads_leniency_and_errors(backend):
+    assert codec.loads(b'{"a": "\xe4\xb8\x8a"}') == {"a": "上"}
+    assert codec.loads('{"a": "line\nbreak"}', strict=False) == {"a": "line\nbreak"}
+    with pytest.raises(json.JSONDecodeError):
+        codec.loads('{"a": "line\nbreak"}')
+    with pytest.raises(json.JSONDecodeError):
+        codec.loads("{not json")
+
+
+def test_api_response_matches_starlette_layout(backend):
+    from fastapi.responses import JSONResponse
+    from api.responses import FastJSONResponse
+
+    content = {"data": [{"title": "咖啡", "liked": 12, "tags": ["a", "b"]}], "total": 1}
+    assert FastJSONResponse(content).body == JSONResponse(content).body
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""Creator mode pipeline: concurrent creators, shared concurrency budget and the platform crawlers wired to it"""
+import asyncio
+
+import pytest
+
+import config
+from src.core.pipeline import CreatorPipeline
+from src.models.m_zhihu import ZhihuContent, ZhihuCreator
+from src.models.page import CursorPage
+
+
+async def listing(prefix: str, pages: int, per_page: int = 3):
+    for page in range(pages):
+        yield CursorPage(items=[f"{prefix}-{page}-{i}" for i in range(per_page)], cursor=page + 1,
+                         has_more=page + 1 < pages)
+
+
+@pytest.mark.asyncio
+async def test_creators_run_concurrently_within_the_budget():
+    in_flight, peak, started, handled = 0, 0, [], []
+
+    async def request():
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+
+    async def crawl_creator(creator, pipeline):
+        started.append(creator)
+        async with pipeline.budget:
+            await request()
+        await pipeline.feed(listing(creator, pages=2))
+
+    async def handle_item(item, pipeline):
+        async with pipeline.budget:
+            await request()
+        handled.append(item)
+
+    pipeline = CreatorPipeline(concurrency=3, queue_size=2)
+    await pipeline.run(["a", "b", "c", "d"], crawl_creator, handle_item)
+    assert sorted(handled) == sorted(f"{c}-{p}-{i}" for c in "abcd" for p in range(2) for i in range(3))
+    assert started == ["a", "b", "c", "d"] and peak == 3
+    assert pipeline.items_processed == pipeline.items_submitted == 24
+
+
+@pytest.mark.asyncio
+async def test_failures_are_isolated():
+    handled = []
+
+    async def crawl_creator(creator, pipeline):
+        if creator == "bad":
+            raise RuntimeError("banned")
+        await pipeline.feed(listing(creator, pages=1))
+
+    async def handle_item(item, pipeline):
+        if item.endswith("-1"):
+            raise ValueError(item)
+        handled.append(item)
+
+    pipeline = CreatorPipeline(concurrency=2)
+    await pipeline.run(["bad", "ok"], crawl_creator, handle_item)
+    assert handled == ["ok-0-0", "ok-0-2"] and pipeline.items_failed == 1
+
+
+class FakeZhihuClient:
+    def __init__(self):
+        self.listed = []
+
+    async def get_creator_info(self, url_token):
+        return ZhihuCreator(url_token=url_token, user_id=url_token)
+
+    def _listing(self, content_type):
+        def iterate(creator, crawl_interval=1.0, offset=0):
+            self.listed.append((creator.url_token, content_type))
+
+            async def pages():
+                yield CursorPage(items=[
+                    ZhihuContent(content_id=f"{creator.url_token}-{content_type}-{i}", content_type=content_type)
+                    for i in range(2)
+                ], cursor=20)
+            return pages()
+        return iterate
+
+    @property
+    def iter_anwser_by_creator(self):
+        return self._listing("answer")
+
+    @property
+    def iter_articles_by_creator(self):
+        return self._listing("article")
+
+    @property
+    def iter_videos_by_creator(self):
+        return self._listing("zvideo")
+
+
+@pytest.mark.asyncio
+async def test_zhihu_creators_feed_the_selected_content_types(monkeypatch):
+    from src.platforms.zhihu import core as zhihu_core
+
+    stored, commented = [], []
+
+    async def save_creator(creator):
+        stored.append(creator.url_token)
+
+    async def update_zhihu_content(content_item):
+        stored.append(content_item.content_id)
+
+    async def get_comments(content_item, semaphore):
+        async with semaphore:
+            commented.append(content_item.content_id)
+
+    monkeypatch.setattr(zhihu_core.zhihu_store, "save_creator", save_creator)
+    monkeypatch.setattr(zhihu_core.zhihu_store, "update_zhihu_content", update_zhihu_content)
+    monkeypatch.setattr(config, "ZHIHU_CREATOR_URL_LIST", ["https://www.zhihu.com/people/u1", "https://www.zhihu.com/people/u2"])
+    monkeypatch.setattr(config, "ZHIHU_CREATOR_CONTENT_TYPES", ["answer", "zvideo"])
+    monkeypatch.setattr(config, "ENABLE_GET_COMMENTS", True)
+    monkeypatch.setattr(config, "CRAWLER_MAX_SLEEP_SEC", 0)
+    monkeypatch.setattr(config, "MAX_CONCURRENCY_NUM", 2)
+
+    crawler = zhihu_core.ZhihuCrawler()
+    crawler.zhihu_client = FakeZhihuClient()
+    monkeypatch.setattr(crawler, "get_comments", get_comments)
+    await crawler.get_creators_and_notes()
+
+    assert sorted(crawler.zhihu_client.listed) == [
+        ("u1", "answer"), ("u1", "zvideo"), ("u2", "answer"), ("u2", "zvideo"),
+    ]
+    expected = {f"{u}-{t}-{i}" for u in ("u1", "u2") for t in ("answer", "zvideo") for i in range(2)}
+    assert set(commented) == expected and set(stored) == expected | {"u1", "u2"}
+
+
+@pytest.mark.asyncio
+async def test_xhs_creator_notes_get_details_and_comments(monkeypatch):
+    from src.platforms.xhs import core as xhs_core
+
+    creators = [
+        "https://www.xiaohongshu.com/user/profile/u1?xsec_token=t1&xsec_source=pc_feed",
+        "https://www.xiaohongshu.com/user/profile/u2?xsec_token=t2&xsec_source=pc_feed",
+    ]
+    details, comments = [], []
+
+    class FakeXhsClient:
+        async def get_creator_info(self, user_id, xsec_token="", xsec_source=""):
+            return {}
+
+        async def iter_notes_by_creator(self, user_id, crawl_interval=1.0, xsec_token="", xsec_source=""):
+            yield CursorPage(items=[{"note_id": f"{user_id}-n{i}", "xsec_token": xsec_token} for i in range(3)])
+
+    async def get_note_detail_async_task(note_id, xsec_source, xsec_token, semaphore):
+        async with semaphore:
+            details.append(note_id)
+        return None
+
+    async def get_comments(note_id, xsec_token, semaphore):
+        comments.append((note_id, xsec_token))
+
+    monkeypatch.setattr(config, "XHS_CREATOR_ID_LIST", creators)
+    monkeypatch.setattr(config, "ENABLE_GET_COMMENTS", True)
+    monkeypatch.setattr(config, "CRAWLER_MAX_SLEEP_SEC", 0)
+    crawler = xhs_core.XiaoHongShuCrawler()
+    crawler.xhs_client = FakeXhsClient()
+    monkeypatch.setattr(crawler, "get_note_detail_async_task", get_note_detail_async_task)
+    monkeypatch.setattr(crawler, "get_comments", get_comments)
+    await crawler.get_creators_and_notes()
+
+    assert sorted(details) == [f"u{u}-n{i}" for u in (1, 2) for i in range(3)]
+    assert sorted(comments) == [(f"u{u}-n{i}", f"t{u}") for u in (1, 2) for i in range(3)]
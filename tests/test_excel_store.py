@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""Excel export: streaming rollover, width estimation, shared named styles, readable files and the in-memory save path"""
+import re
+import zipfile
+
+import openpyxl
+import pytest
+
+import config
+from src.core.var import crawler_type_var
+from src.storage.base.excel_store_base import ExcelStoreBase, StreamingExcelStoreBase
+from src.storage.xhs._store_impl import XhsExcelStoreImplement
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    # Both stores write to data/<platform> under the working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "EXCEL_STREAMING_MODE", config.EXCEL_STREAMING_MODE)
+    ExcelStoreBase._instances.clear()
+    yield tmp_path
+    ExcelStoreBase._instances.clear()
+
+
+def comment(index, content="text"):
+    return {"comment_id": f"c{index}", "content": content, "pictures": ["a.jpg"], "parent_comment_id": None}
+
+
+def sheet_rows(path, title):
+    workbook = openpyxl.load_workbook(path)
+    return [list(row) for row in workbook[title].iter_rows(values_only=True)]
+
+
+@pytest.mark.asyncio
+async def test_new_part_file_with_repeated_headers_at_the_row_limit():
+    store = StreamingExcelStoreBase("xhs", max_rows=3, sample_rows=2)
+    for index in range(2):
+        await store.store_content({"note_id": f"n{index}", "title": "t"})
+    for index in range(7):
+        await store.store_comment(comment(index))
+    await store.close()
+
+    names = [path.name for path in store.saved_files]
+    assert len(names) == 3 and names[1:] == [names[0].replace(".xlsx", f"_part{part}.xlsx") for part in (2, 3)]
+    header = ["comment_id", "content", "pictures", "parent_comment_id"]
+    parts = [sheet_rows(path, "Comments") for path in store.saved_files]
+    assert [part[0] for part in parts] == [header] * 3
+    assert [[row[0] for row in part[1:]] for part in parts] == [["c0", "c1", "c2"], ["c3", "c4", "c5"], ["c6"]]
+    # Only the sheet that reached the limit continues, contents were all written to the first part
+    assert sheet_rows(store.saved_files[0], "Contents") == [["note_id", "title"], ["n0", "t"], ["n1", "t"]]
+    assert openpyxl.load_workbook(store.saved_files[1]).sheetnames == ["Comments"]
+
+
+@pytest.mark.asyncio
+async def test_column_widths_are_estimated_from_the_sampled_rows():
+    store = StreamingExcelStoreBase("xhs", sample_rows=3)
+    for index, content in enumerate(["short", "x" * 20, "y" * 30, "z" * 200]):
+        await store.store_comment(comment(index, content))
+    await store.close()
+
+    columns = openpyxl.load_workbook(store.saved_files[0])["Comments"].column_dimensions
+    # comment_id: header length + 2, content: longest sampled value + 2 (the 4th row is not sampled),
+    # pictures: "['a.jpg']" + 2, parent_comment_id: header length + 2
+    assert [columns[letter].width for letter in "ABCD"] == [12, 32, 11, 19]
+
+    store = StreamingExcelStoreBase("zhihu", sample_rows=2)
+    await store.store_comment(comment(0, "w" * 200))
+    await store.close()
+    assert openpyxl.load_workbook(store.saved_files[0])["Comments"].column_dimensions["B"].width == 50
+
+
+@pytest.mark.asyncio
+async def test_cells_share_two_named_styles():
+    store = StreamingExcelStoreBase("xhs", sample_rows=5)
+    for index in range(50):
+        await store.store_comment(comment(index))
+        await store.store_creator({"user_id": f"u{index}", "nickname": "n"})
+    await store.close()
+
+    path = store.saved_files[0]
+    workbook = openpyxl.load_workbook(path)
+    assert [name for name in workbook.named_styles if name.startswith("lc_")] == ["lc_header", "lc_cell"]
+    for title in ("Comments", "Creators"):
+        rows = list(workbook[title].iter_rows())
+        assert {cell.style for cell in rows[0]} == {"lc_header"} and rows[0][0].font.b
+        assert {cell.style for row in rows[1:] for cell in row} == {"lc_cell"}
+    # Every cell references one of a handful of shared formats instead of carrying its own
+    styles_xml = zipfile.ZipFile(path).read("xl/styles.xml").decode()
+    assert int(re.search(r'<cellXfs count="(\d+)"', styles_xml).group(1)) <= 4
+
+
+@pytest.mark.asyncio
+async def test_workbook_is_readable_after_close():
+    store = StreamingExcelStoreBase("xhs", sample_rows=100)
+    await store.store_comment(comment(0))
+    await store.store_comment({**comment(1), "content": 3})
+    await store.close()
+
+    # Rows still in the width sample are written by close, lists become text and None an empty cell
+    assert sheet_rows(store.saved_files[0], "Comments")[1:] == [
+        ["c0", "text", "['a.jpg']", None], ["c1", 3, "['a.jpg']", None],
+    ]
+    assert store.workbook is None and ExcelStoreBase._instances == {}
+
+    empty = StreamingExcelStoreBase("zhihu")
+    await empty.close()
+    assert empty.saved_files == []
+
+
+@pytest.mark.asyncio
+async def test_in_memory_store_is_written_by_save():
+    crawler_type_var.set("search")
+    config.EXCEL_STREAMING_MODE = False
+    store = XhsExcelStoreImplement()
+    assert type(store) is ExcelStoreBase and XhsExcelStoreImplement() is store
+    await store.store_content({"note_id": "n1", "title": "t", "tag_list": ["a"]})
+    await store.close()
+
+    workbook = openpyxl.load_workbook(store.filename)
+    # Sheets without rows are removed
+    assert workbook.sheetnames == ["Contents"]
+    assert sheet_rows(store.filename, "Contents") == [["note_id", "title", "tag_list"], ["n1", "t", "['a']"]]
+    assert workbook["Contents"]["A1"].font.b and workbook["Contents"].column_dimensions["A"].width == 10
+    assert ExcelStoreBase._instances == {}
+
+    # flush_all saves every remaining singleton through the same path
+    other = ExcelStoreBase.get_instance("zhihu", "detail")
+    await other.store_creator({"user_id": "u1"})
+    ExcelStoreBase.flush_all()
+    assert sheet_rows(other.filename, "Creators") == [["user_id"], ["u1"]]
+
+    config.EXCEL_STREAMING_MODE = True
+    ExcelStoreBase._instances.clear()
+    assert type(XhsExcelStoreImplement()) is StreamingExcelStoreBase
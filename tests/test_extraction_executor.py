@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""Size based dispatch of the extraction executor and the loop lag monitor"""
+import asyncio
+import json
+import time
+
+import pytest
+import pytest_asyncio
+
+import config
+from src.platforms.xhs.extractor import XiaoHongShuExtractor
+from src.platforms.zhihu.help import ZhihuExtractor
+from src.platforms.zhihu.exception import DataFetchError
+from src.services.extraction import ExtractionExecutor, LoopLagMonitor, create_process_pool
+from src.services.extraction import executor as extraction
+from tests.benchmarks import fixtures
+
+NOTE_ID = "65a1b2c3d4e5f60718293a4b"
+# Filled in by the test only, a forked worker would inherit it
+PARENT_ONLY_STATE = []
+
+
+def worker_view(name):
+    return PARENT_ONLY_STATE, getattr(config, name)
+
+
+@pytest_asyncio.fixture
+async def executor():
+    extraction._extraction_executor = ExtractionExecutor(workers=1, min_bytes=100 * 1024)
+    yield extraction._extraction_executor
+    extraction.close_extraction_executor()
+
+
+@pytest.mark.asyncio
+async def test_small_pages_stay_inline_large_pages_are_offloaded(executor):
+    extractor = XiaoHongShuExtractor()
+    small = fixtures.xhs_note_html(NOTE_ID, scale=1)
+    large = fixtures.xhs_note_html(NOTE_ID, scale=5)
+    assert len(small) < executor.min_bytes <= len(large)
+
+    assert await extractor.extract_note_detail_from_html_async(NOTE_ID, small) == extractor.extract_note_detail_from_html(NOTE_ID, small)
+    assert await extractor.extract_note_detail_from_html_async(NOTE_ID, large) == extractor.extract_note_detail_from_html(NOTE_ID, large)
+    assert executor.stats()["inline_calls"] == 1
+    assert executor.stats()["offloaded_calls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_zhihu_page_and_search_extraction_through_pool(executor):
+    extractor = ZhihuExtractor()
+    html = fixtures.zhihu_answer_html(scale=3)
+    search_text = json.dumps(fixtures.zhihu_search_response(results=20, paragraphs=60), ensure_ascii=False)
+
+    assert await extractor.extract_answer_content_from_html_async(html) == extractor.extract_answer_content_from_html(html)
+    contents = await extractor.extract_contents_from_search_text_async(search_text)
+    assert [content.content_id for content in contents] == [
+        content.content_id for content in extractor.extract_contents_from_search(json.loads(search_text))
+    ]
+    assert executor.stats()["offloaded_calls"] == 2
+
+    # Errors raised in the worker reach the caller unchanged
+    with pytest.raises(DataFetchError):
+        await extractor.extract_contents_from_search_text_async('{"error": {"message": "blocked"}}' + " " * executor.min_bytes)
+
+
+@pytest.mark.asyncio
+async def test_workers_zero_runs_everything_inline():
+    executor = ExtractionExecutor(workers=0, min_bytes=1)
+    assert await executor.run(10 ** 9, sum, [1, 2, 3]) == 6
+    assert executor.stats()["offloaded_calls"] == 0
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_monitor_reports_blocking():
+    monitor = LoopLagMonitor(interval=0.01).start()
+    await asyncio.sleep(0.05)
+    time.sleep(0.15)
+    await asyncio.sleep(0.02)
+    summary = await monitor.stop()
+    assert summary["samples"] > 1
+    assert summary["max_ms"] >= 100
+
+
+def test_pool_workers_are_not_forked_but_see_the_runtime_config(monkeypatch):
+    monkeypatch.setattr(config, "EXTRACTION_OFFLOAD_MIN_BYTES", 12345)
+    PARENT_ONLY_STATE.append("parent")
+    try:
+        with create_process_pool(1) as pool:
+            assert pool.submit(worker_view, "EXTRACTION_OFFLOAD_MIN_BYTES").result() == ([], 12345)
+    finally:
+        PARENT_ONLY_STATE.clear()
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""Fan-out store: every sink gets every record, failing and slow sinks are isolated, flush/close drain the queues"""
+import asyncio
+import logging
+
+import pytest
+import typer
+
+from src.core.arg import _parse_save_data_option
+from src.core.base_crawler import AbstractStore
+from src.storage.base.fanout_store import FanOutStore, get_save_data_options
+
+
+class RecordingStore(AbstractStore):
+    def __init__(self, fail_on=None, gate=None):
+        self.fail_on = fail_on
+        self.gate = gate
+        self.records = []
+        self.calls = []
+
+    async def _call(self, name):
+        self.calls.append(name)
+        if self.fail_on == name:
+            raise RuntimeError(f"{name} broke")
+
+    async def open(self):
+        await self._call("open")
+
+    async def flush(self):
+        await self._call("flush")
+
+    async def close(self):
+        await self._call("close")
+
+    async def _store(self, kind, item):
+        if self.gate is not None:
+            await self.gate.wait()
+        await self._call(f"store_{kind}")
+        self.records.append((kind, item))
+
+    async def store_content(self, content_item):
+        await self._store("content", content_item)
+
+    async def store_comment(self, comment_item):
+        await self._store("comment", comment_item)
+
+    async def store_creator(self, creator):
+        await self._store("creator", creator)
+
+
+class MutatingStore(RecordingStore):
+    mutates_records = True
+
+
+async def feed(store, count):
+    for index in range(count):
+        await store.store_content({"note_id": f"n{index}"})
+        await store.store_comment({"comment_id": f"c{index}"})
+        # A crawl awaits its next request between records, letting the sink workers run
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_every_sink_receives_every_record_in_order():
+    sinks = {"a": RecordingStore(), "b": RecordingStore(), "c": MutatingStore()}
+    store = FanOutStore(list(sinks.items()), queue_size=4)
+    await store.open()
+    await feed(store, 20)
+    await store.store_creator({"user_id": "u1"})
+    await store.close()
+
+    expected = [kind for index in range(20) for kind in ("content", "comment")] + ["creator"]
+    for sink in sinks.values():
+        assert [kind for kind, _ in sink.records] == expected
+        assert sink.calls[0] == "open" and sink.calls[-1] == "close"
+    # Read only sinks share the record, a sink that modifies records gets a copy
+    assert sinks["a"].records[0][1] is sinks["b"].records[0][1]
+    assert sinks["c"].records[0][1] is not sinks["a"].records[0][1]
+    assert sinks["c"].records[0][1] == sinks["a"].records[0][1]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("stage", ["open", "store_content", "flush", "close"])
+async def test_failing_sink_is_isolated(stage, caplog):
+    broken, healthy = RecordingStore(fail_on=stage), RecordingStore()
+    store = FanOutStore([("broken", broken), ("healthy", healthy)])
+    await store.open()
+    await feed(store, 3)
+    await store.flush()
+    await store.close()
+
+    assert len(healthy.records) == 6 and healthy.calls[-2:] == ["flush", "close"]
+    if stage == "open":
+        # A sink that cannot be opened is skipped for the whole run
+        assert broken.calls == ["open"]
+    elif stage == "store_content":
+        assert [kind for kind, _ in broken.records] == ["comment"] * 3 and store.sinks[0].failed == 3
+    assert any("Sink broken" in record.getMessage() for record in caplog.records if record.levelno == logging.ERROR)
+
+
+@pytest.mark.asyncio
+async def test_slow_sink_does_not_stall_the_crawl_or_the_other_sinks():
+    gate = asyncio.Event()
+    slow, fast = RecordingStore(gate=gate), RecordingStore()
+    store = FanOutStore([("slow", slow), ("fast", fast)], queue_size=2)
+    await store.open()
+
+    # The slow sink's queue fills after 2 records, dispatching must still not wait for it
+    await asyncio.wait_for(feed(store, 50), timeout=1)
+    await asyncio.wait_for(store.sinks[1].queue.join(), timeout=1)
+    assert len(fast.records) == 100 and slow.records == []
+    assert len(store.sinks[0].backlog) > 0
+
+    gate.set()
+    await store.flush()
+    assert [item for _, item in slow.records] == [item for _, item in fast.records]
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_sink_drops_records_once_its_backlog_is_full(caplog):
+    gate = asyncio.Event()
+    slow, fast = RecordingStore(gate=gate), RecordingStore()
+    store = FanOutStore([("slow", slow), ("fast", fast)], queue_size=2, backlog_size=3)
+    await store.open()
+    await feed(store, 5)
+    gate.set()
+    await store.close()
+
+    assert len(fast.records) == 10
+    # Queue (2) + backlog (3) are kept, plus the record the worker had already taken off the queue
+    assert (len(slow.records), store.sinks[0].dropped) == (6, 4)
+    assert [item for _, item in slow.records] == [item for _, item in fast.records][:len(slow.records)]
+    assert "dropping new records" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_flush_and_close_drain_every_queue():
+    gate = asyncio.Event()
+    slow = RecordingStore(gate=gate)
+    store = FanOutStore([("slow", slow), ("other", RecordingStore())], queue_size=1)
+    await store.open()
+    await feed(store, 10)
+
+    flush = asyncio.create_task(store.flush())
+    await asyncio.sleep(0.01)
+    assert not flush.done()
+    gate.set()
+    await flush
+    # flush returns only once the queue and backlog were written, then flushes the sink
+    assert len(slow.records) == 20 and slow.calls[-1] == "flush"
+
+    gate.clear()
+    await feed(store, 2)
+    close = asyncio.create_task(store.close())
+    await asyncio.sleep(0.01)
+    gate.set()
+    await close
+    assert len(slow.records) == 24 and slow.calls[-1] == "close"
+    assert all(sink.worker is None for sink in store.sinks)
+
+
+def test_save_data_option_lists():
+    assert _parse_save_data_option("sqlite, JSONL,sqlite") == "sqlite,jsonl"
+    assert _parse_save_data_option("parquet") == "parquet"
+    with pytest.raises(typer.BadParameter, match="Unsupported save option 'xml'"):
+        _parse_save_data_option("jsonl,xml")
+    with pytest.raises(typer.BadParameter, match="At least one"):
+        _parse_save_data_option(" , ")
+
+    assert get_save_data_options("sqlite, JSONL,sqlite,") == ["sqlite", "jsonl"]
+    assert get_save_data_options(["csv", " json "]) == ["csv", "json"]
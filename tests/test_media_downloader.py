@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""Media downloader resume: Range + If-Range on retry, truncation when the server sends the whole file, retries"""
+import httpx
+import pytest
+
+import config
+from src.services.media import downloader as downloader_module
+from src.services.media.downloader import MediaDownloader, MediaTask
+
+BODY = bytes(range(256)) * 64
+URL = "https://media.example.com/video.mp4"
+
+
+class FakeServer:
+    """
+    Serves BODY with a strong ETag, honouring Range only when If-Range matches.
+    `cut_after` bytes into the next full response the connection drops; `ignore_range` answers every request with 200.
+    """
+
+    def __init__(self, etag='"v1"', ignore_range=False):
+        self.body = BODY
+        self.etag = etag
+        self.ignore_range = ignore_range
+        self.cut_after = None
+        self.statuses = []
+        self.requests = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.statuses:
+            return httpx.Response(self.statuses.pop(0))
+        headers = {"ETag": self.etag} if self.etag else {}
+        start = 0
+        range_header = request.headers.get("Range")
+        if range_header and not self.ignore_range and request.headers.get("If-Range") == self.etag:
+            start = int(range_header.removeprefix("bytes=").rstrip("-"))
+            headers["Content-Range"] = f"bytes {start}-{len(self.body) - 1}/{len(self.body)}"
+        status = 206 if "Content-Range" in headers else 200
+        body = self.body[start:]
+        if self.cut_after is not None:
+            body, self.cut_after = self._cut(body, self.cut_after), None
+        return httpx.Response(status, headers=headers, content=body)
+
+    @staticmethod
+    async def _cut(body, size):
+        yield body[:size]
+        raise httpx.ReadError("connection reset")
+
+
+@pytest.fixture(autouse=True)
+def no_waiting(monkeypatch):
+    monkeypatch.setattr(config, "MEDIA_DOWNLOAD_DEFAULT_RATE", 0)
+    monkeypatch.setattr(config, "MEDIA_DOWNLOAD_RATE_LIMITS", {})
+    # Chunks are written whole, a small chunk size lets an interrupted response leave a partial file
+    monkeypatch.setattr(downloader_module, "CHUNK_SIZE", 1024)
+    monkeypatch.setattr(MediaDownloader, "_backoff", staticmethod(lambda attempt: 0))
+
+
+async def download(server, path, retries=3):
+    downloader = MediaDownloader(concurrency=1, retries=retries, transport=httpx.MockTransport(server.handler))
+    await downloader.submit(MediaTask(url=URL, path=path))
+    await downloader.close()
+    return downloader
+
+
+@pytest.mark.asyncio
+async def test_interrupted_download_resumes_with_if_range(tmp_path):
+    server = FakeServer()
+    server.cut_after = 4096
+    path = tmp_path / "video.mp4"
+    downloader = await download(server, path)
+
+    assert path.read_bytes() == BODY
+    assert not path.with_name("video.mp4.part").exists() and not path.with_name("video.mp4.part.validator").exists()
+    resumed = server.requests[1].headers
+    assert (resumed["Range"], resumed["If-Range"]) == ("bytes=4096-", '"v1"')
+    assert downloader.files_downloaded == 1 and downloader.bytes_downloaded == len(BODY)
+
+
+@pytest.mark.asyncio
+async def test_full_response_to_a_range_request_truncates_the_part_file(tmp_path):
+    server = FakeServer(ignore_range=True)
+    server.cut_after = 4096
+    path = tmp_path / "video.mp4"
+    await download(server, path)
+
+    assert server.requests[1].headers["Range"] == "bytes=4096-"
+    assert path.read_bytes() == BODY
+
+
+@pytest.mark.asyncio
+async def test_changed_remote_file_is_downloaded_from_scratch(tmp_path):
+    # A .part left by an earlier run of an older version of the file
+    path = tmp_path / "video.mp4"
+    path.with_name("video.mp4.part").write_bytes(b"stale" * 100)
+    path.with_name("video.mp4.part.validator").write_text('"v0"', encoding="utf-8")
+    server = FakeServer(etag='"v1"')
+    await download(server, path)
+
+    assert server.requests[0].headers["If-Range"] == '"v0"'
+    assert path.read_bytes() == BODY
+
+
+@pytest.mark.asyncio
+async def test_part_file_without_validator_is_not_resumed(tmp_path):
+    path = tmp_path / "video.mp4"
+    path.with_name("video.mp4.part").write_bytes(BODY[:1000])
+    server = FakeServer(etag=None)
+    await download(server, path)
+
+    assert "Range" not in server.requests[0].headers
+    assert path.read_bytes() == BODY
+
+
+@pytest.mark.asyncio
+async def test_server_errors_are_retried_client_errors_are_not(tmp_path):
+    server = FakeServer()
+    server.statuses = [503, 429]
+    downloader = await download(server, tmp_path / "ok.mp4")
+    assert (tmp_path / "ok.mp4").read_bytes() == BODY
+    assert len(server.requests) == 3
+
+    server = FakeServer()
+    server.statuses = [404]
+    downloader = await download(server, tmp_path / "missing.mp4")
+    assert len(server.requests) == 1 and downloader.files_failed == 1
+    assert list(tmp_path.glob("missing.mp4*")) == []
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_the_configured_retries(tmp_path):
+    server = FakeServer()
+    server.statuses = [503] * 3
+    downloader = await download(server, tmp_path / "video.mp4", retries=2)
+    assert len(server.requests) == 3 and downloader.files_failed == 1
+    assert not (tmp_path / "video.mp4").exists()
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""MongoDB bulk upsert tests, run against mongomock (no mongod required)"""
+import asyncio
+import inspect
+
+import pytest
+import pytest_asyncio
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from mongomock.collection import BulkOperationBuilder
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+from config import db_config
+from src.storage.base.mongodb_store_base import (
+    MongoBulkWriter,
+    MongoDBConnection,
+    MongoDBStoreBase,
+    UNIQUE_INDEXES,
+)
+
+
+@pytest_asyncio.fixture
+async def mock_db(monkeypatch):
+    client = mongomock_motor.AsyncMongoMockClient()
+    db = client["media_crawler_test"]
+    connection = MongoDBConnection()
+    monkeypatch.setattr(connection, "_client", client)
+    monkeypatch.setattr(connection, "_db", db)
+    monkeypatch.setattr(MongoBulkWriter, "_buffers", {})
+    monkeypatch.setattr(MongoBulkWriter, "_first_buffered_at", {})
+    monkeypatch.setattr(MongoBulkWriter, "_attempts", {})
+    monkeypatch.setattr(MongoBulkWriter, "_timers", {})
+    monkeypatch.setattr(db_config, "MONGODB_BULK_SIZE", 3)
+    monkeypatch.setattr(db_config, "MONGODB_BULK_FLUSH_INTERVAL_MS", 60000)
+    monkeypatch.setattr(db_config, "MONGODB_BULK_MAX_RETRIES", 2)
+    if "sort" not in inspect.signature(BulkOperationBuilder.add_update).parameters:
+        # pymongo >= 4.11 passes sort=None for every UpdateOne, mongomock does not know the argument yet
+        add_update = BulkOperationBuilder.add_update
+        monkeypatch.setattr(
+            BulkOperationBuilder, "add_update",
+            lambda self, *args, sort=None, **kwargs: add_update(self, *args, **kwargs),
+        )
+    await MongoDBConnection._ensure_indexes(db)
+    yield db
+    for timer in MongoBulkWriter._timers.values():
+        timer.cancel()
+
+
+@pytest.mark.asyncio
+async def test_upserts_are_buffered_until_batch_size(mock_db):
+    store = MongoDBStoreBase(collection_prefix="xhs")
+    await store.save_or_update("contents", {"note_id": "n1"}, {"note_id": "n1", "title": "a"})
+    await store.save_or_update("contents", {"note_id": "n2"}, {"note_id": "n2", "title": "b"})
+    assert await mock_db["xhs_contents"].count_documents({}) == 0
+
+    await store.save_or_update("contents", {"note_id": "n3"}, {"note_id": "n3", "title": "c"})
+    assert await mock_db["xhs_contents"].count_documents({}) == 3
+    assert MongoBulkWriter.pending_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_same_key_is_merged_and_updates_existing(mock_db):
+    store = MongoDBStoreBase(collection_prefix="zhihu")
+    await store.save_or_update("contents", {"content_id": "c1"}, {"content_id": "c1", "title": "old", "voteup_count": 1})
+    assert await MongoDBStoreBase.flush_all()
+
+    await store.save_or_update("contents", {"content_id": "c1"}, {"voteup_count": 2})
+    await store.save_or_update("contents", {"content_id": "c1"}, {"voteup_count": 3})
+    assert MongoBulkWriter.pending_count() == 1
+    assert await MongoDBStoreBase.flush_all()
+
+    docs = await mock_db["zhihu_contents"].find({}).to_list(length=None)
+    assert len(docs) == 1
+    assert docs[0]["title"] == "old"
+    assert docs[0]["voteup_count"] == 3
+
+
+@pytest.mark.asyncio
+async def test_unique_indexes_are_ensured(mock_db):
+    for collection_name, key in UNIQUE_INDEXES.items():
+        index_info = await mock_db[collection_name].index_information()
+        assert any(
+            info.get("unique") and info["key"] == [(key, 1)]
+            for info in index_info.values()
+        ), collection_name
+
+
+def fail_bulk_write(monkeypatch, db, make_error):
+    """Make bulk_write raise make_error(operations) once, the operations it does not report are still applied"""
+    collection_type = type(db["xhs_contents"])
+    bulk_write = collection_type.bulk_write
+    calls = []
+
+    async def failing(self, operations, **kwargs):
+        calls.append(len(operations))
+        if len(calls) > 1:
+            return await bulk_write(self, operations, **kwargs)
+        error = make_error(operations)
+        if isinstance(error, BulkWriteError):
+            failed = {item["index"] for item in error.details["writeErrors"]}
+            applied = [op for index, op in enumerate(operations) if index not in failed]
+            if applied:
+                await bulk_write(self, applied, **kwargs)
+        raise error
+
+    monkeypatch.setattr(collection_type, "bulk_write", failing)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_retryable_write_errors_are_buffered_again(mock_db, monkeypatch):
+    fail_bulk_write(monkeypatch, mock_db, lambda operations: BulkWriteError({"writeErrors": [
+        {"index": 0, "code": 11000, "errmsg": "duplicate key"},
+        {"index": 1, "code": 121, "errmsg": "document failed validation"},
+    ]}))
+    store = MongoDBStoreBase(collection_prefix="xhs")
+    for note_id in ("n1", "n2", "n3"):
+        await store.save_or_update("contents", {"note_id": note_id}, {"note_id": note_id})
+
+    # n3 was written, n2 can never succeed, n1 lost an upsert race and is sent again
+    assert [doc["note_id"] async for doc in mock_db["xhs_contents"].find({})] == ["n3"]
+    assert MongoBulkWriter.pending_count() == 1
+    assert await MongoDBStoreBase.flush_all()
+    assert sorted([doc["note_id"] async for doc in mock_db["xhs_contents"].find({})]) == ["n1", "n3"]
+
+
+@pytest.mark.asyncio
+async def test_unacknowledged_batch_is_kept_and_newer_data_wins(mock_db, monkeypatch):
+    fail_bulk_write(monkeypatch, mock_db, lambda operations: AutoReconnect("connection reset"))
+    store = MongoDBStoreBase(collection_prefix="xhs")
+    for note_id in ("n1", "n2", "n3"):
+        await store.save_or_update("contents", {"note_id": note_id}, {"note_id": note_id, "liked_count": 1})
+    assert MongoBulkWriter.pending_count() == 3
+
+    await store.save_or_update("contents", {"note_id": "n1"}, {"liked_count": 2})
+    assert await MongoDBStoreBase.flush_all()
+    docs = {doc["note_id"]: doc["liked_count"] async for doc in mock_db["xhs_contents"].find({})}
+    assert docs == {"n1": 2, "n2": 1, "n3": 1}
+
+
+@pytest.mark.asyncio
+async def test_operations_are_dropped_after_max_retries(mock_db, monkeypatch):
+    collection_type = type(mock_db["xhs_contents"])
+    calls = []
+
+    async def down(self, operations, **kwargs):
+        calls.append(len(operations))
+        raise AutoReconnect("mongod is down")
+
+    monkeypatch.setattr(collection_type, "bulk_write", down)
+    store = MongoDBStoreBase(collection_prefix="xhs")
+    await store.save_or_update("contents", {"note_id": "n1"}, {"note_id": "n1"})
+    assert not await MongoDBStoreBase.flush_all()
+    assert calls == [1, 1, 1] and MongoBulkWriter.pending_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_quiet_collection_is_flushed_by_the_interval_timer(mock_db, monkeypatch):
+    monkeypatch.setattr(db_config, "MONGODB_BULK_FLUSH_INTERVAL_MS", 50)
+    store = MongoDBStoreBase(collection_prefix="zhihu")
+    await store.save_or_update("comments", {"comment_id": "c1"}, {"comment_id": "c1"})
+    assert await mock_db["zhihu_comments"].count_documents({}) == 0
+    await asyncio.sleep(0.2)
+    assert await mock_db["zhihu_comments"].count_documents({}) == 1
+    assert MongoBulkWriter.pending_count() == 0
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""Lazy iter_* pagination of the clients: page order, cursors, limits and early termination"""
+from contextlib import aclosing
+
+import pytest
+
+import config
+from src.models.m_zhihu import ZhihuContent, ZhihuCreator
+from src.platforms.xhs.client import XiaoHongShuClient
+from src.platforms.zhihu.client import ZhiHuClient
+from tests.benchmarks import fixtures
+
+
+class XhsPages:
+    """Fake comment API: `pages` first level pages of 2 comments, every comment has one more sub comment page"""
+
+    def __init__(self, pages: int = 3):
+        self.pages = pages
+        self.calls = []
+
+    async def get_note_comments(self, note_id, xsec_token, cursor=""):
+        self.calls.append(("root", cursor))
+        page = int(cursor or 0)
+        has_more = page + 1 < self.pages
+        comments = [
+            {
+                "id": f"c{page}_{i}", "note_id": note_id, "sub_comments": [{"id": f"c{page}_{i}s"}],
+                "sub_comment_has_more": True, "sub_comment_cursor": "s0",
+            }
+            for i in range(2)
+        ]
+        return {"comments": comments, "cursor": str(page + 1) if has_more else "", "has_more": has_more}
+
+    async def get_note_sub_comments(self, note_id, root_comment_id, xsec_token, num=10, cursor=""):
+        self.calls.append(("sub", root_comment_id))
+        return {"comments": [{"id": f"{root_comment_id}p"}], "cursor": "", "has_more": False}
+
+
+@pytest.fixture
+def xhs_client(monkeypatch):
+    client = XiaoHongShuClient(headers={}, playwright_page=None, cookie_dict={})
+    pages = XhsPages()
+    monkeypatch.setattr(client, "get_note_comments", pages.get_note_comments)
+    monkeypatch.setattr(client, "get_note_sub_comments", pages.get_note_sub_comments)
+    return client, pages
+
+
+@pytest.mark.asyncio
+async def test_xhs_comment_pages_are_yielded_in_crawl_order(xhs_client):
+    client, _ = xhs_client
+    pages = [page async for page in client.iter_note_comments("n1", "tok", crawl_interval=0, with_sub_comments=True)]
+    assert [(page.parent_id, [item["id"] for item in page]) for page in pages[:5]] == [
+        ("", ["c0_0", "c0_1"]), ("c0_0", ["c0_0s"]), ("c0_0", ["c0_0p"]), ("c0_1", ["c0_1s"]), ("c0_1", ["c0_1p"]),
+    ]
+    assert [page.cursor for page in pages if not page.parent_id] == ["1", "2", ""]
+    assert [page.has_more for page in pages if not page.parent_id] == [True, True, False]
+
+
+@pytest.mark.asyncio
+async def test_xhs_comments_resume_from_cursor_and_stop_at_max_count(xhs_client):
+    client, pages = xhs_client
+    resumed = [page async for page in client.iter_note_comments("n1", "tok", 0, cursor="2", with_sub_comments=False)]
+    assert [item["id"] for page in resumed for item in page] == ["c2_0", "c2_1"]
+
+    pages.calls.clear()
+    limited = [page async for page in client.iter_note_comments("n1", "tok", 0, max_count=3, with_sub_comments=False)]
+    assert [len(page) for page in limited] == [2, 1]
+    assert pages.calls == [("root", ""), ("root", "1")]
+
+
+@pytest.mark.asyncio
+async def test_xhs_breaking_out_stops_requesting(xhs_client):
+    client, pages = xhs_client
+    async with aclosing(client.iter_note_comments("n1", "tok", crawl_interval=0, with_sub_comments=True)) as stream:
+        async for page in stream:
+            if page.parent_id:
+                break
+    assert pages.calls == [("root", "")]
+
+
+@pytest.mark.asyncio
+async def test_xhs_list_wrapper_feeds_the_callback_page_by_page(xhs_client, monkeypatch):
+    client, _ = xhs_client
+    monkeypatch.setattr(config, "ENABLE_GET_SUB_COMMENTS", True)
+    stored = []
+
+    async def callback(note_id, comments):
+        stored.append((note_id, len(comments)))
+
+    result = await client.get_note_all_comments("n1", "tok", crawl_interval=0, callback=callback, max_count=100)
+    assert len(result) == sum(count for _, count in stored) == 3 * (2 + 2 * 2)
+    assert stored[0] == ("n1", 2) and {note_id for note_id, _ in stored} == {"n1"}
+
+
+@pytest.mark.asyncio
+async def test_xhs_creator_notes_are_capped_by_config(monkeypatch):
+    client = XiaoHongShuClient(headers={}, playwright_page=None, cookie_dict={})
+    monkeypatch.setattr(config, "CRAWLER_MAX_NOTES_COUNT", 25)
+
+    async def get_notes_by_creator(user_id, cursor, page_size=30, xsec_token="", xsec_source=""):
+        page = int(cursor or 0)
+        return {"notes": [{"note_id": f"{page}_{i}"} for i in range(10)], "cursor": str(page + 1), "has_more": True}
+
+    monkeypatch.setattr(client, "get_notes_by_creator", get_notes_by_creator)
+    pages = [page async for page in client.iter_notes_by_creator("u1", crawl_interval=0)]
+    assert [len(page) for page in pages] == [10, 10, 5] and pages[-1].cursor == "3"
+
+
+@pytest.fixture
+def zhihu_client(monkeypatch):
+    client = ZhiHuClient(headers={}, playwright_page=None, cookie_dict={})
+    calls = []
+
+    def paging(offset, pages):
+        page = int(offset or 0)
+        return {"is_end": page + 1 >= pages, "next": f"/x?offset={page + 1}&limit=10"}
+
+    async def get_root_comments(content_id, content_type, offset="", limit=10):
+        calls.append(("root", offset))
+        data = fixtures.zhihu_comments(content_id, count=2)
+        for index, comment in enumerate(data):
+            comment.update(id=f"{offset or 0}{index}", child_comment_count=1)
+        return {"data": data, "paging": paging(offset, 2)}
+
+    async def get_child_comments(root_comment_id, offset="", limit=10):
+        calls.append(("child", root_comment_id))
+        return {"data": fixtures.zhihu_comments(root_comment_id, count=1), "paging": paging(offset, 1)}
+
+    async def get_creator_answers(url_token, offset=0, limit=20):
+        calls.append(("answers", offset))
+        return {"data": [fixtures.zhihu_answer(f"{10 ** 9 + offset}", paragraphs=1)], "paging": {"is_end": offset >= 40}}
+
+    monkeypatch.setattr(client, "get_root_comments", get_root_comments)
+    monkeypatch.setattr(client, "get_child_comments", get_child_comments)
+    monkeypatch.setattr(client, "get_creator_answers", get_creator_answers)
+    return client, calls
+
+
+@pytest.mark.asyncio
+async def test_zhihu_comment_pages_carry_offsets_and_parents(zhihu_client):
+    client, calls = zhihu_client
+    content = ZhihuContent(content_id="1000000001", content_type="answer")
+    pages = [page async for page in client.iter_note_comments(content, crawl_interval=0, with_sub_comments=True)]
+    roots = [page for page in pages if not page.parent_id]
+    assert [page.cursor for page in roots] == ["1", "2"] and [page.has_more for page in roots] == [True, False]
+    assert [page.parent_id for page in pages[:3]] == ["", "00", "01"]
+    assert calls[:3] == [("root", ""), ("child", "00"), ("child", "01")]
+
+
+@pytest.mark.asyncio
+async def test_zhihu_creator_answers_stream_and_stop_early(zhihu_client):
+    client, calls = zhihu_client
+    creator = ZhihuCreator(url_token="member-1")
+    pages = [page async for page in client.iter_anwser_by_creator(creator, crawl_interval=0)]
+    assert [page.cursor for page in pages] == [20, 40, 60] and not pages[-1].has_more
+
+    calls.clear()
+    async with aclosing(client.iter_anwser_by_creator(creator, crawl_interval=0, offset=20)) as stream:
+        async for _ in stream:
+            break
+    assert calls == [("answers", 20)]
+    assert len(await client.get_all_anwser_by_creator(creator, crawl_interval=0)) == 3
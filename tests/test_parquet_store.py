@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""Parquet store and converter: fixed schema and coercion, row groups, partition layout, zstd, JSON/CSV/JSONL conversion"""
+import csv
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import pytest
+
+from src.models.m_xiaohongshu import XhsNoteCommentRecord
+from src.storage.base import parquet_store_base
+from src.storage.base.parquet_converter import convert_file
+from src.storage.base.parquet_store_base import ParquetStoreBase, build_schema
+from src.storage.xhs._store_impl import XHS_PARQUET_FIELDS
+from src.utils import codec
+
+DATE = "2025-01-01"
+
+
+def comment(index):
+    return {
+        "comment_id": f"c{index}", "create_time": str(1700000000000 + index), "ip_location": "上海",
+        "note_id": "n1", "content": f"评论 {index}, with \"quotes\"", "user_id": f"u{index}", "nickname": "nick",
+        "avatar": "https://example.com/a.jpg", "sub_comment_count": "0", "pictures": "", "parent_comment_id": "0",
+        "last_modify_ts": 1700000000000, "like_count": "1.2万",
+    }
+
+
+@pytest.fixture(autouse=True)
+def fixed_date(monkeypatch):
+    monkeypatch.setattr(parquet_store_base.utils, "get_current_date", lambda: DATE)
+
+
+def make_store(tmp_path, row_group_size=1000):
+    return ParquetStoreBase("xhs", XHS_PARQUET_FIELDS, crawler_type="search", row_group_size=row_group_size,
+                            base_dir=tmp_path)
+
+
+def written_files(base_dir, entity):
+    return sorted((base_dir / "platform=xhs" / f"date={DATE}" / f"entity={entity}").glob("*.parquet"))
+
+
+@pytest.mark.asyncio
+async def test_records_are_coerced_to_the_fixed_entity_schema(tmp_path):
+    store = make_store(tmp_path)
+    await store.store_content({
+        "note_id": 123, "time": "1700000000000", "last_update_time": "soon", "liked_count": 12,
+        "image_list": ["a.jpg", "b.jpg"], "tag_list": {"tag": "咖啡"}, "not_in_schema": "ignored",
+    })
+    await store.store_comment(XhsNoteCommentRecord(**comment(1)))
+    await store.close()
+
+    contents = pq.read_table(written_files(tmp_path, "contents")[0])
+    assert contents.schema == build_schema(XHS_PARQUET_FIELDS["contents"])
+    row = contents.to_pylist()[0]
+    assert (row["note_id"], row["time"], row["last_update_time"], row["liked_count"]) == ("123", 1700000000000, None, "12")
+    assert codec.loads(row["image_list"]) == ["a.jpg", "b.jpg"] and codec.loads(row["tag_list"]) == {"tag": "咖啡"}
+    assert row["title"] is None and "not_in_schema" not in row
+
+    # Slotted records are read like dicts
+    comments = pq.read_table(written_files(tmp_path, "comments")[0])
+    assert comments.schema == build_schema(XHS_PARQUET_FIELDS["comments"])
+    assert comments.to_pylist() == [{**comment(1), "create_time": 1700000000001}]
+
+
+@pytest.mark.asyncio
+async def test_row_groups_are_written_every_row_group_size_records(tmp_path):
+    store = make_store(tmp_path, row_group_size=3)
+    for index in range(7):
+        await store.store_comment(comment(index))
+    # Two full row groups are on disk, the 7th record waits in the buffer
+    assert store.written_rows == 6
+    await store.flush()
+    assert store.written_rows == 7
+    await store.store_comment(comment(7))
+    await store.close()
+
+    (path,) = written_files(tmp_path, "comments")
+    metadata = pq.ParquetFile(path).metadata
+    assert [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)] == [3, 3, 1, 1]
+    assert [row["comment_id"] for row in pq.read_table(path).to_pylist()] == [f"c{i}" for i in range(8)]
+
+
+@pytest.mark.asyncio
+async def test_dataset_is_partitioned_by_platform_date_and_entity_and_zstd_compressed(tmp_path):
+    store = make_store(tmp_path)
+    await store.store_content({"note_id": "n1"})
+    await store.store_comment(comment(1))
+    await store.store_creator({"user_id": "u1"})
+    await store.close()
+
+    files = sorted(path.relative_to(tmp_path).parent.as_posix() for path in tmp_path.rglob("*.parquet"))
+    assert files == [f"platform=xhs/date={DATE}/entity={entity}" for entity in ("comments", "contents", "creators")]
+    assert all(path.name.startswith("search_") for path in tmp_path.rglob("*.parquet"))
+
+    # Read as a hive partitioned dataset the partition keys become columns
+    schema = build_schema(XHS_PARQUET_FIELDS["comments"])
+    for key in ("platform", "date", "entity"):
+        schema = schema.append(pa.field(key, pa.string()))
+    dataset = ds.dataset(tmp_path, format="parquet", partitioning="hive", schema=schema)
+    table = dataset.to_table(columns=["comment_id", "platform", "date", "entity"], filter=ds.field("entity") == "comments")
+    assert table.to_pylist() == [{"comment_id": "c1", "platform": "xhs", "date": DATE, "entity": "comments"}]
+    metadata = pq.ParquetFile(written_files(tmp_path, "comments")[0]).metadata
+    assert {metadata.row_group(0).column(i).compression for i in range(metadata.num_columns)} == {"ZSTD"}
+
+
+@pytest.mark.asyncio
+async def test_json_csv_and_jsonl_outputs_convert_to_the_store_schema(tmp_path):
+    records = [comment(index) for index in range(5)]
+    store = make_store(tmp_path / "store", row_group_size=2)
+    for record in records:
+        await store.store_comment(record)
+    await store.close()
+    expected = pq.read_table(written_files(tmp_path / "store", "comments")[0])
+
+    source_dir = tmp_path / "data" / "xhs"
+    for fmt in ("json", "csv", "jsonl"):
+        (source_dir / fmt).mkdir(parents=True)
+    (source_dir / "json" / f"search_comments_{DATE}.json").write_bytes(codec.dumps_bytes(records))
+    with open(source_dir / "csv" / f"search_comments_{DATE}.csv", "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(records[0]))
+        writer.writeheader()
+        writer.writerows(records)
+    (source_dir / "jsonl" / f"search_comments_{DATE}.jsonl").write_text(
+        "".join(codec.dumps(record) + "\n" for record in records) + "\n", encoding="utf-8"
+    )
+
+    for fmt in ("json", "csv", "jsonl"):
+        output = convert_file(source_dir / fmt / f"search_comments_{DATE}.{fmt}", row_group_size=2,
+                              base_dir=tmp_path / "converted")
+        # Platform, entity and date are taken from the path
+        assert output == written_files(tmp_path / "converted", "comments")[0].with_name(f"search_comments_{DATE}_{fmt}.parquet")
+        table = pq.read_table(output)
+        assert table.schema == expected.schema and table.to_pylist() == expected.to_pylist()
+        assert pq.ParquetFile(output).metadata.num_row_groups == 3
+
+    with pytest.raises(ValueError, match="Cannot infer"):
+        convert_file(source_dir / "json" / f"search_comments_{DATE}.json".replace("search_comments", "export"))
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""Multi-proxy balancer: latency weighted selection, quarantine and replacement, persisted scores"""
+import asyncio
+import random
+from functools import partial
+
+import httpx
+import pytest
+
+from src.platforms.xhs.client import XiaoHongShuClient
+from src.services.proxy import proxy_balancer
+from src.services.proxy.proxy_balancer import ProxyBalancer
+from src.services.proxy.types import IpInfoModel
+
+
+def make_proxy(index: int) -> IpInfoModel:
+    return IpInfoModel(ip=f"10.0.0.{index}", port=8000, user="", password="")
+
+
+class FakeIpPool:
+    def __init__(self, count: int):
+        self.proxies = [make_proxy(index) for index in range(1, count + 1)]
+
+    async def get_proxy(self) -> IpInfoModel:
+        if not self.proxies:
+            raise Exception("pool is empty")
+        return self.proxies.pop(0)
+
+
+class FakeProxies:
+    """Per proxy behaviour behind httpx.MockTransport: added latency and response status"""
+
+    def __init__(self, delays=None, statuses=None):
+        self.delays = delays or {}
+        self.statuses = statuses or {}
+        self.used = []
+
+    def client(self, proxy=None, **kwargs):
+        host = proxy.split("//")[-1].split(":")[0]
+        return httpx.AsyncClient(transport=httpx.MockTransport(partial(self.handle, host)), **kwargs)
+
+    async def handle(self, host, request):
+        self.used.append(host)
+        await asyncio.sleep(self.delays.get(host, 0))
+        return httpx.Response(self.statuses.get(host, 200), text=host)
+
+
+@pytest.fixture
+def proxies(monkeypatch):
+    fake = FakeProxies()
+    monkeypatch.setattr(proxy_balancer, "create_async_client", fake.client)
+    return fake
+
+
+@pytest.mark.asyncio
+async def test_faster_proxies_get_more_requests(proxies):
+    random.seed(7)
+    proxies.delays = {"10.0.0.1": 0.03, "10.0.0.2": 0.0}
+    balancer = await ProxyBalancer(FakeIpPool(2), size=2, score_file="").start()
+    for _ in range(40):
+        await balancer.request("GET", "https://example.com/api")
+    assert proxies.used.count("10.0.0.2") > 3 * proxies.used.count("10.0.0.1") > 0
+    slow, fast = balancer.endpoints
+    assert slow.latency > fast.latency and slow.score == pytest.approx(fast.score)
+    await balancer.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_spread_over_all_proxies(proxies):
+    proxies.delays = {f"10.0.0.{index}": 0.02 for index in range(1, 4)}
+    balancer = await ProxyBalancer(FakeIpPool(3), size=3, score_file="").start()
+    await asyncio.gather(*(balancer.request("GET", "https://example.com/api") for _ in range(30)))
+    assert set(proxies.used) == {"10.0.0.1", "10.0.0.2", "10.0.0.3"}
+    assert all(endpoint.in_flight == 0 for endpoint in balancer.endpoints)
+    await balancer.close()
+
+
+@pytest.mark.asyncio
+async def test_failing_proxy_is_quarantined_and_replaced(proxies, tmp_path):
+    proxies.statuses = {"10.0.0.1": 502}
+    score_file = tmp_path / "scores.json"
+    pool = FakeIpPool(3)
+    balancer = await ProxyBalancer(pool, size=2, score_file=str(score_file), max_failures=2).start()
+    bad = balancer.endpoints[0]
+    for _ in range(2):
+        balancer.report(bad, 0.1, ok=False, reason="HTTP 502")
+    assert bad.quarantined_until > 0
+
+    proxies.used.clear()
+    for _ in range(10):
+        await balancer.request("GET", "https://example.com/api")
+    assert "10.0.0.1" not in proxies.used and {e.key for e in balancer.endpoints} == {"10.0.0.2:8000", "10.0.0.3:8000"}
+    assert bad.retired and bad.client.is_closed
+    await balancer.close()
+
+    # Scores survive the run and are picked up when the same proxy is bound again
+    pool.proxies = [make_proxy(1)]
+    restarted = await ProxyBalancer(pool, size=1, score_file=str(score_file)).start()
+    assert restarted.endpoints[0].score == pytest.approx(bad.score, abs=1e-3) and bad.score < 0.5
+    await restarted.close()
+
+
+@pytest.mark.asyncio
+async def test_transport_errors_count_against_the_proxy(monkeypatch):
+    def client(proxy=None, **kwargs):
+        def refuse(request):
+            raise httpx.ConnectError("proxy refused", request=request)
+        return httpx.AsyncClient(transport=httpx.MockTransport(refuse), **kwargs)
+
+    monkeypatch.setattr(proxy_balancer, "create_async_client", client)
+    balancer = await ProxyBalancer(FakeIpPool(1), size=1, score_file="", max_failures=5).start()
+    with pytest.raises(httpx.ConnectError):
+        await balancer.request("GET", "https://example.com/api")
+    assert balancer.endpoints[0].failures == 1 and balancer.endpoints[0].score < 1
+    await balancer.close()
+
+
+@pytest.mark.asyncio
+async def test_client_requests_go_through_the_balancer(proxies):
+    balancer = await ProxyBalancer(FakeIpPool(2), size=2, score_file="").start()
+    client = XiaoHongShuClient(headers={}, playwright_page=None, cookie_dict={}, proxy_balancer=balancer)
+    assert await client.request("GET", "https://edith.xiaohongshu.com/api", return_response=True) in {
+        "10.0.0.1", "10.0.0.2",
+    }
+    assert sum(endpoint.requests for endpoint in balancer.endpoints) == 1
+    await balancer.close()
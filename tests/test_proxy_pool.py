@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""Proxy IP pool: concurrent batch validation against a local URL, background refill and early rotation"""
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+
+import config
+from src.services.proxy.base_proxy import IpGetError
+from src.services.proxy.proxy_ip_pool import ProxyIpPool
+from src.services.proxy.types import IpInfoModel
+
+TIMEOUT = 0.3
+
+
+async def _answer(reader, writer):
+    await reader.readuntil(b"\r\n\r\n")
+    writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: close\r\n\r\nok")
+    await writer.drain()
+    writer.close()
+
+
+async def _hang(reader, writer):
+    await asyncio.sleep(10)
+
+
+@pytest_asyncio.fixture
+async def servers():
+    """Local HTTP servers acting as proxies: `good` answers any request, `hanging` never answers"""
+    started = []
+
+    async def start(handler):
+        server = await asyncio.start_server(handler, "127.0.0.1", 0)
+        started.append(server)
+        return server.sockets[0].getsockname()[1]
+
+    yield {"good": lambda: start(_answer), "hanging": lambda: start(_hang)}
+    for server in started:
+        server.close()
+
+
+class FakeProvider:
+    def __init__(self, *batches):
+        self.batches = list(batches)
+        self.calls = 0
+
+    async def get_proxy(self, num):
+        self.calls += 1
+        return self.batches.pop(0) if self.batches else []
+
+
+def proxy(port: int, expires_in: int = 3600) -> IpInfoModel:
+    return IpInfoModel(ip="127.0.0.1", port=port, user="", password="", expired_time_ts=int(time.time()) + expires_in)
+
+
+@pytest.fixture(autouse=True)
+def pool_config(monkeypatch):
+    monkeypatch.setattr(config, "PROXY_VALIDATE_TIMEOUT", TIMEOUT)
+    monkeypatch.setattr(config, "PROXY_POOL_LOW_WATER", 2)
+    monkeypatch.setattr(config, "PROXY_ROTATE_AHEAD_SEC", 60)
+
+
+@pytest.mark.asyncio
+async def test_batch_is_validated_concurrently(servers, monkeypatch):
+    good = await servers["good"]()
+    hanging = [await servers["hanging"]() for _ in range(3)]
+    monkeypatch.setattr(config, "PROXY_VALIDATE_URL", f"http://127.0.0.1:{good}/echo")
+    provider = FakeProvider([proxy(port) for port in [*hanging, good, 1]])
+    pool = ProxyIpPool(5, enable_validate_ip=True, ip_provider=provider)
+
+    started = time.monotonic()
+    await pool.load_proxies()
+    assert time.monotonic() - started < 2 * TIMEOUT
+    assert [item.port for item in pool.proxy_list] == [good]
+
+
+@pytest.mark.asyncio
+async def test_pool_refills_in_background_below_low_water(servers, monkeypatch):
+    ports = [await servers["good"]() for _ in range(5)]
+    monkeypatch.setattr(config, "PROXY_VALIDATE_URL", f"http://127.0.0.1:{ports[0]}/")
+    provider = FakeProvider([proxy(port) for port in ports[:3]], [proxy(port) for port in ports[3:]])
+    pool = ProxyIpPool(3, enable_validate_ip=True, ip_provider=provider)
+    await pool.load_proxies()
+
+    await pool.get_proxy()
+    assert pool._refill_task is None and len(pool.proxy_list) == 2
+    await pool.get_proxy()
+    assert len(pool.proxy_list) == 1 and not pool._refill_task.done()
+    await pool._refill_task
+    assert provider.calls == 2 and len(pool.proxy_list) == 3
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_drained_pool_refills_once_then_fails_fast():
+    provider = FakeProvider([proxy(9001)], [proxy(9002)])
+    pool = ProxyIpPool(1, enable_validate_ip=False, ip_provider=provider)
+    assert sorted(item.port for item in await asyncio.gather(pool.get_proxy(), pool.get_proxy())) == [9001, 9002]
+
+    await pool.close()
+    pool.proxy_list = []
+    started = time.monotonic()
+    with pytest.raises(IpGetError):
+        await pool.get_proxy()
+    assert time.monotonic() - started < 0.5
+
+
+@pytest.mark.asyncio
+async def test_rotates_ahead_of_expiry():
+    pool = ProxyIpPool(1, enable_validate_ip=False, ip_provider=FakeProvider([proxy(9002)]))
+    pool.current_proxy = expiring = proxy(9001, expires_in=45)
+    assert not pool.is_current_proxy_expired()
+
+    # Nothing pooled yet: keep the expiring proxy and refill in the background
+    assert await pool.get_or_refresh_proxy() is expiring
+    await pool._refill_task
+    rotated = await pool.get_or_refresh_proxy()
+    assert rotated.port == 9002 and pool.current_proxy is rotated
+    await pool.close()
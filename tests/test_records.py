@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""Slotted record types: mapping interface used by the sinks, serialization, validation and the DB stores"""
+import csv
+import io
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+
+import config
+from config import db_config
+from src.models.m_xiaohongshu import XhsNoteCommentRecord
+from src.models.m_zhihu import ZhihuComment, ZhihuContent
+from src.platforms.zhihu.help import ZhihuExtractor
+from src.storage.base import db_session
+from src.storage.base.parquet_store_base import INT64, STRING, fields_from_model
+from src.storage.xhs import build_xhs_comment_item
+from src.storage.zhihu import build_zhihu_comment_item
+from src.utils import codec
+from tests.benchmarks import fixtures
+
+XHS_COMMENT = {
+    "id": "c1", "content": "评论", "create_time": 1700000000000, "ip_location": "上海", "like_count": "12",
+    "sub_comment_count": "3", "user_info": {"user_id": "u1", "nickname": "n", "image": "i"}, "pictures": [],
+}
+
+
+def test_records_have_no_instance_dict():
+    for record in (ZhihuContent(), ZhihuComment(), build_xhs_comment_item("n1", XHS_COMMENT)):
+        assert not hasattr(record, "__dict__")
+        with pytest.raises(AttributeError):
+            record.not_a_field = 1
+
+
+def test_record_is_a_read_only_mapping_for_the_sinks():
+    comment = build_zhihu_comment_item(ZhihuComment(comment_id="1", content="你好", like_count=3))
+    row = dict(comment)
+    assert list(row) == list(comment.keys()) == [name for name, _ in comment.items()]
+    assert row["last_modify_ts"] > 0 and comment["content"] == "你好"
+    assert comment.get("missing", "-") == "-" and "like_count" in comment
+    with pytest.raises(KeyError):
+        comment["missing"]
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=comment.keys())
+    writer.writeheader()
+    writer.writerow(comment)
+    assert buffer.getvalue().splitlines()[0].startswith("comment_id,parent_comment_id,content")
+
+
+@pytest.mark.parametrize("backend", ["json", "orjson", "msgspec"])
+def test_codec_serializes_records_like_their_dict(backend):
+    if backend != "json" and getattr(codec, backend) is None:
+        pytest.skip(f"{backend} is not installed")
+    previous = codec.BACKEND
+    codec.set_backend(backend)
+    try:
+        record = build_xhs_comment_item("n1", XHS_COMMENT)
+        assert codec.dumps(record) == codec.dumps(record.model_dump())
+        assert codec.loads(codec.dumps([record])) == [record.model_dump()]
+    finally:
+        codec.set_backend(previous)
+
+
+def test_extractor_output_matches_the_declared_fields():
+    content = ZhihuContent(content_id="1000000001", content_type="answer")
+    comments = ZhihuExtractor().extract_comments(content, fixtures.zhihu_comments("1000000001", count=5))
+    assert len(comments) == 5
+    assert all(isinstance(comment, ZhihuComment) and comment.content_id == "1000000001" for comment in comments)
+
+
+def test_validation_converts_lossless_values_and_rejects_the_rest():
+    record = ZhihuComment(comment_id=123, like_count="12", publish_time=None, sub_comment_count=4.0, ip_location=None)
+    record.validate()
+    assert (record.comment_id, record.like_count, record.publish_time, record.sub_comment_count, record.ip_location) == (
+        "123", 12, 0, 4, None
+    )
+    with pytest.raises(ValueError, match="ZhihuComment.like_count"):
+        ZhihuComment(like_count="many").validate()
+    with pytest.raises(ValueError, match="ZhihuComment.content"):
+        ZhihuComment.model_validate({"content": {"html": "<p/>"}})
+
+
+def test_validation_is_switched_by_config(monkeypatch):
+    monkeypatch.setattr(config, "ENABLE_RECORD_VALIDATION", False)
+    assert build_xhs_comment_item("n1", XHS_COMMENT).create_time == 1700000000000
+    assert build_xhs_comment_item("n1", {**XHS_COMMENT, "create_time": "1700000000000"}).create_time == "1700000000000"
+    monkeypatch.setattr(config, "ENABLE_RECORD_VALIDATION", True)
+    record = build_xhs_comment_item("n1", {**XHS_COMMENT, "create_time": "1700000000000"})
+    assert record.create_time == 1700000000000 and record.parent_comment_id == "0"
+
+
+def test_parquet_fields_from_records():
+    fields = fields_from_model(XhsNoteCommentRecord)
+    assert fields["create_time"] == INT64 and fields["like_count"] == STRING and fields["last_modify_ts"] == INT64
+    assert list(fields) == list(XhsNoteCommentRecord.__dataclass_fields__)
+
+
+@pytest_asyncio.fixture
+async def sqlite_db(tmp_path, monkeypatch):
+    pytest.importorskip("aiosqlite")
+    monkeypatch.setitem(db_config.sqlite_db_config, "db_path", str(tmp_path / "records.db"))
+    monkeypatch.setattr(db_config, "SQLITE_SINGLE_WRITER", False)
+    monkeypatch.setattr(db_session, "_engines", {})
+    await db_session.create_tables("sqlite")
+    yield
+    for engine in db_session._engines.values():
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_db_stores_insert_then_update_records(sqlite_db):
+    from src.storage.xhs._store_impl import XhsSqliteStoreImplement
+    from src.storage.zhihu._store_impl import ZhihuSqliteStoreImplement
+
+    xhs, zhihu = XhsSqliteStoreImplement(), ZhihuSqliteStoreImplement()
+    for likes in ("3", "5"):
+        await xhs.store_comment(build_xhs_comment_item("n1", {**XHS_COMMENT, "like_count": likes}))
+        await zhihu.store_comment(build_zhihu_comment_item(ZhihuComment(comment_id="z1", like_count=int(likes))))
+
+    async with db_session.get_session("sqlite") as session:
+        assert (await session.execute(text("SELECT comment_id, like_count FROM xhs_note_comment"))).all() == [("c1", "5")]
+        assert (await session.execute(text("SELECT comment_id, like_count FROM zhihu_comment"))).all() == [("z1", 5)]
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""Async redis cache against fakeredis: JSON values, SCAN based keys, MGET bulk reads and the proxy IP cache"""
+import pickle
+
+import pytest
+import pytest_asyncio
+
+import config
+from src.services.cache.async_redis_cache import AsyncRedisCache
+from src.services.cache.cache_factory import CacheFactory
+from src.services.proxy.base_proxy import IpCache
+from src.services.proxy.types import IpInfoModel
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest_asyncio.fixture
+async def redis_client():
+    client = fakeredis.FakeAsyncRedis()
+    yield client
+    await client.flushall()
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_values_round_trip_as_json(redis_client):
+    cache = AsyncRedisCache(client=redis_client)
+    await cache.set("note", {"id": "n1", "tags": ["咖啡"], "likes": 3}, expire_time=10)
+    assert await cache.get("note") == {"id": "n1", "tags": ["咖啡"], "likes": 3}
+    assert await redis_client.get("note") == '{"id":"n1","tags":["咖啡"],"likes":3}'.encode()
+    assert 0 < await redis_client.ttl("note") <= 10
+    assert await cache.get("missing") is None
+
+    # Entries written by the pickle based cache are not unpickled, they read as missing
+    await redis_client.set("legacy", pickle.dumps({"id": "n1"}))
+    assert await cache.get("legacy") is None
+
+
+@pytest.mark.asyncio
+async def test_keys_scan_and_mget_in_batches(redis_client, monkeypatch):
+    from src.services.cache import async_redis_cache
+
+    monkeypatch.setattr(async_redis_cache, "MGET_BATCH_SIZE", 7)
+    cache = AsyncRedisCache(client=redis_client)
+    for index in range(30):
+        await cache.set(f"KDL_{index}", index, expire_time=60)
+    await cache.set("OTHER_1", "x", expire_time=60)
+
+    keys = sorted(await cache.keys("KDL_*"), key=lambda key: int(key.split("_")[1]))
+    assert keys == [f"KDL_{index}" for index in range(30)]
+    assert await cache.mget(keys + ["KDL_missing"]) == list(range(30)) + [None]
+    assert await cache.mget([]) == []
+
+
+@pytest.mark.asyncio
+async def test_ip_cache_loads_all_ips_in_bulk(redis_client, monkeypatch):
+    monkeypatch.setattr(
+        CacheFactory, "create_cache",
+        staticmethod(lambda cache_type, *args, **kwargs: AsyncRedisCache(client=redis_client)),
+    )
+    ip_cache = IpCache()
+    for port in (8001, 8002):
+        proxy = IpInfoModel(ip="10.0.0.1", port=port, user="u", password="p", expired_time_ts=2000000000)
+        await ip_cache.set_ip(f"KDL_10.0.0.1_{port}", proxy.model_dump_json(), ex=60)
+    await redis_client.set("KDL_broken", b"\x80not json")
+
+    proxies = await ip_cache.load_all_ip(proxy_brand_name="KDL")
+    assert sorted(proxy.port for proxy in proxies) == [8001, 8002]
+
+
+def test_factory_selects_the_async_cache():
+    assert isinstance(CacheFactory.create_cache(config.CACHE_TYPE_REDIS_ASYNC), AsyncRedisCache)
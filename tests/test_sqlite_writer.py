@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""SQLite single writer: upsert semantics, flush barriers and records rejected by SQLite"""
+import sqlite3
+
+import pytest
+
+from src.storage.base.sqlite_writer import SqliteWriteError, SqliteWriter, UpsertSpec, open_readonly_connection
+
+SPEC = UpsertSpec(table="note", key="note_id", columns=("note_id", "title", "likes", "add_ts"),
+                  update_columns=("likes",))
+
+
+@pytest.fixture
+def writer(tmp_path):
+    db_path = str(tmp_path / "writer.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE note (id INTEGER PRIMARY KEY, note_id TEXT UNIQUE, title TEXT, likes INTEGER CHECK (likes >= 0), "
+        "add_ts INTEGER)"
+    )
+    conn.close()
+    # Large batch and interval: only barriers commit, so the tests control every group commit
+    writer = SqliteWriter(db_path, batch_size=10000, flush_interval_ms=60000)
+    writer.start()
+    yield writer
+    writer.close()
+
+
+def rows(writer):
+    with open_readonly_connection(writer.db_path) as conn:
+        return [tuple(row) for row in conn.execute("SELECT note_id, title, likes, add_ts FROM note ORDER BY note_id")]
+
+
+def note(note_id, likes, title="t", add_ts=1):
+    return {"note_id": note_id, "title": title, "likes": likes, "add_ts": add_ts}
+
+
+@pytest.mark.asyncio
+async def test_upsert_inserts_then_refreshes_update_columns_only(writer):
+    await writer.submit(SPEC, note("n1", 1, title="first", add_ts=1))
+    # Same key twice in one group: the later record wins
+    await writer.submit(SPEC, note("n2", 1))
+    await writer.submit(SPEC, note("n2", 5))
+    await writer.flush()
+    assert rows(writer) == [("n1", "first", 1, 1), ("n2", "t", 5, 1)]
+
+    await writer.submit(SPEC, note("n1", 9, title="second", add_ts=2))
+    await writer.flush()
+    assert rows(writer)[0] == ("n1", "first", 9, 1)
+    assert writer.committed_rows == 3
+
+
+@pytest.mark.asyncio
+async def test_flush_returns_after_everything_submitted_before_it(writer):
+    for index in range(200):
+        await writer.submit(SPEC, note(f"n{index:03d}", index))
+    assert rows(writer) == []
+    await writer.flush()
+    assert len(rows(writer)) == 200 and rows(writer)[-1] == ("n199", "t", 199, 1)
+
+
+@pytest.mark.asyncio
+async def test_rejected_record_is_isolated_and_reported(writer):
+    await writer.submit(SPEC, note("n1", 1))
+    await writer.submit(SPEC, note("bad", -1))
+    await writer.submit(SPEC, note("n2", 2))
+    with pytest.raises(SqliteWriteError) as error:
+        await writer.flush()
+    assert [(table, key) for table, key, _ in error.value.failures] == [("note", "bad")]
+    assert rows(writer) == [("n1", "t", 1, 1), ("n2", "t", 2, 1)]
+    assert (writer.committed_rows, writer.failed_rows) == (2, 1)
+
+    # Failures are reported once, the next flush starts clean
+    await writer.submit(SPEC, note("n3", 3))
+    await writer.flush()
+
+
+@pytest.mark.asyncio
+async def test_close_reports_records_rejected_after_the_last_flush(writer):
+    await writer.submit(SPEC, note("bad", -1))
+    with pytest.raises(SqliteWriteError):
+        writer.close()
+    assert rows(writer) == []
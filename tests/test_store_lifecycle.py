@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""Every SAVE_DATA_OPTION store of both platforms opens, flushes and closes through its factory"""
+import logging
+
+import pytest
+
+import config
+from config import db_config
+from src.core.var import crawler_type_var
+from src.storage.xhs import XhsStoreFactory
+from src.storage.zhihu import ZhihuStoreFactory
+
+FACTORIES = [XhsStoreFactory, ZhihuStoreFactory]
+OPTIONS = list(XhsStoreFactory.STORES)
+
+
+@pytest.fixture(autouse=True)
+def isolated_run(tmp_path, monkeypatch):
+    # File sinks write under ./data, the single SQLite writer opens SQLITE_DB_PATH
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(db_config, "SQLITE_DB_PATH", str(tmp_path / "sqlite_tables.db"))
+    monkeypatch.setattr(config, "ENABLE_GET_WORDCLOUD", False)
+    crawler_type_var.set("search")
+    for factory in FACTORIES:
+        monkeypatch.setattr(factory, "_store", None)
+
+
+def test_both_platforms_support_the_same_options():
+    assert sorted(ZhihuStoreFactory.STORES) == sorted(OPTIONS)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("factory", FACTORIES, ids=lambda factory: factory.__name__)
+@pytest.mark.parametrize("option", OPTIONS)
+async def test_store_opens_flushes_and_closes(factory, option, monkeypatch):
+    monkeypatch.setattr(config, "SAVE_DATA_OPTION", option)
+    store = await factory.open_store()
+    await store.flush()
+    await factory.close_store()
+    assert factory._store is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("factory", FACTORIES, ids=lambda factory: factory.__name__)
+async def test_fanned_out_file_sinks_flush_without_errors(factory, monkeypatch, caplog):
+    monkeypatch.setattr(config, "SAVE_DATA_OPTION", "csv,json,jsonl")
+    store = await factory.open_store()
+    await store.flush()
+    await factory.close_store()
+    failures = [record.getMessage() for record in caplog.records if record.levelno >= logging.ERROR]
+    assert failures == []
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""Thumbnails: bounded output, format fallback, skip / failure accounting, the downloader hook and the upload preview"""
+import base64
+import io
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from PIL import Image
+
+import config
+from api.routers import publisher as publisher_router
+from api.routers.auth import get_current_user
+from src.services.media import MediaDownloader, MediaTask, ThumbnailProcessor, make_thumbnail_bytes
+from src.services.media import thumbnails
+from src.services.media.thumbnails import make_thumbnail, resolve_format, thumbnail_path
+
+
+def image_bytes(size=(1200, 800), fmt="JPEG", mode="RGB"):
+    buffer = io.BytesIO()
+    Image.new(mode, size, (200, 80, 40, 255)[:len(mode)]).save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+def open_image(data):
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    return image
+
+
+@pytest.fixture(autouse=True)
+def no_waiting(monkeypatch):
+    monkeypatch.setattr(config, "MEDIA_DOWNLOAD_DEFAULT_RATE", 0)
+    monkeypatch.setattr(config, "MEDIA_DOWNLOAD_RATE_LIMITS", {})
+
+
+@pytest.mark.parametrize("size, fmt, mode", [((1200, 800), "JPEG", "RGB"), ((300, 900), "PNG", "RGBA"),
+                                             ((100, 50), "PNG", "P")])
+def test_thumbnail_fits_the_max_size_and_keeps_the_aspect_ratio(tmp_path, size, fmt, mode):
+    src = tmp_path / f"0.{fmt.lower()}"
+    src.write_bytes(image_bytes(size, fmt, mode))
+    for out_fmt in ("WEBP", "JPEG"):
+        dst = thumbnail_path(src, out_fmt)
+        size_in, size_out, longest = make_thumbnail(str(src), str(dst), 240, out_fmt, 80)
+
+        thumb = open_image(dst.read_bytes())
+        scale = min(1, 240 / max(size))
+        assert thumb.format == out_fmt and max(thumb.size) == longest <= 240
+        assert thumb.size == (round(size[0] * scale), round(size[1] * scale))
+        assert (size_in, size_out) == (src.stat().st_size, dst.stat().st_size)
+        assert not dst.with_name(dst.name + ".tmp").exists()
+
+    preview = open_image(make_thumbnail_bytes(image_bytes(size, fmt, mode), 120))
+    assert preview.format == "WEBP" and max(preview.size) <= 120
+
+
+def test_avif_falls_back_to_webp_when_unavailable(monkeypatch, tmp_path):
+    monkeypatch.setattr(thumbnails, "AVIF_AVAILABLE", False)
+    assert resolve_format("avif") == "WEBP"
+    assert ThumbnailProcessor(fmt="AVIF", workers=1).fmt == "WEBP"
+    assert open_image(make_thumbnail_bytes(image_bytes(), 64, "AVIF")).format == "WEBP"
+    assert thumbnail_path(tmp_path / "0.jpg", "WEBP").name == "0.thumb.webp"
+    with pytest.raises(ValueError):
+        resolve_format("GIF")
+
+
+@pytest.mark.asyncio
+async def test_existing_thumbnails_are_skipped_and_corrupt_images_counted(tmp_path):
+    good, existing, corrupt = tmp_path / "good.jpg", tmp_path / "existing.jpg", tmp_path / "corrupt.jpg"
+    good.write_bytes(image_bytes())
+    existing.write_bytes(image_bytes())
+    thumbnail_path(existing, "WEBP").write_bytes(b"already there")
+    corrupt.write_bytes(b"\xff\xd8 not really a jpeg")
+
+    processor = ThumbnailProcessor(max_size=64, fmt="WEBP", workers=1)
+    for path in (good, existing, corrupt):
+        await processor.submit(path)
+    await processor.close()
+
+    stats = processor.stats()
+    assert (stats["images_processed"], stats["images_skipped"], stats["images_failed"]) == (1, 1, 1)
+    assert stats["bytes_in"] == good.stat().st_size and stats["bytes_out"] == thumbnail_path(good, "WEBP").stat().st_size
+    assert thumbnail_path(existing, "WEBP").read_bytes() == b"already there"
+    assert not thumbnail_path(corrupt, "WEBP").exists()
+
+
+@pytest.mark.asyncio
+async def test_downloaded_images_get_a_thumbnail_through_on_complete(tmp_path):
+    content = image_bytes((800, 600))
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=content))
+    processor = ThumbnailProcessor(max_size=100, fmt="WEBP", workers=1)
+    downloader = MediaDownloader(concurrency=2, transport=transport)
+    for index, kind in enumerate(["image", "image", "video"]):
+        await downloader.submit(MediaTask(url=f"https://cdn.example.com/{index}", path=tmp_path / f"{index}.jpg",
+                                          kind=kind, on_complete=processor.on_media_complete))
+    await downloader.close()
+    await processor.close()
+
+    # Videos are left alone
+    assert sorted(path.name for path in tmp_path.glob("*.thumb.*")) == ["0.thumb.webp", "1.thumb.webp"]
+    assert max(open_image((tmp_path / "0.thumb.webp").read_bytes()).size) == 100
+    assert processor.images_processed == 2
+
+
+class FakePublisher:
+    def __init__(self):
+        self.uploads = []
+
+    async def get_upload_permit(self, count):
+        return {"file_ids": [f"file{len(self.uploads)}"], "token": "token"}
+
+    async def upload_image(self, path, file_id, token):
+        self.uploads.append(file_id)
+        image = Image.open(path)
+        return type("ImageInfo", (), {"width": image.width, "height": image.height})()
+
+
+async def upload(content):
+    app = FastAPI()
+    app.include_router(publisher_router.router)
+    app.dependency_overrides[get_current_user] = lambda: {"user_id": 1}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://api") as client:
+        return await client.post("/publisher/upload", files={"file": ("a.jpg", content, "image/jpeg")})
+
+
+@pytest.mark.asyncio
+async def test_upload_preview_is_a_thumbnail_and_undecodable_images_are_not_uploaded(monkeypatch):
+    publisher = FakePublisher()
+    monkeypatch.setattr(publisher_router, "_publisher_instance", publisher)
+    monkeypatch.setattr(publisher_router, "_uploaded_images", {})
+
+    response = await upload(image_bytes((1600, 1200)))
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["width"], body["height"]) == (1600, 1200)
+    preview = open_image(base64.b64decode(body["url"].removeprefix("data:image/webp;base64,")))
+    assert max(preview.size) == publisher_router.PREVIEW_MAX_SIZE
+
+    response = await upload(b"\xff\xd8 not really a jpeg")
+    assert response.status_code == 400
+    assert publisher.uploads == ["file0"] and list(publisher_router._uploaded_images) == ["file0"]
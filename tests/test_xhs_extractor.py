@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""Equivalence of the targeted __INITIAL_STATE__ extraction with the original whole-page implementation"""
+import json
+import re
+
+import humps
+import pytest
+
+from src.platforms.xhs.extractor import XiaoHongShuExtractor, decamelize_tree
+from tests.benchmarks import fixtures
+
+NOTE_IDS = ["65a1b2c3d4e5f60718293a4b", "6600aa11bb22cc33dd44ee55", "5e8f9a0b1c2d3e4f50617283"]
+
+
+def legacy_extract_note_detail(note_id: str, html: str):
+    if "noteDetailMap" not in html:
+        return None
+    state = re.findall(r"window.__INITIAL_STATE__=({.*})</script>", html)[0].replace("undefined", '""')
+    if state != "{}":
+        return humps.decamelize(json.loads(state))["note"]["note_detail_map"][note_id]["note"]
+    return None
+
+
+def legacy_extract_creator_info(html: str):
+    match = re.search(r"<script>window.__INITIAL_STATE__=(.+)<\/script>", html, re.M)
+    if match is None:
+        return None
+    info = json.loads(match.group(1).replace(":undefined", ":null"), strict=False)
+    if info is None:
+        return None
+    return info.get("user").get("userPageData")
+
+
+@pytest.fixture
+def extractor():
+    return XiaoHongShuExtractor()
+
+
+@pytest.mark.parametrize("scale", [1, 3])
+@pytest.mark.parametrize("note_id", NOTE_IDS)
+def test_note_detail_matches_legacy(extractor, note_id, scale):
+    html = fixtures.xhs_note_html(note_id, scale=scale)
+    note = extractor.extract_note_detail_from_html(note_id, html)
+    assert note == legacy_extract_note_detail(note_id, html)
+    assert note["last_update_time"] == ""
+    assert note["interact_info"]["liked_count"]
+
+
+@pytest.mark.parametrize("user_id", ["5f0e1d2c3b4a596877665544", "60aa11bb22cc33dd44ee5566"])
+def test_creator_info_matches_legacy(extractor, user_id):
+    html = fixtures.xhs_creator_html(user_id, scale=2)
+    creator = extractor.extract_creator_info_from_html(html)
+    assert creator == legacy_extract_creator_info(html)
+    assert creator["basicInfo"]["imageb"] is None
+
+
+def test_note_text_containing_undefined_is_kept(extractor):
+    note_id = NOTE_IDS[0]
+    state = fixtures.xhs_initial_state(note_id)
+    note = state["note"]["noteDetailMap"][note_id]["note"]
+    note["desc"] = "this value is undefined, really undefined"
+    note["tagList"][0]["name"] = "undefined"
+    html = f"<html><script>window.__INITIAL_STATE__={fixtures._js_literal(state)}</script></html>"
+
+    result = extractor.extract_note_detail_from_html(note_id, html)
+    assert result["desc"] == "this value is undefined, really undefined"
+    assert result["tag_list"][0]["name"] == "undefined"
+    assert result["last_update_time"] == ""
+
+
+def test_missing_state_returns_none(extractor):
+    assert extractor.extract_note_detail_from_html(NOTE_IDS[0], "<html>captcha</html>") is None
+    assert extractor.extract_note_detail_from_html(
+        NOTE_IDS[0], "<script>window.__INITIAL_STATE__={}</script><div>noteDetailMap</div>"
+    ) is None
+    assert extractor.extract_creator_info_from_html("<html></html>") is None
+
+
+def test_decamelize_tree_matches_humps():
+    tree = {"noteDetailMap": [{"imageList": [{"urlDefault": 1, "infoList": [{"imageScene": "WB_DFT"}]}]}], "APIResponse": {"X": 2}}
+    assert decamelize_tree(tree) == humps.decamelize(tree)
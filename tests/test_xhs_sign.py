@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""Property tests of the byte level XHS sign helpers against the original list based implementation"""
+import ctypes
+import json
+from urllib.parse import quote
+
+import pytest
+
+hypothesis = pytest.importorskip("hypothesis")
+from hypothesis import given, strategies as st
+
+from src.platforms.xhs import help as xhs_help
+from src.platforms.xhs import xhs_sign
+from src.platforms.xhs.playwright_sign import _build_xs_common, _build_xs_payload
+
+
+# ========== Reference implementation (as shipped before the byte level rewrite) ==========
+
+def _crc32_table():
+    table = []
+    for n in range(256):
+        c = n
+        for _ in range(8):
+            c = (c >> 1) ^ 0xEDB88320 if c & 1 else c >> 1
+        table.append(c)
+    return table
+
+
+LEGACY_CRC32_TABLE = _crc32_table()
+LEGACY_BASE64_CHARS = list("ZmserbBoHQtNP+wOcza/LpngG8yJq42KWYj0DSfdikx3VT16IlUAFM97hECvuRX5")
+
+
+def legacy_right_shift_unsigned(num: int, bit: int = 0) -> int:
+    val = ctypes.c_uint32(num).value >> bit
+    MAX32INT = 4294967295
+    return (val + (MAX32INT + 1)) % (2 * (MAX32INT + 1)) - MAX32INT - 1
+
+
+def legacy_mrc(e: str) -> int:
+    o = -1
+    for n in range(min(57, len(e))):
+        o = LEGACY_CRC32_TABLE[(o & 255) ^ ord(e[n])] ^ legacy_right_shift_unsigned(o, 8)
+    return o ^ -1 ^ 3988292384
+
+
+def legacy_encode_utf8(s: str) -> list:
+    encoded = quote(s, safe="~()*!.'")
+    result = []
+    i = 0
+    while i < len(encoded):
+        if encoded[i] == "%":
+            result.append(int(encoded[i + 1: i + 3], 16))
+            i += 3
+        else:
+            result.append(ord(encoded[i]))
+            i += 1
+    return result
+
+
+def legacy_b64_encode(data: list) -> str:
+    def triplet(e):
+        return (
+            LEGACY_BASE64_CHARS[(e >> 18) & 63] + LEGACY_BASE64_CHARS[(e >> 12) & 63]
+            + LEGACY_BASE64_CHARS[(e >> 6) & 63] + LEGACY_BASE64_CHARS[e & 63]
+        )
+
+    length = len(data)
+    remainder = length % 3
+    chunks = []
+    main_length = length - remainder
+    for start in range(0, main_length, 16383):
+        end = min(start + 16383, main_length)
+        chunks.append("".join(
+            triplet(((data[i] << 16) & 0xFF0000) + ((data[i + 1] << 8) & 0xFF00) + (data[i + 2] & 0xFF))
+            for i in range(start, end, 3)
+        ))
+    if remainder == 1:
+        a = data[length - 1]
+        chunks.append(LEGACY_BASE64_CHARS[a >> 2] + LEGACY_BASE64_CHARS[(a << 4) & 63] + "==")
+    elif remainder == 2:
+        a = (data[length - 2] << 8) + data[length - 1]
+        chunks.append(
+            LEGACY_BASE64_CHARS[a >> 10] + LEGACY_BASE64_CHARS[(a >> 4) & 63]
+            + LEGACY_BASE64_CHARS[(a << 2) & 63] + "="
+        )
+    return "".join(chunks)
+
+
+# ========== Properties ==========
+
+# The signed strings are x-t + x-s + b1, the original table lookup only supports one byte characters
+latin1_text = st.text(alphabet=st.characters(max_codepoint=255))
+# Lone surrogates cannot be encoded by either implementation
+unicode_text = st.text(alphabet=st.characters(blacklist_categories=("Cs",)))
+
+
+@given(latin1_text)
+def test_mrc_matches_legacy(s):
+    assert xhs_sign.mrc(s) == legacy_mrc(s)
+
+
+@given(latin1_text.filter(lambda s: len(s) >= 57))
+def test_legacy_help_mrc_matches(s):
+    assert xhs_help.mrc(s) == legacy_mrc(s)
+
+
+@given(unicode_text)
+def test_encode_utf8_matches_legacy(s):
+    assert list(xhs_sign.encode_utf8(s)) == legacy_encode_utf8(s)
+
+
+@given(st.binary(max_size=2048))
+def test_b64_encode_matches_legacy(data):
+    assert xhs_sign.b64_encode(data) == legacy_b64_encode(list(data))
+
+
+@given(st.lists(st.integers(min_value=0, max_value=255), max_size=64))
+def test_b64_encode_accepts_int_lists(data):
+    assert xhs_sign.b64_encode(data) == legacy_b64_encode(data)
+
+
+@given(unicode_text)
+def test_encode_then_b64_matches_legacy(s):
+    assert xhs_sign.b64_encode(xhs_sign.encode_utf8(s)) == legacy_b64_encode(legacy_encode_utf8(s))
+
+
+def test_b64_encode_crosses_legacy_chunk_boundary():
+    data = bytes(range(256)) * 200
+    assert xhs_sign.b64_encode(data) == legacy_b64_encode(list(data))
+
+
+@given(
+    a1=st.text(alphabet="0123456789abcdef", min_size=52, max_size=52),
+    b1=st.text(alphabet=st.characters(min_codepoint=33, max_codepoint=126), max_size=400),
+    x3=st.text(max_size=200),
+    x_t=st.integers(min_value=10 ** 12, max_value=10 ** 13 - 1).map(str),
+)
+def test_signature_headers_match_legacy(a1, b1, x3, x_t):
+    x_s = _build_xs_payload(x3, "object")
+    legacy_x_s = "XYS_" + legacy_b64_encode(legacy_encode_utf8(json.dumps(
+        {"x0": "4.2.1", "x1": "xhs-pc-web", "x2": "Mac OS", "x3": x3, "x4": "object"}, separators=(",", ":")
+    )))
+    assert x_s == legacy_x_s
+
+    payload = {
+        "s0": 3, "s1": "", "x0": "1", "x1": "4.2.2", "x2": "Mac OS", "x3": "xhs-pc-web", "x4": "4.74.0",
+        "x5": a1, "x6": x_t, "x7": x_s, "x8": b1, "x9": legacy_mrc(x_t + x_s + b1), "x10": 154, "x11": "normal",
+    }
+    legacy_common = legacy_b64_encode(legacy_encode_utf8(json.dumps(payload, separators=(",", ":"))))
+    assert _build_xs_common(a1, b1, x_s, x_t) == legacy_common
+    assert xhs_help.sign(a1, b1, x_s, x_t)["x-s-common"] == legacy_common
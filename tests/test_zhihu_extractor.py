@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""Equivalence of the js-initialData script slicing with the original parsel DOM parsing"""
+import json
+
+import pytest
+from parsel import Selector
+
+from src.platforms.zhihu.help import ZhihuExtractor, _decode_initial_entities, slice_script_text
+from tests.benchmarks import fixtures
+
+
+def dom_entities(html: str):
+    js_init_data = Selector(text=html).xpath("//script[@id='js-initialData']/text()").get(default="")
+    return json.loads(js_init_data).get("initialState", {}).get("entities", {})
+
+
+@pytest.fixture
+def extractor():
+    return ZhihuExtractor()
+
+
+@pytest.mark.parametrize("scale", [1, 3])
+@pytest.mark.parametrize("builder", [
+    fixtures.zhihu_answer_html, fixtures.zhihu_article_html, fixtures.zhihu_zvideo_html, fixtures.zhihu_creator_html,
+])
+def test_sliced_script_matches_dom(builder, scale):
+    html = builder(scale=scale)
+    assert slice_script_text(html, "js-initialData") == Selector(text=html).xpath(
+        "//script[@id='js-initialData']/text()"
+    ).get()
+    assert ZhihuExtractor._extract_initial_entities(html) == dom_entities(html)
+
+
+@pytest.mark.parametrize("method, builder, entity", [
+    ("extract_answer_content_from_html", fixtures.zhihu_answer_html, "answers"),
+    ("extract_article_content_from_html", fixtures.zhihu_article_html, "articles"),
+])
+def test_content_from_html_matches_dom(extractor, method, builder, entity):
+    html = builder(scale=2)
+    content = next(iter(dom_entities(html)[entity].values()))
+    expected = getattr(extractor, f"_extract_{entity[:-1]}_content")(content)
+    assert getattr(extractor, method)(html) == expected
+
+
+def test_zvideo_resolves_author_from_users(extractor):
+    html = fixtures.zhihu_zvideo_html(scale=2)
+    content = extractor.extract_zvideo_content_from_html(html)
+    entities = dom_entities(html)
+    zvideo = next(iter(entities["zvideos"].values()))
+    assert content.user_nickname == entities["users"][zvideo["author"]]["name"]
+
+
+def test_creator_matches_dom(extractor):
+    html = fixtures.zhihu_creator_html("member-creator", scale=2)
+    creator = extractor.extract_creator("member-creator", html)
+    expected = dom_entities(html)["users"]["member-creator"]
+    assert (creator.user_nickname, creator.fans, creator.anwser_count) == (
+        expected["name"], expected["followerCount"], expected["answerCount"]
+    )
+
+
+def test_falls_back_to_dom_when_tag_cannot_be_sliced(extractor):
+    html = fixtures.zhihu_answer_html(scale=1).replace('<script id="js-initialData"', "<script id=js-initialData")
+    assert slice_script_text(html, "js-initialData") is None
+    assert extractor.extract_answer_content_from_html(html).content_id == "1000000001"
+
+
+def test_missing_script_returns_none(extractor):
+    html = "<html><body><script id=\"js-clientConfig\">{}</script></body></html>"
+    assert extractor.extract_answer_content_from_html(html) is None
+    assert extractor.extract_creator("member-creator", html) is None
+    assert extractor.extract_zvideo_content_from_html("") is None
+
+
+@pytest.mark.parametrize("js_init_data", [
+    # Nested "entities" keys before and inside the real branch must not be taken for initialState.entities
+    '{"initialState":{"common":{"ad":{"entities":{}}},"entities":{"answers":{"1":{"id":1}}}}}',
+    '{"meta": {"entities": []}, "initialState" : { "loading" : {"entities": {"x": 1}} ,\n'
+    ' "entities" : {"answers": {"1": {"id": 1, "entities": {}}}}}, "subAppName": "main"}',
+    # A key string that merely contains the pattern
+    '{"initialState":{"note":"\\"entities\\":{}","entities":{"answers":{"1":{"id":1}}}}}',
+    # Entities missing or not an object: whatever the full parse gives
+    '{"initialState":{"common":{"entities":{"answers":{}}}}}',
+    '{"initialState":{"entities":null}}',
+])
+def test_only_the_direct_entities_member_of_initial_state_is_decoded(js_init_data):
+    expected = json.loads(js_init_data).get("initialState", {}).get("entities", {})
+    assert _decode_initial_entities(js_init_data) == expected